@@ -0,0 +1,841 @@
+# aws_emulator.py
+# Emulador asyncio en proceso de la mensajería del flujo de pedidos.
+#
+# Lee las aristas de delimasa_aws_diagram.py y construye sustitutos en
+# memoria de cada nodo según su tipo:
+#   SQS            cola con visibility timeout, lotes, contador de
+#                  recepciones y DLQ (<cola>_dlq) tras max_receive_count
+#   SNS            tópico con fan-out a sus suscriptores (aristas salientes)
+#   Eventbridge    bus con reglas por detail-type hacia sus destinos
+#   StepFunctions  máquina de estados (subconjunto de ASL: Task, Parallel,
+#                  Pass, Succeed, Fail, Retry y Catch)
+#   Lambda         función Python con concurrencia limitada: toda invocación
+#                  (Step Functions, pollers de SQS, SNS, EventBridge) pasa por
+#                  el mismo límite y espera turno si está lleno (throttle); las
+#                  asíncronas además esperan en la cola de eventos de la función
+# Un handler solo puede enviar a los nodos con los que su Lambda está
+# conectada en el diagrama (ctx.send / ctx.publish / ctx.put_event /
+# ctx.start_execution); las fuentes de eventos SQS no dibujadas se declaran
+# en WIRING["event_sources"] y se avisan al arrancar.
+#
+# Todo corre en un solo hilo: los mensajes son objetos con __slots__ en
+# deques, los plazos de visibilidad van en orden FIFO (el timeout es fijo
+# por cola) y los handlers síncronos se ejecutan sin crear tareas, así que
+# un núcleo mueve decenas de miles de mensajes por segundo.
+#
+# Uso:
+#     python aws_emulator.py --orders 100000
+#     python aws_emulator.py --orders 20000 --rate 2000 --handler-ms 5
+#     python aws_emulator.py --orders 20000 --fail lambda_notificaciones=0.05 --visibility 0.2
+#     python aws_emulator.py --set sqs_facturacion.concurrency=1 --set lambda_notificaciones.concurrency=2
+
+import argparse
+import asyncio
+import copy
+import inspect
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+
+import topology
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WIRING = {
+    "script": "delimasa_aws_diagram.py",
+    "entry": "lambda_registro",
+    "queues": {
+        "default": {"visibility_timeout": 30.0, "max_receive_count": 3},
+    },
+    "functions": {
+        "default": {"concurrency": 50},
+        "lambda_notificaciones": {"concurrency": 20},
+    },
+    # Consumidores de colas (event source mappings): no están dibujados
+    "event_sources": {
+        "sqs_pedidos": {"target": "step_functions", "batch_size": 10, "concurrency": 5},
+        "sqs_facturacion": {"target": "lambda_notificaciones", "batch_size": 10, "concurrency": 5},
+    },
+    # Reglas de EventBridge: destino -> detail-types que recibe
+    "rules": {
+        "eventbridge": {"sns_estados": ["EstadoPedido"], "sns_alertas": ["Alerta"]},
+    },
+    "state_machines": {
+        "step_functions": {
+            "StartAt": "Validaciones",
+            "States": {
+                "Validaciones": {
+                    "Type": "Parallel",
+                    "Branches": [
+                        {"StartAt": "Inventario",
+                         "States": {"Inventario": {"Type": "Task", "Resource": "lambda_validacion_inv",
+                                                   "End": True}}},
+                        {"StartAt": "Credito",
+                         "States": {"Credito": {"Type": "Task", "Resource": "lambda_validacion_cred",
+                                                "End": True}}},
+                    ],
+                    "Catch": [{"ErrorEquals": ["States.ALL"], "Next": "Alertar"}],
+                    "Next": "Facturar",
+                },
+                "Facturar": {"Type": "Task", "Resource": "lambda_facturas",
+                             "Retry": [{"ErrorEquals": ["States.ALL"], "MaxAttempts": 2}],
+                             "Catch": [{"ErrorEquals": ["States.ALL"], "Next": "Alertar"}],
+                             "Next": "Notificar"},
+                "Notificar": {"Type": "Task", "Resource": "lambda_notificaciones",
+                              "Catch": [{"ErrorEquals": ["States.ALL"], "Next": "Alertar"}],
+                              "Next": "PublicarEstado"},
+                "PublicarEstado": {"Type": "Task", "Resource": "eventbridge",
+                                   "DetailType": "EstadoPedido", "End": True},
+                "Alertar": {"Type": "Task", "Resource": "eventbridge", "DetailType": "Alerta",
+                            "Next": "Fallido"},
+                "Fallido": {"Type": "Fail", "Error": "PedidoNoProcesado"},
+            },
+        },
+    },
+}
+
+
+class WiringError(ValueError):
+    pass
+
+
+class ExecutionFailed(Exception):
+    pass
+
+
+_ids = itertools.count(1)
+
+
+class Message:
+    __slots__ = ("id", "body", "receive_count", "sent_at")
+
+    def __init__(self, body, sent_at):
+        self.id = next(_ids)
+        self.body = body
+        self.receive_count = 0
+        self.sent_at = sent_at
+
+
+# ============================================
+# RECURSOS
+# ============================================
+
+class Queue:
+    """Cola SQS estándar en memoria."""
+
+    def __init__(self, name, visibility_timeout=30.0, max_receive_count=3, dlq=None):
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_receive_count = max_receive_count
+        self.dlq = dlq
+        self._visible = deque()
+        self._inflight = {}
+        # (plazo, recibo) en orden de recepción: el timeout es fijo por cola
+        self._deadlines = deque()
+        self._receipts = itertools.count(1)
+        self._ready = asyncio.Event()
+        self.sent = self.received = self.deleted = self.redriven = self.expired = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self._visible)
+
+    @property
+    def in_flight(self):
+        return len(self._inflight)
+
+    def send(self, body):
+        self._enqueue(Message(body, time.perf_counter()))
+
+    def _enqueue(self, message):
+        self._visible.append(message)
+        self.sent += 1
+        if len(self._visible) > self.max_depth:
+            self.max_depth = len(self._visible)
+        if not self._ready.is_set():
+            self._ready.set()
+
+    def _expire(self, now):
+        deadlines, inflight = self._deadlines, self._inflight
+        while deadlines and (deadlines[0][1] not in inflight or deadlines[0][0] <= now):
+            _, receipt = deadlines.popleft()
+            message = inflight.pop(receipt, None)
+            if message is not None:
+                self.expired += 1
+                self._visible.append(message)
+
+    async def receive(self, max_messages=10, wait_seconds=20.0):
+        """Hasta `max_messages` pares (recibo, mensaje), con long polling."""
+        loop = asyncio.get_running_loop()
+        until = loop.time() + wait_seconds
+        while True:
+            now = loop.time()
+            self._expire(now)
+            batch = []
+            while self._visible and len(batch) < max_messages:
+                message = self._visible.popleft()
+                message.receive_count += 1
+                if self.dlq is not None and message.receive_count > self.max_receive_count:
+                    self.redriven += 1
+                    self.dlq._enqueue(message)
+                    continue
+                receipt = next(self._receipts)
+                self._inflight[receipt] = message
+                self._deadlines.append((now + self.visibility_timeout, receipt))
+                batch.append((receipt, message))
+            if batch:
+                self.received += len(batch)
+                return batch
+            remaining = until - now
+            if self._deadlines:
+                remaining = min(remaining, self._deadlines[0][0] - now)
+            if remaining <= 0 and now >= until:
+                return []
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), max(remaining, 0.001))
+            except asyncio.TimeoutError:
+                pass
+
+    def delete(self, receipt):
+        if self._inflight.pop(receipt, None) is not None:
+            self.deleted += 1
+
+
+class Topic:
+    """Tópico SNS: cada publicación llega a todos los suscriptores."""
+
+    def __init__(self, name):
+        self.name = name
+        self.subscribers = []
+        self.published = self.delivered = 0
+
+    def publish(self, message):
+        self.published += 1
+        for deliver in self.subscribers:
+            deliver(message)
+            self.delivered += 1
+
+
+class EventBus:
+    """Bus de EventBridge con reglas por detail-type."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rules = []          # (detail-types o None = todos, entrega)
+        self.events = self.matched = 0
+
+    def put_event(self, detail_type, detail, source="delimasa"):
+        self.events += 1
+        event = {"source": source, "detail-type": detail_type, "detail": detail}
+        for types, deliver in self.rules:
+            if types is None or detail_type in types:
+                deliver(event)
+                self.matched += 1
+
+
+class Context:
+    """Contexto del handler: solo alcanza los nodos conectados a su Lambda."""
+
+    __slots__ = ("function_name", "_emulator")
+
+    def __init__(self, emulator, function_name):
+        self.function_name = function_name
+        self._emulator = emulator
+
+    def send(self, queue, body):
+        self._emulator.resource(self.function_name, queue, Queue).send(body)
+
+    def publish(self, topic, message):
+        self._emulator.resource(self.function_name, topic, Topic).publish(message)
+
+    def put_event(self, bus, detail_type, detail):
+        self._emulator.resource(self.function_name, bus, EventBus).put_event(detail_type, detail)
+
+    def start_execution(self, machine, payload):
+        self._emulator.spawn(self._emulator.resource(self.function_name, machine, StateMachine).execute(payload))
+
+
+class Function:
+    """Lambda: invocación síncrona o asíncrona, ambas bajo el mismo límite de concurrencia.
+
+    Una llamada que llega con todas las instancias ocupadas cuenta como
+    throttle y espera turno en orden de llegada (Step Functions y los
+    pollers de SQS reintentan hasta conseguirlo).
+    """
+
+    def __init__(self, emulator, name, handler, concurrency=50, failure_rate=0.0):
+        self.emulator = emulator
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.failure_rate = failure_rate
+        self.context = Context(emulator, name)
+        self.pending = deque()
+        self.workers = 0
+        self.active = 0
+        self.waiting = deque()
+        self.invocations = self.errors = self.max_pending = 0
+        self.throttles = self.max_waiting = self.peak_active = 0
+
+    def invoke(self, event):
+        """Llama al handler; devuelve su resultado (o un awaitable)."""
+        self.invocations += 1
+        if self.failure_rate and random.random() < self.failure_rate:
+            self.errors += 1
+            raise RuntimeError(f"{self.name}: fallo inyectado")
+        try:
+            return self.handler(event, self.context)
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def _acquire(self):
+        if self.active < self.concurrency:
+            self.active += 1
+        else:
+            self.throttles += 1
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiting.append(waiter)
+            if len(self.waiting) > self.max_waiting:
+                self.max_waiting = len(self.waiting)
+            try:
+                await waiter        # _release le cede la instancia
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                raise
+        if self.active > self.peak_active:
+            self.peak_active = self.active
+
+    def _release(self):
+        while self.waiting:
+            waiter = self.waiting.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    async def call(self, event):
+        await self._acquire()
+        try:
+            result = self.invoke(event)
+            if inspect.isawaitable(result):
+                try:
+                    result = await result
+                except Exception:
+                    self.errors += 1
+                    raise
+            return result
+        finally:
+            self._release()
+
+    @property
+    def busy(self):
+        return self.active or self.waiting or self.pending or self.workers
+
+    def invoke_async(self, event):
+        self.pending.append(event)
+        if len(self.pending) > self.max_pending:
+            self.max_pending = len(self.pending)
+        if self.workers < self.concurrency:
+            self.workers += 1
+            self.emulator.spawn(self._worker())
+
+    async def _worker(self):
+        try:
+            served = 0
+            while self.pending:
+                event = self.pending.popleft()
+                # Invocación asíncrona de Lambda: dos reintentos y se descarta
+                for _ in range(3):
+                    try:
+                        await self.call(event)
+                        break
+                    except Exception:
+                        continue
+                served += 1
+                if served % 64 == 0:
+                    await asyncio.sleep(0)   # no acaparar el bucle con handlers síncronos
+        finally:
+            self.workers -= 1
+
+
+class StateMachine:
+    """Intérprete de un subconjunto de Amazon States Language."""
+
+    def __init__(self, emulator, name, definition):
+        self.emulator = emulator
+        self.name = name
+        self.definition = definition
+        self.started = self.succeeded = self.failed = self.running = 0
+
+    async def execute(self, payload):
+        self.started += 1
+        self.running += 1
+        try:
+            output = await self._run(self.definition, payload)
+            self.succeeded += 1
+            return output
+        except ExecutionFailed:
+            self.failed += 1
+            return None
+        finally:
+            self.running -= 1
+
+    async def _run(self, definition, data):
+        name = definition["StartAt"]
+        while True:
+            state = definition["States"][name]
+            kind = state["Type"]
+            try:
+                if kind == "Task":
+                    data = await self._task(state, data)
+                elif kind == "Parallel":
+                    branches = [self._run(branch, data) for branch in state["Branches"]]
+                    if self.emulator.concurrent_branches:
+                        data = list(await asyncio.gather(*branches))
+                    else:
+                        data = [await branch for branch in branches]
+                elif kind == "Pass":
+                    data = state.get("Result", data)
+                elif kind == "Succeed":
+                    return data
+                elif kind == "Fail":
+                    raise ExecutionFailed(state.get("Error", "States.Failed"))
+                else:
+                    raise WiringError(f"{self.name}: estado {kind!r} no soportado")
+            except ExecutionFailed as exc:
+                if kind == "Fail" or not state.get("Catch"):
+                    raise
+                name = state["Catch"][0]["Next"]
+                data = {"Error": str(exc), "Input": data}
+                continue
+            if state.get("End"):
+                return data
+            name = state["Next"]
+
+    async def _task(self, state, data):
+        resource = state["Resource"]
+        target = self.emulator.resource(self.name, resource)
+        if not isinstance(target, Function):
+            self.emulator.deliver(self.name, resource, data, detail_type=state.get("DetailType"))
+            return data
+        attempts = 1 + sum(r.get("MaxAttempts", 3) for r in state.get("Retry", []))
+        for attempt in range(attempts):
+            try:
+                result = await target.call(data)
+                return data if result is None else result
+            except Exception as exc:
+                if attempt == attempts - 1:
+                    raise ExecutionFailed(f"{resource}: {exc}") from exc
+
+
+class EventSource:
+    """Event source mapping: pollers que leen lotes de una cola."""
+
+    def __init__(self, emulator, queue, target, batch_size=10, concurrency=5):
+        self.emulator = emulator
+        self.queue = queue
+        self.target = target
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.batches = self.failures = 0
+        self.busy = 0
+
+    async def poll(self):
+        queue, target = self.queue, self.target
+        while True:
+            batch = await queue.receive(self.batch_size, wait_seconds=1.0)
+            if not batch:
+                continue
+            self.busy += 1
+            self.batches += 1
+            try:
+                if isinstance(target, StateMachine):
+                    # StartExecution es asíncrono: el mensaje se borra al arrancar
+                    for receipt, message in batch:
+                        self.emulator.spawn(target.execute(message.body))
+                        queue.delete(receipt)
+                else:
+                    await target.call({"Records": [{"messageId": m.id, "body": m.body,
+                                                    "receiveCount": m.receive_count} for _, m in batch]})
+                    for receipt, _ in batch:
+                        queue.delete(receipt)
+            except Exception:
+                # El lote vuelve a ser visible al vencer el visibility timeout
+                self.failures += 1
+            finally:
+                self.busy -= 1
+
+
+# ============================================
+# EMULADOR
+# ============================================
+
+class Emulator:
+    """Recursos en memoria construidos a partir de la topología."""
+
+    def __init__(self, graph, wiring, handlers, failure_rates=None):
+        self.graph = graph
+        self.wiring = wiring
+        self.resources = {}
+        self.event_sources = []
+        self.warnings = []
+        self.tasks = set()
+        self.concurrent_branches = any(inspect.iscoroutinefunction(h) for h in handlers.values())
+        failure_rates = failure_rates or {}
+
+        for node in range(graph.n_nodes):
+            name, kind = graph.ids[node], graph.kind(node)
+            if kind == "SQS":
+                options = dict(wiring["queues"]["default"], **wiring["queues"].get(name, {}))
+                dlq = Queue(f"{name}_dlq")
+                self.resources[dlq.name] = dlq
+                self.resources[name] = Queue(name, options["visibility_timeout"],
+                                             options["max_receive_count"], dlq)
+            elif kind == "SNS":
+                self.resources[name] = Topic(name)
+            elif kind == "Eventbridge":
+                self.resources[name] = EventBus(name)
+            elif kind == "StepFunctions" and name in wiring["state_machines"]:
+                self.resources[name] = StateMachine(self, name, wiring["state_machines"][name])
+            elif kind == "Lambda" and name in handlers:
+                options = dict(wiring["functions"]["default"], **wiring["functions"].get(name, {}))
+                self.resources[name] = Function(self, name, handlers[name], options["concurrency"],
+                                                failure_rates.get(name, 0.0))
+        self._subscribe()
+        self._check_state_machines()
+
+    def _subscribe(self):
+        graph = self.graph
+        for name, resource in self.resources.items():
+            if isinstance(resource, Topic):
+                for succ in graph.successors(graph.index[name]):
+                    target = self.resources.get(graph.ids[succ])
+                    if target is not None:
+                        resource.subscribers.append(self._delivery(target))
+            elif isinstance(resource, EventBus):
+                rules = self.wiring["rules"].get(name, {})
+                for succ in graph.successors(graph.index[name]):
+                    target_name = graph.ids[succ]
+                    if target_name in self.resources:
+                        types = rules.get(target_name)
+                        resource.rules.append((set(types) if types else None,
+                                               self._delivery(self.resources[target_name])))
+        for queue_name, source in self.wiring["event_sources"].items():
+            queue, target = self.resources.get(queue_name), self.resources.get(source["target"])
+            if queue is None or target is None:
+                self.warnings.append(f"fuente de eventos {queue_name} → {source['target']}: recurso inexistente")
+                continue
+            if graph.index[source["target"]] not in graph.successors(graph.index[queue_name]):
+                self.warnings.append(f"salto {queue_name} → {source['target']} no dibujado en el diagrama")
+            self.event_sources.append(EventSource(self, queue, target, source.get("batch_size", 10),
+                                                  source.get("concurrency", 5)))
+        consumed = {id(source.queue) for source in self.event_sources}
+        for name, resource in self.resources.items():
+            if isinstance(resource, Queue) and resource.dlq is not None and id(resource) not in consumed:
+                self.warnings.append(f"{name} no tiene consumidor (ni en el diagrama ni en "
+                                     f"WIRING['event_sources']): su backlog crece sin límite")
+
+    def _check_state_machines(self):
+        for machine in self.resources.values():
+            if isinstance(machine, StateMachine):
+                for resource in _task_resources(machine.definition):
+                    self.resource(machine.name, resource)
+
+    def _delivery(self, target):
+        if isinstance(target, Function):
+            return lambda message: target.invoke_async({"Records": [{"Sns": {"Message": message}}]})
+        if isinstance(target, Queue):
+            return target.send
+        if isinstance(target, Topic):
+            return target.publish
+        if isinstance(target, StateMachine):
+            return lambda message: self.spawn(target.execute(message))
+        raise WiringError(f"destino no admitido: {type(target).__name__}")
+
+    def resource(self, source, name, expected=None):
+        """Recurso `name` si la arista source → name existe en el diagrama."""
+        graph = self.graph
+        if name not in graph.index or graph.index[name] not in graph.successors(graph.index[source]):
+            raise WiringError(f"{source} → {name} no está en el diagrama")
+        resource = self.resources.get(name)
+        if resource is None or (expected is not None and not isinstance(resource, expected)):
+            raise WiringError(f"{name} no es un recurso emulado de tipo {expected.__name__ if expected else '?'}")
+        return resource
+
+    def deliver(self, source, name, payload, detail_type=None):
+        target = self.resource(source, name)
+        if isinstance(target, EventBus):
+            target.put_event(detail_type or "Evento", payload)
+        else:
+            self._delivery(target)(payload)
+
+    def spawn(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def idle(self):
+        if self.tasks:
+            return False
+        consumed = {id(source.queue) for source in self.event_sources}
+        for resource in self.resources.values():
+            if isinstance(resource, Queue) and id(resource) in consumed and (len(resource) or resource.in_flight):
+                return False
+            if isinstance(resource, Function) and resource.busy:
+                return False
+            if isinstance(resource, StateMachine) and resource.running:
+                return False
+        return not any(source.busy for source in self.event_sources)
+
+    async def run(self, orders, rate=None):
+        """Inyecta `orders` pedidos por la función de entrada y espera a que todo drene."""
+        entry = self.resources[self.wiring["entry"]]
+        pollers = [asyncio.get_running_loop().create_task(source.poll())
+                   for source in self.event_sources for _ in range(source.concurrency)]
+        started = time.perf_counter()
+        try:
+            asynchronous = inspect.iscoroutinefunction(entry.handler)
+            for i, order in enumerate(orders):
+                # Lazo abierto: los pedidos no esperan a que termine el anterior.
+                # Un handler síncrono termina antes de ceder el bucle, así que
+                # nunca ocupa más de una instancia: se espera sin crear tarea
+                if asynchronous:
+                    self.spawn(entry.call(order))
+                else:
+                    # call() no cede el bucle si hay instancia libre: mismo
+                    # límite y contadores que el resto de invocaciones
+                    try:
+                        await entry.call(order)
+                    except Exception:
+                        pass        # ya contado en entry.errors: el cliente recibe el error
+                if rate:
+                    lag = started + (i + 1) / rate - time.perf_counter()
+                    if lag > 0:
+                        await asyncio.sleep(lag)
+                elif i % 256 == 255:
+                    await asyncio.sleep(0)
+            injected = time.perf_counter() - started
+            while not self.idle():
+                await asyncio.sleep(0.005)
+            return injected, time.perf_counter() - started
+        finally:
+            for poller in pollers:
+                poller.cancel()
+            await asyncio.gather(*pollers, return_exceptions=True)
+
+
+def _task_resources(definition):
+    for state in definition["States"].values():
+        if state["Type"] == "Task":
+            yield state["Resource"]
+        for branch in state.get("Branches", []):
+            yield from _task_resources(branch)
+
+
+# ============================================
+# HANDLERS DE DELIMASA
+# ============================================
+
+def delimasa_handlers(handler_ms=0.0):
+    """Handlers mínimos de las Lambdas del flujo; con handler_ms simulan E/S."""
+
+    def registro(event, ctx):
+        ctx.send("sqs_pedidos", event)
+        return {"statusCode": 201, "pedidoId": event["pedidoId"]}
+
+    def validacion_inv(event, ctx):
+        return {"inventario": "ok", "pedidoId": event["pedidoId"]}
+
+    def validacion_cred(event, ctx):
+        return {"credito": "aprobado", "pedidoId": event["pedidoId"]}
+
+    def facturas(event, ctx):
+        order_id = event[0]["pedidoId"] if isinstance(event, list) else event["pedidoId"]
+        ctx.send("sqs_facturacion", {"pedidoId": order_id, "factura": f"FE-{order_id}"})
+        return {"pedidoId": order_id}
+
+    def notificaciones(event, ctx):
+        records = event.get("Records") if isinstance(event, dict) else None
+        for record in records or [event]:
+            ctx.send("sqs_notificaciones", {"canal": "sms", "origen": record})
+        return event
+
+    handlers = {
+        "lambda_registro": registro,
+        "lambda_validacion_inv": validacion_inv,
+        "lambda_validacion_cred": validacion_cred,
+        "lambda_facturas": facturas,
+        "lambda_notificaciones": notificaciones,
+    }
+    if not handler_ms:
+        return handlers
+
+    def slow(handler):
+        async def wrapper(event, ctx):
+            await asyncio.sleep(handler_ms / 1000)
+            return handler(event, ctx)
+        return wrapper
+
+    return {name: slow(handler) for name, handler in handlers.items()}
+
+
+def sample_orders(count, seed=None):
+    rng = random.Random(seed)
+    clients = ("clienteA", "clienteB", "clienteC")
+    for i in range(count):
+        yield {"pedidoId": f"P{i:07d}", "clienteId": rng.choice(clients),
+               "valor": rng.randint(200_000, 5_000_000)}
+
+
+# ============================================
+# CLI
+# ============================================
+
+# Campos de WIRING ajustables con --set; los enteros deben serlo
+SETTABLE = {
+    "functions": ("concurrency",),
+    "event_sources": ("batch_size", "concurrency"),
+    "queues": ("visibility_timeout", "max_receive_count"),
+}
+INTEGER_FIELDS = ("concurrency", "batch_size", "max_receive_count")
+
+
+def apply_settings(wiring, settings, graph, handlers):
+    """--set recurso.campo=valor sobre una copia de WIRING."""
+    queues = {graph.ids[n] for n in range(graph.n_nodes) if graph.kind(n) == "SQS"}
+    for setting in settings:
+        target, _, raw = setting.partition("=")
+        name, _, field = target.partition(".")
+        if name in wiring["event_sources"]:
+            section = "event_sources"
+        elif name == "default" or name in handlers:
+            section = "functions"
+        elif name in queues:
+            section = "queues"
+        else:
+            known = sorted(set(wiring["event_sources"]) | set(handlers) | queues)
+            raise ValueError(f"--set {setting!r}: recurso desconocido (usa {', '.join(known)})")
+        if field not in SETTABLE[section]:
+            raise ValueError(f"--set {setting!r}: campo desconocido para {name} "
+                             f"(usa {', '.join(SETTABLE[section])})")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = None
+        integer = field in INTEGER_FIELDS
+        if (isinstance(value, bool) or not isinstance(value, int if integer else (int, float))
+                or value <= 0):
+            raise ValueError(f"--set {setting!r}: {field} debe ser un "
+                             f"{'entero' if integer else 'número'} positivo")
+        wiring[section].setdefault(name, {})[field] = value
+
+
+def parse_failures(items, handlers):
+    """--fail lambda=probabilidad → {lambda: probabilidad}."""
+    failure_rates = {}
+    for item in items:
+        name, _, raw = item.partition("=")
+        if name not in handlers:
+            raise ValueError(f"--fail {item!r}: Lambda desconocida (usa {', '.join(handlers)})")
+        try:
+            probability = float(raw)
+        except ValueError:
+            probability = None
+        if probability is None or not 0.0 <= probability <= 1.0:
+            raise ValueError(f"--fail {item!r}: la probabilidad debe estar en [0, 1]")
+        failure_rates[name] = probability
+    return failure_rates
+
+
+def print_report(emulator, orders, injected, elapsed):
+    messages = 0
+    print(f"\n{'Recurso':<26} {'Tipo':<14} {'Entrantes':>10} {'Salientes':>10} {'Pico':>8} {'Notas'}")
+    print("-" * 90)
+    for name, resource in emulator.resources.items():
+        if isinstance(resource, Queue):
+            if not resource.sent:
+                continue
+            messages += resource.sent
+            notes = []
+            if resource.redriven:
+                notes.append(f"{resource.redriven:,} a DLQ")
+            if resource.expired:
+                notes.append(f"{resource.expired:,} reintentos")
+            if not any(s.queue is resource for s in emulator.event_sources) and not name.endswith("_dlq"):
+                notes.append(f"⚠️  sin consumidor: backlog sin límite ({len(resource):,}, "
+                             f"+{resource.sent / elapsed:,.0f} msg/s)")
+            print(f"{name:<26} {'SQS':<14} {resource.sent:>10,} {resource.deleted:>10,} "
+                  f"{resource.max_depth:>8,} {', '.join(notes)}")
+        elif isinstance(resource, Topic) and resource.published:
+            messages += resource.published
+            print(f"{name:<26} {'SNS':<14} {resource.published:>10,} {resource.delivered:>10,} {'':>8}")
+        elif isinstance(resource, EventBus) and resource.events:
+            messages += resource.events
+            print(f"{name:<26} {'EventBridge':<14} {resource.events:>10,} {resource.matched:>10,} {'':>8}")
+        elif isinstance(resource, StateMachine) and resource.started:
+            notes = f"{resource.failed:,} fallidas" if resource.failed else ""
+            print(f"{name:<26} {'StepFunctions':<14} {resource.started:>10,} {resource.succeeded:>10,} "
+                  f"{'':>8} {notes}")
+        elif isinstance(resource, Function) and resource.invocations:
+            notes = [f"concurrencia {resource.peak_active}/{resource.concurrency}"]
+            if resource.throttles:
+                notes.append(f"{resource.throttles:,} throttles (hasta {resource.max_waiting:,} esperando)")
+            if resource.errors:
+                notes.append(f"{resource.errors:,} errores")
+            notes = ", ".join(notes)
+            print(f"{name:<26} {'Lambda':<14} {resource.invocations:>10,} {'':>10} "
+                  f"{resource.max_pending:>8,} {notes}")
+    print("-" * 90)
+    print(f"📦 {orders:,} pedidos inyectados en {injected:.2f}s, flujo drenado en {elapsed:.2f}s")
+    print(f"📨 {messages:,} mensajes ({messages / elapsed:,.0f} msg/s, {orders / elapsed:,.0f} pedidos/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulador en memoria de SQS/SNS/EventBridge/Step Functions")
+    parser.add_argument("--orders", type=int, default=50_000)
+    parser.add_argument("--rate", type=float, help="pedidos/s (por defecto, tan rápido como se pueda)")
+    parser.add_argument("--handler-ms", type=float, default=0.0, help="latencia simulada de cada handler")
+    parser.add_argument("--visibility", type=float, help="visibility timeout de todas las colas (s)")
+    parser.add_argument("--fail", action="append", default=[], metavar="LAMBDA=PROB",
+                        help="probabilidad de fallo inyectado, p. ej. lambda_facturas=0.01")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="RECURSO.CAMPO=VALOR",
+                        help="concurrencia o lote, p. ej. sqs_facturacion.concurrency=1")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    wiring = copy.deepcopy(WIRING)
+    if args.visibility is not None:
+        if args.visibility <= 0:
+            parser.error("--visibility debe ser positivo")
+        wiring["queues"]["default"]["visibility_timeout"] = args.visibility
+    graph = topology.load(os.path.join(BASE_DIR, wiring["script"]), static=True)
+    handlers = delimasa_handlers(args.handler_ms)
+    try:
+        apply_settings(wiring, args.settings, graph, handlers)
+        failure_rates = parse_failures(args.fail, handlers)
+    except ValueError as exc:
+        parser.error(str(exc))
+    random.seed(args.seed)
+
+    async def session():
+        emulator = Emulator(graph, wiring, handlers, failure_rates)
+        for warning in emulator.warnings:
+            print(f"ℹ️  {warning}")
+        print(f"🏃 Emulando {args.orders:,} pedidos...", flush=True)
+        injected, elapsed = await emulator.run(sample_orders(args.orders, args.seed), args.rate)
+        print_report(emulator, args.orders, injected, elapsed)
+
+    asyncio.run(session())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
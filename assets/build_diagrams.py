@@ -0,0 +1,177 @@
+# build_diagrams.py
+# Construye todos los diagramas de assets/ en paralelo.
+#
+# Busca los scripts que abren un `with ...Diagram(...)`, los ejecuta en un
+# pool de procesos (un worker por núcleo) y muestra un resumen de tiempos.
+# Cada worker importa diagrams una sola vez y lo reutiliza entre scripts; un
+# script que falla no detiene a los demás.
+#
+# Uso:
+#     python build_diagrams.py                 # todos los diagramas de assets/
+#     python build_diagrams.py -j 2 uber_*.py  # solo algunos, con 2 workers
+#     python build_diagrams.py --formats png,svg,pdf  # un layout, varios formatos
+#     python build_diagrams.py --import-report        # módulos de proveedor usados
+
+import argparse
+import ast
+import contextlib
+import glob
+import io
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def is_diagram_script(path):
+    """True si el módulo abre un contexto `with <algo>Diagram(...)`."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            tree = ast.parse(fh.read(), filename=path)
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return False
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.With):
+            continue
+        for item in node.items:
+            call = item.context_expr
+            if not isinstance(call, ast.Call):
+                continue
+            func = call.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")
+            if name.endswith("Diagram"):
+                return True
+    return False
+
+
+def discover(directory=BASE_DIR, patterns=None):
+    """Scripts de diagramas en `directory`, en orden alfabético."""
+    paths = set()
+    for pattern in patterns or ["*.py"]:
+        paths.update(glob.glob(os.path.join(directory, pattern)))
+    return sorted(p for p in paths if is_diagram_script(p))
+
+
+def render_script(path):
+    """Ejecuta un script de diagrama dentro del worker y devuelve su resultado."""
+    # Los scripts importan módulos hermanos (render_cache, ...)
+    script_dir = os.path.dirname(os.path.abspath(path))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    result = {"script": os.path.basename(path), "ok": True, "error": None, "renders": [], "imports": []}
+    output = io.StringIO()
+    cwd = os.getcwd()
+    started = time.perf_counter()
+    try:
+        import lazy_nodes
+        import render_cache
+        del render_cache.render_log[:]
+        lazy_nodes.reset_report()
+        os.chdir(script_dir)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            runpy.run_path(path, run_name="__main__")
+        result["renders"] = list(render_cache.render_log)
+        result["imports"] = lazy_nodes.import_report()
+    except BaseException:  # SystemExit incluido: un script no tumba el build
+        result["ok"] = False
+        result["error"] = traceback.format_exc(limit=-3)
+    finally:
+        os.chdir(cwd)
+    result["seconds"] = time.perf_counter() - started
+    result["output"] = output.getvalue()
+    return result
+
+
+def build(paths, jobs=None):
+    """Renderiza `paths` en paralelo; devuelve los resultados en orden de llegada."""
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(render_script, path): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:  # worker muerto (p. ej. BrokenProcessPool)
+                result = {
+                    "script": os.path.basename(futures[future]),
+                    "ok": False,
+                    "error": f"{type(exc).__name__}: {exc}",
+                    "renders": [],
+                    "imports": [],
+                    "seconds": 0.0,
+                    "output": "",
+                }
+            status = "✅" if result["ok"] else "❌"
+            print(f"{status} {result['script']} ({result['seconds']:.2f}s)", flush=True)
+            results.append(result)
+    return results
+
+
+def print_import_report(results):
+    """Módulos de proveedor que tocó cada diagrama (vía lazy_nodes)."""
+    for result in sorted(results, key=lambda r: r["script"]):
+        total = sum(seconds for _, seconds, _ in result["imports"])
+        print(f"\n📦 {result['script']}: {len(result['imports'])} módulos de proveedor, "
+              f"{total * 1000:.1f} ms de import en este worker")
+        for module, seconds, classes in result["imports"]:
+            note = f"{seconds * 1000:7.1f} ms" if seconds else "   cargado"
+            print(f"   {note}  {module:<32} {', '.join(classes)}")
+
+
+def print_summary(results, wall_seconds, verbose=False):
+    print()
+    print(f"{'Diagrama':<32} {'Estado':<8} {'Tiempo':>8}  Salida")
+    print("-" * 78)
+    for result in sorted(results, key=lambda r: r["script"]):
+        status = "ok" if result["ok"] else "ERROR"
+        outputs = ", ".join(
+            f"{os.path.basename(r['filename'])} ({'caché' if r['hit'] else 'render ' + r.get('layout', 'dot')})"
+            for r in result["renders"]
+        )
+        print(f"{result['script']:<32} {status:<8} {result['seconds']:>7.2f}s  {outputs}")
+        if not result["ok"]:
+            print("    " + result["error"].strip().replace("\n", "\n    "))
+        if verbose and result["output"].strip():
+            print("    " + result["output"].strip().replace("\n", "\n    "))
+    serial = sum(r["seconds"] for r in results)
+    failed = sum(1 for r in results if not r["ok"])
+    print("-" * 78)
+    print(f"📊 {len(results)} diagramas, {failed} con error | "
+          f"pared {wall_seconds:.2f}s | suma de tiempos {serial:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construye los diagramas de arquitectura en paralelo")
+    parser.add_argument("patterns", nargs="*", help="patrones glob relativos a --dir (por defecto *.py)")
+    parser.add_argument("--dir", default=BASE_DIR, help="directorio con los scripts (por defecto assets/)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="número de workers (por defecto: núcleos)")
+    parser.add_argument("--formats", help="formatos de salida separados por comas (p. ej. png,svg,pdf)")
+    parser.add_argument("--import-report", action="store_true",
+                        help="muestra los módulos de proveedor que importó cada diagrama")
+    parser.add_argument("-v", "--verbose", action="store_true", help="muestra la salida de cada script")
+    args = parser.parse_args()
+
+    if args.formats:
+        # Los workers heredan el entorno; CachedDiagram lo consulta al renderizar
+        os.environ["DIAGRAMS_FORMATS"] = args.formats
+
+    paths = discover(args.dir, args.patterns)
+    if not paths:
+        print("No se encontraron scripts de diagramas.")
+        return 1
+
+    print(f"🏗️  Construyendo {len(paths)} diagramas con {args.jobs or os.cpu_count()} workers...")
+    started = time.perf_counter()
+    results = build(paths, jobs=args.jobs)
+    print_summary(results, time.perf_counter() - started, verbose=args.verbose)
+    if args.import_report:
+        print_import_report(results)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,666 @@
+# cache_sim.py
+# Simulador de caché dirigido por trazas para dimensionar ElastiCache.
+#
+# En delimasa_aws_diagram.py, `cache` (ElastiCache Redis) y `dynamodb_cache`
+# están delante de rds / rds_replica y api_gateway consulta `cache`. Este
+# script reproduce un log de peticiones (GET /clients/:id,
+# /products/search?q=..., /products/:id, ...) contra varias políticas y
+# tamaños de caché y reporta tasa de aciertos, peticiones/s que siguen
+# llegando al backend y memoria Redis estimada:
+#   lru      menos recientemente usado (todas las capacidades en una pasada,
+#            con distancias de pila de Mattson sobre un árbol de Fenwick)
+#   lfu      menos frecuentemente usado (frecuencias de los residentes)
+#   tinylfu  W-TinyLFU: ventana LRU del 1 % + LRU principal con admisión
+#            por un count-min sketch de 4 bits que envejece
+#   ttl      LRU + expiración fija (--ttl), como allkeys-lru con EXPIRE
+#
+# Para trazas de cientos de millones de peticiones:
+#   - las claves se internan a enteros densos y la traza vive en arrays
+#     int32/float32 (se puede guardar con --save traza.npz y reutilizar);
+#   - --sample aplica muestreo espacial por hash de clave (SHARDS): se
+#     simula solo una fracción de las claves con la capacidad escalada por
+#     la misma fracción; las --hot-keys claves más pedidas (cabeza de la
+#     Zipf, que metería mucha varianza) no se simulan: se dan por siempre
+#     residentes, ocupan su hueco de la capacidad y sus aciertos se cuentan
+#     de forma analítica (fallan el primer acceso y, con ttl, al expirar).
+#     Así la traza simulada es de verdad la fracción --sample del resto;
+#   - las estructuras de cada política son arrays indexados por clave
+#     (listas doblemente enlazadas y contadores en array.array, bytearray
+#     para el sketch, entradas del heap de LFU empaquetadas en un entero),
+#     sin objetos por entrada.
+#
+# Formato de la traza: JSONL ({"ts": ..., "method": "GET", "path": "/api/..."})
+# o log combinado de nginx/Apache ([10/Oct/2024:13:55:36 -0500] "GET /api/... HTTP/1.1").
+#
+# Uso:
+#     python cache_sim.py generate trafico.jsonl --requests 5000000
+#     python cache_sim.py run trafico.jsonl --sizes 1000,10000,50000 --save trafico.npz
+#     python cache_sim.py run trafico.npz --policies lru,tinylfu --sample 0.05
+#     python cache_sim.py run access.log --policies ttl --ttl 300
+
+import argparse
+import array
+import functools
+import heapq
+import json
+import math
+import re
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Rutas de backend/src/routes/index.ts y tamaño medio de su respuesta en caché (bytes)
+ROUTES = [
+    ("/clients/:id", re.compile(r"^/clients/[^/?]+$"), 650),
+    ("/clients", re.compile(r"^/clients/?$"), 2_200),
+    ("/products/search", re.compile(r"^/products/search"), 1_800),
+    ("/products/:id", re.compile(r"^/products/[^/?]+$"), 260),
+    ("/products", re.compile(r"^/products/?$"), 2_100),
+    ("otras", re.compile(r""), 500),
+]
+REDIS_OVERHEAD_BYTES = 90         # dictEntry + robj + SDS de la clave, aprox.
+POLICIES = ("lru", "lfu", "tinylfu", "ttl")
+
+_CLF_RE = re.compile(r'\[([^\]]+)\] "(\w+) (\S+)')
+
+
+# ============================================
+# TRAZA
+# ============================================
+
+def _normalize(path):
+    if path.startswith("/api/"):
+        path = path[4:]
+    base, _, query = path.partition("?")
+    if query:
+        query = "&".join(sorted(query.lower().split("&")))
+        return f"{base}?{query}"
+    return base
+
+
+def _route(path):
+    for index, (_, pattern, _) in enumerate(ROUTES):
+        if pattern.match(path):
+            return index
+    return len(ROUTES) - 1
+
+
+def _parse_time(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_timestamp(value)
+
+
+@functools.lru_cache(maxsize=100_000)
+def _parse_timestamp(text):
+    # los logs repiten el mismo segundo en muchas líneas seguidas
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return datetime.strptime(text, "%d/%b/%Y:%H:%M:%S %z").timestamp()
+
+
+def parse_line(line):
+    """(segundo, método, ruta normalizada) de una línea JSONL o de log combinado."""
+    if line.startswith("{"):
+        record = json.loads(line)
+        path = record.get("path") or record.get("url") or ""
+        return _parse_time(record.get("ts", 0)), record.get("method", "GET").upper(), _normalize(path)
+    match = _CLF_RE.search(line)
+    if match is None:
+        return None
+    return _parse_time(match.group(1)), match.group(2).upper(), _normalize(match.group(3))
+
+
+class Trace:
+    """Traza internada: arrays de claves densas, tiempos y rutas."""
+
+    def __init__(self, keys, times, key_route, total, passthrough, route_requests, sample):
+        self.keys = keys                          # int32, solo GET muestreados
+        self.times = times                        # float32, segundos desde el inicio
+        self.key_route = key_route                # int8 por clave
+        self.total = total                        # peticiones de la traza completa
+        self.passthrough = passthrough            # no cacheables (POST, ...), sin muestrear
+        self.route_requests = route_requests      # GET por ruta, sin muestrear
+        self.sample = sample
+        # peticiones a las claves calientes (ids de la traza completa): no se
+        # simulan, ver hot_hits
+        self.hot_keys = np.zeros(0, np.int32)
+        self.hot_times = np.zeros(0, np.float32)
+        self.n_hot = 0
+
+    @property
+    def n_keys(self):
+        return len(self.key_route)
+
+    @property
+    def duration(self):
+        return float(self.times[-1] - self.times[0]) if len(self.times) > 1 else 1.0
+
+    def save(self, path):
+        np.savez_compressed(path, keys=self.keys, times=self.times, key_route=self.key_route,
+                            meta=np.array([self.total, self.passthrough, self.sample], np.float64),
+                            route_requests=self.route_requests)
+
+    @classmethod
+    def load_npz(cls, path):
+        data = np.load(path)
+        total, passthrough, sample = data["meta"]
+        return cls(data["keys"], data["times"], data["key_route"], int(total), int(passthrough),
+                   data["route_requests"], float(sample))
+
+    def resample(self, sample, hot_keys=1024):
+        """Muestra espacial de claves (SHARDS) estratificada por popularidad.
+
+        Las `hot_keys` claves más pedidas salen de la simulación (hot_hits);
+        del resto se queda una fracción `sample` por hash de su id, con peso
+        1/sample. Sin separarlas, un puñado de claves muy populares (listados,
+        cabeza de la Zipf) dispara la varianza del estimador, y simularlas
+        enteras se llevaría la mayor parte de la traza.
+        """
+        if sample >= 1:
+            return self
+        counts = np.bincount(self.keys, minlength=self.n_keys)
+        hot = np.zeros(self.n_keys, bool)
+        if hot_keys:
+            hot[np.argsort(counts)[-hot_keys:]] = True
+        # mezcla de splitmix64 sobre el id de clave: estable entre ejecuciones
+        threshold = np.uint64(int(sample * 2 ** 32))
+        z = np.arange(1, self.n_keys + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        keep_key = ~hot & (((z ^ (z >> np.uint64(31))) >> np.uint64(32)) < threshold)
+        mask = keep_key[self.keys]
+        remap = np.cumsum(keep_key) - 1
+        trace = Trace(remap[self.keys[mask]].astype(np.int32), self.times[mask], self.key_route[keep_key],
+                      self.total, self.passthrough, self.route_requests, sample)
+        hot_requests = hot[self.keys]
+        trace.hot_keys = self.keys[hot_requests]
+        trace.hot_times = self.times[hot_requests]
+        trace.n_hot = int(hot.sum())
+        return trace
+
+    def weights(self):
+        """Peso de cada petición simulada para estimar sobre la traza completa."""
+        return np.full(len(self.keys), 1.0 / self.sample)
+
+    def capacity(self, size):
+        """Capacidad de la caché muestreada equivalente a `size` claves (sin las calientes)."""
+        if self.sample >= 1:
+            return size
+        return max(1, int(round(self.sample * max(size - self.n_hot, 0))))
+
+    def hot_hits(self, policy, ttl):
+        """Aciertos de las claves calientes, residentes siempre.
+
+        Fallan su primer acceso y, con ttl, el primero tras cada expiración.
+        """
+        if not self.n_hot:
+            return 0
+        if policy != "ttl":
+            return len(self.hot_keys) - self.n_hot
+        order = np.lexsort((self.hot_times, self.hot_keys))
+        keys, times = self.hot_keys[order], self.hot_times[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        writes = 0
+        for block in np.split(times, starts[1:]):
+            i = 0
+            while i < len(block):
+                writes += 1
+                i = int(np.searchsorted(block, block[i] + ttl, side="left"))
+        return len(self.hot_keys) - writes
+
+
+def read_trace(path, chunk_lines=1_000_000):
+    """Lee un log (o una traza .npz guardada) y devuelve la traza internada completa."""
+    if path.endswith(".npz"):
+        return Trace.load_npz(path)
+    ids, key_route = {}, []
+    keys_parts, time_parts = [], []
+    total = passthrough = 0
+    start = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while True:
+            lines = f.readlines(chunk_lines * 80)
+            if not lines:
+                break
+            keys, times = [], []
+            for line in lines:
+                parsed = parse_line(line)
+                if parsed is None:
+                    continue
+                ts, method, key = parsed
+                total += 1
+                if method != "GET":
+                    passthrough += 1
+                    continue
+                key_id = ids.get(key)
+                if key_id is None:
+                    key_id = ids[key] = len(key_route)
+                    key_route.append(_route(key.partition("?")[0]))
+                if start is None:
+                    start = ts
+                keys.append(key_id)
+                times.append(ts - start)
+            keys_parts.append(np.array(keys, np.int32))
+            time_parts.append(np.array(times, np.float32))
+    keys = np.concatenate(keys_parts) if keys_parts else np.zeros(0, np.int32)
+    times = np.concatenate(time_parts) if time_parts else np.zeros(0, np.float32)
+    key_route = np.array(key_route, np.int8)
+    route_requests = np.bincount(key_route[keys], minlength=len(ROUTES))
+    return Trace(keys, times, key_route, total, passthrough, route_requests, 1.0)
+
+
+# ============================================
+# POLÍTICAS
+# ============================================
+
+def lru_stack_distances(keys, n_keys):
+    """Distancia de pila de cada acceso (-1 en el primer acceso a la clave).
+
+    Un acceso acierta en una LRU de capacidad C si su distancia < C, así que
+    una sola pasada da la curva de aciertos de todas las capacidades.
+    """
+    n = len(keys)
+    tree = array.array("i", bytes(4 * (n + 1)))   # Fenwick: 1 en el último acceso de cada clave
+    last = array.array("q", [-1]) * n_keys
+    distances = np.empty(n, np.int64)
+    for t, key in enumerate(keys.tolist()):
+        p = last[key]
+        if p < 0:
+            distances[t] = -1
+        else:
+            # claves distintas accedidas en (p, t) = marcas en ese intervalo
+            count, i = 0, t
+            while i > 0:
+                count += tree[i]
+                i &= i - 1
+            i = p + 1
+            while i > 0:
+                count -= tree[i]
+                i &= i - 1
+            distances[t] = count
+            i = p + 1
+            while i <= n:
+                tree[i] -= 1
+                i += i & -i
+        i = t + 1
+        while i <= n:
+            tree[i] += 1
+            i += i & -i
+        last[key] = t
+    return distances
+
+
+class LinkedLRU:
+    """LRU intrusiva sobre listas de enteros indexadas por clave."""
+
+    def __init__(self, n_keys, capacity):
+        self.capacity = capacity
+        self.prev = array.array("i", [-1]) * n_keys
+        self.next = array.array("i", [-1]) * n_keys
+        self.resident = bytearray(n_keys)
+        self.head = self.tail = -1     # head = más reciente
+        self.size = 0
+
+    def _unlink(self, key):
+        p, n = self.prev[key], self.next[key]
+        if p >= 0:
+            self.next[p] = n
+        else:
+            self.head = n
+        if n >= 0:
+            self.prev[n] = p
+        else:
+            self.tail = p
+
+    def _push(self, key):
+        self.prev[key] = -1
+        self.next[key] = self.head
+        if self.head >= 0:
+            self.prev[self.head] = key
+        self.head = key
+        if self.tail < 0:
+            self.tail = key
+
+    def touch(self, key):
+        if self.head != key:
+            self._unlink(key)
+            self._push(key)
+
+    def insert(self, key):
+        """Inserta `key`; devuelve la clave desalojada o -1."""
+        evicted = -1
+        if self.size >= self.capacity:
+            evicted = self.tail
+            self.remove(evicted)
+        self._push(key)
+        self.resident[key] = 1
+        self.size += 1
+        return evicted
+
+    def remove(self, key):
+        self._unlink(key)
+        self.resident[key] = 0
+        self.size -= 1
+
+
+def simulate_ttl(keys, times, n_keys, capacity, ttl):
+    lru = LinkedLRU(n_keys, capacity)
+    written = array.array("d", bytes(8 * n_keys))
+    hits = bytearray(len(keys))
+    resident = lru.resident
+    for t, (key, now) in enumerate(zip(keys.tolist(), times.tolist())):
+        if resident[key]:
+            if now - written[key] < ttl:
+                hits[t] = 1
+                lru.touch(key)
+                continue
+            lru.remove(key)
+        lru.insert(key)
+        written[key] = now
+    return hits
+
+
+# Entradas del heap de LFU: frecuencia · 2^72 + instante · 2^32 + clave, un
+# solo entero que ordena igual que la tupla (frecuencia, instante, clave)
+_LFU_KEY_BITS, _LFU_STAMP_BITS = 32, 40
+_LFU_KEY_MASK = (1 << _LFU_KEY_BITS) - 1
+_LFU_FREQ_SHIFT = _LFU_KEY_BITS + _LFU_STAMP_BITS
+
+
+def simulate_lfu(keys, times, n_keys, capacity):
+    freq = array.array("q", bytes(8 * n_keys))
+    stamp = array.array("q", bytes(8 * n_keys))
+    resident = bytearray(n_keys)
+    heap = []                      # entradas empaquetadas con borrado perezoso
+    size = 0
+    hits = bytearray(len(keys))
+    for t, key in enumerate(keys.tolist()):
+        if resident[key]:
+            hits[t] = 1
+            freq[key] += 1
+        else:
+            if size >= capacity:
+                while True:
+                    entry = heapq.heappop(heap)
+                    victim = entry & _LFU_KEY_MASK
+                    if resident[victim] and \
+                            entry == (freq[victim] << _LFU_FREQ_SHIFT | stamp[victim] << _LFU_KEY_BITS | victim):
+                        break
+                resident[victim] = 0
+                size -= 1
+            resident[key] = 1
+            freq[key] = 1
+            size += 1
+        stamp[key] = t
+        heapq.heappush(heap, freq[key] << _LFU_FREQ_SHIFT | t << _LFU_KEY_BITS | key)
+        if len(heap) > 4 * capacity + 1024:
+            # compacta las entradas obsoletas
+            heap = [freq[k] << _LFU_FREQ_SHIFT | stamp[k] << _LFU_KEY_BITS | k
+                    for k in np.flatnonzero(np.frombuffer(resident, np.uint8)).tolist()]
+            heapq.heapify(heap)
+    return hits
+
+
+class FrequencySketch:
+    """Count-min sketch de 4 filas con contadores de 4 bits y envejecimiento."""
+
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+
+    def __init__(self, capacity):
+        bits = max(4, math.ceil(math.log2(max(capacity, 1) * 4)))
+        self.width = 1 << bits
+        self.shift = 64 - bits
+        self.rows = [bytearray(self.width) for _ in self.SEEDS]
+        self.additions = 0
+        self.sample_size = 10 * max(capacity, 1)
+
+    def _slots(self, key):
+        # splitmix64 sobre la clave (como Trace.resample): ids consecutivos no
+        # caen en columnas vecinas; cada fila toma los bits altos de un producto
+        z = (key + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        z ^= z >> 31
+        return [((z * seed) & _MASK64) >> self.shift for seed in self.SEEDS]
+
+    def increment(self, key):
+        for row, slot in zip(self.rows, self._slots(key)):
+            if row[slot] < 15:
+                row[slot] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            # reinicio: se dividen a la mitad todos los contadores
+            for i, row in enumerate(self.rows):
+                self.rows[i] = bytearray(row.translate(_HALF))
+            self.additions //= 2
+
+    def frequency(self, key):
+        return min(row[slot] for row, slot in zip(self.rows, self._slots(key)))
+
+
+_HALF = bytes(v >> 1 for v in range(256))
+_MASK64 = (1 << 64) - 1
+
+
+def simulate_tinylfu(keys, times, n_keys, capacity):
+    window_size = max(1, capacity // 100)
+    window = LinkedLRU(n_keys, window_size)
+    main = LinkedLRU(n_keys, max(1, capacity - window_size))
+    sketch = FrequencySketch(capacity)
+    hits = bytearray(len(keys))
+    for t, key in enumerate(keys.tolist()):
+        sketch.increment(key)
+        if window.resident[key]:
+            hits[t] = 1
+            window.touch(key)
+            continue
+        if main.resident[key]:
+            hits[t] = 1
+            main.touch(key)
+            continue
+        candidate = window.insert(key)
+        if candidate < 0:
+            continue
+        # El candidato que sale de la ventana entra al principal solo si es más frecuente
+        if main.size < main.capacity:
+            main.insert(candidate)
+        elif sketch.frequency(candidate) > sketch.frequency(main.tail):
+            main.insert(candidate)
+    return hits
+
+
+# ============================================
+# EXPERIMENTO
+# ============================================
+
+def run(trace, policies, sizes, ttl):
+    """[(política, capacidad, tasa de aciertos, segundos)].
+
+    Cada simulador devuelve qué peticiones acertaron; con muestreo, la tasa
+    se pondera con Trace.weights y se suman los aciertos de las claves
+    calientes (Trace.hot_hits).
+    """
+    rows = []
+    keys, times, n_keys = trace.keys, trace.times, trace.n_keys
+    weights = trace.weights()
+    total_weight = weights.sum() + len(trace.hot_keys)
+
+    def ratio(hits, policy):
+        return float((weights[hits].sum() + trace.hot_hits(policy, ttl)) / total_weight)
+
+    if "lru" in policies:
+        started = time.perf_counter()
+        distances = lru_stack_distances(keys, n_keys)
+        elapsed = time.perf_counter() - started
+        for size in sizes:
+            hits = (distances >= 0) & (distances < trace.capacity(size))
+            rows.append(("lru", size, ratio(hits, "lru"), elapsed / len(sizes)))
+    simulators = {
+        "lfu": lambda capacity: simulate_lfu(keys, times, n_keys, capacity),
+        "tinylfu": lambda capacity: simulate_tinylfu(keys, times, n_keys, capacity),
+        "ttl": lambda capacity: simulate_ttl(keys, times, n_keys, capacity, ttl),
+    }
+    for policy in policies:
+        if policy == "lru":
+            continue
+        for size in sizes:
+            started = time.perf_counter()
+            hits = np.frombuffer(simulators[policy](trace.capacity(size)), np.uint8).view(bool)
+            rows.append((policy, size, ratio(hits, policy), time.perf_counter() - started))
+    return rows
+
+
+def mean_object_bytes(trace):
+    """Tamaño medio por clave en Redis, ponderado por las claves de cada ruta."""
+    if not trace.n_keys:
+        return 0
+    per_route = np.bincount(trace.key_route, minlength=len(ROUTES))
+    payload = sum(count * ROUTES[i][2] for i, count in enumerate(per_route))
+    return payload / trace.n_keys + REDIS_OVERHEAD_BYTES
+
+
+def print_report(trace, rows, load_seconds, sim_seconds):
+    gets = int(trace.route_requests.sum())
+    duration = trace.duration
+    print(f"\n📥 {trace.total:,} peticiones ({gets:,} GET cacheables, {trace.passthrough:,} sin caché) "
+          f"en {duration / 3600:.1f} h; {trace.n_keys:,} claves simuladas"
+          + (f" (muestreo {trace.sample:.1%}, {len(trace.keys) / gets:.1%} de los GET; "
+             f"{trace.n_hot:,} claves calientes como residentes)" if trace.sample < 1 else ""))
+    for i, (route, _, _) in enumerate(ROUTES):
+        if trace.route_requests[i]:
+            print(f"   {route:<18} {trace.route_requests[i]:>12,} GET ({trace.route_requests[i] / gets:.1%})")
+
+    object_bytes = mean_object_bytes(trace)
+    base_rps = trace.total / duration
+    print(f"\n{'Política':<9} {'capacidad':>10} {'Redis MB':>9} {'aciertos':>9} {'backend pet/s':>14} "
+          f"{'reducción':>10} {'sim s':>7}")
+    print("-" * 74)
+    best = {}
+    for policy, size, ratio, seconds in rows:
+        hits = ratio * gets
+        backend = (trace.total - hits) / duration
+        reduction = hits / trace.total if trace.total else 0.0
+        print(f"{policy:<9} {size:>10,} {size * object_bytes / 1e6:>9.1f} {ratio:>9.2%} {backend:>14,.1f} "
+              f"{reduction:>10.1%} {seconds:>7.2f}")
+        if ratio > best.get(size, ("", -1))[1]:
+            best[size] = (policy, ratio)
+    print("-" * 74)
+    print(f"🖥️  Sin caché el backend recibe {base_rps:,.1f} pet/s; objeto medio {object_bytes:,.0f} B en Redis")
+    for size, (policy, ratio) in sorted(best.items()):
+        print(f"🏆 {size:>10,} claves: {policy} ({ratio:.2%})")
+    print(f"⏱️  lectura {load_seconds:.1f}s, simulación {sim_seconds:.1f}s")
+
+
+# ============================================
+# TRAZA SINTÉTICA
+# ============================================
+
+def generate(path, requests, clients, products, terms, seed=None, days=1.0, block=500_000):
+    """Log JSONL con popularidad Zipf y perfil diario de tráfico."""
+    rng = np.random.default_rng(seed)
+    duration = days * 86_400
+    # llegadas más densas entre 8 y 18 h: CDF por horas e inversa sobre uniformes ordenados
+    hours = np.arange(int(math.ceil(days * 24)))
+    weights = np.where((hours % 24 >= 8) & (hours % 24 < 18), 3.0, 0.5)
+    cdf = np.r_[0.0, np.cumsum(weights)] / weights.sum()
+    edges = 1_735_689_600 + np.r_[hours, len(hours)] * 3_600.0
+    kinds = ["clients_id", "search", "products_id", "products", "clients", "post"]
+    mix = np.array([0.28, 0.30, 0.30, 0.04, 0.02, 0.06])
+    with open(path, "w", encoding="utf-8") as f:
+        for first in range(0, requests, block):
+            n = min(block, requests - first)
+            u = np.sort(rng.uniform(first / requests, (first + n) / requests, n))
+            ts = np.minimum(np.interp(u, cdf, edges), 1_735_689_600 + duration)
+            kind = rng.choice(len(kinds), n, p=mix)
+            client = rng.zipf(1.3, n) % clients
+            product = rng.zipf(1.2, n) % products
+            term = rng.zipf(1.1, n) % terms
+            out = []
+            for t, k, c, p, q in zip(ts.tolist(), kind.tolist(), client.tolist(), product.tolist(), term.tolist()):
+                kind_name = kinds[k]
+                if kind_name == "clients_id":
+                    method, route = "GET", f"/api/clients/cliente{c}"
+                elif kind_name == "search":
+                    method, route = "GET", f"/api/products/search?q=termino{q}"
+                elif kind_name == "products_id":
+                    method, route = "GET", f"/api/products/{p + 1}"
+                elif kind_name == "products":
+                    method, route = "GET", "/api/products"
+                elif kind_name == "clients":
+                    method, route = "GET", "/api/clients"
+                else:
+                    method, route = "POST", "/api/orders/analyze"
+                out.append(f'{{"ts": {t:.3f}, "method": "{method}", "path": "{route}"}}\n')
+            f.write("".join(out))
+
+
+# ============================================
+# CLI
+# ============================================
+
+def _sizes(text):
+    return [int(float(x)) for x in text.split(",") if x]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tasa de aciertos de políticas de caché sobre una traza")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="simula la traza")
+    run_parser.add_argument("trace", help="log JSONL / combinado, o traza .npz guardada")
+    run_parser.add_argument("--policies", default="lru,lfu,tinylfu,ttl")
+    run_parser.add_argument("--sizes", type=_sizes, default=_sizes("1000,10000,50000"),
+                            help="capacidades en número de claves")
+    run_parser.add_argument("--ttl", type=float, default=300.0, help="segundos de vida en la política ttl")
+    run_parser.add_argument("--sample", type=float, default=1.0, help="fracción de claves simulada (SHARDS)")
+    run_parser.add_argument("--hot-keys", type=int, default=1024,
+                            help="claves más pedidas que se dan por residentes con --sample "
+                                 "(como mucho 1/10 de la menor capacidad)")
+    run_parser.add_argument("--save", metavar="NPZ", help="guarda la traza internada para reutilizarla")
+
+    gen_parser = commands.add_parser("generate", help="genera una traza sintética")
+    gen_parser.add_argument("output")
+    gen_parser.add_argument("--requests", type=int, default=1_000_000)
+    gen_parser.add_argument("--clients", type=int, default=20_000)
+    gen_parser.add_argument("--products", type=int, default=50_000)
+    gen_parser.add_argument("--terms", type=int, default=200_000)
+    gen_parser.add_argument("--days", type=float, default=1.0)
+    gen_parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        started = time.perf_counter()
+        generate(args.output, args.requests, args.clients, args.products, args.terms, args.seed, args.days)
+        print(f"✅ {args.requests:,} peticiones en {args.output} ({time.perf_counter() - started:.1f}s)")
+        return 0
+
+    policies = [p for p in args.policies.split(",") if p]
+    unknown = [p for p in policies if p not in POLICIES]
+    if unknown:
+        parser.error(f"políticas desconocidas: {', '.join(unknown)} (usa {', '.join(POLICIES)})")
+    if not 0 < args.sample <= 1:
+        parser.error("--sample debe estar en (0, 1]")
+
+    started = time.perf_counter()
+    trace = read_trace(args.trace)
+    load_seconds = time.perf_counter() - started
+    if args.save:
+        trace.save(args.save)
+        print(f"💾 Traza internada guardada en {args.save}")
+    # el estrato caliente tiene que ser pequeño frente a la caché más pequeña
+    trace = trace.resample(args.sample, min(args.hot_keys, min(args.sizes) // 10))
+    if not len(trace.keys):
+        print("⚠️  La traza no tiene peticiones GET cacheables")
+        return 1
+    started = time.perf_counter()
+    rows = run(trace, policies, args.sizes, args.ttl)
+    print_report(trace, rows, load_seconds, time.perf_counter() - started)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
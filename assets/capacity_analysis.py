@@ -0,0 +1,315 @@
+# capacity_analysis.py
+# Cuellos de botella y flujo máximo a partir de la capacidad de cada nodo.
+#
+# Los scripts de diagrama anotan los nodos con capacity={...} (ver
+# topology.py). Cada anotación se traduce a peticiones/s con la regla que
+# corresponda (se toma la más restrictiva):
+#   rps                                   valor explícito
+#   throttle_rps                          throttling de API Gateway
+#   reserved_concurrency + duration_ms    Lambda: concurrencia / duración
+#   consumers + batch_size + receive_ms   SQS: consumidores · lote / recepción
+#   max_connections + query_ms            RDS: conexiones / duración de consulta
+#   wcu / rcu (+ writes_/reads_per_request) DynamoDB
+# y a pedidos/s dividiendo por `calls_per_order` (llamadas por pedido).
+#
+# La demanda de un pedido sale del camino del pedido, no de todo lo que
+# cuelga de la entrada: los nodos entre la entrada y el nodo por el que pasa
+# todo pedido (--via, lambda_registro en DeliMasa) y los que se alcanzan
+# desde él. lambda_tracking o dynamodb_tracking también cuelgan de
+# api_gateway, pero las consultas de seguimiento no son pedidos y no cuentan.
+# Cada pedido tiene que llegar a todos los nodos con capacidad de ese camino,
+# así que el máximo sostenible es el mínimo, entre esos destinos, del flujo
+# máximo entrada → destino. El flujo máximo se calcula
+# con Dinic sobre el grafo con nodos desdoblados (v_in → v_out con la
+# capacidad del nodo, aristas sin límite) y el corte mínimo del destino que
+# limita nombra los nodos saturados. Por ejemplo, rds recibe aristas de
+# lambda_registro, lambda_facturas y las dos validaciones: su fila muestra si
+# el corte cae en rds o en lambda_registro.
+#
+# Uso:
+#     python capacity_analysis.py
+#     python capacity_analysis.py --target rds --set rds.max_connections=400
+#     python capacity_analysis.py --via lambda_tracking     # capacidad del seguimiento
+#     python capacity_analysis.py uber_architecture_aws.py --entry api_gw --via api_gw
+
+import argparse
+import json
+import math
+import os
+import sys
+from collections import deque
+
+import topology
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = os.path.join(BASE_DIR, "delimasa_aws_diagram.py")
+# Todo pedido de DeliMasa pasa por aquí
+DEFAULT_VIA = "lambda_registro"
+
+INF = math.inf
+_EPS = 1e-9
+
+# Campos de capacity={...} que entran en capacity_rps (numéricos)
+CAPACITY_FIELDS = ("rps", "throttle_rps", "reserved_concurrency", "concurrency", "duration_ms",
+                   "consumers", "batch_size", "receive_ms", "max_connections", "query_ms",
+                   "wcu", "rcu", "writes_per_request", "reads_per_request", "calls_per_order")
+# Anotaciones que se aceptan con --set: las anteriores más las solo informativas
+ANNOTATION_FIELDS = CAPACITY_FIELDS + ("burst",)
+
+
+def capacity_rps(capacity):
+    """(peticiones/s, regla) de una anotación capacity={...}; (inf, None) si no limita."""
+    limits = []
+    if "rps" in capacity:
+        limits.append((float(capacity["rps"]), "rps"))
+    if "throttle_rps" in capacity:
+        limits.append((float(capacity["throttle_rps"]), "throttle"))
+    concurrency = capacity.get("reserved_concurrency", capacity.get("concurrency"))
+    if concurrency is not None and "duration_ms" in capacity:
+        limits.append((concurrency * 1000.0 / capacity["duration_ms"], "concurrencia"))
+    if {"consumers", "batch_size", "receive_ms"} <= capacity.keys():
+        limits.append((capacity["consumers"] * capacity["batch_size"] * 1000.0 / capacity["receive_ms"],
+                       "consumidores"))
+    if "max_connections" in capacity and "query_ms" in capacity:
+        limits.append((capacity["max_connections"] * 1000.0 / capacity["query_ms"], "conexiones"))
+    if "wcu" in capacity:
+        limits.append((capacity["wcu"] / capacity.get("writes_per_request", 1), "WCU"))
+    if "rcu" in capacity:
+        limits.append((capacity["rcu"] / capacity.get("reads_per_request", 1), "RCU"))
+    if not limits:
+        return INF, None
+    return min(limits)
+
+
+def node_capacities(graph):
+    """{nodo: (pedidos/s, peticiones/s, regla)} de los nodos anotados."""
+    result = {}
+    for node, capacity in graph.node_capacity.items():
+        rps, rule = capacity_rps(capacity)
+        result[node] = (rps / capacity.get("calls_per_order", 1), rps, rule)
+    return result
+
+
+class FlowNetwork:
+    """Red de flujo con listas de adyacencia en arrays paralelos (Dinic)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.head = [[] for _ in range(size)]
+        self.to = []
+        self.cap = []
+
+    def add_edge(self, u, v, capacity):
+        self.head[u].append(len(self.to))
+        self.to.append(v)
+        self.cap.append(capacity)
+        self.head[v].append(len(self.to))
+        self.to.append(u)
+        self.cap.append(0.0)
+
+    def _levels(self, source):
+        level = [-1] * self.size
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for e in self.head[u]:
+                if self.cap[e] > _EPS and level[self.to[e]] < 0:
+                    level[self.to[e]] = level[u] + 1
+                    queue.append(self.to[e])
+        return level
+
+    def max_flow(self, source, sink):
+        flow = 0.0
+        while True:
+            level = self._levels(source)
+            if level[sink] < 0:
+                return flow
+            cursor = [0] * self.size
+            while True:
+                pushed = self._augment(source, sink, INF, level, cursor)
+                if pushed <= _EPS:
+                    break
+                if pushed == INF:
+                    return INF
+                flow += pushed
+
+    def _augment(self, source, sink, limit, level, cursor):
+        # DFS iterativo por el grafo de niveles; devuelve el flujo empujado
+        path = []
+        u = source
+        while True:
+            if u == sink:
+                pushed = min([limit] + [self.cap[e] for e in path])
+                for e in path:
+                    self.cap[e] -= pushed
+                    self.cap[e ^ 1] += pushed
+                return pushed
+            edges = self.head[u]
+            while cursor[u] < len(edges):
+                e = edges[cursor[u]]
+                v = self.to[e]
+                if self.cap[e] > _EPS and level[v] == level[u] + 1:
+                    break
+                cursor[u] += 1
+            else:
+                if not path:
+                    return 0.0
+                # callejón sin salida: se retrocede y se descarta la arista
+                level[u] = -1
+                e = path.pop()
+                u = self.to[e ^ 1]
+                cursor[u] += 1
+                continue
+            e = edges[cursor[u]]
+            path.append(e)
+            u = self.to[e]
+
+    def reachable(self, source):
+        seen = [False] * self.size
+        seen[source] = True
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for e in self.head[u]:
+                if self.cap[e] > _EPS and not seen[self.to[e]]:
+                    seen[self.to[e]] = True
+                    queue.append(self.to[e])
+        return seen
+
+
+def max_flow(graph, capacities, source, target):
+    """(pedidos/s, nodos del corte mínimo) de source a target.
+
+    Cada nodo v se desdobla en 2v → 2v+1 con su capacidad en pedidos/s.
+    """
+    network = FlowNetwork(2 * graph.n_nodes)
+    for node in range(graph.n_nodes):
+        network.add_edge(2 * node, 2 * node + 1, capacities.get(node, (INF,))[0])
+    for edge in range(graph.n_edges):
+        network.add_edge(2 * graph.flow_src[edge] + 1, 2 * graph.flow_dst[edge], INF)
+    flow = network.max_flow(2 * source, 2 * target + 1)
+    if flow == INF:
+        return INF, []
+    seen = network.reachable(2 * source)
+    cut = [node for node in range(graph.n_nodes) if seen[2 * node] and not seen[2 * node + 1]]
+    return flow, cut
+
+
+def reachable_from(graph, source, reverse=False):
+    """Nodos alcanzables desde source (o que llegan a source con reverse=True)."""
+    neighbours = [[] for _ in range(graph.n_nodes)]
+    for edge in range(graph.n_edges):
+        src, dst = graph.flow_src[edge], graph.flow_dst[edge]
+        if reverse:
+            src, dst = dst, src
+        neighbours[src].append(dst)
+    seen, queue = {source}, deque([source])
+    while queue:
+        for succ in neighbours[queue.popleft()]:
+            if succ not in seen:
+                seen.add(succ)
+                queue.append(succ)
+    return seen
+
+
+def order_path(graph, entry, via):
+    """Nodos que recorre un pedido: entrada → via y todo lo que sigue a via."""
+    return (reachable_from(graph, entry) & reachable_from(graph, via, reverse=True)) | \
+        reachable_from(graph, via)
+
+
+def analyze(graph, entry, targets=None, via=None):
+    """Flujo máximo entrada → cada destino anotado del camino del pedido, del más restrictivo."""
+    capacities = node_capacities(graph)
+    if targets is None:
+        path = order_path(graph, entry, entry if via is None else via)
+        targets = [node for node in capacities if node in path]
+    rows = [(target, *max_flow(graph, capacities, entry, target)) for target in targets]
+    rows.sort(key=lambda row: row[1])
+    return capacities, rows
+
+
+def apply_settings(graph, settings):
+    """--set nodo.campo=valor sobre la capacidad del nodo (what-if)."""
+    for setting in settings:
+        target, _, raw = setting.partition("=")
+        name, _, field = target.partition(".")
+        if name not in graph.index or not field:
+            raise ValueError(f"--set {setting!r}: se espera nodo.campo=valor")
+        if field not in ANNOTATION_FIELDS:
+            raise ValueError(f"--set {setting!r}: campo de capacidad desconocido {field!r} "
+                             f"(usa {', '.join(ANNOTATION_FIELDS)})")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = None
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"--set {setting!r}: {field} debe ser un número positivo")
+        node = graph.index[name]
+        graph.node_capacity[node] = dict(graph.node_capacity.get(node, {}), **{field: value})
+
+
+def _rate(value):
+    return "∞" if value == INF else f"{value:,.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flujo máximo de pedidos y nodos que saturan primero")
+    parser.add_argument("source", nargs="?", default=DEFAULT_SCRIPT,
+                        help="script, especificación .json o artefacto .topo (por defecto DeliMasa)")
+    parser.add_argument("--entry", default="api_gateway", help="nodo por el que entran los pedidos")
+    parser.add_argument("--via", help=f"nodo por el que pasa todo pedido (por defecto {DEFAULT_VIA} "
+                                      "si existe; si no, cuenta todo lo alcanzable desde la entrada)")
+    parser.add_argument("--target", action="append", help="destino concreto (se puede repetir)")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="NODO.CAMPO=VALOR",
+                        help="ajusta una capacidad, p. ej. rds.max_connections=400")
+    args = parser.parse_args()
+
+    graph = topology.load(args.source, static=args.source.endswith(".py"))
+    if args.entry not in graph.index:
+        parser.error(f"nodo de entrada desconocido: {args.entry!r}")
+    via = args.via or (DEFAULT_VIA if DEFAULT_VIA in graph.index else args.entry)
+    if via not in graph.index:
+        parser.error(f"nodo --via desconocido: {via!r}")
+    try:
+        apply_settings(graph, args.settings)
+    except ValueError as exc:
+        parser.error(str(exc))
+    targets = None
+    if args.target:
+        unknown = [t for t in args.target if t not in graph.index]
+        if unknown:
+            parser.error(f"nodos desconocidos: {', '.join(unknown)}")
+        targets = [graph.index[t] for t in args.target]
+
+    capacities, rows = analyze(graph, graph.index[args.entry], targets, graph.index[via])
+    if not capacities:
+        print("⚠️  Ningún nodo tiene capacity={...} en el diagrama")
+        return 1
+
+    print(f"\n{'Nodo':<26} {'Regla':<13} {'pet/s':>10} {'llam/ped':>9} {'pedidos/s':>10}")
+    print("-" * 72)
+    for node, (orders, rps, rule) in sorted(capacities.items(), key=lambda item: item[1][0]):
+        calls = graph.node_capacity[node].get("calls_per_order", 1)
+        print(f"{graph.ids[node]:<26} {rule or '-':<13} {_rate(rps):>10} {calls:>9} {_rate(orders):>10}")
+
+    print(f"\n{'Destino':<26} {'flujo máx (pedidos/s)':>22}  corte mínimo")
+    print("-" * 72)
+    for target, flow, cut in rows:
+        names = ", ".join(graph.ids[n] for n in cut) or "-"
+        print(f"{graph.ids[target]:<26} {_rate(flow):>22}  {names}")
+
+    if rows:
+        target, flow, cut = rows[0]
+        names = ", ".join(graph.ids[n] for n in cut)
+        print(f"\n🚦 Máximo sostenible desde {args.entry} (pedidos por {via}): {_rate(flow)} pedidos/s")
+        print(f"   limita el camino hacia {graph.ids[target]}; nodos saturados: {names or '-'}")
+        for node in cut:
+            orders = capacities[node][0]
+            print(f"   - {graph.ids[node]}: {capacities[node][2]} → {_rate(orders)} pedidos/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,16 @@
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.compute import Lambda, ECS, Fargate
-from diagrams.aws.database import RDS, Dynamodb, ElasticacheForRedis
-from diagrams.aws.network import CloudFront, Route53, APIGateway, VpnGateway, ELB
-from diagrams.aws.storage import S3, S3Glacier
-from diagrams.aws.integration import SQS, SNS, Eventbridge, StepFunctions
-from diagrams.aws.security import Cognito, WAF, SecretsManager
-from diagrams.aws.management import Cloudwatch, CloudwatchAlarm, Cloudtrail, SystemsManager
-from diagrams.aws.analytics import Kinesis
-from diagrams.aws.ml import Textract, Comprehend, SagemakerModel, Lex
-from diagrams.aws.devtools import XRay
-from diagrams.onprem.client import Users, Client
-from diagrams.onprem.network import Internet
-from diagrams.generic.blank import Blank
+from topology import Diagram, Cluster, Edge
+from lazy_nodes import (
+    Lambda, ECS, Fargate, RDS, Dynamodb, ElasticacheForRedis, CloudFront,
+    Route53, APIGateway, VpnGateway, ELB, S3, S3Glacier, SQS, SNS,
+    Eventbridge, StepFunctions, Cognito, WAF, SecretsManager, Cloudwatch,
+    CloudwatchAlarm, Cloudtrail, SystemsManager, Kinesis, Textract,
+    Comprehend, SagemakerModel, Lex, XRay, Users, Client, Internet, Blank,
+)
 
 # Configuración del diagrama
+# capacity= no se dibuja: es la capacidad de cada nodo para capacity_analysis.py
+# (concurrencia reservada de Lambda, lotes y consumidores de SQS, conexiones
+# de RDS, WCU/RCU de DynamoDB, throttling de API Gateway)
 graph_attr = {
     "fontsize": "16",
     "bgcolor": "white",
@@ -25,7 +22,7 @@ graph_attr = {
 
 with Diagram(
     "Arquitectura AWS - Sistema de Gestión de Pedidos DeliMasa",
-    filename="/home/claude/delimasa_aws_arquitectura",
+    filename="delimasa_aws_arquitectura",
     show=False,
     direction="TB",
     graph_attr=graph_attr,
@@ -61,21 +58,28 @@ with Diagram(
     
     # ============ CAPA DE API ============
     with Cluster("Capa de API Gateway", graph_attr={"bgcolor": "#E8F5E9"}):
-        api_gateway = APIGateway("API Gateway\nREST API")
+        api_gateway = APIGateway("API Gateway\nREST API",
+                                 capacity={"throttle_rps": 10000, "burst": 5000})
     
     # ============ CAPA DE APLICACIÓN - LAMBDA FUNCTIONS ============
     with Cluster("Microservicios Lambda", graph_attr={"bgcolor": "#F3E5F5"}):
         with Cluster("Gestión de Pedidos"):
-            lambda_registro = Lambda("Registro de\nPedidos")
-            lambda_validacion_inv = Lambda("Validación de\nInventario")
-            lambda_validacion_cred = Lambda("Validación de\nCrédito")
+            lambda_registro = Lambda("Registro de\nPedidos",
+                                     capacity={"reserved_concurrency": 100, "duration_ms": 250})
+            lambda_validacion_inv = Lambda("Validación de\nInventario",
+                                           capacity={"reserved_concurrency": 50, "duration_ms": 90})
+            lambda_validacion_cred = Lambda("Validación de\nCrédito",
+                                            capacity={"reserved_concurrency": 50, "duration_ms": 250})
         
         with Cluster("Facturación"):
-            lambda_facturas = Lambda("Generación de\nFacturas")
+            lambda_facturas = Lambda("Generación de\nFacturas",
+                                     capacity={"reserved_concurrency": 40, "duration_ms": 600})
         
         with Cluster("Notificaciones y Tracking"):
-            lambda_notificaciones = Lambda("Gestión de\nNotificaciones")
-            lambda_tracking = Lambda("Consultas de\nTracking")
+            lambda_notificaciones = Lambda("Gestión de\nNotificaciones",
+                                           capacity={"reserved_concurrency": 20, "duration_ms": 150})
+            lambda_tracking = Lambda("Consultas de\nTracking",
+                                     capacity={"reserved_concurrency": 50, "duration_ms": 80})
             lambda_incidencias = Lambda("Gestión de\nIncidencias")
     
     # ============ SERVICIOS ECS/FARGATE ============
@@ -89,15 +93,18 @@ with Diagram(
     
     # ============ ORQUESTACIÓN Y FLUJOS ============
     with Cluster("Orquestación de Flujos", graph_attr={"bgcolor": "#FFF9C4"}):
-        step_functions = StepFunctions("Step Functions\nFlujo de Pedidos")
+        step_functions = StepFunctions("Step Functions\nFlujo de Pedidos",
+                                       capacity={"rps": 1300})
         eventbridge = Eventbridge("EventBridge\nEvent Bus")
     
     # ============ INTEGRACIÓN Y MENSAJERÍA ============
     with Cluster("Integración y Mensajería", graph_attr={"bgcolor": "#E0F2F1"}):
         with Cluster("SQS Queues"):
-            sqs_pedidos = SQS("Cola de\nPedidos")
+            sqs_pedidos = SQS("Cola de\nPedidos",
+                              capacity={"batch_size": 10, "consumers": 5, "receive_ms": 50})
             sqs_notificaciones = SQS("Cola de\nNotificaciones")
-            sqs_facturacion = SQS("Cola de\nFacturación")
+            sqs_facturacion = SQS("Cola de\nFacturación",
+                                  capacity={"batch_size": 10, "consumers": 5, "receive_ms": 50})
         
         with Cluster("SNS Topics"):
             sns_alertas = SNS("Alertas a\nAtención")
@@ -120,11 +127,14 @@ with Diagram(
     # ============ CAPA DE DATOS ============
     with Cluster("Capa de Datos", graph_attr={"bgcolor": "#BBDEFB"}):
         with Cluster("Base de Datos Transaccional"):
-            rds = RDS("RDS PostgreSQL\nPedidos, Clientes\nProductos, Inventario")
-            rds_replica = RDS("Read Replica\nConsultas")
+            rds = RDS("RDS PostgreSQL\nPedidos, Clientes\nProductos, Inventario",
+                      capacity={"max_connections": 150, "query_ms": 20, "calls_per_order": 4})
+            rds_replica = RDS("Read Replica\nConsultas",
+                              capacity={"max_connections": 150, "query_ms": 12})
         
         with Cluster("Base de Datos NoSQL"):
-            dynamodb_tracking = Dynamodb("DynamoDB\nTracking Tiempo Real")
+            dynamodb_tracking = Dynamodb("DynamoDB\nTracking Tiempo Real",
+                                         capacity={"wcu": 500, "rcu": 1500, "reads_per_request": 2})
             dynamodb_sesiones = Dynamodb("DynamoDB\nSesiones Atención")
             dynamodb_cache = Dynamodb("DynamoDB\nCache Consultas")
         
@@ -0,0 +1,275 @@
+# extract_topology.py
+# Extractor estático de topologías: recupera el grafo de un script de
+# diagrama analizando su AST, sin ejecutarlo y sin diagrams ni Graphviz.
+#
+# Interpreta el subconjunto de Python que usan los scripts de assets/:
+#   - imports de clases de nodo (lazy_nodes, diagrams.*)
+#   - asignaciones de literales (graph_attr = {...}) y de nodos
+#   - with Diagram(...) / with Cluster(...) anidados
+#   - cadenas >>, << y - con Edge(label=..., style=...), listas y abanicos
+#     ([svc_ride, svc_matching, svc_pay] >> aurora)
+#   - bucles for sobre listas literales (for svc in [...]: ...)
+# Los operadores se aplican sobre los mismos objetos de topology.py, así que
+# la especificación resultante es idéntica a la que emite el script al
+# ejecutarse (ids, orden y atributos).
+#
+# Uso:
+#     python extract_topology.py uber_architecture_aws.py
+#     python extract_topology.py *.py --check     # compara con la ejecución
+#     python extract_topology.py delimasa_aws_diagram.py --json
+
+import argparse
+import ast
+import json
+import operator
+import os
+import sys
+import time
+
+import lazy_nodes
+import topology
+
+_OPERATORS = {ast.RShift: operator.rshift, ast.LShift: operator.lshift, ast.Sub: operator.sub,
+              ast.Add: operator.add}
+
+_DIAGRAM_MODULES = ("topology", "render_cache", "diagrams")
+
+
+class ExtractionError(ValueError):
+    pass
+
+
+class _Unknown:
+    """Valor que el extractor no puede resolver estáticamente."""
+
+    def __repr__(self):
+        return "<desconocido>"
+
+
+UNKNOWN = _Unknown()
+
+
+class _Extractor:
+    def __init__(self, filename):
+        self.filename = filename
+        self.env = {}
+        self.kinds = {}       # nombre local -> tipo de nodo
+        self.roles = {}       # nombre local -> "diagram" | "cluster" | "edge"
+        self.diagram = None
+        self.specs = []
+        self.warnings = []
+
+    def warn(self, node, message):
+        self.warnings.append(f"{self.filename}:{getattr(node, 'lineno', '?')}: {message}")
+
+    # ---------- sentencias ----------
+    def run(self, statements):
+        for stmt in statements:
+            self.statement(stmt)
+
+    def statement(self, stmt):
+        if isinstance(stmt, ast.ImportFrom):
+            self.import_from(stmt)
+        elif isinstance(stmt, ast.Assign):
+            value = self.expr(stmt.value)
+            for target in stmt.targets:
+                self.assign(target, value)
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+            self.assign(stmt.target, self.expr(stmt.value))
+        elif isinstance(stmt, ast.Expr):
+            self.expr(stmt.value)
+        elif isinstance(stmt, ast.With):
+            self.with_block(stmt)
+        elif isinstance(stmt, ast.For):
+            self.for_loop(stmt)
+        elif isinstance(stmt, (ast.Import, ast.Pass, ast.FunctionDef, ast.ClassDef)):
+            pass
+        elif self.diagram is not None:
+            self.warn(stmt, f"sentencia {type(stmt).__name__} ignorada")
+
+    def import_from(self, stmt):
+        module = stmt.module or ""
+        for alias in stmt.names:
+            local = alias.asname or alias.name
+            if alias.name.endswith("Diagram") and module.split(".")[0] in _DIAGRAM_MODULES:
+                self.roles[local] = "diagram"
+            elif alias.name in ("Cluster", "Group") and module.split(".")[0] in _DIAGRAM_MODULES:
+                self.roles[local] = "cluster"
+            elif alias.name == "Edge" and module.split(".")[0] in _DIAGRAM_MODULES:
+                self.roles[local] = "edge"
+            elif module == "lazy_nodes":
+                self.kinds[local] = alias.name
+            elif module.startswith("diagrams."):
+                self.kinds[local] = local if local in lazy_nodes.REGISTRY else alias.name
+
+    def assign(self, target, value):
+        if isinstance(target, ast.Name):
+            self.env[target.id] = value
+        elif isinstance(target, (ast.Tuple, ast.List)) and isinstance(value, (list, tuple)) \
+                and len(value) == len(target.elts):
+            for element, item in zip(target.elts, value):
+                self.assign(element, item)
+
+    def with_block(self, stmt):
+        contexts = []
+        for item in stmt.items:
+            call = item.context_expr
+            role = self.roles.get(getattr(getattr(call, "func", None), "id", None))
+            if role == "diagram":
+                contexts.append(self.open_diagram(call))
+            elif role == "cluster":
+                args, kwargs = self.arguments(call)
+                cluster = topology.Cluster(*args, **kwargs)
+                cluster.__enter__()
+                contexts.append(cluster)
+            else:
+                self.warn(stmt, "contexto with no reconocido; se analiza su cuerpo")
+                contexts.append(None)
+            if item.optional_vars is not None and contexts[-1] is not None:
+                self.assign(item.optional_vars, contexts[-1])
+        self.run(stmt.body)
+        for context in reversed(contexts):
+            if isinstance(context, topology.Cluster):
+                context.__exit__(None, None, None)
+            elif isinstance(context, topology.Diagram):
+                self.close_diagram(context)
+
+    def open_diagram(self, call):
+        args, kwargs = self.arguments(call)
+        kwargs.pop("cache", None)
+        diagram = topology.Diagram(*args, **kwargs)
+        diagram._token = lazy_nodes.bind_builder(diagram)
+        self.diagram = diagram
+        return diagram
+
+    def close_diagram(self, diagram):
+        lazy_nodes.unbind_builder(diagram._token)
+        self.specs.append(diagram.to_spec(self.env))
+        self.diagram = None
+
+    def for_loop(self, stmt):
+        iterable = self.expr(stmt.iter)
+        if not isinstance(iterable, (list, tuple)):
+            self.warn(stmt, "bucle for sobre un valor no literal; se omite")
+            return
+        for item in iterable:
+            self.assign(stmt.target, item)
+            self.run(stmt.body)
+        self.run(stmt.orelse)
+
+    # ---------- expresiones ----------
+    def arguments(self, call):
+        args = [self.expr(arg) for arg in call.args]
+        kwargs = {}
+        for keyword in call.keywords:
+            value = self.expr(keyword.value)
+            if keyword.arg is None:
+                if isinstance(value, dict):
+                    kwargs.update(value)
+                continue
+            if value is UNKNOWN:
+                self.warn(call, f"argumento {keyword.arg}= no literal; se omite")
+                continue
+            kwargs[keyword.arg] = value
+        return args, kwargs
+
+    def expr(self, node):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return self.env.get(node.id, UNKNOWN)
+        if isinstance(node, ast.List):
+            return [self.expr(e) for e in node.elts]
+        if isinstance(node, ast.Tuple):
+            return tuple(self.expr(e) for e in node.elts)
+        if isinstance(node, ast.Dict):
+            if any(k is None for k in node.keys):
+                return UNKNOWN
+            return {self.expr(k): self.expr(v) for k, v in zip(node.keys, node.values)}
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value = self.expr(node.operand)
+            return -value if isinstance(value, (int, float)) else UNKNOWN
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            left, right = self.expr(node.left), self.expr(node.right)
+            if left is UNKNOWN or right is UNKNOWN:
+                self.warn(node, "operando desconocido en una conexión")
+                return UNKNOWN
+            try:
+                return _OPERATORS[type(node.op)](left, right)
+            except TypeError:
+                return UNKNOWN
+        if isinstance(node, ast.Call):
+            return self.call(node)
+        return UNKNOWN
+
+    def call(self, node):
+        name = getattr(node.func, "id", None)
+        if name in self.kinds and self.diagram is not None:
+            args, kwargs = self.arguments(node)
+            return self.diagram.add_node(self.kinds[name], *args, **kwargs)
+        if self.roles.get(name) == "edge":
+            args, kwargs = self.arguments(node)
+            return topology.Edge(*args, **kwargs)
+        # print(), funciones de usuario, etc.: sin efecto en la topología
+        return UNKNOWN
+
+
+def extract_source(source, filename="<script>"):
+    """Especificaciones de todos los Diagram del código y avisos del análisis."""
+    try:
+        tree = ast.parse(source, filename=filename)
+    except SyntaxError as exc:
+        raise ExtractionError(f"{filename}: {exc}") from exc
+    extractor = _Extractor(filename)
+    try:
+        extractor.run(tree.body)
+    finally:
+        if extractor.diagram is not None:
+            lazy_nodes.unbind_builder(extractor.diagram._token)
+    return extractor.specs, extractor.warnings
+
+
+def extract(path):
+    """Especificación del primer Diagram del script (ver topology.py)."""
+    with open(path, encoding="utf-8") as fh:
+        specs, _ = extract_source(fh.read(), filename=path)
+    if not specs:
+        raise ExtractionError(f"{path} no contiene un bloque with Diagram(...)")
+    return specs[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrae la topología de scripts de diagramas sin ejecutarlos")
+    parser.add_argument("scripts", nargs="+")
+    parser.add_argument("--json", action="store_true", help="imprime la especificación JSON")
+    parser.add_argument("--check", action="store_true",
+                        help="compara con la especificación que emite el script al ejecutarse")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.scripts:
+        with open(path, encoding="utf-8") as fh:
+            source = fh.read()
+        started = time.perf_counter()
+        specs, warnings = extract_source(source, filename=path)
+        elapsed = (time.perf_counter() - started) * 1000
+        if not specs:
+            print(f"⏭️  {os.path.basename(path)}: sin bloque with Diagram(...)")
+            continue
+        spec = specs[0]
+        if args.json:
+            print(json.dumps(spec, ensure_ascii=False, indent=2))
+            continue
+        print(f"✅ {os.path.basename(path)}: {len(spec['nodes'])} nodos, {len(spec['edges'])} aristas, "
+              f"{len(spec['clusters'])} clusters en {elapsed:.1f} ms")
+        for warning in warnings:
+            print(f"   ⚠️  {warning}")
+        if args.check:
+            same = topology.spec_digest(spec) == topology.spec_digest(topology.spec_from_script(path))
+            failed |= not same
+            print("   ✔ coincide con la ejecución" if same else "   ✘ difiere de la ejecución")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+# failure_sim.py
+# Inyección de fallos y disponibilidad de los flujos de negocio de DeliMasa.
+#
+# Se tumban nodos de la topología (vpn, rds, cache, sqs_pedidos, ...) y se
+# comprueba qué flujos siguen siendo alcanzables: un flujo está disponible
+# si desde su origen se llega, solo por nodos vivos, a todos sus nodos
+# requeridos (FLOWS).
+#
+# Los escenarios se evalúan en paralelo a nivel de bits: para cada nodo hay
+# un bitset (uint64 empaquetados) con un bit por escenario, 1 = vivo. La
+# alcanzabilidad se propaga por las aristas con operaciones vectoriales
+#     alcanzable[dst] |= alcanzable[src] & vivo[dst]
+# hasta el punto fijo, así que 100.000 escenarios cuestan lo mismo que unas
+# pocas pasadas sobre arrays de 1.563 palabras.
+#
+# Modos:
+#     python failure_sim.py --fail vpn              # fallo concreto: flujos y nodos aislados
+#     python failure_sim.py --single                # impacto de cada fallo individual
+#     python failure_sim.py --scenarios 100000      # Monte Carlo con disponibilidad por nodo y SLA
+#     python failure_sim.py --scenarios 100000 --fail cache --sla 0.9995
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import topology
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Flujos de negocio: origen y nodos que tienen que ser alcanzables
+FLOWS = {
+    "registro": {"source": "clientes",
+                 "requires": ["lambda_registro", "rds", "sqs_pedidos", "step_functions"]},
+    "facturacion": {"source": "clientes",
+                    "requires": ["lambda_facturas", "sqs_facturacion", "s3_facturas", "api_dian"]},
+    "tracking": {"source": "clientes",
+                 "requires": ["lambda_tracking", "dynamodb_tracking", "cache"]},
+    "notificaciones": {"source": "clientes",
+                       "requires": ["lambda_notificaciones", "sqs_notificaciones", "api_sms"]},
+    "integracion_erp": {"source": "clientes",
+                        "requires": ["legacy_erp", "legacy_bodega"]},
+}
+
+# Disponibilidad mensual por tipo de nodo (fracción del tiempo en servicio)
+KIND_AVAILABILITY = {
+    "Users": 1.0,
+    "Client": 0.995,
+    "Internet": 0.999,
+    "Route53": 0.99999,
+    "CloudFront": 0.9999,
+    "WAF": 0.9999,
+    "APIGateway": 0.9995,
+    "Lambda": 0.9995,
+    "StepFunctions": 0.999,
+    "SQS": 0.9999,
+    "SNS": 0.9999,
+    "Eventbridge": 0.9999,
+    "RDS": 0.9995,
+    "Dynamodb": 0.99999,
+    "ElasticacheForRedis": 0.999,
+    "S3": 0.9999,
+    "VpnGateway": 0.9995,
+}
+
+AVAILABILITY = {
+    "script": "delimasa_aws_diagram.py",
+    "default": 0.9999,
+    # por id, con prioridad sobre el tipo
+    "nodes": {"internet": 0.99999},
+}
+
+
+# ============================================
+# BITSETS
+# ============================================
+
+def _words(scenarios):
+    return (scenarios + 63) // 64
+
+
+def pack(bits):
+    """Matriz booleana (filas, escenarios) -> (filas, palabras) uint64."""
+    rows, scenarios = bits.shape
+    padded = np.zeros((rows, _words(scenarios) * 64), dtype=bool)
+    padded[:, :scenarios] = bits
+    return np.packbits(padded, axis=1, bitorder="little").view(np.uint64)
+
+
+def popcount(words):
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+class FailureModel:
+    """Topología compilada con las aristas en orden topológico aproximado."""
+
+    def __init__(self, graph, flows):
+        self.graph = graph
+        self.flows = {}
+        for name, flow in flows.items():
+            missing = [n for n in [flow["source"]] + flow["requires"] if n not in graph.index]
+            if missing:
+                raise ValueError(f"flujo {name}: nodos desconocidos {', '.join(missing)}")
+            self.flows[name] = (graph.index[flow["source"]], [graph.index[n] for n in flow["requires"]])
+        # Orden de aristas por profundidad BFS desde los orígenes: la primera
+        # pasada ya propaga casi todo y el punto fijo converge en 1-2 pasadas
+        depth = {}
+        frontier = sorted({source for source, _ in self.flows.values()})
+        for node in frontier:
+            depth[node] = 0
+        while frontier:
+            following = []
+            for node in frontier:
+                for succ in graph.successors(node):
+                    if succ not in depth:
+                        depth[succ] = depth[node] + 1
+                        following.append(succ)
+            frontier = following
+        edges = [(graph.flow_src[e], graph.flow_dst[e]) for e in range(graph.n_edges)
+                 if graph.flow_src[e] in depth]
+        edges.sort(key=lambda edge: depth[edge[0]])
+        self.edge_src = np.array([s for s, _ in edges], dtype=np.int64)
+        self.edge_dst = np.array([d for _, d in edges], dtype=np.int64)
+
+    def reach(self, alive, source):
+        """Bitsets de alcanzabilidad desde `source` en todos los escenarios."""
+        reach = np.zeros_like(alive)
+        reach[source] = alive[source]
+        changed = True
+        while changed:
+            changed = False
+            for src, dst in zip(self.edge_src, self.edge_dst):
+                update = reach[src] & alive[dst]
+                merged = reach[dst] | update
+                if not np.array_equal(merged, reach[dst]):
+                    reach[dst] = merged
+                    changed = True
+        return reach
+
+    def evaluate(self, alive):
+        """{flujo: bitset de escenarios en que está disponible}."""
+        reach_by_source = {}
+        result = {}
+        for name, (source, requires) in self.flows.items():
+            if source not in reach_by_source:
+                reach_by_source[source] = self.reach(alive, source)
+            reach = reach_by_source[source]
+            up = reach[requires[0]].copy()
+            for node in requires[1:]:
+                up &= reach[node]
+            result[name] = up
+        return result, reach_by_source
+
+
+def availabilities(graph, config):
+    values = np.empty(graph.n_nodes)
+    for node in range(graph.n_nodes):
+        node_id = graph.ids[node]
+        values[node] = config["nodes"].get(node_id, KIND_AVAILABILITY.get(graph.kind(node), config["default"]))
+    return values
+
+
+def sample_alive(rng, availability, scenarios, forced_down=()):
+    bits = rng.random((len(availability), scenarios)) < availability[:, None]
+    for node in forced_down:
+        bits[node] = False
+    return pack(bits)
+
+
+# ============================================
+# CLI
+# ============================================
+
+def _nines(fraction):
+    return f"{fraction * 100:.4f}%"
+
+
+def report_forced(model, down):
+    graph = model.graph
+    alive = np.ones((graph.n_nodes, 1), dtype=bool)
+    for node in down:
+        alive[node] = False
+    flows, reaches = model.evaluate(pack(alive))
+    names = ", ".join(graph.ids[n] for n in down)
+    print(f"\n💥 Fallo de {names}")
+    for name, bits in flows.items():
+        up = bool(bits[0] & np.uint64(1))
+        source, requires = model.flows[name]
+        lost = [graph.ids[n] for n in requires if not reaches[source][n][0] & np.uint64(1)]
+        print(f"   {'✅' if up else '❌'} {name:<18} {'' if up else 'sin acceso a ' + ', '.join(lost)}")
+    # Nodos que dejan de ser alcanzables desde algún origen (aunque sigan vivos)
+    baseline = model.evaluate(pack(np.ones((graph.n_nodes, 1), dtype=bool)))[1]
+    isolated = sorted({
+        graph.ids[n] for source, reach in reaches.items() for n in range(graph.n_nodes)
+        if n not in down and baseline[source][n][0] & np.uint64(1) and not reach[n][0] & np.uint64(1)
+    })
+    if isolated:
+        print(f"   🔌 quedan aislados: {', '.join(isolated)}")
+
+
+def report_single(model):
+    """Un escenario por nodo: qué flujos rompe cada fallo individual."""
+    graph = model.graph
+    alive = ~np.eye(graph.n_nodes, dtype=bool)
+    flows, _ = model.evaluate(pack(alive))
+    broken = np.zeros((graph.n_nodes, len(flows)), dtype=bool)
+    for column, bits in enumerate(flows.values()):
+        up = np.unpackbits(bits.view(np.uint8), bitorder="little")[:graph.n_nodes].astype(bool)
+        broken[:, column] = ~up
+    rows = sorted((node for node in range(graph.n_nodes) if broken[node].any()),
+                  key=lambda node: (-broken[node].sum(), graph.ids[node]))
+    print(f"\n{'Nodo caído':<26} flujos interrumpidos")
+    print("-" * 72)
+    for node in rows:
+        names = [name for column, name in enumerate(flows) if broken[node, column]]
+        print(f"{graph.ids[node]:<26} {', '.join(names)}")
+    print(f"\n🛡️  {graph.n_nodes - len(rows)} nodos cuyo fallo individual no interrumpe ningún flujo")
+
+
+def report_monte_carlo(model, availability, scenarios, forced, sla, seed):
+    graph = model.graph
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    alive = sample_alive(rng, availability, scenarios, forced)
+    flows, _ = model.evaluate(alive)
+    all_up = None
+    for bits in flows.values():
+        all_up = bits.copy() if all_up is None else all_up & bits
+    elapsed = time.perf_counter() - started
+
+    print(f"\n🎲 {scenarios:,} escenarios en {elapsed:.2f}s")
+    print(f"\n{'Flujo':<20} {'disponibilidad':>15}  SLA {sla * 100:g}%")
+    print("-" * 50)
+    for name, bits in flows.items():
+        fraction = popcount(bits) / scenarios
+        print(f"{name:<20} {_nines(fraction):>15}  {'✅' if fraction >= sla else '❌'}")
+    overall = popcount(all_up) / scenarios
+    print("-" * 50)
+    print(f"{'todos los flujos':<20} {_nines(overall):>15}  {'✅' if overall >= sla else '❌'}")
+
+    # Criticidad: escenarios con el nodo caído en que algún flujo cae. Los
+    # bits de relleno del último word no son escenarios: se enmascaran al negar
+    valid = pack(np.ones((1, scenarios), dtype=bool))[0]
+    down_any = ~all_up & valid
+    rows = []
+    for node in range(graph.n_nodes):
+        dead = ~alive[node] & valid
+        failures = popcount(dead)
+        if failures:
+            rows.append((popcount(dead & down_any) / scenarios, failures, node))
+    rows.sort(reverse=True)
+    print(f"\n{'Nodo':<26} {'caídas':>8} {'indisponibilidad atribuible':>28}")
+    print("-" * 66)
+    for share, failures, node in rows[:10]:
+        if share:
+            print(f"{graph.ids[node]:<26} {failures:>8,} {_nines(share):>28}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inyección de fallos y disponibilidad de flujos de negocio")
+    parser.add_argument("source", nargs="?", help="script, .json o .topo (por defecto DeliMasa)")
+    parser.add_argument("--fail", help="nodos caídos, separados por comas (p. ej. vpn,rds)")
+    parser.add_argument("--single", action="store_true", help="impacto de cada fallo individual")
+    parser.add_argument("--scenarios", type=int, default=0, help="escenarios Monte Carlo")
+    parser.add_argument("--sla", type=float, default=0.999, help="objetivo de disponibilidad (fracción)")
+    parser.add_argument("--config", help="JSON con flows, nodes (disponibilidad por id) y default")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config, flows = copy.deepcopy(AVAILABILITY), copy.deepcopy(FLOWS)
+    if args.config:
+        with open(args.config, encoding="utf-8") as fh:
+            custom = json.load(fh)
+        flows.update(custom.pop("flows", {}))
+        config["nodes"].update(custom.pop("nodes", {}))
+        config.update(custom)
+    source = args.source or os.path.join(BASE_DIR, config["script"])
+    graph = topology.load(source, static=source.endswith(".py"))
+    model = FailureModel(graph, flows)
+
+    forced = []
+    if args.fail:
+        unknown = [n for n in args.fail.split(",") if n not in graph.index]
+        if unknown:
+            parser.error(f"nodos desconocidos: {', '.join(unknown)}")
+        forced = [graph.index[n] for n in args.fail.split(",")]
+        report_forced(model, forced)
+    if args.single:
+        report_single(model)
+    if args.scenarios:
+        report_monte_carlo(model, availabilities(graph, config), args.scenarios, forced, args.sla, args.seed)
+    if not (forced or args.single or args.scenarios):
+        parser.error("indica --fail, --single o --scenarios")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+# lambda_coldstart.py
+# Arranques en frío, concurrencia y provisioned concurrency de las Lambdas.
+#
+# Toma las funciones del cluster "Microservicios Lambda" de
+# delimasa_aws_diagram.py (de lambda_registro a lambda_incidencias) con su
+# reserved_concurrency y duration_ms (capacity={...}) y una serie de
+# peticiones por segundo de cada función (CSV o generada con el perfil
+# diario de pipeline_sim.py). Con resolución de un segundo calcula:
+#   concurrencia   c[t] = ceil(peticiones[t] · duración)
+#   pool caliente  w[t] = máx(c) en los `keep_warm_s` segundos anteriores
+#                  (entornos que Lambda aún no ha reciclado)
+#   fríos          max(0, c[t] - max(provisioned, w[t])), limitados por la
+#                  escala de nuevos entornos por segundo
+#   throttling     lo que supera reserved_concurrency o la escala
+# y de ahí la fracción de peticiones con arranque en frío, la cola de
+# latencia añadida (mezcla de lognormales: caliente vs. caliente + init) y
+# el coste diario con y sin provisioned concurrency.
+#
+# Todo son operaciones sobre arrays (funciones × segundos): el máximo
+# deslizante usa el algoritmo de van Herk/Gil-Werman por bloques, y la
+# búsqueda de provisioned concurrency evalúa todos los valores enteros a
+# la vez con histogramas de (w[t], c[t]), así que un día completo de las
+# siete funciones se resuelve en décimas de segundo.
+#
+# Uso:
+#     python lambda_coldstart.py
+#     python lambda_coldstart.py --rate 5 --provisioned lambda_registro=4 --provisioned lambda_facturas=3
+#     python lambda_coldstart.py --optimize --target-cold 0.001 --schedule
+#     python lambda_coldstart.py --series trafico_lambdas.csv --keep-warm 300
+
+import argparse
+import copy
+import csv
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import topology
+from pipeline_sim import DAY_PROFILE
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLUSTER = "Microservicios Lambda"
+DAY = 86_400
+
+# Precios de Lambda x86 en us-east-1 (USD)
+PRICE_REQUEST = 0.20 / 1e6
+PRICE_GB_S = 0.0000166667
+PRICE_PC_GB_S = 0.0000041667           # provisioned concurrency reservada
+PRICE_PC_DURATION_GB_S = 0.0000097222  # duración servida por provisioned
+
+LAMBDA_MODEL = {
+    "script": "delimasa_aws_diagram.py",
+    "keep_warm_s": 420,          # inactividad antes de reciclar un entorno
+    "scale_per_s": 100,          # nuevos entornos por segundo y función (1.000 cada 10 s)
+    "account_limit": 1000,       # concurrencia de la cuenta si no hay reservada
+    "sigma": 0.35,               # dispersión lognormal de la duración
+    "functions": {
+        # per_order: invocaciones por pedido; init_ms: inicialización en frío
+        "default": {"per_order": 1.0, "memory_mb": 512, "init_ms": 450, "duration_ms": 200},
+        "lambda_registro": {"per_order": 1.0},
+        "lambda_validacion_inv": {"per_order": 1.0, "memory_mb": 256},
+        "lambda_validacion_cred": {"per_order": 1.0, "memory_mb": 256},
+        "lambda_facturas": {"per_order": 1.0, "memory_mb": 1024, "init_ms": 1200},
+        "lambda_notificaciones": {"per_order": 3.0, "memory_mb": 256},
+        "lambda_tracking": {"per_order": 6.0, "memory_mb": 256, "init_ms": 350},
+        "lambda_incidencias": {"per_order": 0.03, "duration_ms": 300},
+    },
+}
+
+
+# ============================================
+# MODELO
+# ============================================
+
+class FunctionSet:
+    """Parámetros de las funciones del cluster como arrays paralelos."""
+
+    def __init__(self, graph, model):
+        functions = model["functions"]
+        names = [graph.ids[n] for n in range(graph.n_nodes)
+                 if graph.kind(n) == "Lambda" and graph.top_cluster(n) != -1
+                 and graph.cluster_labels[graph.top_cluster(n)] == CLUSTER]
+        if not names:
+            raise ValueError(f"no hay funciones Lambda en el cluster {CLUSTER!r}")
+        self.names = names
+        rows = []
+        for name in names:
+            params = dict(functions["default"], **functions.get(name, {}))
+            capacity = graph.node_capacity.get(graph.index[name], {})
+            params["duration_ms"] = capacity.get("duration_ms", params["duration_ms"])
+            params["limit"] = capacity.get("reserved_concurrency", model["account_limit"])
+            rows.append(params)
+        self.per_order = np.array([r["per_order"] for r in rows])
+        self.memory_gb = np.array([r["memory_mb"] / 1024 for r in rows])
+        self.init = np.array([r["init_ms"] / 1000 for r in rows])
+        self.duration = np.array([r["duration_ms"] / 1000 for r in rows])
+        self.limit = np.array([r["limit"] for r in rows], np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def sliding_max(values, window):
+    """Máximo de cada ventana de `window` muestras que termina en t (por filas)."""
+    rows, n = values.shape
+    blocks = -(-(n + window - 1) // window)
+    padded = np.zeros((rows, blocks * window), values.dtype)
+    padded[:, window - 1:window - 1 + n] = values
+    shaped = padded.reshape(rows, blocks, window)
+    prefix = np.maximum.accumulate(shaped, axis=2).reshape(rows, -1)
+    suffix = np.maximum.accumulate(shaped[:, :, ::-1], axis=2)[:, :, ::-1].reshape(rows, -1)
+    return np.maximum(suffix[:, :n], prefix[:, window - 1:window - 1 + n])
+
+
+class DayResult:
+    """Resultado por función (arrays de longitud F) de un día simulado."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def simulate(functions, requests, provisioned, model):
+    """requests: (F, T) peticiones por segundo; provisioned: (F,) o (F, T)."""
+    requests = np.asarray(requests, np.float64)
+    limit = functions.limit[:, None]
+    demand = np.ceil(requests * functions.duration[:, None]).astype(np.int64)
+    concurrency = np.minimum(demand, limit)
+    provisioned = np.minimum(np.broadcast_to(np.asarray(provisioned, np.int64).reshape(len(functions), -1),
+                                             demand.shape), limit)
+
+    # Entornos calientes al empezar cada segundo: máximo de los keep_warm_s anteriores
+    warm = np.zeros_like(concurrency)
+    warm[:, 1:] = sliding_max(concurrency, model["keep_warm_s"])[:, :-1]
+    cold_envs = np.maximum(0, concurrency - np.maximum(provisioned, warm))
+    scale_excess = np.maximum(0, cold_envs - model["scale_per_s"])
+    cold_envs -= scale_excess
+
+    per_env = np.divide(requests, demand, out=np.zeros_like(requests), where=demand > 0)
+    throttled = (demand - concurrency + scale_excess) * per_env
+    cold_requests = np.minimum(cold_envs, requests)
+
+    # Coste: la concurrencia cubierta por provisioned se factura a su tarifa de duración
+    gb = functions.memory_gb[:, None]
+    busy_gb_s = (requests - throttled) * functions.duration[:, None] * gb
+    covered = np.minimum(concurrency, provisioned) / np.maximum(concurrency, 1)
+    cost = (requests.sum(axis=1) * PRICE_REQUEST
+            + (busy_gb_s * (1 - covered)).sum(axis=1) * PRICE_GB_S
+            + (busy_gb_s * covered).sum(axis=1) * PRICE_PC_DURATION_GB_S
+            + (provisioned * gb).sum(axis=1) * PRICE_PC_GB_S)
+
+    served = requests.sum(axis=1) - throttled.sum(axis=1)
+    return DayResult(
+        requests=requests.sum(axis=1), served=served, peak=demand.max(axis=1),
+        mean_warm=np.maximum(warm, provisioned).mean(axis=1),
+        cold=cold_requests.sum(axis=1), throttled=throttled.sum(axis=1),
+        cold_fraction=np.divide(cold_requests.sum(axis=1), served, out=np.zeros(len(served)), where=served > 0),
+        provisioned=provisioned.mean(axis=1), cost=cost, warm=warm, concurrency=concurrency)
+
+
+# ============================================
+# LATENCIA
+# ============================================
+
+def _lognormal_cdf(x, median, sigma):
+    return 0.5 * (1 + math.erf(math.log(x / median) / (sigma * math.sqrt(2)))) if x > 0 else 0.0
+
+
+def mixture_quantile(q, median, init, sigma, cold_fraction):
+    """Cuantil de la latencia: caliente ~ LN(median) y fría = caliente + init."""
+    def cdf(x):
+        return ((1 - cold_fraction) * _lognormal_cdf(x, median, sigma)
+                + cold_fraction * _lognormal_cdf(x - init, median, sigma))
+
+    low, high = 0.0, median * math.exp(6 * sigma) + init
+    for _ in range(60):
+        mid = (low + high) / 2
+        if cdf(mid) < q:
+            low = mid
+        else:
+            high = mid
+    return high
+
+
+# ============================================
+# PROVISIONED CONCURRENCY
+# ============================================
+
+def cold_curve(concurrency, warm, max_p, segments=None):
+    """Entornos fríos para cada P = 0..max_p, sin volver a simular.
+
+    Cada segundo aporta max(0, c - max(P, w)): vale c - w hasta P = w, baja
+    con pendiente -1 hasta P = c y después es 0. Sumando las pendientes con
+    bincount se obtiene la curva completa. Con `segments` (índice de
+    segmento por segundo) se obtiene una curva por segmento, p. ej. por hora.
+    """
+    c = np.minimum(concurrency, max_p + 1)
+    w = np.minimum(warm, c)
+    active = c > w
+    c, w = c[active], w[active]
+    n_seg = 1 if segments is None else int(segments.max()) + 1
+    seg = np.zeros(len(c), np.int64) if segments is None else segments[active]
+    width = max_p + 2
+    base = np.bincount(seg, weights=c - w, minlength=n_seg)
+    slope = (np.bincount(seg * width + w, minlength=n_seg * width)
+             - np.bincount(seg * width + c, minlength=n_seg * width)).reshape(n_seg, width)
+    # pendiente en [k, k+1): -(segundos con w <= k < c)
+    decrease = np.cumsum(np.cumsum(slope, axis=1), axis=1)[:, :-1]
+    curve = base[:, None] - np.hstack([np.zeros((n_seg, 1)), decrease[:, :-1]])
+    return curve if segments is not None else curve[0]
+
+
+def optimize(functions, result, requests, target, hourly=False):
+    """Provisioned mínima por función (o por función y hora) con fríos <= target."""
+    plans = []
+    for f in range(len(functions)):
+        c, w = result.concurrency[f], result.warm[f]
+        max_p = int(c.max())
+        if hourly:
+            hours = np.arange(len(c)) // 3600
+            curve = cold_curve(c, w, max_p, hours)
+            per_hour = np.bincount(hours, weights=requests[f], minlength=curve.shape[0])
+            ok = curve <= target * np.maximum(per_hour, 1)[:, None]
+            plans.append(np.argmax(ok, axis=1)[hours])
+        else:
+            curve = cold_curve(c, w, max_p)
+            ok = np.flatnonzero(curve <= target * max(requests[f].sum(), 1))
+            plans.append(int(ok[0]) if len(ok) else max_p)
+    return plans
+
+
+# ============================================
+# TRÁFICO
+# ============================================
+
+def generate_requests(functions, rate, seed=None, seconds=DAY, profile=DAY_PROFILE):
+    """Peticiones por segundo: pedidos/s con perfil horario × invocaciones por pedido."""
+    rng = np.random.default_rng(seed)
+    weights = np.asarray(profile, np.float64)
+    weights = weights / weights.mean()
+    hourly = rate * weights[(np.arange(seconds) // 3600) % len(weights)]
+    return rng.poisson(functions.per_order[:, None] * hourly[None, :]).astype(np.float64)
+
+
+def read_series(path, functions):
+    """CSV con una columna por función (segundo opcional); faltantes = 0."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = {name: [] for name in functions.names}
+        for row in reader:
+            for name in functions.names:
+                columns[name].append(float(row.get(name) or 0))
+    return np.array([columns[name] for name in functions.names])
+
+
+# ============================================
+# CLI
+# ============================================
+
+def _ms(seconds):
+    return f"{seconds * 1000:,.0f}"
+
+
+def print_report(functions, base, result, model, label):
+    sigma = model["sigma"]
+    print(f"\n{label}")
+    print(f"{'Función':<24} {'pet/día':>10} {'pico':>5} {'lím':>5} {'P':>5} {'caliente':>8} "
+          f"{'fríos':>7} {'% frío':>7} {'throttle':>8} {'p99 ms':>8} {'+p99':>6} {'+p99.9':>7} {'USD/día':>8}")
+    print("-" * 122)
+    for f, name in enumerate(functions.names):
+        median, init = functions.duration[f], functions.init[f]
+        p99 = mixture_quantile(0.99, median, init, sigma, result.cold_fraction[f])
+        p999 = mixture_quantile(0.999, median, init, sigma, result.cold_fraction[f])
+        warm99 = mixture_quantile(0.99, median, init, sigma, 0.0)
+        warm999 = mixture_quantile(0.999, median, init, sigma, 0.0)
+        print(f"{name:<24} {result.requests[f]:>10,.0f} {result.peak[f]:>5,} {functions.limit[f]:>5,} "
+              f"{result.provisioned[f]:>5.1f} {result.mean_warm[f]:>8.1f} {result.cold[f]:>7,.0f} "
+              f"{result.cold_fraction[f]:>7.3%} {result.throttled[f]:>8,.0f} {_ms(p99):>8} "
+              f"{_ms(p99 - warm99):>6} {_ms(p999 - warm999):>7} {result.cost[f]:>8.2f}")
+    print("-" * 122)
+    delta = result.cost.sum() - base.cost.sum()
+    print(f"💰 {result.cost.sum():,.2f} USD/día ({delta:+,.2f} frente a sin provisioned); "
+          f"{result.cold.sum():,.0f} arranques en frío, {result.throttled.sum():,.0f} peticiones con throttling")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranques en frío y provisioned concurrency de las Lambdas")
+    parser.add_argument("--series", help="CSV de peticiones por segundo (una columna por función)")
+    parser.add_argument("--rate", type=float, default=1.2, help="pedidos/s medios del día (sin --series)")
+    parser.add_argument("--keep-warm", type=int, help="segundos que un entorno inactivo sigue caliente")
+    parser.add_argument("--provisioned", action="append", default=[], metavar="FUNCIÓN=N")
+    parser.add_argument("--optimize", action="store_true", help="busca la provisioned mínima por función")
+    parser.add_argument("--schedule", action="store_true", help="con --optimize, un valor por hora")
+    parser.add_argument("--target-cold", type=float, default=0.001, help="fracción máxima de peticiones en frío")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="FUNCIÓN.CAMPO=VALOR",
+                        help="p. ej. lambda_facturas.init_ms=800")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    model = copy.deepcopy(LAMBDA_MODEL)
+    if args.keep_warm:
+        model["keep_warm_s"] = args.keep_warm
+
+    graph = topology.load(os.path.join(BASE_DIR, model["script"]), static=True)
+    functions = FunctionSet(graph, model)
+    for setting in args.settings:
+        target, _, raw = setting.partition("=")
+        name, _, field = target.partition(".")
+        if name != "default" and name not in functions.names:
+            parser.error(f"--set {setting!r}: función desconocida {name!r} (usa default o {', '.join(functions.names)})")
+        if field not in model["functions"]["default"]:
+            parser.error(f"--set {setting!r}: campo desconocido {field!r} "
+                         f"(usa {', '.join(model['functions']['default'])})")
+        try:
+            model["functions"].setdefault(name, {})[field] = json.loads(raw)
+        except ValueError:
+            parser.error(f"--set {setting!r}: se espera un número")
+    if args.settings:
+        functions = FunctionSet(graph, model)
+    provisioned = np.zeros(len(functions), np.int64)
+    for item in args.provisioned:
+        name, _, value = item.partition("=")
+        if name not in functions.names:
+            parser.error(f"--provisioned {item!r}: función desconocida {name!r} (usa {', '.join(functions.names)})")
+        try:
+            count = int(value)
+        except ValueError:
+            count = -1
+        if count < 0:
+            parser.error(f"--provisioned {item!r}: se espera un entero >= 0")
+        provisioned[functions.names.index(name)] = count
+
+    started = time.perf_counter()
+    requests = read_series(args.series, functions) if args.series else generate_requests(functions, args.rate, args.seed)
+    generated = time.perf_counter()
+    base = simulate(functions, requests, np.zeros(len(functions), np.int64), model)
+    elapsed = time.perf_counter() - generated
+
+    print(f"⚙️  {len(functions)} funciones × {requests.shape[1]:,} s; entornos calientes {model['keep_warm_s']} s")
+    print_report(functions, base, base, model, "Sin provisioned concurrency")
+    if provisioned.any():
+        print_report(functions, base, simulate(functions, requests, provisioned, model), model,
+                     "Con provisioned concurrency (--provisioned)")
+    if args.optimize:
+        opt_started = time.perf_counter()
+        plans = optimize(functions, base, requests, args.target_cold, args.schedule)
+        plan = np.vstack(plans) if args.schedule else np.array(plans, np.int64)[:, None]
+        result = simulate(functions, requests, plan, model)
+        label = "por hora" if args.schedule else "constante"
+        print_report(functions, base, result, model,
+                     f"Provisioned mínima {label} para ≤ {args.target_cold:.2%} de peticiones en frío "
+                     f"({time.perf_counter() - opt_started:.2f}s)")
+        if args.schedule:
+            print("\n🗓️  Provisioned por hora (0-23)")
+            for f, name in enumerate(functions.names):
+                hours = plan[f, ::3600][:24]
+                print(f"{name:<24} " + " ".join(f"{int(p):>2}" for p in hours))
+    print(f"\n⏱️  tráfico {generated - started:.2f}s, simulación {elapsed:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
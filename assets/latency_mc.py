@@ -0,0 +1,418 @@
+# latency_mc.py
+# Estimador Monte Carlo de latencia extremo a extremo sobre los caminos de
+# una topología, vectorizado con NumPy.
+#
+# Enumera los caminos simples entre dos nodos del diagrama (por ejemplo
+# clientes → internet → dns → cdn → waf → api_gateway → lambda_registro → rds
+# en delimasa_aws_diagram.py), asigna una distribución de latencia a cada
+# nodo (por tipo o por id) y a cada arista, y muestrea millones de
+# peticiones por lotes: cada componente es una columna de un array y la
+# latencia de un camino es la suma de sus columnas.
+#
+# Los percentiles salen de histogramas logarítmicos acumulados por lote
+# (error < 1.2 %), así la memoria no depende del número de muestras. Cada
+# componente tiene su propio generador sembrado con su id (números
+# aleatorios comunes): en un barrido what-if solo se vuelven a muestrear las
+# columnas cuya distribución cambió y las diferencias entre configuraciones
+# no se pierden en el ruido.
+#
+# Las distribuciones usan el formato de pipeline_sim.py:
+#     {"dist": "lognormal", "median": 0.008, "sigma": 0.6}
+#
+# Uso:
+#     python latency_mc.py --from clientes --to rds
+#     python latency_mc.py --from clientes --to rds --fork-join --curve curvas.csv
+#     python latency_mc.py --path clientes,internet,dns,cdn,waf,api_gateway,lambda_registro,rds \
+#         --sweep rds.median=0.002,0.004,0.008,0.016 --sweep lambda_registro.sigma=0.3,0.5,0.8
+
+import argparse
+import copy
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+import topology
+from pipeline_sim import DIST_PARAMS, sampler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Latencia por tipo de nodo (segundos); los ids de LATENCY_MODEL["nodes"]
+# tienen prioridad
+KIND_LATENCY = {
+    "Users": {"dist": "const", "value": 0.0},
+    "Client": {"dist": "const", "value": 0.0},
+    "Internet": {"dist": "lognormal", "median": 0.035, "sigma": 0.45},
+    "Route53": {"dist": "lognormal", "median": 0.012, "sigma": 0.6},
+    "CloudFront": {"dist": "lognormal", "median": 0.004, "sigma": 0.5},
+    "WAF": {"dist": "lognormal", "median": 0.0015, "sigma": 0.3},
+    "APIGateway": {"dist": "lognormal", "median": 0.009, "sigma": 0.35},
+    "Lambda": {"dist": "lognormal", "median": 0.12, "sigma": 0.5},
+    "Fargate": {"dist": "lognormal", "median": 0.05, "sigma": 0.5},
+    "ELB": {"dist": "lognormal", "median": 0.002, "sigma": 0.3},
+    "RDS": {"dist": "lognormal", "median": 0.008, "sigma": 0.6},
+    "Dynamodb": {"dist": "lognormal", "median": 0.005, "sigma": 0.4},
+    "ElasticacheForRedis": {"dist": "lognormal", "median": 0.0008, "sigma": 0.3},
+    "SQS": {"dist": "lognormal", "median": 0.01, "sigma": 0.4},
+    "SNS": {"dist": "lognormal", "median": 0.02, "sigma": 0.5},
+    "Eventbridge": {"dist": "lognormal", "median": 0.025, "sigma": 0.5},
+    "StepFunctions": {"dist": "lognormal", "median": 0.04, "sigma": 0.3},
+    "S3": {"dist": "lognormal", "median": 0.02, "sigma": 0.5},
+    "SagemakerModel": {"dist": "lognormal", "median": 0.06, "sigma": 0.4},
+    "VpnGateway": {"dist": "lognormal", "median": 0.015, "sigma": 0.5},
+}
+
+LATENCY_MODEL = {
+    "script": "delimasa_aws_diagram.py",
+    "nodes": {
+        "rds_replica": {"dist": "lognormal", "median": 0.005, "sigma": 0.5},
+    },
+    # "origen>destino": distribución del salto de red
+    "edges": {
+        "clientes>internet": {"dist": "lognormal", "median": 0.02, "sigma": 0.5},
+    },
+    "edge_default": {"dist": "const", "value": 0.0005},
+    "node_default": {"dist": "const", "value": 0.0},
+}
+
+# Histogramas: 200 bins por década entre 1 µs y 1000 s
+_HIST_LOW, _HIST_DECADES, _HIST_PER_DECADE = -6.0, 9, 200
+_HIST_BINS = _HIST_DECADES * _HIST_PER_DECADE
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def enumerate_paths(graph, source, target, max_paths=10_000, max_depth=64):
+    """Caminos simples source → target (listas de índices) en el sentido del flujo."""
+    paths, stack = [], [(source, [source])]
+    while stack and len(paths) < max_paths:
+        node, path = stack.pop()
+        if node == target:
+            paths.append(path)
+            continue
+        if len(path) >= max_depth:
+            continue
+        for succ in reversed(graph.successors(node)):
+            if succ not in path:
+                stack.append((succ, path + [succ]))
+    return paths
+
+
+class LatencyModel:
+    """Distribución de cada nodo y arista de la topología."""
+
+    def __init__(self, graph, config):
+        self.graph = graph
+        self.config = config
+
+    def node(self, index):
+        node_id = self.graph.ids[index]
+        if node_id in self.config.get("nodes", {}):
+            return self.config["nodes"][node_id]
+        return KIND_LATENCY.get(self.graph.kind(index), self.config.get("node_default"))
+
+    def edge(self, src, dst):
+        key = f"{self.graph.ids[src]}>{self.graph.ids[dst]}"
+        return self.config.get("edges", {}).get(key, self.config.get("edge_default"))
+
+
+def _hist_index(values):
+    scaled = (np.log10(np.maximum(values, 1e-12)) - _HIST_LOW) * _HIST_PER_DECADE
+    return np.clip(scaled.astype(np.int64), 0, _HIST_BINS - 1)
+
+
+def hist_percentiles(counts, points):
+    """Percentiles (segundos) de un histograma logarítmico."""
+    cumulative = np.cumsum(counts)
+    total = cumulative[-1]
+    if not total:
+        return np.full(len(points), np.nan)
+    ranks = np.asarray(points, dtype=float) / 100 * total
+    bins = np.searchsorted(cumulative, ranks, side="left")
+    # centro geométrico del bin
+    return 10 ** (_HIST_LOW + (bins + 0.5) / _HIST_PER_DECADE)
+
+
+class PathEstimate:
+    def __init__(self, graph, path, histogram, total, component_sums, samples):
+        self.path = path
+        self.names = [graph.ids[i] for i in path]
+        self.histogram = histogram
+        self.mean = total / samples
+        self.component_means = {k: v / samples for k, v in component_sums.items()}
+
+    def percentiles(self, points=PERCENTILES):
+        return dict(zip(points, hist_percentiles(self.histogram, points)))
+
+    @property
+    def label(self):
+        return " → ".join(self.names)
+
+
+class MonteCarlo:
+    """Muestreo por lotes con números aleatorios comunes por componente."""
+
+    def __init__(self, graph, seed=0, batch=262_144, cache_mb=512):
+        self.graph = graph
+        self.seed = seed
+        self.batch = batch
+        self.cache_bytes = int(cache_mb * 1024 * 1024)
+        self._columns = {}
+        self._cached = 0
+
+    def _column(self, key, dist, batch_no, size):
+        """Muestras del componente `key` para el lote `batch_no` (memoizadas)."""
+        cache_key = (key, json.dumps(dist, sort_keys=True), batch_no, size)
+        column = self._columns.get(cache_key)
+        if column is None:
+            stream = zlib.crc32(key.encode("utf-8"))
+            rng = np.random.default_rng([self.seed, stream, batch_no])
+            column = sampler(rng, dist)(size).astype(np.float32)
+            if self._cached + column.nbytes <= self.cache_bytes:
+                self._columns[cache_key] = column
+                self._cached += column.nbytes
+        return column
+
+    def run(self, model, paths, samples, fork_join=False):
+        graph = self.graph
+        components = {}
+        for path in paths:
+            for node in path:
+                components.setdefault(graph.ids[node], model.node(node))
+            for src, dst in zip(path, path[1:]):
+                components.setdefault(f"{graph.ids[src]}>{graph.ids[dst]}", model.edge(src, dst))
+        keys = list(components)
+        column_of = {key: i for i, key in enumerate(keys)}
+        members = []
+        for path in paths:
+            names = [graph.ids[n] for n in path]
+            hops = [f"{a}>{b}" for a, b in zip(names, names[1:])]
+            members.append([column_of[k] for k in names + hops])
+
+        histograms = np.zeros((len(paths), _HIST_BINS), dtype=np.int64)
+        totals = np.zeros(len(paths))
+        component_sums = np.zeros(len(keys))
+        joint = np.zeros(_HIST_BINS, dtype=np.int64)
+        critical = np.zeros(len(paths), dtype=np.int64)
+
+        done, batch_no = 0, 0
+        while done < samples:
+            size = min(self.batch, samples - done)
+            columns = [self._column(key, components[key], batch_no, size) for key in keys]
+            component_sums += [column.sum(dtype=np.float64) for column in columns]
+            latencies = np.empty((len(paths), size), dtype=np.float32)
+            for p, indices in enumerate(members):
+                row = latencies[p]
+                np.copyto(row, columns[indices[0]])
+                for i in indices[1:]:
+                    row += columns[i]
+                histograms[p] += np.bincount(_hist_index(row), minlength=_HIST_BINS)
+            totals += latencies.sum(axis=1, dtype=np.float64)
+            if fork_join:
+                # La petición recorre todos los caminos: manda el más lento
+                critical += np.bincount(latencies.argmax(axis=0), minlength=len(paths))
+                joint += np.bincount(_hist_index(latencies.max(axis=0)), minlength=_HIST_BINS)
+            done += size
+            batch_no += 1
+
+        estimates = []
+        for p, path in enumerate(paths):
+            names = [graph.ids[n] for n in path]
+            hops = [f"{a}>{b}" for a, b in zip(names, names[1:])]
+            sums = {k: component_sums[column_of[k]] for k in names + hops}
+            estimates.append(PathEstimate(graph, path, histograms[p], totals[p], sums, samples))
+        return estimates, (joint if fork_join else None), (critical if fork_join else None)
+
+
+# ============================================
+# CONFIGURACIÓN Y BARRIDOS
+# ============================================
+
+def load_model(path=None):
+    config = copy.deepcopy(LATENCY_MODEL)
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            custom = json.load(fh)
+        for section in ("nodes", "edges"):
+            config[section].update(custom.pop(section, {}))
+        config.update(custom)
+    return config
+
+
+def apply_setting(config, graph, setting, value):
+    """Ajusta `nodo.parámetro` (o `origen>destino.parámetro`) partiendo de su distribución actual."""
+    target, _, param = setting.rpartition(".")
+    if not target or not param:
+        raise ValueError(f"{setting!r}: se espera nodo.parámetro=valor")
+    if ">" in target:
+        src, dst = target.split(">", 1)
+        unknown = [name for name in (src, dst) if name not in graph.index]
+        if unknown:
+            raise ValueError(f"{setting!r}: nodo desconocido: {', '.join(map(repr, unknown))}")
+        model = LatencyModel(graph, config)
+        current = model.edge(graph.index[src], graph.index[dst])
+        section = "edges"
+    else:
+        if target not in graph.index:
+            raise ValueError(f"{setting!r}: nodo desconocido: {target!r}")
+        current = LatencyModel(graph, config).node(graph.index[target])
+        section = "nodes"
+    kind = value if param == "dist" else current.get("dist", "const")
+    if kind not in DIST_PARAMS:
+        raise ValueError(f"{setting!r}: distribución desconocida {kind!r} (usa {', '.join(DIST_PARAMS)})")
+    if param != "dist" and param not in DIST_PARAMS[kind]:
+        raise ValueError(f"{setting!r}: la distribución {kind} de {target} no tiene {param!r} "
+                         f"(usa {', '.join(DIST_PARAMS[kind])})")
+    dist = dict(current)
+    dist[param] = value
+    config[section][target] = dist
+
+
+def _parse_value(raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def sweep_grid(sweeps):
+    """Producto cartesiano de --sweep nodo.param=v1,v2,... -> [{ajuste: valor}]."""
+    axes = []
+    for sweep in sweeps:
+        setting, _, values = sweep.partition("=")
+        axes.append([(setting, _parse_value(v)) for v in values.split(",") if v])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+# ============================================
+# CLI
+# ============================================
+
+def _ms(seconds):
+    return f"{seconds * 1000:8.1f}"
+
+
+def print_estimates(estimates, joint=None, critical=None, samples=0):
+    worst = max(estimates, key=lambda e: e.percentiles((99,))[99])
+    header = " ".join(f"{'p' + format(p, 'g'):>8}" for p in PERCENTILES)
+    print(f"\n{'#':>3} {'media':>8} {header}  camino (ms)")
+    print("-" * 100)
+    for i, estimate in enumerate(sorted(estimates, key=lambda e: -e.percentiles((99,))[99]), 1):
+        values = " ".join(_ms(v) for v in estimate.percentiles().values())
+        mark = "🔥" if estimate is worst else "  "
+        print(f"{i:>3} {_ms(estimate.mean)} {values}  {mark} {estimate.label}")
+    print(f"\n🔥 Camino crítico (mayor p99): {worst.label}")
+    contributions = sorted(worst.component_means.items(), key=lambda item: -item[1])
+    for name, mean in contributions:
+        if mean <= 0:
+            continue
+        print(f"   {mean / worst.mean * 100:5.1f}%  {_ms(mean)} ms  {name.replace('>', ' → ')}")
+    if joint is not None:
+        values = " ".join(_ms(v) for v in hist_percentiles(joint, PERCENTILES))
+        print(f"\n🔀 Fork-join (todos los caminos en paralelo): {values} ms")
+        for estimate, count in sorted(zip(estimates, critical), key=lambda item: -item[1])[:5]:
+            print(f"   {count / samples * 100:5.1f}% crítico  {estimate.label}")
+
+
+def write_curves(estimates, path):
+    points = np.concatenate([np.arange(1, 100), [99.5, 99.9, 99.99]])
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["percentil"] + [e.label for e in estimates])
+        columns = [hist_percentiles(e.histogram, points) for e in estimates]
+        for row, point in enumerate(points):
+            writer.writerow([f"{point:g}"] + [f"{c[row] * 1000:.3f}" for c in columns])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia extremo a extremo por Monte Carlo sobre la topología")
+    parser.add_argument("--script", help="script o especificación de la topología (por defecto la del modelo)")
+    parser.add_argument("--from", dest="source", default="clientes", help="nodo de origen")
+    parser.add_argument("--to", dest="target", default="rds", help="nodo de destino")
+    parser.add_argument("--path", help="camino explícito: ids separados por comas")
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", help="JSON con distribuciones de nodos y aristas")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="NODO.PARAM=VALOR",
+                        help="ajuste puntual, p. ej. rds.median=0.004")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NODO.PARAM=V1,V2,...",
+                        help="barrido what-if (varios --sweep forman una rejilla)")
+    parser.add_argument("--fork-join", action="store_true",
+                        help="la petición recorre todos los caminos en paralelo")
+    parser.add_argument("--curve", help="CSV con la curva de percentiles de cada camino")
+    args = parser.parse_args()
+
+    if args.sweep and (args.curve or args.fork_join):
+        parser.error("--curve y --fork-join no se combinan con --sweep")
+
+    config = load_model(args.config)
+    script = args.script or os.path.join(BASE_DIR, config["script"])
+    graph = topology.load(script, static=script.endswith(".py"))
+    for name in (args.source, args.target):
+        if name not in graph.index:
+            parser.error(f"nodo desconocido: {name!r}")
+    try:
+        for setting in args.settings:
+            key, _, value = setting.partition("=")
+            apply_setting(config, graph, key, _parse_value(value))
+        grid = sweep_grid(args.sweep)
+        for combo in grid:
+            for setting, value in combo.items():
+                apply_setting(copy.deepcopy(config), graph, setting, value)
+    except ValueError as exc:
+        parser.error(f"--set/--sweep {exc}")
+
+    if args.path:
+        names = args.path.split(",")
+        unknown = [n for n in names if n not in graph.index]
+        if unknown:
+            parser.error(f"nodos desconocidos: {', '.join(unknown)}")
+        paths = [[graph.index[n] for n in names]]
+        for a, b in zip(paths[0], paths[0][1:]):
+            if b not in graph.successors(a):
+                print(f"ℹ️  salto {graph.ids[a]} → {graph.ids[b]} no dibujado en el diagrama")
+    else:
+        paths = enumerate_paths(graph, graph.index[args.source], graph.index[args.target])
+        if not paths:
+            print(f"❌ No hay caminos de {args.source} a {args.target}")
+            return 1
+    print(f"🧭 {len(paths)} caminos, {args.samples:,} muestras")
+
+    estimator = MonteCarlo(graph, seed=args.seed)
+    if not args.sweep:
+        started = time.perf_counter()
+        estimates, joint, critical = estimator.run(LatencyModel(graph, config), paths, args.samples,
+                                                   fork_join=args.fork_join)
+        print_estimates(estimates, joint, critical, args.samples)
+        print(f"\n⏱️  {time.perf_counter() - started:.2f}s")
+        if args.curve:
+            write_curves(estimates, args.curve)
+            print(f"💾 Curvas de percentiles en {args.curve}")
+        return 0
+
+    print(f"🔁 Barrido de {len(grid)} configuraciones")
+    print(f"\n{'configuración':<48} {'p50':>8} {'p95':>8} {'p99':>8}  camino crítico")
+    print("-" * 100)
+    started = time.perf_counter()
+    for combo in grid:
+        scenario = copy.deepcopy(config)
+        for setting, value in combo.items():
+            apply_setting(scenario, graph, setting, value)
+        estimates, _, _ = estimator.run(LatencyModel(graph, scenario), paths, args.samples)
+        worst = max(estimates, key=lambda e: e.percentiles((99,))[99])
+        p = worst.percentiles((50, 95, 99))
+        label = ", ".join(f"{k}={v}" for k, v in combo.items())
+        hops = f"{worst.names[0]} … {worst.names[-2]} → {worst.names[-1]}" if len(worst.names) > 3 else worst.label
+        print(f"{label:<48} {_ms(p[50])} {_ms(p[95])} {_ms(p[99])}  {hops}")
+    elapsed = time.perf_counter() - started
+    print(f"\n⏱️  {len(grid)} configuraciones en {elapsed:.2f}s ({elapsed / len(grid) * 1000:.0f} ms cada una)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
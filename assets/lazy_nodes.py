@@ -0,0 +1,209 @@
+# lazy_nodes.py
+# Registro perezoso de clases de nodo de "diagrams".
+#
+# Importar un proveedor (diagrams.aws.compute, diagrams.onprem.client, ...)
+# cuesta tiempo aunque el diagrama no use sus clases. Aquí cada nombre es un
+# LazyNode que solo importa su módulo la primera vez que se crea un nodo:
+#
+#     from lazy_nodes import Lambda, S3      # no importa nada todavía
+#     fn = Lambda("Registro")                # importa diagrams.aws.compute
+#
+# Dentro de un topology.Diagram la llamada no importa nada: el nodo se
+# registra en la especificación y la clase se resuelve al renderizar.
+#
+# Con DIAGRAMS_IMPORT_REPORT=1 el script imprime al terminar qué módulos
+# tocó y cuánto tardó cada import (ver también build_diagrams.py --import-report).
+
+import atexit
+import contextvars
+import importlib
+import os
+import sys
+import time
+
+# nombre exportado -> "módulo:Clase"
+REGISTRY = {
+    # AWS - analítica
+    "Athena": "diagrams.aws.analytics:Athena",
+    "Glue": "diagrams.aws.analytics:Glue",
+    "Kinesis": "diagrams.aws.analytics:Kinesis",
+    "KinesisDataStreams": "diagrams.aws.analytics:KinesisDataStreams",
+    "Quicksight": "diagrams.aws.analytics:Quicksight",
+    # AWS - blockchain
+    "ManagedBlockchain": "diagrams.aws.blockchain:ManagedBlockchain",
+    # AWS - cómputo
+    "ECS": "diagrams.aws.compute:ECS",
+    "EKS": "diagrams.aws.compute:EKS",
+    "Fargate": "diagrams.aws.compute:Fargate",
+    "Lambda": "diagrams.aws.compute:Lambda",
+    # AWS - bases de datos
+    "Dynamodb": "diagrams.aws.database:Dynamodb",
+    "ElastiCache": "diagrams.aws.database:ElastiCache",
+    "Elasticache": "diagrams.aws.database:Elasticache",
+    "ElasticacheForRedis": "diagrams.aws.database:ElasticacheForRedis",
+    "RDS": "diagrams.aws.database:RDS",
+    # AWS - devtools
+    "Codepipeline": "diagrams.aws.devtools:Codepipeline",
+    "XRay": "diagrams.aws.devtools:XRay",
+    # AWS - general
+    "InternetAlt1": "diagrams.aws.general:InternetAlt1",
+    # diagrams no incluye Amazon Location Service: se usa el icono genérico
+    "LocationService": "diagrams.aws.general:General",
+    # AWS - integración
+    "Eventbridge": "diagrams.aws.integration:Eventbridge",
+    "SNS": "diagrams.aws.integration:SNS",
+    "SQS": "diagrams.aws.integration:SQS",
+    "StepFunctions": "diagrams.aws.integration:StepFunctions",
+    # AWS - IoT
+    "IotCore": "diagrams.aws.iot:IotCore",
+    # AWS - gestión
+    "Cloudtrail": "diagrams.aws.management:Cloudtrail",
+    "Cloudwatch": "diagrams.aws.management:Cloudwatch",
+    "CloudwatchAlarm": "diagrams.aws.management:CloudwatchAlarm",
+    "SystemsManager": "diagrams.aws.management:SystemsManager",
+    # AWS - migración (Dms no existe en diagrams; su alias es DMS)
+    "Dms": "diagrams.aws.migration:DMS",
+    # AWS - machine learning
+    "Comprehend": "diagrams.aws.ml:Comprehend",
+    "Lex": "diagrams.aws.ml:Lex",
+    "Personalize": "diagrams.aws.ml:Personalize",
+    "SagemakerModel": "diagrams.aws.ml:SagemakerModel",
+    "Textract": "diagrams.aws.ml:Textract",
+    # AWS - móvil
+    "APIGWMobile": "diagrams.aws.mobile:APIGateway",
+    # AWS - red
+    "APIGateway": "diagrams.aws.network:APIGateway",
+    "CloudFront": "diagrams.aws.network:CloudFront",
+    "ELB": "diagrams.aws.network:ELB",
+    "InternetGateway": "diagrams.aws.network:InternetGateway",
+    "NATGateway": "diagrams.aws.network:NATGateway",
+    "Route53": "diagrams.aws.network:Route53",
+    "VPCRouter": "diagrams.aws.network:VPCRouter",
+    "VpnGateway": "diagrams.aws.network:VpnGateway",
+    # AWS - seguridad
+    "CertificateManager": "diagrams.aws.security:CertificateManager",
+    "Cognito": "diagrams.aws.security:Cognito",
+    "SecretsManager": "diagrams.aws.security:SecretsManager",
+    "Shield": "diagrams.aws.security:Shield",
+    "WAF": "diagrams.aws.security:WAF",
+    # AWS - almacenamiento
+    "S3": "diagrams.aws.storage:S3",
+    "S3Glacier": "diagrams.aws.storage:S3Glacier",
+    # Genéricos y on-premise
+    "Blank": "diagrams.generic.blank:Blank",
+    "Celery": "diagrams.onprem.queue:Celery",
+    "Client": "diagrams.onprem.client:Client",
+    "Internet": "diagrams.onprem.network:Internet",
+    "Users": "diagrams.onprem.client:Users",
+}
+
+# módulo -> {"seconds": tiempo de import, "classes": clases usadas}
+_report = {}
+
+# Diagram de topology.py activo: los nodos se registran en su especificación
+# en lugar de instanciar la clase de diagrams
+_builder = contextvars.ContextVar("lazy_nodes_builder", default=None)
+
+
+def bind_builder(builder):
+    return _builder.set(builder)
+
+
+def unbind_builder(token):
+    _builder.reset(token)
+
+
+def current_builder():
+    return _builder.get()
+
+
+def _import(module):
+    """Importa `module` y anota el tiempo si no estaba cargado."""
+    entry = _report.setdefault(module, {"seconds": 0.0, "classes": set()})
+    if module not in sys.modules:
+        started = time.perf_counter()
+        importlib.import_module(module)
+        entry["seconds"] += time.perf_counter() - started
+    return sys.modules[module]
+
+
+class LazyNode:
+    """Fábrica de nodos que resuelve su clase real en la primera llamada."""
+
+    __slots__ = ("name", "module", "attr", "_cls")
+
+    def __init__(self, name, target):
+        self.name = name
+        self.module, self.attr = target.split(":")
+        self._cls = None
+
+    def resolve(self):
+        if self._cls is None:
+            self._cls = getattr(_import(self.module), self.attr)
+        entry = _report.setdefault(self.module, {"seconds": 0.0, "classes": set()})
+        entry["classes"].add(self.name)
+        return self._cls
+
+    def __call__(self, *args, **kwargs):
+        builder = _builder.get()
+        if builder is not None:
+            return builder.add_node(self.name, *args, **kwargs)
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<LazyNode {self.name} -> {self.module}.{self.attr}>"
+
+
+_nodes = {}
+
+
+def node(name):
+    """LazyNode registrado con `name`."""
+    try:
+        return _nodes[name]
+    except KeyError:
+        pass
+    try:
+        target = REGISTRY[name]
+    except KeyError:
+        raise AttributeError(f"{name!r} no está en lazy_nodes.REGISTRY") from None
+    _nodes[name] = LazyNode(name, target)
+    return _nodes[name]
+
+
+def register(name, target):
+    """Añade o redefine una entrada: register("EC2", "diagrams.aws.compute:EC2")."""
+    REGISTRY[name] = target
+    _nodes.pop(name, None)
+
+
+def __getattr__(name):
+    # PEP 562: `from lazy_nodes import Lambda` llega aquí sin importar nada
+    if name.startswith("__"):
+        raise AttributeError(name)
+    return node(name)
+
+
+def import_report():
+    """Módulos de proveedor tocados: [(módulo, segundos, [clases])]."""
+    return [
+        (module, entry["seconds"], sorted(entry["classes"]))
+        for module, entry in sorted(_report.items(), key=lambda item: -item[1]["seconds"])
+    ]
+
+
+def reset_report():
+    _report.clear()
+
+
+def print_import_report(title=None):
+    rows = import_report()
+    total = sum(seconds for _, seconds, _ in rows)
+    print(f"📦 Imports de proveedores{' - ' + title if title else ''}: "
+          f"{len(rows)} módulos, {total * 1000:.1f} ms")
+    for module, seconds, classes in rows:
+        print(f"   {seconds * 1000:7.1f} ms  {module:<32} {', '.join(classes)}")
+
+
+if os.environ.get("DIAGRAMS_IMPORT_REPORT") == "1":
+    atexit.register(print_import_report)
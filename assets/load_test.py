@@ -0,0 +1,574 @@
+# load_test.py
+# Generador de carga asyncio para la API de análisis de pedidos.
+#
+# Construye pedidos realistas a partir del catálogo de
+# backend/src/data/mockData.ts (MOCK_CLIENTS y MOCK_PRODUCTS, leídos del
+# propio fichero TypeScript por mock_catalog.py) y los envía a POST /api/orders/analyze y
+# POST /api/orders/analyze-with-ai en lazo abierto (tasa fija de llegadas,
+# la latencia se mide desde el instante programado para no ocultar colas)
+# o en lazo cerrado (N usuarios que esperan cada respuesta). Las conexiones
+# HTTP/1.1 keep-alive se reutilizan desde un pool acotado.
+#
+# Las latencias van a un histograma HDR por endpoint (3 cifras
+# significativas, de 1 µs a horas) y las respuestas 429 se atribuyen al
+# limitador que las emitió según su mensaje:
+#   generalLimiter     100 peticiones / 15 min por IP, en toda la API
+#   aiAnalysisLimiter  10 análisis / min por IP, solo en analyze-with-ai
+#
+# Para no gastar cuota de OpenAI, `fake-openai` levanta un servidor
+# compatible con /v1/chat/completions con latencia configurable; el SDK de
+# openai del backend lo usa si se arranca con OPENAI_BASE_URL apuntando a él.
+#
+# Uso:
+#     python load_test.py fake-openai --port 8089 --latency-ms 900 --jitter 0.3
+#     (cd ../backend && OPENAI_BASE_URL=http://127.0.0.1:8089/v1 npm run dev)
+#     python load_test.py run --mode closed --users 20 --duration 30
+#     python load_test.py run --mode open --rate 5 --duration 120 --mix analyze=0.7,analyze-with-ai=0.3
+#     python load_test.py run --fake-openai 8089 --latency-ms 400   (servidor falso en el mismo proceso)
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+from mock_catalog import MOCK_DATA, load_catalog
+
+ENDPOINTS = {
+    "analyze": "/orders/analyze",
+    "analyze-with-ai": "/orders/analyze-with-ai",
+}
+
+# Mensajes de backend/src/middleware/rateLimiter.ts
+LIMITERS = {
+    "aiAnalysisLimiter": "Límite de análisis con IA",
+    "generalLimiter": "Demasiadas solicitudes",
+}
+
+CONDICIONES = [
+    None,
+    "Entrega en 3 días, pago a 30 días",
+    "Pago contraentrega",
+    "Entrega urgente en 24 horas",
+    "Pago a 60 días, entrega programada semanal",
+]
+
+
+# ============================================
+# PEDIDOS
+# ============================================
+
+class OrderFactory:
+    """Pedidos con la forma de AnalyzeOrderRequest (backend/src/types)."""
+
+    def __init__(self, clients, products, rng):
+        self.clients = list(clients.values())
+        self.products = products
+        self.rng = rng
+
+    def order(self):
+        rng = self.rng
+        client = rng.choice(self.clients)
+        items = []
+        for product in rng.sample(self.products, rng.randint(1, min(5, len(self.products)))):
+            cantidad = max(1, int(rng.lognormvariate(math.log(20), 0.8)))
+            # La mayoría pide dentro de su descuento máximo; una parte se excede
+            limit = client["descuentoMaximo"]
+            descuento = rng.choice([0, 5, 10, limit, limit + 5]) if rng.random() < 0.9 else rng.randint(0, 40)
+            precio = product["precioBase"]
+            items.append({
+                "id": product["id"],
+                "producto": product["nombre"],
+                "cantidad": cantidad,
+                "precioUnitario": precio,
+                "descuento": descuento,
+                "subtotal": round(cantidad * precio * (1 - descuento / 100)),
+            })
+        order = {"clienteId": client["id"], "items": items}
+        condiciones = rng.choice(CONDICIONES)
+        if condiciones:
+            order["condiciones"] = condiciones
+        return order
+
+
+# ============================================
+# HISTOGRAMA HDR
+# ============================================
+
+class HdrHistogram:
+    """Histograma de rango dinámico alto en microsegundos.
+
+    Los valores < 2048 µs tienen su propia casilla; por encima, cada
+    potencia de dos se divide en 1024 casillas (error relativo < 0,1 %).
+    """
+
+    SUB_BUCKET_BITS = 11
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    HALF = SUB_BUCKETS >> 1
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        if value < self.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - self.SUB_BUCKET_BITS
+        return self.SUB_BUCKETS + (shift - 1) * self.HALF + (value >> shift) - self.HALF
+
+    def _value(self, index):
+        # Valor más alto equivalente a la casilla
+        if index < self.SUB_BUCKETS:
+            return index
+        shift = (index - self.SUB_BUCKETS) // self.HALF + 1
+        sub = (index - self.SUB_BUCKETS) % self.HALF + self.HALF
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1e6))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, q):
+        """Percentil q (0-100) en milisegundos."""
+        if not self.total:
+            return math.nan
+        rank = max(1, math.ceil(q / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._value(index), self.max) / 1000
+        return self.max / 1000
+
+
+# ============================================
+# CLIENTE HTTP CON POOL
+# ============================================
+
+class HttpError(Exception):
+    pass
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, method, host, path, body):
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HttpError("conexión cerrada por el servidor")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            payload = b"".join(chunks)
+        else:
+            payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        return status, headers, payload
+
+    @property
+    def reusable(self):
+        return not self.writer.is_closing()
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Como mucho `size` conexiones keep-alive hacia un mismo host."""
+
+    def __init__(self, url, size):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.host_header = parts.netloc
+        self.idle = []
+        self.slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def request(self, method, path, body=b""):
+        async with self.slots:
+            connection = self.idle.pop() if self.idle else None
+            if connection is None:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                connection = Connection(reader, writer)
+                self.opened += 1
+            try:
+                response = await connection.request(method, self.host_header, self.prefix + path, body)
+            except (OSError, HttpError, asyncio.IncompleteReadError, ValueError, IndexError):
+                connection.close()
+                raise
+            if response[1].get("connection", "").lower() == "close" or not connection.reusable:
+                connection.close()
+            else:
+                self.idle.append(connection)
+            return response
+
+    def close(self):
+        for connection in self.idle:
+            connection.close()
+        self.idle.clear()
+
+
+# ============================================
+# CARGA
+# ============================================
+
+class EndpointStats:
+    def __init__(self, name):
+        self.name = name
+        self.latency = HdrHistogram()         # respuestas 2xx
+        self.statuses = {}
+        self.errors = 0
+        self.accepted = 0
+        # limitador -> (segundo del primer 429, aceptadas antes, cabeceras RateLimit-*)
+        self.first_rejection = {}
+        self.rejections = {}
+        self.ai_fallbacks = 0
+
+
+class LoadTest:
+    def __init__(self, pool, factory, mix, timeout=60.0):
+        self.pool = pool
+        self.factory = factory
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.timeout = timeout
+        self.stats = {name: EndpointStats(name) for name in mix}
+        self.timeline = []                   # (segundo, endpoint, estado)
+        self.started = None
+
+    async def one(self, scheduled=None):
+        name = random.choices(self.names, self.weights)[0]
+        stats = self.stats[name]
+        body = json.dumps(self.factory.order()).encode()
+        begin = time.perf_counter() if scheduled is None else scheduled
+        try:
+            status, headers, payload = await asyncio.wait_for(
+                self.pool.request("POST", ENDPOINTS[name], body), self.timeout)
+        except (OSError, HttpError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            stats.errors += 1
+            self.timeline.append((time.perf_counter() - self.started, name, "error"))
+            return
+        elapsed = time.perf_counter() - begin
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        self.timeline.append((time.perf_counter() - self.started, name, status))
+        if status == 429:
+            self._rejected(stats, headers, payload)
+        elif 200 <= status < 300:
+            stats.accepted += 1
+            stats.latency.record(elapsed)
+            if name == "analyze-with-ai" and b'"confidence":50' in payload and b"no disponible" in payload:
+                stats.ai_fallbacks += 1
+
+    def _rejected(self, stats, headers, payload):
+        text = payload.decode("utf-8", "replace")
+        limiter = next((name for name, message in LIMITERS.items() if message in text), "desconocido")
+        stats.rejections[limiter] = stats.rejections.get(limiter, 0) + 1
+        if limiter not in stats.first_rejection:
+            announced = {k: headers[k] for k in ("ratelimit-limit", "ratelimit-reset") if k in headers}
+            stats.first_rejection[limiter] = (time.perf_counter() - self.started, stats.accepted, announced)
+
+    async def closed_loop(self, users, duration, requests, think):
+        deadline = time.perf_counter() + duration
+        budget = [requests]
+
+        async def user():
+            while time.perf_counter() < deadline and budget[0] != 0:
+                budget[0] -= 1
+                await self.one()
+                if think:
+                    await asyncio.sleep(random.expovariate(1 / think))
+
+        self.started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(users)))
+
+    async def open_loop(self, rate, duration, requests, poisson):
+        self.started = time.perf_counter()
+        total = requests if requests >= 0 else int(rate * duration)
+        pending = set()
+        at = self.started
+        for _ in range(total):
+            at += random.expovariate(rate) if poisson else 1 / rate
+            delay = at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.ensure_future(self.one(scheduled=at))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+
+# ============================================
+# OPENAI FALSO
+# ============================================
+
+class FakeOpenAI:
+    """Servidor mínimo compatible con POST /v1/chat/completions."""
+
+    def __init__(self, latency_ms, jitter=0.3, error_rate=0.0, seed=None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.latency_hist = HdrHistogram()
+
+    def _delay(self):
+        if not self.jitter:
+            return self.latency
+        # lognormal con media `latency` y coeficiente de variación `jitter`
+        sigma = math.sqrt(math.log(1 + self.jitter ** 2))
+        return self.rng.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+
+    def completion(self, request):
+        decision = self.rng.choices(["APROBAR", "AJUSTAR", "RECHAZAR"], [0.6, 0.3, 0.1])[0]
+        analysis = {
+            "contextualInsights": ["Cliente con historial estable", "Pedido balanceado",
+                                   "Demanda institucional estable en Colombia"],
+            "riskAssessment": "Riesgo comercial acotado según el historial reciente.",
+            "negotiationSuggestions": ["Mantener condiciones actuales", "Ofrecer productos complementarios",
+                                       "Proponer volumen trimestral"],
+            "finalRecommendation": f"Se recomienda {decision.lower()} el pedido.",
+            "decision": decision,
+            "confidence": self.rng.randint(60, 95),
+        }
+        content = json.dumps(analysis, ensure_ascii=False)
+        prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4
+        return {
+            "id": f"chatcmpl-fake{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4},
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                path = request_line.split()[1].decode()
+                self.requests += 1
+                delay = self._delay()
+                self.latency_hist.record(delay)
+                await asyncio.sleep(delay)
+                if not path.endswith("/chat/completions"):
+                    status, payload = 404, {"error": {"message": f"ruta no soportada: {path}"}}
+                elif self.rng.random() < self.error_rate:
+                    status, payload = 500, {"error": {"message": "fallo simulado", "type": "server_error"}}
+                else:
+                    status, payload = 200, self.completion(json.loads(body or b"{}"))
+                data = json.dumps(payload, ensure_ascii=False).encode()
+                writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"Connection: keep-alive\r\n\r\n".encode() + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host, port):
+        return await asyncio.start_server(self.handle, host, port)
+
+
+# ============================================
+# INFORME
+# ============================================
+
+def print_report(test, elapsed):
+    print(f"\n{'Endpoint':<18} {'2xx':>7} {'429':>6} {'otros':>6} {'err':>5} "
+          f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'p99.9 ms':>9} {'máx ms':>9}")
+    print("-" * 98)
+    for stats in test.stats.values():
+        rejected = sum(stats.rejections.values())
+        others = sum(n for s, n in stats.statuses.items() if s != 429 and not 200 <= s < 300)
+        hist = stats.latency
+        print(f"{stats.name:<18} {stats.accepted:>7,} {rejected:>6,} {others:>6,} {stats.errors:>5,} "
+              f"{hist.percentile(50):>9.1f} {hist.percentile(90):>9.1f} {hist.percentile(99):>9.1f} "
+              f"{hist.percentile(99.9):>9.1f} {hist.max / 1000:>9.1f}")
+    print("-" * 98)
+    total = sum(s.accepted for s in test.stats.values())
+    print(f"⏱️  {elapsed:.1f}s, {total / elapsed:,.1f} respuestas 2xx/s, "
+          f"{test.pool.opened} conexiones abiertas")
+
+    rejected_any = False
+    for stats in test.stats.values():
+        for limiter, (second, accepted, announced) in sorted(stats.first_rejection.items()):
+            rejected_any = True
+            extra = ", ".join(f"{k}={v}" for k, v in announced.items())
+            print(f"🚫 {limiter} rechaza {stats.name} desde t={second:.1f}s, tras {accepted:,} aceptadas "
+                  f"({stats.rejections[limiter]:,} rechazos{'; ' + extra if extra else ''})")
+        if stats.ai_fallbacks:
+            print(f"⚠️  {stats.name}: {stats.ai_fallbacks:,} respuestas con el análisis de respaldo "
+                  f"(OpenAI falló o no respondió JSON válido)")
+    if not rejected_any:
+        print("✅ Ningún limitador rechazó peticiones")
+    else:
+        print("   generalLimiter cuenta por IP en toda la API: todo el tráfico de esta máquina comparte ventana")
+
+
+def print_timeline(test, bucket):
+    """Respuestas por intervalo: dónde empiezan los 429."""
+    if not test.timeline:
+        return
+    slots = {}
+    for second, name, status in test.timeline:
+        row = slots.setdefault(int(second // bucket), {})
+        key = (name, "429" if status == 429 else "ok" if isinstance(status, int) and status < 300 else "otro")
+        row[key] = row.get(key, 0) + 1
+    print(f"\n{'t (s)':>7}  " + "  ".join(f"{n + ' ok/429':>26}" for n in test.stats))
+    for slot in sorted(slots):
+        row = slots[slot]
+        cells = "  ".join(f"{row.get((n, 'ok'), 0):>21,}/{row.get((n, '429'), 0):<4,}" for n in test.stats)
+        print(f"{slot * bucket:>7.0f}  {cells}")
+
+
+# ============================================
+# CLI
+# ============================================
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"endpoint desconocido: {name!r} (usa {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run(args):
+    server = fake = None
+    if args.fake_openai:
+        fake = FakeOpenAI(args.latency_ms, args.jitter, args.error_rate, args.seed)
+        server = await fake.start("127.0.0.1", args.fake_openai)
+        print(f"🤖 OpenAI falso en http://127.0.0.1:{args.fake_openai}/v1 "
+              f"(arranca el backend con OPENAI_BASE_URL apuntando aquí)")
+    clients, products = load_catalog(args.catalog)
+    factory = OrderFactory(clients, products, random.Random(args.seed))
+    random.seed(args.seed)
+    pool = ConnectionPool(args.url, args.connections)
+    test = LoadTest(pool, factory, args.mix, args.timeout)
+    print(f"🏃 {args.mode} → {args.url} ({', '.join(f'{k}={v:g}' for k, v in args.mix.items())})", flush=True)
+    started = time.perf_counter()
+    try:
+        if args.mode == "closed":
+            await test.closed_loop(args.users, args.duration, args.requests, args.think)
+        else:
+            await test.open_loop(args.rate, args.duration, args.requests, args.poisson)
+    finally:
+        pool.close()
+        if server is not None:
+            server.close()
+    print_report(test, time.perf_counter() - started)
+    if args.timeline:
+        print_timeline(test, args.timeline)
+    if fake is not None and fake.requests:
+        print(f"🤖 OpenAI falso: {fake.requests:,} llamadas, p50 {fake.latency_hist.percentile(50):.0f} ms")
+    return 0
+
+
+async def serve(args):
+    fake = FakeOpenAI(args.latency_ms, args.jitter, args.error_rate, args.seed)
+    server = await fake.start(args.host, args.port)
+    print(f"🤖 OpenAI falso en http://{args.host}:{args.port}/v1 "
+          f"(latencia media {args.latency_ms:g} ms, cv {args.jitter:g}, errores {args.error_rate:.0%})")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga sobre la API de análisis de pedidos")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fake_options = argparse.ArgumentParser(add_help=False)
+    fake_options.add_argument("--latency-ms", type=float, default=800.0, help="latencia media de OpenAI falso")
+    fake_options.add_argument("--jitter", type=float, default=0.3, help="coeficiente de variación de la latencia")
+    fake_options.add_argument("--error-rate", type=float, default=0.0, help="fracción de respuestas 500")
+    fake_options.add_argument("--seed", type=int, default=None)
+
+    run_parser = commands.add_parser("run", parents=[fake_options], help="lanza la carga")
+    run_parser.add_argument("--url", default="http://127.0.0.1:3000/api")
+    run_parser.add_argument("--mode", choices=["open", "closed"], default="closed")
+    run_parser.add_argument("--rate", type=float, default=10.0, help="peticiones/s en lazo abierto")
+    run_parser.add_argument("--poisson", action="store_true", help="llegadas de Poisson en lazo abierto")
+    run_parser.add_argument("--users", type=int, default=10, help="usuarios en lazo cerrado")
+    run_parser.add_argument("--think", type=float, default=0.0, help="tiempo medio de espera entre peticiones (s)")
+    run_parser.add_argument("--duration", type=float, default=30.0)
+    run_parser.add_argument("--requests", type=int, default=-1, help="límite de peticiones (por defecto, según duración)")
+    run_parser.add_argument("--connections", type=int, default=32, help="tamaño del pool keep-alive")
+    run_parser.add_argument("--timeout", type=float, default=60.0)
+    run_parser.add_argument("--mix", type=parse_mix, default=parse_mix("analyze=0.8,analyze-with-ai=0.2"))
+    run_parser.add_argument("--timeline", type=float, default=0, metavar="S",
+                            help="muestra respuestas ok/429 cada S segundos")
+    run_parser.add_argument("--catalog", default=MOCK_DATA)
+    run_parser.add_argument("--fake-openai", type=int, metavar="PUERTO",
+                            help="levanta también el OpenAI falso en este puerto")
+
+    serve_parser = commands.add_parser("fake-openai", parents=[fake_options], help="solo el OpenAI falso")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8089)
+
+    args = parser.parse_args()
+    try:
+        if args.command == "run":
+            return asyncio.run(run(args))
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
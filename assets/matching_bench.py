@@ -0,0 +1,351 @@
+# matching_bench.py
+# Motor de emparejamiento de referencia (conductor disponible más cercano)
+# con índice espacial por celdas y banco de pruebas para el diseño de
+# uber_architecture_aws.py:
+#   conductor >> svc_ws >> cache / q_driver     pings de ubicación
+#   svc_ride >> q_match >> svc_matching         solicitudes de viaje
+#
+# Índice: rejilla uniforme en metros (equivalente a celdas geohash de tamaño
+# fijo) sobre la ciudad; cada celda guarda el conjunto de conductores
+# disponibles que contiene. Un lote de pings actualiza las posiciones de
+# forma vectorizada (NumPy) y solo los conductores que cambian de celda se
+# mueven de conjunto (actualización incremental). Un conductor en viaje sale
+# del índice y vuelve al terminar, en el punto de destino.
+#
+# Consulta: anillos de celdas alrededor del punto de recogida; se para en
+# cuanto el mejor candidato está más cerca que cualquier celda del anillo
+# siguiente (distancia >= r · celda), así el resultado es exacto.
+#
+# El banco simula N conductores moviéndose, R pings/s repartidos al azar y
+# solicitudes de viaje concentradas en zonas calientes, en ticks de 100 ms, y
+# mide el coste por ping del índice, si el proceso da abasto con la tasa de
+# pings y la latencia de cada emparejamiento (histograma HDR).
+#
+# Uso:
+#     python matching_bench.py
+#     python matching_bench.py --drivers 1000000 --rate 100000 --seconds 10
+#     python matching_bench.py --drivers 10000,100000,1000000 --cell 150,300,600 --json bench.json
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import topology
+from load_test import HdrHistogram
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIAGRAM = os.path.join(BASE_DIR, "uber_architecture_aws.py")
+
+# Aristas del diagrama que recorre el modelo
+MODELED_HOPS = (("conductor", "svc_ws"), ("svc_ws", "cache"), ("svc_ws", "q_driver"),
+                ("svc_ride", "q_match"), ("q_match", "svc_matching"))
+
+CITY = {
+    "width_m": 40_000.0,            # ~ Bogotá urbana
+    "height_m": 30_000.0,
+    "hotspots": 12,                 # centros de demanda (mezcla de gaussianas)
+    "hotspot_sigma_m": 2_500.0,
+    "uniform_share": 0.3,           # parte de conductores repartidos al azar
+}
+FLEET = {
+    "speed_mps": 8.0,
+    "turn_probability": 0.05,       # por ping
+    "requests_per_s": 300.0,
+    "trip_minutes": 15.0,
+    "max_radius_m": 5_000.0,        # sin conductor en este radio = sin asignación
+}
+TICK_S = 0.1
+
+
+# ============================================
+# ÍNDICE ESPACIAL
+# ============================================
+
+class GridIndex:
+    """Conjuntos de conductores por celda; claves enteras cy·nx + cx."""
+
+    def __init__(self, width, height, cell, capacity):
+        self.cell = float(cell)
+        self.nx = int(np.ceil(width / cell))
+        self.ny = int(np.ceil(height / cell))
+        self.cells = {}
+        self.driver_cell = np.full(capacity, -1, dtype=np.int64)
+
+    def _coords(self, x, y):
+        cx = np.clip((x // self.cell).astype(np.int64), 0, self.nx - 1)
+        cy = np.clip((y // self.cell).astype(np.int64), 0, self.ny - 1)
+        return cx, cy
+
+    def keys(self, x, y):
+        cx, cy = self._coords(x, y)
+        return cy * self.nx + cx
+
+    def insert(self, ids, x, y):
+        keys = self.keys(x, y)
+        cells = self.cells
+        for driver, key in zip(ids.tolist(), keys.tolist()):
+            bucket = cells.get(key)
+            if bucket is None:
+                bucket = cells[key] = set()
+            bucket.add(driver)
+        self.driver_cell[ids] = keys
+
+    def remove(self, driver):
+        key = int(self.driver_cell[driver])
+        if key >= 0:
+            self.cells[key].discard(driver)
+            self.driver_cell[driver] = -1
+
+    def update(self, ids, x, y):
+        """Pings de conductores (disponibles o no); devuelve cuántos cambian de celda."""
+        old = self.driver_cell[ids]
+        new = self.keys(x, y)
+        moved = (old != new) & (old >= 0)
+        if not moved.any():
+            return 0
+        cells = self.cells
+        moved_ids = ids[moved]
+        for driver, src, dst in zip(moved_ids.tolist(), old[moved].tolist(), new[moved].tolist()):
+            cells[src].discard(driver)
+            bucket = cells.get(dst)
+            if bucket is None:
+                bucket = cells[dst] = set()
+            bucket.add(driver)
+        self.driver_cell[moved_ids] = new[moved]
+        return len(moved_ids)
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            return [cy * self.nx + cx]
+        keys = []
+        for x in range(cx - r, cx + r + 1):
+            if 0 <= x < self.nx:
+                if cy - r >= 0:
+                    keys.append((cy - r) * self.nx + x)
+                if cy + r < self.ny:
+                    keys.append((cy + r) * self.nx + x)
+        for y in range(cy - r + 1, cy + r):
+            if 0 <= y < self.ny:
+                if cx - r >= 0:
+                    keys.append(y * self.nx + cx - r)
+                if cx + r < self.nx:
+                    keys.append(y * self.nx + cx + r)
+        return keys
+
+    def nearest(self, px, py, xs, ys, max_radius):
+        """(conductor, distancia, candidatos revisados) o (-1, inf, revisados)."""
+        cx = min(max(int(px // self.cell), 0), self.nx - 1)
+        cy = min(max(int(py // self.cell), 0), self.ny - 1)
+        best, best_dist, scanned = -1, np.inf, 0
+        max_ring = int(np.ceil(max_radius / self.cell)) + 1
+        cells = self.cells
+        for r in range(max_ring + 1):
+            ring = [cells[key] for key in self._ring(cx, cy, r) if cells.get(key)]
+            if ring:
+                ids = np.fromiter(itertools.chain.from_iterable(ring), dtype=np.int64)
+                dist = np.hypot(xs[ids] - px, ys[ids] - py)
+                i = int(dist.argmin())
+                scanned += len(ids)
+                if dist[i] < best_dist:
+                    best, best_dist = int(ids[i]), float(dist[i])
+            # cualquier celda del anillo r+1 está a >= r·celda del punto
+            if best_dist <= r * self.cell:
+                break
+        if best_dist > max_radius:
+            return -1, np.inf, scanned
+        return best, best_dist, scanned
+
+
+# ============================================
+# FLOTA Y MOTOR
+# ============================================
+
+class City:
+    def __init__(self, rng, config=CITY):
+        self.config = config
+        self.width, self.height = config["width_m"], config["height_m"]
+        self.centers = rng.uniform((0.15 * self.width, 0.15 * self.height),
+                                   (0.85 * self.width, 0.85 * self.height), (config["hotspots"], 2))
+        self.rng = rng
+
+    def points(self, n, uniform_share=None):
+        share = self.config["uniform_share"] if uniform_share is None else uniform_share
+        rng = self.rng
+        centers = self.centers[rng.integers(0, len(self.centers), n)]
+        pts = centers + rng.normal(0.0, self.config["hotspot_sigma_m"], (n, 2))
+        uniform = rng.random(n) < share
+        pts[uniform] = rng.uniform((0, 0), (self.width, self.height), (int(uniform.sum()), 2))
+        return np.clip(pts[:, 0], 0, self.width - 1e-6), np.clip(pts[:, 1], 0, self.height - 1e-6)
+
+
+class MatchingEngine:
+    """Flota en arrays NumPy + índice de conductores disponibles."""
+
+    def __init__(self, city, drivers, cell, rng, fleet=FLEET):
+        self.city, self.rng, self.fleet = city, rng, fleet
+        self.x, self.y = city.points(drivers)
+        heading = rng.uniform(0, 2 * np.pi, drivers)
+        speed = rng.normal(fleet["speed_mps"], 2.0, drivers).clip(0.5)
+        self.vx, self.vy = speed * np.cos(heading), speed * np.sin(heading)
+        self.last_ping = np.zeros(drivers)
+        self.available = np.ones(drivers, dtype=bool)
+        self.index = GridIndex(city.width, city.height, cell, drivers)
+        started = time.perf_counter()
+        self.index.insert(np.arange(drivers), self.x, self.y)
+        self.build_seconds = time.perf_counter() - started
+        self.trips = []                 # heap (fin, conductor)
+
+    def pings(self, ids, now):
+        dt = now - self.last_ping[ids]
+        self.last_ping[ids] = now
+        x = self.x[ids] + self.vx[ids] * dt
+        y = self.y[ids] + self.vy[ids] * dt
+        # rebote en los bordes y giros ocasionales
+        out_x = (x < 0) | (x >= self.city.width)
+        out_y = (y < 0) | (y >= self.city.height)
+        self.vx[ids[out_x]] *= -1
+        self.vy[ids[out_y]] *= -1
+        x = np.clip(x, 0, self.city.width - 1e-6)
+        y = np.clip(y, 0, self.city.height - 1e-6)
+        turn = ids[self.rng.random(len(ids)) < self.fleet["turn_probability"]]
+        self.vx[turn], self.vy[turn] = -self.vy[turn], self.vx[turn]
+        self.x[ids], self.y[ids] = x, y
+        free = ids[self.available[ids]]
+        return self.index.update(free, self.x[free], self.y[free])
+
+    def request(self, px, py, now):
+        driver, dist, scanned = self.index.nearest(px, py, self.x, self.y, self.fleet["max_radius_m"])
+        if driver >= 0:
+            self.index.remove(driver)
+            self.available[driver] = False
+            duration = self.rng.exponential(self.fleet["trip_minutes"] * 60)
+            heapq.heappush(self.trips, (now + duration, driver))
+        return driver, dist, scanned
+
+    def release(self, now):
+        done = []
+        while self.trips and self.trips[0][0] <= now:
+            done.append(heapq.heappop(self.trips)[1])
+        if done:
+            ids = np.array(done, dtype=np.int64)
+            self.x[ids], self.y[ids] = self.city.points(len(ids))
+            self.available[ids] = True
+            self.index.insert(ids, self.x[ids], self.y[ids])
+        return len(done)
+
+
+# ============================================
+# BANCO DE PRUEBAS
+# ============================================
+
+def bench(drivers, cell, rate, seconds, seed=None, fleet=FLEET):
+    rng = np.random.default_rng(seed)
+    city = City(rng)
+    engine = MatchingEngine(city, drivers, cell, rng, fleet)
+    latency = HdrHistogram()
+    ingest_seconds = 0.0
+    pings = moved = matched = unmatched = scanned = requests = 0
+    worst_tick = 0.0
+    pings_per_tick = int(round(rate * TICK_S))
+    for tick in range(int(round(seconds / TICK_S))):
+        now = (tick + 1) * TICK_S
+        tick_started = time.perf_counter()
+        engine.release(now)
+        ids = rng.integers(0, drivers, pings_per_tick)
+        started = time.perf_counter()
+        moved += engine.pings(ids, now)
+        ingest_seconds += time.perf_counter() - started
+        pings += len(ids)
+
+        n_requests = rng.poisson(fleet["requests_per_s"] * TICK_S)
+        px, py = city.points(n_requests, uniform_share=0.1)
+        for x, y in zip(px.tolist(), py.tolist()):
+            started = time.perf_counter()
+            driver, _, seen = engine.request(x, y, now)
+            latency.record(time.perf_counter() - started)
+            scanned += seen
+            matched += driver >= 0
+            unmatched += driver < 0
+        requests += n_requests
+        worst_tick = max(worst_tick, time.perf_counter() - tick_started)
+
+    return {
+        "drivers": drivers, "cell_m": cell, "rate": rate, "seconds": seconds,
+        "build_s": engine.build_seconds,
+        "ping_us": ingest_seconds / max(pings, 1) * 1e6,
+        "ping_capacity": pings / ingest_seconds if ingest_seconds else float("inf"),
+        "moved_share": moved / max(pings, 1),
+        "requests": requests, "matched": matched, "unmatched": unmatched,
+        "scanned_mean": scanned / max(requests, 1),
+        "match_p50_us": latency.percentile(50) * 1000 if latency.total else None,
+        "match_p99_us": latency.percentile(99) * 1000 if latency.total else None,
+        "match_max_us": latency.max if latency.total else None,
+        "worst_tick_ms": worst_tick * 1000,
+        "keeps_up": worst_tick <= TICK_S,
+        "cells": engine.index.nx * engine.index.ny,
+    }
+
+
+def check_diagram(path):
+    graph = topology.load(path, static=True)
+    pairs = {(graph.ids[graph.flow_src[e]], graph.ids[graph.flow_dst[e]]) for e in range(graph.n_edges)}
+    return [hop for hop in MODELED_HOPS if hop not in pairs]
+
+
+def _ints(raw):
+    return [int(float(value)) for value in raw.split(",")]
+
+
+def print_results(rows):
+    print(f"\n{'conductores':>11} {'celda m':>8} {'build s':>8} {'µs/ping':>8} {'pings/s máx':>12} "
+          f"{'cambian':>8} {'cand.':>7} {'p50 µs':>8} {'p99 µs':>8} {'máx µs':>8} {'tick ms':>8}")
+    print("-" * 110)
+    for row in rows:
+        flag = "✅" if row["keeps_up"] else "❌"
+        print(f"{row['drivers']:>11,} {row['cell_m']:>8,} {row['build_s']:>8.2f} {row['ping_us']:>8.2f} "
+              f"{row['ping_capacity']:>12,.0f} {row['moved_share']:>8.1%} {row['scanned_mean']:>7,.0f} "
+              f"{row['match_p50_us']:>8,.0f} {row['match_p99_us']:>8,.0f} {row['match_max_us']:>8,} "
+              f"{row['worst_tick_ms']:>6,.0f} {flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice espacial y banco del motor de emparejamiento")
+    parser.add_argument("--drivers", default="1000000", help="conductores (lista separada por comas)")
+    parser.add_argument("--cell", default="300", help="tamaño de celda en metros (lista)")
+    parser.add_argument("--rate", type=int, default=100_000, help="pings por segundo")
+    parser.add_argument("--requests", type=float, default=FLEET["requests_per_s"], help="solicitudes por segundo")
+    parser.add_argument("--seconds", type=float, default=5.0, help="segundos simulados por caso")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--diagram", default=DIAGRAM)
+    parser.add_argument("--json", dest="json_out", help="escribe los resultados")
+    args = parser.parse_args()
+
+    missing = check_diagram(args.diagram)
+    if missing:
+        print("⚠️  Saltos del modelo que no están en el diagrama: "
+              + ", ".join(f"{a} → {b}" for a, b in missing))
+    fleet = dict(FLEET, requests_per_s=args.requests)
+    print(f"🚗 {args.rate:,} pings/s · {args.requests:,.0f} solicitudes/s · {args.seconds:g} s simulados por caso")
+
+    rows = []
+    for drivers, cell in itertools.product(_ints(args.drivers), _ints(args.cell)):
+        print(f"   ⏳ {drivers:,} conductores, celdas de {cell} m...")
+        rows.append(bench(drivers, cell, args.rate, args.seconds, args.seed, fleet))
+    print_results(rows)
+    print(f"\n   tick de {TICK_S * 1000:.0f} ms: ✅ si el peor tick (pings + emparejamientos) cabe en él")
+    print("   Cada ping equivale a un GEOADD y cada emparejamiento a un GEOSEARCH + ZREM en Redis (svc_ws >> cache)")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"💾 Resultados en {args.json_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
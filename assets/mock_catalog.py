@@ -0,0 +1,44 @@
+# mock_catalog.py
+# Catálogo de clientes y productos de backend/src/data/mockData.ts.
+#
+# MOCK_CLIENTS y MOCK_PRODUCTS se leen del propio fichero TypeScript, así
+# load_test.py y policy_backtest.py usan siempre los mismos límites de
+# descuento, márgenes mínimos, cupos de crédito y precios que el backend.
+#
+#     from mock_catalog import load_catalog
+#     clients, products = load_catalog()
+
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MOCK_DATA = os.path.join(BASE_DIR, "..", "backend", "src", "data", "mockData.ts")
+
+_CLIENT_RE = re.compile(r"(\w+):\s*\{([^{}]*)\}")
+_PRODUCT_RE = re.compile(r"\{\s*id:\s*'(\d+)'([^{}]*)\}")
+_FIELD_RE = re.compile(r"(\w+):\s*(?:'([^']*)'|([\d.]+)|(true|false))")
+
+
+def _fields(text):
+    fields = {}
+    for name, string, number, boolean in _FIELD_RE.findall(text):
+        if string or not (number or boolean):
+            fields[name] = string
+        elif boolean:
+            fields[name] = boolean == "true"
+        else:
+            fields[name] = float(number) if "." in number else int(number)
+    return fields
+
+
+def load_catalog(path=MOCK_DATA):
+    """(clientes, productos) tal como están en mockData.ts."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    clients_block = source.split("MOCK_CLIENTS", 1)[1].split("MOCK_PRODUCTS", 1)[0]
+    products_block = source.split("MOCK_PRODUCTS", 1)[1]
+    clients = {name: _fields(body) for name, body in _CLIENT_RE.findall(clients_block)}
+    products = [dict(_fields(body), id=pid) for pid, body in _PRODUCT_RE.findall(products_block)]
+    if not clients or not products:
+        raise ValueError(f"{path}: no se encontraron MOCK_CLIENTS/MOCK_PRODUCTS")
+    return clients, [p for p in products if p.get("disponible", True)]
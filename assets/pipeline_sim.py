@@ -0,0 +1,605 @@
+# pipeline_sim.py
+# Simulador de eventos discretos del flujo de pedidos de DeliMasa.
+#
+# El flujo se construye sobre la topología de delimasa_aws_diagram.py:
+#
+#   api_gateway → lambda_registro → sqs_pedidos → step_functions
+#       → [lambda_validacion_inv ∥ lambda_validacion_cred] → lambda_facturas
+#       → sqs_facturacion → lambda_notificaciones
+#
+# Cada etapa es un nodo del diagrama con un tipo:
+#   delay     concurrencia ilimitada (API Gateway): solo suma latencia
+#   pool      `concurrency` workers (Lambda); si están ocupados el pedido
+#             espera en FIFO o, con overflow="reject", se rechaza (429)
+#   queue     cola SQS con `consumers` pollers que toman lotes de `batch`
+#             mensajes; el tiempo de servicio se muestrea por lote
+#   parallel  Step Functions: tras su latencia lanza las `branches` en
+#             paralelo y continúa cuando terminan todas (join)
+# Los tiempos de servicio son distribuciones (const, exp, lognormal, gamma,
+# uniform) en segundos. Los saltos que no están dibujados en el diagrama se
+# avisan al validar el flujo contra la topología.
+#
+# DELIMASA_PIPELINE solo fija la forma del flujo y de cada distribución; las
+# cifras salen de las anotaciones capacity={...} del diagrama (las mismas que
+# usa capacity_analysis.py):
+#   pool   concurrency ← reserved_concurrency, tiempo de servicio ← duration_ms
+#   queue  consumers ← consumers, batch ← batch_size, servicio ← receive_ms
+# El tiempo anotado es la mediana (lognormal), la media (exp, gamma) o el
+# valor (const) de la distribución. --config y --set mandan sobre el diagrama.
+#
+# El motor usa un heap de tuplas (tiempo, código entero): etapa y pedido (o
+# lote) van empaquetados en el código, el estado de cada pedido vive en
+# arrays preasignados, los tiempos de servicio se muestrean por bloques con
+# NumPy y las llegadas (Poisson, con perfil horario opcional) se generan de
+# antemano y se consumen con un puntero, sin pasar por el heap.
+#
+# Uso:
+#     python pipeline_sim.py --orders 2000000 --rate 1.2
+#     python pipeline_sim.py --orders 500000 --rate 40 --set lambda_registro.concurrency=20
+#     python pipeline_sim.py --config temporada_alta.json --series colas.csv
+
+import argparse
+import array
+import copy
+import csv
+import heapq
+import json
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+import topology
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STAGE_TYPES = ("delay", "pool", "queue", "parallel")
+_DELAY, _POOL, _QUEUE, _PARALLEL = range(4)
+
+# Código de evento: payload (pedido o lote) << _SHIFT | etapa
+_SHIFT = 8
+_MASK = (1 << _SHIFT) - 1
+
+_BLOCK = 1 << 16
+
+# Perfil diario de temporada alta: multiplicador de la tasa media por hora
+DAY_PROFILE = (0.15, 0.1, 0.1, 0.1, 0.15, 0.3, 0.7, 1.2, 1.8, 2.0, 1.9, 1.7,
+               1.4, 1.5, 1.8, 1.9, 1.7, 1.4, 1.1, 0.9, 0.7, 0.5, 0.35, 0.2)
+
+# Concurrencia, lotes y duraciones: capacity={...} del diagrama (apply_capacity)
+DELIMASA_PIPELINE = {
+    "script": "delimasa_aws_diagram.py",
+    "entry": "api_gateway",
+    "stages": {
+        "api_gateway": {
+            "type": "delay",
+            "service": {"dist": "lognormal", "median": 0.012, "sigma": 0.35},
+            "next": "lambda_registro",
+        },
+        "lambda_registro": {
+            "type": "pool", "overflow": "reject",
+            "service": {"dist": "lognormal", "sigma": 0.5},
+            "next": "sqs_pedidos",
+        },
+        "sqs_pedidos": {
+            "type": "queue",
+            "service": {"dist": "gamma", "cv": 0.5},
+            "next": "step_functions",
+        },
+        "step_functions": {
+            "type": "parallel",
+            "service": {"dist": "lognormal", "median": 0.04, "sigma": 0.3},
+            "branches": ["lambda_validacion_inv", "lambda_validacion_cred"],
+            "next": "lambda_facturas",
+        },
+        "lambda_validacion_inv": {
+            "type": "pool",
+            "service": {"dist": "lognormal", "sigma": 0.4},
+        },
+        "lambda_validacion_cred": {
+            "type": "pool",
+            "service": {"dist": "lognormal", "sigma": 0.6},
+        },
+        "lambda_facturas": {
+            "type": "pool",
+            "service": {"dist": "lognormal", "sigma": 0.5},
+            "next": "sqs_facturacion",
+        },
+        "sqs_facturacion": {
+            "type": "queue",
+            "service": {"dist": "gamma", "cv": 0.5},
+            "next": "lambda_notificaciones",
+        },
+        "lambda_notificaciones": {
+            "type": "pool",
+            "service": {"dist": "exp"},
+            "next": None,
+        },
+    },
+}
+
+# Parámetro de cada distribución que toma el tiempo anotado en el diagrama
+ANNOTATED_PARAM = {"const": "value", "exp": "mean", "gamma": "mean", "lognormal": "median"}
+
+# Campos que lee cada tipo de etapa y parámetros de cada distribución (--set)
+STAGE_FIELDS = {
+    "delay": ("type", "service", "next"),
+    "pool": ("type", "service", "next", "concurrency", "overflow"),
+    "queue": ("type", "service", "next", "consumers", "batch", "overflow"),
+    "parallel": ("type", "service", "next", "branches"),
+}
+DIST_PARAMS = {"const": ("value",), "exp": ("mean",), "lognormal": ("median", "sigma"),
+               "gamma": ("mean", "cv"), "uniform": ("low", "high")}
+
+
+# ============================================
+# DISTRIBUCIONES
+# ============================================
+
+def sampler(rng, spec):
+    """Función que devuelve un bloque de muestras (np.ndarray) de la distribución."""
+    dist = spec.get("dist", "const")
+    if dist == "const":
+        value = float(spec["value"])
+        return lambda size: np.full(size, value)
+    if dist == "exp":
+        mean = float(spec["mean"])
+        return lambda size: rng.exponential(mean, size)
+    if dist == "lognormal":
+        mu, sigma = np.log(float(spec["median"])), float(spec["sigma"])
+        return lambda size: rng.lognormal(mu, sigma, size)
+    if dist == "gamma":
+        # media y coeficiente de variación: shape = 1/cv², scale = media·cv²
+        mean, cv = float(spec["mean"]), float(spec.get("cv", 1.0))
+        return lambda size: rng.gamma(1.0 / cv ** 2, mean * cv ** 2, size)
+    if dist == "uniform":
+        low, high = float(spec["low"]), float(spec["high"])
+        return lambda size: rng.uniform(low, high, size)
+    raise ValueError(f"distribución desconocida: {dist!r}")
+
+
+def arrival_times(rng, orders, rate, profile=None):
+    """Instantes de llegada de un proceso de Poisson (homogéneo o por horas)."""
+    if not profile:
+        return np.cumsum(rng.exponential(1.0 / rate, orders))
+    # Poisson no homogéneo por aclarado: se genera a la tasa pico y se acepta
+    # cada llegada con probabilidad tasa(t) / pico
+    weights = np.asarray(profile, dtype=float)
+    weights = weights / weights.mean()
+    peak = rate * weights.max()
+    chunks, total, start = [], 0, 0.0
+    while total < orders:
+        size = int((orders - total) * weights.max() * 1.1) + 1024
+        times = start + np.cumsum(rng.exponential(1.0 / peak, size))
+        start = times[-1]
+        hour = (times // 3600).astype(np.int64) % len(weights)
+        kept = times[rng.random(size) * peak < rate * weights[hour]]
+        chunks.append(kept)
+        total += len(kept)
+    return np.concatenate(chunks)[:orders]
+
+
+# ============================================
+# MOTOR
+# ============================================
+
+class Stage:
+    """Parámetros compilados de una etapa (ver cabecera)."""
+
+    __slots__ = ("name", "index", "type", "concurrency", "batch", "reject", "next", "join",
+                 "branches", "draw", "buffer", "cursor", "busy", "waiting",
+                 "completed", "rejected", "busy_seconds", "max_waiting")
+
+    def __init__(self, name, index, config, rng):
+        kind = config.get("type", "pool")
+        if kind not in STAGE_TYPES:
+            raise ValueError(f"{name}: tipo de etapa desconocido {kind!r}")
+        self.name = name
+        self.index = index
+        self.type = STAGE_TYPES.index(kind)
+        if self.type == _QUEUE:
+            self.concurrency = int(config.get("consumers", 1))
+        elif self.type == _POOL:
+            self.concurrency = int(config.get("concurrency", 1))
+        else:
+            self.concurrency = 0
+        self.batch = int(config.get("batch", 1)) if self.type == _QUEUE else 1
+        self.reject = config.get("overflow", "queue") == "reject"
+        self.next = -1
+        self.join = -1
+        self.branches = ()
+        self.draw = sampler(rng, config.get("service", {"dist": "const", "value": 0.0}))
+        self.buffer = []
+        self.cursor = 0
+        self.busy = 0
+        self.waiting = deque()
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self.max_waiting = 0
+
+    def sample(self):
+        if self.cursor >= len(self.buffer):
+            # tolist(): indexar floats de Python es más rápido que escalares NumPy
+            self.buffer = self.draw(_BLOCK).tolist()
+            self.cursor = 0
+        value = self.buffer[self.cursor]
+        self.cursor += 1
+        return value
+
+
+class SimulationResult:
+    def __init__(self, simulator, latencies, duration, wall_seconds):
+        self.stages = simulator.stages
+        self.orders = simulator.orders
+        self.latencies = latencies
+        self.duration = duration
+        self.wall_seconds = wall_seconds
+        self.events = simulator.events
+        self.series_times = np.asarray(simulator.series_times)
+        self.series = {name: np.asarray(values) for name, values in simulator.series.items()}
+
+    @property
+    def completed(self):
+        return len(self.latencies)
+
+    @property
+    def rejected(self):
+        return self.orders - self.completed
+
+    @property
+    def throughput(self):
+        return self.completed / self.duration if self.duration else 0.0
+
+    def percentiles(self, points=(50, 95, 99)):
+        if not self.completed:
+            return {p: float("nan") for p in points}
+        return dict(zip(points, np.percentile(self.latencies, points)))
+
+    def stage_rows(self):
+        for stage in self.stages:
+            capacity = stage.concurrency * self.duration
+            utilization = stage.busy_seconds / capacity if capacity else None
+            yield stage, utilization
+
+
+class PipelineSimulator:
+    """Simulador de eventos discretos de un flujo de etapas (ver cabecera)."""
+
+    def __init__(self, config, seed=None, sample_every=60.0):
+        self.config = config
+        self.rng = np.random.default_rng(seed)
+        names = list(config["stages"])
+        if len(names) > _MASK:
+            raise ValueError(f"máximo {_MASK} etapas")
+        self.stages = [Stage(name, i, config["stages"][name], self.rng) for i, name in enumerate(names)]
+        self.by_name = {stage.name: stage for stage in self.stages}
+        if config["entry"] not in self.by_name:
+            raise ValueError(f"etapa de entrada desconocida: {config['entry']!r}")
+        for stage in self.stages:
+            stage_config = config["stages"][stage.name]
+            following = stage_config.get("next")
+            if following is not None:
+                stage.next = self._stage(following, stage.name).index
+            if stage.type == _PARALLEL:
+                stage.branches = tuple(self._stage(b, stage.name).index for b in stage_config["branches"])
+                for branch in stage.branches:
+                    self.stages[branch].join = stage.index
+        self.entry = self.by_name[config["entry"]].index
+        self.sample_every = sample_every
+        self.orders = 0
+        self.events = 0
+        self.series_times = []
+        self.series = {s.name: [] for s in self.stages if s.type in (_POOL, _QUEUE)}
+
+    def _stage(self, name, referrer):
+        try:
+            return self.by_name[name]
+        except KeyError:
+            raise ValueError(f"{referrer}: etapa desconocida {name!r}") from None
+
+    def hops(self):
+        """Saltos (origen, destino) del flujo, incluidos los de fan-out."""
+        for stage in self.stages:
+            if stage.next >= 0:
+                yield stage.name, self.stages[stage.next].name
+            for branch in stage.branches:
+                yield stage.name, self.stages[branch].name
+
+    def run(self, arrivals):
+        """Simula los pedidos que llegan en `arrivals` (segundos, crecientes)."""
+        started = time.perf_counter()
+        stages = self.stages
+        n = len(arrivals)
+        self.orders = n
+        arrival = arrivals.tolist()
+        done = array.array("d", bytes(8 * n))
+        finished = bytearray(n)          # 1 = completado
+        pending = bytearray(n)           # ramas pendientes del parallel activo
+        batches = {}
+        next_batch = 0
+        heap = []
+        push, pop = heapq.heappush, heapq.heappop
+        series_names = [s for s in stages if s.type in (_POOL, _QUEUE)]
+        next_sample = 0.0
+        events = 0
+
+        def start(stage, payload, now):
+            # Inicia servicio en un worker libre (pool/queue) o sin límite (delay/parallel)
+            nonlocal next_batch
+            if stage.type == _QUEUE:
+                size = min(stage.batch, len(stage.waiting) + 1)
+                if size > 1:
+                    items = [payload]
+                    waiting = stage.waiting
+                    for _ in range(size - 1):
+                        items.append(waiting.popleft())
+                    batches[next_batch] = items
+                    payload = -(next_batch + 1)
+                    next_batch += 1
+            service = stage.sample()
+            if stage.concurrency:
+                stage.busy += 1
+                stage.busy_seconds += service
+            push(heap, (now + service, (payload << _SHIFT) | stage.index))
+
+        def enter(stage, order, now):
+            if stage.type in (_DELAY, _PARALLEL) or stage.busy < stage.concurrency:
+                start(stage, order, now)
+            elif stage.reject:
+                stage.rejected += 1
+            else:
+                stage.waiting.append(order)
+                if len(stage.waiting) > stage.max_waiting:
+                    stage.max_waiting = len(stage.waiting)
+
+        def leave(stage, order, now):
+            if stage.join >= 0:
+                pending[order] -= 1
+                if pending[order]:
+                    return
+                stage = stages[stage.join]
+            if stage.next < 0:
+                done[order] = now - arrival[order]
+                finished[order] = 1
+            else:
+                enter(stages[stage.next], order, now)
+
+        def finish(stage, payload, now):
+            stage.completed += 1
+            if stage.type == _PARALLEL:
+                pending[payload] = len(stage.branches)
+                for branch in stage.branches:
+                    enter(stages[branch], payload, now)
+                return
+            if stage.concurrency:
+                stage.busy -= 1
+                if stage.waiting:
+                    start(stage, stage.waiting.popleft(), now)
+            if payload < 0:
+                items = batches.pop(-payload - 1)
+                stage.completed += len(items) - 1
+                for order in items:
+                    leave(stage, order, now)
+            else:
+                leave(stage, payload, now)
+
+        entry = stages[self.entry]
+        i = 0
+        now = 0.0
+        while i < n or heap:
+            if heap and (i >= n or heap[0][0] <= arrival[i]):
+                now, code = pop(heap)
+                finish(stages[code & _MASK], code >> _SHIFT, now)
+            else:
+                now = arrival[i]
+                enter(entry, i, now)
+                i += 1
+            events += 1
+            if now >= next_sample:
+                self.series_times.append(now)
+                for stage in series_names:
+                    self.series[stage.name].append(len(stage.waiting))
+                next_sample = now + self.sample_every
+
+        self.events = events
+        completed = np.frombuffer(finished, dtype=np.uint8).astype(bool)
+        latencies = np.frombuffer(done, dtype=np.float64)[completed]
+        duration = now - (arrival[0] if n else 0.0)
+        return SimulationResult(self, latencies, duration, time.perf_counter() - started)
+
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+
+def apply_capacity(config, graph):
+    """Completa concurrencia, lotes y duraciones con las anotaciones capacity={...}.
+
+    Solo rellena lo que la configuración no fija.
+    """
+    for name, stage in config["stages"].items():
+        if name not in graph.index:
+            continue
+        capacity = graph.node_capacity.get(graph.index[name], {})
+        kind = stage.get("type", "pool")
+        millis = None
+        if kind == "pool":
+            concurrency = capacity.get("reserved_concurrency", capacity.get("concurrency"))
+            if concurrency is not None:
+                stage.setdefault("concurrency", concurrency)
+            millis = capacity.get("duration_ms")
+        elif kind == "queue":
+            for field, key in (("consumers", "consumers"), ("batch", "batch_size")):
+                if key in capacity:
+                    stage.setdefault(field, capacity[key])
+            millis = capacity.get("receive_ms")
+        service = stage.get("service")
+        if millis is not None and service is not None and service.get("dist", "const") in ANNOTATED_PARAM:
+            service.setdefault(ANNOTATED_PARAM[service.get("dist", "const")], millis / 1000)
+
+
+def check_params(config):
+    """Nombres de los parámetros que ni el diagrama ni la configuración fijaron."""
+    required = {"pool": ("concurrency",), "queue": ("consumers", "batch")}
+    missing = []
+    for name, stage in config["stages"].items():
+        missing += [f"{name}.{field}" for field in required.get(stage.get("type", "pool"), ())
+                    if field not in stage]
+        service = stage.get("service")
+        param = ANNOTATED_PARAM.get((service or {}).get("dist", "const"))
+        if service is not None and param and param not in service:
+            missing.append(f"{name}.service.{param}")
+    return missing
+
+
+def load_config(path=None, overrides=()):
+    """Flujo por defecto con las cifras del diagrama, fusionado con un JSON y --set etapa.campo=valor."""
+    config = copy.deepcopy(DELIMASA_PIPELINE)
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            custom = json.load(fh)
+        stages = custom.pop("stages", {})
+        config.update(custom)
+        for name, stage in stages.items():
+            if stage is None:
+                config["stages"].pop(name, None)
+            else:
+                config["stages"].setdefault(name, {}).update(stage)
+    apply_capacity(config, topology.load(os.path.join(BASE_DIR, config["script"]), static=True))
+    for override in overrides:
+        target, _, raw = override.partition("=")
+        name, _, field = target.partition(".")
+        if not field or name not in config["stages"]:
+            raise ValueError(f"--set {override!r}: se espera etapa.campo=valor")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        stage = config["stages"][name]
+        if field.startswith("service."):
+            service = stage.setdefault("service", {})
+            param = field.split(".", 1)[1]
+            dist = value if param == "dist" else service.get("dist", "const")
+            if dist not in DIST_PARAMS:
+                raise ValueError(f"--set {override!r}: distribución desconocida {dist!r} "
+                                 f"(usa {', '.join(DIST_PARAMS)})")
+            if param != "dist" and param not in DIST_PARAMS[dist]:
+                raise ValueError(f"--set {override!r}: la distribución {dist} de {name} no tiene "
+                                 f"{param!r} (usa {', '.join(DIST_PARAMS[dist])})")
+            service[param] = value
+        else:
+            fields = STAGE_FIELDS.get(stage.get("type", "pool"), ())
+            if field not in fields:
+                raise ValueError(f"--set {override!r}: campo desconocido para {name} "
+                                 f"(usa {', '.join(fields)} o service.<parámetro>)")
+            stage[field] = value
+    return config
+
+
+def check_topology(simulator, script):
+    """Nodos del flujo que no existen y saltos no dibujados en el diagrama."""
+    graph = topology.load(script, static=True)
+    missing = [s.name for s in simulator.stages if s.name not in graph.index]
+    undrawn = []
+    for src, dst in simulator.hops():
+        if src in graph.index and dst in graph.index and \
+                graph.index[dst] not in graph.successors(graph.index[src]):
+            undrawn.append((src, dst))
+    return missing, undrawn
+
+
+# ============================================
+# CLI
+# ============================================
+
+def _sparkline(values, width=48):
+    if len(values) == 0 or values.max() == 0:
+        return "▁" * min(width, max(len(values), 1))
+    blocks = "▁▂▃▄▅▆▇█"
+    chunks = np.array_split(values, min(width, len(values)))
+    peaks = np.array([chunk.max() for chunk in chunks])
+    return "".join(blocks[int(p / values.max() * (len(blocks) - 1))] for p in peaks)
+
+
+def print_report(result):
+    days = result.duration / 86400
+    print(f"\n📦 {result.orders:,} pedidos en {days:.2f} días simulados "
+          f"({result.events:,} eventos, {result.wall_seconds:.1f}s de cómputo)")
+    print(f"   completados {result.completed:,} | rechazados {result.rejected:,} | "
+          f"throughput medio {result.throughput:.2f} pedidos/s")
+    p = result.percentiles((50, 95, 99))
+    if result.completed:
+        print(f"   latencia p50 {p[50]:.3f}s | p95 {p[95]:.3f}s | p99 {p[99]:.3f}s | "
+              f"máx {result.latencies.max():.3f}s")
+    print()
+    print(f"{'Etapa':<24} {'Tipo':<9} {'Workers':>7} {'Completados':>12} {'Rechazos':>9} "
+          f"{'Uso':>6} {'Cola máx':>9}")
+    print("-" * 82)
+    for stage, utilization in result.stage_rows():
+        usage = f"{utilization * 100:5.1f}%" if utilization is not None else "    -"
+        workers = stage.concurrency or "∞"
+        print(f"{stage.name:<24} {STAGE_TYPES[stage.type]:<9} {workers:>7} {stage.completed:>12,} "
+              f"{stage.rejected:>9,} {usage:>6} {stage.max_waiting:>9,}")
+    queued = [(name, values) for name, values in result.series.items() if len(values) and values.max()]
+    if queued:
+        print("\n📈 Profundidad de cola en el tiempo:")
+        for name, values in queued:
+            print(f"   {name:<24} {_sparkline(values)} máx {values.max():,}")
+
+
+def write_series(result, path):
+    names = list(result.series)
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["segundo"] + names)
+        for row, moment in enumerate(result.series_times):
+            writer.writerow([f"{moment:.1f}"] + [int(result.series[name][row]) for name in names])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de capacidad del flujo de pedidos DeliMasa")
+    parser.add_argument("--orders", type=int, default=200_000, help="pedidos a simular")
+    parser.add_argument("--rate", type=float, default=1.0, help="tasa media de llegada (pedidos/s)")
+    parser.add_argument("--profile", choices=("plano", "diurno"), default="diurno",
+                        help="perfil horario de llegadas (por defecto temporada alta diurna)")
+    parser.add_argument("--config", help="JSON con etapas a sobrescribir (etapa: null la elimina)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="ETAPA.CAMPO=VALOR",
+                        help="ajuste puntual, p. ej. lambda_registro.concurrency=50")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--sample-every", type=float, default=60.0, help="muestreo de colas (s simulados)")
+    parser.add_argument("--series", help="CSV con la profundidad de colas en el tiempo")
+    parser.add_argument("--no-check", action="store_true", help="no valida el flujo contra el diagrama")
+    args = parser.parse_args()
+
+    try:
+        config = load_config(args.config, args.overrides)
+    except ValueError as exc:
+        parser.error(str(exc))
+    missing = check_params(config)
+    if missing:
+        parser.error(f"sin valor en el diagrama ni en la configuración: {', '.join(missing)} (usa --set)")
+    simulator = PipelineSimulator(config, seed=args.seed, sample_every=args.sample_every)
+    if not args.no_check:
+        script = os.path.join(BASE_DIR, config["script"])
+        missing, undrawn = check_topology(simulator, script)
+        for name in missing:
+            print(f"⚠️  {name} no existe en {config['script']}")
+        for src, dst in undrawn:
+            print(f"ℹ️  salto {src} → {dst} no dibujado en {config['script']}")
+
+    profile = DAY_PROFILE if args.profile == "diurno" else None
+    arrivals = arrival_times(simulator.rng, args.orders, args.rate, profile)
+    print(f"🏃 Simulando {args.orders:,} pedidos a {args.rate:g} pedidos/s ({args.profile})...", flush=True)
+    result = simulator.run(arrivals)
+    print_report(result)
+    if args.series:
+        write_series(result, args.series)
+        print(f"\n💾 Series de colas en {args.series}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
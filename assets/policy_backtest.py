@@ -0,0 +1,440 @@
+# policy_backtest.py
+# Backtesting columnar de la política de aprobación comercial.
+#
+# Reproduce, con arrays de NumPy y millones de pedidos por pasada, lo que
+# hacen RulesAnalysisService y CombinedAnalysisService del backend
+# (backend/src/services/):
+#   descuentoExceso = max(0, descuentoPromedio - descuentoMaximo)
+#       > 5  RECHAZAR       > 0  AJUSTAR
+#   margenPromedio (media de (1 - 0.6 / (1 - descuento)) por línea)
+#       < margenMinimo - 2  RECHAZAR     < margenMinimo  AJUSTAR
+#   factor de crédito = totalPedido / limiteCredito
+#       > 1.1  RECHAZAR     > 1  AJUSTAR
+# La decisión por reglas es la más severa de las tres y la final sale de la
+# matriz reglas × IA, con confianza min(matriz, confianza de la IA).
+#
+# La entrada es un CSV o Parquet con una fila por línea de pedido, agrupado
+# por pedido:
+#     pedido_id,cliente_id,cantidad,precio_unitario,descuento[,subtotal][,ia_decision,ia_confianza]
+# y se lee por bloques (--chunk-rows); el último pedido de cada bloque pasa
+# al siguiente. Si no hay columnas de IA, su decisión se modela: coincide con
+# las reglas con probabilidad --ai-agree y cae al análisis de respaldo
+# (decisión de reglas, confianza 50) con probabilidad --ai-fallback.
+#
+# Con --set se evalúa a la vez la política base y la modificada sobre los
+# mismos pedidos y los mismos números aleatorios, y se muestran los cambios.
+#
+# Uso:
+#     python policy_backtest.py generate pedidos_2024.csv --orders 2000000
+#     python policy_backtest.py run pedidos_2024.csv
+#     python policy_backtest.py run pedidos_2024.csv --set descuento_rechazo=8 --set clienteC.margenMinimo=16
+#     python policy_backtest.py run pedidos_2024.parquet --ai-agree 0.7 --ai-fallback 0.05
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from mock_catalog import MOCK_DATA, load_catalog
+
+DECISIONS = ("APROBAR", "AJUSTAR", "RECHAZAR")
+APROBAR, AJUSTAR, RECHAZAR = range(3)
+
+# Umbrales de rulesAnalysisService.ts
+POLICY = {
+    "descuento_rechazo": 5.0,      # exceso de descuento (puntos) que rechaza
+    "margen_banda": 2.0,           # margen < margenMinimo - banda rechaza
+    "credito_ajuste": 1.0,         # factor de crédito que obliga a ajustar
+    "credito_rechazo": 1.1,        # factor de crédito que rechaza
+    "costo": 0.6,                  # costo como fracción del precio unitario
+}
+
+# combinedAnalysisService.ts: filas = reglas, columnas = IA
+DECISION_MATRIX = np.array([
+    [APROBAR, AJUSTAR, AJUSTAR],
+    [AJUSTAR, AJUSTAR, RECHAZAR],
+    [AJUSTAR, RECHAZAR, RECHAZAR],
+], dtype=np.int8)
+CONFIDENCE_MATRIX = np.array([
+    [95, 80, 70],
+    [85, 90, 85],
+    [60, 80, 95],
+], dtype=np.float32)
+FALLBACK_CONFIDENCE = 50
+
+REASONS = ("descuento", "margen", "crédito")
+COLUMNS = ("pedido_id", "cliente_id", "cantidad", "precio_unitario", "descuento")
+TEXT_COLUMNS = ("pedido_id", "cliente_id", "ia_decision")
+
+
+# ============================================
+# POLÍTICA
+# ============================================
+
+class Policy:
+    """Umbrales globales + parámetros por cliente en arrays indexados por código."""
+
+    def __init__(self, clients, thresholds=None):
+        self.thresholds = dict(POLICY, **(thresholds or {}))
+        self.clients = clients
+        self.client_ids = list(clients)
+        self.categories = sorted({c["categoria"] for c in clients.values()})
+        self.descuento_maximo = np.array([clients[c]["descuentoMaximo"] for c in self.client_ids], np.float64)
+        self.margen_minimo = np.array([clients[c]["margenMinimo"] for c in self.client_ids], np.float64)
+        self.limite_credito = np.array([clients[c]["limiteCredito"] for c in self.client_ids], np.float64)
+        self.code_order = np.argsort(self.client_ids).astype(np.int16)
+        self.category = np.array([self.categories.index(clients[c]["categoria"]) for c in self.client_ids],
+                                 np.int8)
+
+    def with_settings(self, settings):
+        """Copia con --set umbral=valor o cliente.campo=valor aplicados."""
+        thresholds = dict(self.thresholds)
+        clients = copy.deepcopy(self.clients)
+        for setting in settings:
+            target, _, raw = setting.partition("=")
+            name, _, field = target.partition(".")
+            if field:
+                if name not in clients or field not in clients[name]:
+                    raise ValueError(f"--set {setting!r}: cliente o campo desconocido")
+            elif target not in thresholds:
+                raise ValueError(f"--set {setting!r}: umbral desconocido (usa {', '.join(POLICY)})")
+            if field and isinstance(clients[name][field], str):
+                # nombre, categoria, historial: texto tal cual
+                clients[name][field] = raw
+                continue
+            try:
+                value = json.loads(raw)
+            except ValueError:
+                value = None
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"--set {setting!r}: {field or target} espera un número, no {raw!r}")
+            if field:
+                clients[name][field] = value
+            else:
+                thresholds[target] = float(value)
+        return Policy(clients, thresholds)
+
+    def rules(self, orders):
+        """(decisión por reglas, máscaras de rechazo por motivo) de un bloque de pedidos."""
+        t = self.thresholds
+        client = orders["cliente"]
+        exceso = np.maximum(0.0, orders["descuento_promedio"] - self.descuento_maximo[client])
+        margen_minimo = self.margen_minimo[client]
+        credito = orders["total"] / self.limite_credito[client]
+        margen = orders["margen_promedio"]
+
+        reject = (exceso > t["descuento_rechazo"],
+                  margen < margen_minimo - t["margen_banda"],
+                  credito > t["credito_rechazo"])
+        adjust = (exceso > 0, margen < margen_minimo, credito > t["credito_ajuste"])
+        decision = np.where(adjust[0] | adjust[1] | adjust[2], AJUSTAR, APROBAR).astype(np.int8)
+        decision[reject[0] | reject[1] | reject[2]] = RECHAZAR
+        return decision, reject
+
+    def margins(self, descuento):
+        """Margen (%) de cada línea; el precio se cancela en la fórmula del servicio."""
+        neto = 1.0 - descuento / 100.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (neto - self.thresholds["costo"]) / neto * 100.0
+
+
+# ============================================
+# LECTURA POR BLOQUES
+# ============================================
+
+def _csv_chunks(path, chunk_rows):
+    with open(path, encoding="utf-8") as f:
+        header = f.readline().strip().split(",")
+        text = [i for i, name in enumerate(header) if name in TEXT_COLUMNS]
+        numeric = [i for i, name in enumerate(header) if name not in TEXT_COLUMNS]
+        while True:
+            lines = f.readlines(chunk_rows * 48)
+            if not lines:
+                return
+            # loadtxt parsea en C: una pasada para las columnas de texto y otra para las numéricas
+            strings = np.loadtxt(lines, delimiter=",", usecols=text, dtype="U24", ndmin=2)
+            numbers = np.loadtxt(lines, delimiter=",", usecols=numeric, dtype=np.float64, ndmin=2)
+            chunk = {header[i]: strings[:, j] for j, i in enumerate(text)}
+            chunk.update({header[i]: numbers[:, j] for j, i in enumerate(numeric)})
+            yield chunk
+
+
+def _parquet_chunks(path, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("❌ Para leer Parquet instala pyarrow (pip install pyarrow)")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        yield {name: np.asarray(batch.column(i).to_numpy(zero_copy_only=False))
+               for i, name in enumerate(batch.schema.names)}
+
+
+def read_chunks(path, chunk_rows):
+    reader = _parquet_chunks if path.endswith((".parquet", ".pq")) else _csv_chunks
+    return reader(path, chunk_rows)
+
+
+def order_chunks(path, policy, chunk_rows):
+    """Bloques de pedidos ya agregados (una posición por pedido)."""
+    codes = np.array(sorted(policy.client_ids))
+    carry = None
+    for chunk in read_chunks(path, chunk_rows):
+        missing = [c for c in COLUMNS if c not in chunk]
+        if missing:
+            raise ValueError(f"{path}: faltan columnas {', '.join(missing)}")
+        if carry is not None:
+            chunk = {name: np.concatenate([carry[name], column]) for name, column in chunk.items()}
+        ids = chunk["pedido_id"]
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        if len(starts) < 2:
+            carry = chunk
+            continue
+        # El último pedido puede seguir en el bloque siguiente
+        cut = starts[-1]
+        carry = {name: column[cut:] for name, column in chunk.items()}
+        yield _aggregate({name: column[:cut] for name, column in chunk.items()}, starts[:-1], codes, policy)
+    if carry is not None and len(carry["pedido_id"]):
+        ids = carry["pedido_id"]
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        yield _aggregate(carry, starts, codes, policy)
+
+
+def _aggregate(lines, starts, codes, policy):
+    cantidad = lines["cantidad"].astype(np.float64)
+    precio = lines["precio_unitario"].astype(np.float64)
+    descuento = lines["descuento"].astype(np.float64)
+    if "subtotal" in lines:
+        subtotal = lines["subtotal"].astype(np.float64)
+    else:
+        subtotal = cantidad * precio * (1.0 - descuento / 100.0)
+    count = np.diff(np.r_[starts, len(descuento)])
+
+    # Pocos clientes: búsqueda binaria sobre sus ids ordenados en vez de np.unique
+    names = lines["cliente_id"][starts].astype(codes.dtype)
+    position = np.minimum(np.searchsorted(codes, names), len(codes) - 1)
+    unknown = codes[position] != names
+    if unknown.any():
+        raise ValueError(f"clientes sin datos en MOCK_CLIENTS: {', '.join(np.unique(names[unknown])[:5])}")
+
+    orders = {
+        "cliente": policy.code_order[position],
+        "total": np.add.reduceat(subtotal, starts),
+        "descuento_promedio": np.add.reduceat(descuento, starts) / count,
+        "descuento_linea": descuento,
+        "starts": starts,
+        "count": count,
+    }
+    if "ia_decision" in lines:
+        decision = lines["ia_decision"][starts]
+        orders["ia_decision"] = np.select([decision == d for d in DECISIONS], range(3), -1).astype(np.int8)
+        orders["ia_confianza"] = lines["ia_confianza"][starts].astype(np.float32)
+    return orders
+
+
+# ============================================
+# EVALUACIÓN
+# ============================================
+
+class Tally:
+    """Contadores acumulados de una política."""
+
+    def __init__(self, policy):
+        n_cat = len(policy.categories)
+        self.policy = policy
+        self.rules = np.zeros((n_cat, 3), np.int64)
+        self.final = np.zeros((n_cat, 3), np.int64)
+        self.value = np.zeros((n_cat, 3), np.float64)
+        self.reasons = np.zeros((n_cat, len(REASONS)), np.int64)
+        self.matrix = np.zeros((3, 3), np.int64)
+        self.confidence = np.zeros(n_cat, np.float64)
+        self.orders = 0
+
+    def add(self, category, rules, ai, final, confidence, total, reject):
+        n_cat = len(self.policy.categories)
+        self.rules += np.bincount(category * 3 + rules, minlength=n_cat * 3).reshape(n_cat, 3)
+        self.final += np.bincount(category * 3 + final, minlength=n_cat * 3).reshape(n_cat, 3)
+        self.value += np.bincount(category * 3 + final, weights=total, minlength=n_cat * 3).reshape(n_cat, 3)
+        for i, mask in enumerate(reject):
+            self.reasons[:, i] += np.bincount(category[mask], minlength=n_cat)
+        self.matrix += np.bincount(rules * 3 + ai, minlength=9).reshape(3, 3)
+        self.confidence += np.bincount(category, weights=confidence, minlength=n_cat)
+        self.orders += len(rules)
+
+
+def simulate_ai(rng, rules, agree, fallback):
+    """Decisión y confianza de la IA cuando el histórico no las trae."""
+    n = len(rules)
+    u = rng.random((3, n), dtype=np.float32)
+    other = (rules + 1 + (u[1] < 0.5)) % 3
+    ai = np.where(u[0] < agree, rules, other).astype(np.int8)
+    confidence = (60 + 35 * u[2]).astype(np.float32)
+    failed = rng.random(n, dtype=np.float32) < fallback
+    ai[failed] = rules[failed]
+    confidence[failed] = FALLBACK_CONFIDENCE
+    return ai, confidence
+
+
+def evaluate(orders, policy, tally, ai_draws):
+    # El margen por línea depende del umbral de costo de cada política
+    margins = policy.margins(orders["descuento_linea"])
+    orders["margen_promedio"] = np.add.reduceat(margins, orders["starts"]) / orders["count"]
+    rules, reject = policy.rules(orders)
+    if "ia_decision" in orders:
+        ai, ai_confidence = orders["ia_decision"], orders["ia_confianza"]
+        missing = ai < 0
+        ai = np.where(missing, rules, ai)
+        ai_confidence = np.where(missing, FALLBACK_CONFIDENCE, ai_confidence)
+    else:
+        ai, ai_confidence = ai_draws(rules)
+    final = DECISION_MATRIX[rules, ai]
+    confidence = np.minimum(CONFIDENCE_MATRIX[rules, ai], ai_confidence)
+    tally.add(policy.category[orders["cliente"]].astype(np.intp), rules.astype(np.intp),
+              ai.astype(np.intp), final.astype(np.intp), confidence, orders["total"], reject)
+
+
+def backtest(path, policies, chunk_rows=1_000_000, agree=0.8, fallback=0.02, seed=0):
+    tallies = [Tally(policy) for policy in policies]
+    for index, orders in enumerate(order_chunks(path, policies[0], chunk_rows)):
+        for policy, tally in zip(policies, tallies):
+            # Mismos números aleatorios para todas las políticas en cada bloque
+            rng = np.random.default_rng([seed, index])
+            evaluate(orders, policy, tally, lambda rules: simulate_ai(rng, rules, agree, fallback))
+    return tallies
+
+
+# ============================================
+# DATOS SINTÉTICOS
+# ============================================
+
+def generate(path, orders, clients, products, seed=None, block=250_000):
+    """Un año de pedidos sintéticos con el catálogo mock (sin columnas de IA)."""
+    rng = np.random.default_rng(seed)
+    client_ids = np.array(list(clients))
+    limits = np.array([clients[c]["descuentoMaximo"] for c in client_ids], np.float64)
+    credit = np.array([clients[c]["limiteCredito"] for c in client_ids], np.float64)
+    prices = np.array([p["precioBase"] for p in products], np.float64)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("pedido_id,cliente_id,cantidad,precio_unitario,descuento,subtotal\n")
+        for first in range(0, orders, block):
+            n = min(block, orders - first)
+            client = rng.integers(0, len(client_ids), n)
+            lines = rng.integers(1, 6, n)
+            order = np.repeat(np.arange(first, first + n), lines)
+            line_client = np.repeat(client, lines)
+            product = rng.integers(0, len(prices), len(order))
+            # Tamaño del pedido escalado al cupo de crédito del cliente
+            target = credit[line_client] * rng.lognormal(np.log(0.15), 1.0, len(order)) / np.repeat(lines, lines)
+            cantidad = np.maximum(1, (target / prices[product]).astype(np.int64))
+            limit = limits[line_client]
+            step = rng.choice(5, len(order), p=[0.25, 0.25, 0.2, 0.2, 0.1])
+            descuento = np.choose(step, [np.zeros_like(limit), limit / 2, limit - 2, limit, limit + 6])
+            descuento = np.clip(np.round(descuento), 0, 100)
+            subtotal = np.round(cantidad * prices[product] * (1 - descuento / 100))
+            rows = zip(order, client_ids[line_client], cantidad, prices[product].astype(np.int64),
+                       descuento.astype(np.int64), subtotal.astype(np.int64))
+            f.write("".join(f"P{o:08d},{c},{q},{p},{d},{s}\n" for o, c, q, p, d, s in rows))
+
+
+# ============================================
+# INFORME
+# ============================================
+
+def _pct(count, total):
+    return f"{100 * count / total:5.1f}%" if total else "   - "
+
+
+def print_tally(tally, title):
+    policy = tally.policy
+    print(f"\n📊 {title}: {tally.orders:,} pedidos")
+    print(f"{'Categoría':<10} {'pedidos':>10}  {'reglas A/Aj/R':>22}  {'final A/Aj/R':>22}  "
+          f"{'conf.':>5}  {'rechazo por descuento/margen/crédito':>36}")
+    print("-" * 116)
+    for c, category in enumerate(policy.categories):
+        n = tally.rules[c].sum()
+        rules = " ".join(_pct(x, n) for x in tally.rules[c])
+        final = " ".join(_pct(x, n) for x in tally.final[c])
+        reasons = " ".join(f"{_pct(x, n):>11}" for x in tally.reasons[c])
+        confidence = tally.confidence[c] / n if n else 0
+        print(f"{category:<10} {n:>10,}  {rules:>22}  {final:>22}  {confidence:>5.1f}  {reasons:>36}")
+    total = tally.final.sum(axis=0)
+    value = tally.value.sum(axis=0)
+    print("-" * 116)
+    print("💰 Valor por decisión final: " + ", ".join(
+        f"{d} {_pct(c, tally.orders).strip()} ({v / 1e9:,.1f} mil M COP)" for d, c, v in zip(DECISIONS, total, value)))
+    print("\nMatriz reglas × IA (pedidos)")
+    print(f"{'':<10}" + "".join(f"{'IA ' + d:>16}" for d in DECISIONS))
+    for r, decision in enumerate(DECISIONS):
+        print(f"{decision:<10}" + "".join(f"{x:>16,}" for x in tally.matrix[r]))
+
+
+def print_delta(base, scenario):
+    print("\n🔀 Cambio frente a la política base (puntos porcentuales de la decisión final)")
+    print(f"{'Categoría':<10} " + " ".join(f"{d:>10}" for d in DECISIONS))
+    for c, category in enumerate(base.policy.categories):
+        n = base.final[c].sum()
+        if not n:
+            continue
+        delta = 100 * (scenario.final[c] - base.final[c]) / n
+        print(f"{category:<10} " + " ".join(f"{x:>+10.2f}" for x in delta))
+
+
+# ============================================
+# CLI
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtesting vectorizado de la política de aprobación")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="evalúa la política sobre un histórico")
+    run_parser.add_argument("source", help="CSV o Parquet con una fila por línea de pedido")
+    run_parser.add_argument("--set", dest="settings", action="append", default=[],
+                            metavar="UMBRAL=VALOR|CLIENTE.CAMPO=VALOR",
+                            help="política what-if, p. ej. descuento_rechazo=8 o clienteC.margenMinimo=16")
+    run_parser.add_argument("--ai-agree", type=float, default=0.8, help="prob. de que la IA coincida con las reglas")
+    run_parser.add_argument("--ai-fallback", type=float, default=0.02, help="prob. de respuesta de respaldo")
+    run_parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    run_parser.add_argument("--catalog", default=MOCK_DATA)
+    run_parser.add_argument("--seed", type=int, default=0)
+
+    gen_parser = commands.add_parser("generate", help="genera un histórico sintético")
+    gen_parser.add_argument("output")
+    gen_parser.add_argument("--orders", type=int, default=1_000_000)
+    gen_parser.add_argument("--catalog", default=MOCK_DATA)
+    gen_parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    clients, products = load_catalog(args.catalog)
+    if args.command == "generate":
+        started = time.perf_counter()
+        generate(args.output, args.orders, clients, products, args.seed)
+        size = os.path.getsize(args.output) / 1e6
+        print(f"✅ {args.orders:,} pedidos en {args.output} ({size:,.0f} MB, {time.perf_counter() - started:.1f}s)")
+        return 0
+
+    base = Policy(clients)
+    policies = [base]
+    if args.settings:
+        try:
+            policies.append(base.with_settings(args.settings))
+        except ValueError as exc:
+            parser.error(str(exc))
+    started = time.perf_counter()
+    tallies = backtest(args.source, policies, args.chunk_rows, args.ai_agree, args.ai_fallback, args.seed)
+    elapsed = time.perf_counter() - started
+
+    print_tally(tallies[0], "Política actual")
+    if len(tallies) > 1:
+        print_tally(tallies[1], "Política what-if (" + ", ".join(args.settings) + ")")
+        print_delta(tallies[0], tallies[1])
+    print(f"\n⏱️  {tallies[0].orders:,} pedidos × {len(policies)} políticas en {elapsed:.2f}s "
+          f"({tallies[0].orders * len(policies) / elapsed:,.0f} evaluaciones/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
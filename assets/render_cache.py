@@ -0,0 +1,355 @@
+# render_cache.py
+# Caché de renderizado por contenido para los diagramas de "diagrams".
+#
+# La clave es un hash del grafo generado: fuente DOT canónica (nodos,
+# clusters, aristas, graph_attr), contenido de los iconos referenciados y
+# formato de salida. Si la clave ya existe no se ejecuta Graphviz: se copia
+# la imagen guardada al destino del diagrama.
+#
+# Uso en un script:
+#     from render_cache import CachedDiagram
+#     with CachedDiagram("Mi diagrama", filename="mi_diagrama", show=False):
+#         ...
+#
+# Varios formatos con un solo layout (PNG para el repo, SVG/PDF para la wiki):
+#     DIAGRAMS_FORMATS=png,svg,pdf python delimasa_aws_diagram.py
+#
+# Mantenimiento (pipeline de documentación):
+#     python render_cache.py --stats
+#     python render_cache.py --evict
+#     python render_cache.py --clear
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+import graphviz
+from diagrams import Diagram, setdiagram
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Configuración por variables de entorno
+CACHE_DIR = os.environ.get("DIAGRAMS_CACHE_DIR", os.path.join(BASE_DIR, ".render_cache"))
+CACHE_MAX_MB = float(os.environ.get("DIAGRAMS_CACHE_MAX_MB", "256"))
+CACHE_MAX_DAYS = float(os.environ.get("DIAGRAMS_CACHE_MAX_DAYS", "30"))
+# Entradas usadas hace menos de esto no se expulsan: get() devuelve una ruta
+# que el llamador lee justo después (otro proceso puede estar en put())
+CACHE_GRACE_S = float(os.environ.get("DIAGRAMS_CACHE_GRACE_S", "60"))
+
+# Formatos admitidos; el layout posicionado se guarda como xdot (para volver
+# a dibujar) y como json (posiciones que reutiliza topology_diff.py)
+OUTFORMATS = ("png", "jpg", "svg", "pdf", "dot", "xdot", "json")
+LAYOUT_FORMAT = "xdot"
+POSITIONS_FORMAT = "json"
+
+# Versión del esquema de claves: cambiarla invalida toda la caché
+KEY_VERSION = b"render-cache/1"
+
+# diagrams asigna a cada nodo un uuid4().hex aleatorio en cada ejecución;
+# graphviz lo cita solo cuando empieza por dígito
+_NODE_ID_RE = re.compile(r'"([0-9a-f]{32})"|\b([0-9a-f]{32})\b')
+_IMAGE_RE = re.compile(r'image=(?:"((?:[^"\\]|\\.)*)"|([^\s\]"]+))')
+# Posiciones precalculadas (render incremental): no forman parte de la clave
+_LAYOUT_ATTR_RE = re.compile(r'\s(?:pos|bb|lp)="[^"]*"')
+
+# Historial de renders del proceso: lo consulta build_diagrams.py
+render_log = []
+
+_icon_digests = {}
+
+
+def canonical_source(source, names=None):
+    """Reemplaza los ids aleatorios de nodo por ids estables.
+
+    Con `names` ({uuid: id}) se usan esos ids; el resto se numera en
+    orden de aparición (n0, n1, ...), que es determinista para un script.
+    """
+    mapping = {node_id: '"' + name.replace('"', '\\"') + '"' for node_id, name in (names or {}).items()}
+
+    def _stable(match):
+        node_id = match.group(1) or match.group(2)
+        if node_id not in mapping:
+            mapping[node_id] = f"n{len(mapping)}"
+        return mapping[node_id]
+
+    return _NODE_ID_RE.sub(_stable, source)
+
+
+def icon_digest(path):
+    """sha256 del icono, memorizado por (ruta, tamaño, mtime)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    marker = (path, stat.st_size, stat.st_mtime_ns)
+    digest = _icon_digests.get(marker)
+    if digest is None:
+        with open(path, "rb") as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+        _icon_digests[marker] = digest
+    return digest
+
+
+def graph_digest(source, outformat):
+    """Clave de caché para una fuente DOT canónica y un formato de salida.
+
+    Las rutas de los iconos se sustituyen por el hash de su contenido, así la
+    clave no depende de dónde esté instalado el paquete diagrams.
+    """
+
+    def _icon(match):
+        path = match.group(1) if match.group(1) is not None else match.group(2)
+        return f'image="sha256:{icon_digest(path)}"'
+
+    keyed = _IMAGE_RE.sub(_icon, _LAYOUT_ATTR_RE.sub("", source))
+    hasher = hashlib.sha256(KEY_VERSION)
+    hasher.update(b"\0" + outformat.encode())
+    hasher.update(b"\0" + keyed.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def emit_formats(source, formats, layout=None, positioned=False):
+    """Genera todos los formatos con una sola pasada de Graphviz.
+
+    Sin `layout`, dot calcula el layout una vez y escribe en la misma
+    invocación cada formato pedido más el layout posicionado (LAYOUT_FORMAT y
+    POSITIONS_FORMAT). Con `layout` (un xdot ya posicionado) se usa
+    `neato -n2`, que respeta las posiciones de nodos, clusters y aristas y
+    solo dibuja. Con `positioned` la propia fuente trae posiciones (render
+    incremental): neato -n2 las respeta y solo enruta las aristas sin `pos`.
+    Devuelve {formato: bytes}.
+    """
+    wanted = list(dict.fromkeys(formats))
+    if layout is None:
+        args = ["neato", "-n2"] if positioned else ["dot"]
+        data = source.encode("utf-8")
+        wanted = list(dict.fromkeys(wanted + [LAYOUT_FORMAT, POSITIONS_FORMAT]))
+    else:
+        args, data = ["neato", "-n2"], layout
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in wanted:
+            args += [f"-T{fmt}", "-o", os.path.join(tmp, f"out.{fmt}")]
+        try:
+            proc = subprocess.run(args, input=data, capture_output=True)
+        except FileNotFoundError as exc:
+            raise graphviz.ExecutableNotFound(args) from exc
+        if proc.returncode != 0:
+            raise graphviz.CalledProcessError(proc.returncode, args,
+                                              output=proc.stdout, stderr=proc.stderr)
+        produced = {}
+        for fmt in wanted:
+            with open(os.path.join(tmp, f"out.{fmt}"), "rb") as fh:
+                produced[fmt] = fh.read()
+    return produced
+
+
+def _atomic_copy(src, dst):
+    """Copia src a dst sin dejar archivos a medio escribir."""
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dst)), suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class RenderCache:
+    """Almacén en disco de salidas renderizadas, direccionado por contenido.
+
+    Cada entrada es <root>/<k[:2]>/<k>.<formato>. El mtime se actualiza en
+    cada acierto, de modo que la expulsión por edad y por tamaño elimina
+    primero lo que lleva más tiempo sin usarse. Lo tocado en los últimos
+    `grace` segundos no se expulsa aunque se pase del tamaño máximo: la ruta
+    que acaba de devolver get() sigue existiendo mientras se lee.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=int(CACHE_MAX_MB * 1024 * 1024),
+                 max_age=CACHE_MAX_DAYS * 86400, grace=CACHE_GRACE_S):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.grace = grace
+
+    def path(self, key, outformat):
+        return os.path.join(self.root, key[:2], f"{key}.{outformat}")
+
+    def get(self, key, outformat):
+        """Ruta de la entrada, o None si no está en caché."""
+        path = self.path(key, outformat)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, outformat, data):
+        """Guarda los bytes renderizados y aplica la política de expulsión."""
+        path = self.path(key, outformat)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+        return path
+
+    def entries(self):
+        """Lista de (mtime, tamaño, ruta) de todas las entradas."""
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                stat = entry.stat()
+                found.append((stat.st_mtime, stat.st_size, entry.path))
+        return found
+
+    def evict(self, keep=None):
+        """Expulsa entradas caducadas y, si hace falta, las menos usadas.
+
+        Devuelve (entradas eliminadas, bytes liberados).
+        """
+        entries = sorted(self.entries())
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        removed, freed = 0, 0
+        for mtime, size, path in entries:
+            expired = self.max_age is not None and now - mtime > self.max_age
+            oversized = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or oversized):
+                continue
+            if path == keep:
+                continue
+            try:
+                # mtime actual, no el del listado: un get() posterior lo refresca
+                if now - os.stat(path).st_mtime < self.grace:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root)
+
+
+class CachedDiagram(Diagram):
+    """Diagram que solo invoca Graphviz cuando el grafo cambió.
+
+    Acepta los mismos argumentos que diagrams.Diagram más `cache`
+    (un RenderCache; por defecto el de CACHE_DIR). Con varios formatos
+    (`outformat=["png", "svg", "pdf"]` o DIAGRAMS_FORMATS=png,svg,pdf) el
+    grafo se posiciona una sola vez: ver emit_formats().
+    """
+
+    def __init__(self, *args, cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache if cache is not None else RenderCache()
+        # uuid de diagrams -> id estable (lo rellena topology.render)
+        self.node_names = {}
+        # La fuente trae pos/bb de un layout anterior (ver topology_diff.py)
+        self.positioned = False
+        self.positions_key = None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            # Con una excepción en el bloque el grafo está incompleto
+            if exc_type is None:
+                self.render()
+        finally:
+            setdiagram(None)
+
+    def _validate_outformat(self, outformat):
+        return outformat.lower() in OUTFORMATS
+
+    def formats(self):
+        override = os.environ.get("DIAGRAMS_FORMATS")
+        if override:
+            return [fmt.strip() for fmt in override.split(",") if fmt.strip()]
+        return self.outformat if isinstance(self.outformat, list) else [self.outformat]
+
+    def render(self):
+        source = canonical_source(self.dot.source, self.node_names)
+        started = time.perf_counter()
+        keys = {fmt: graph_digest(source, fmt) for fmt in self.formats()}
+        cached = {fmt: self.cache.get(key, fmt) for fmt, key in keys.items()}
+        missing = [fmt for fmt, path in cached.items() if path is None]
+        self.positions_key = graph_digest(source, POSITIONS_FORMAT)
+        layout_mode = "caché"
+
+        if missing:
+            # El layout posicionado también se guarda en caché
+            layout_key = graph_digest(source, LAYOUT_FORMAT)
+            layout_path = self.cache.get(layout_key, LAYOUT_FORMAT)
+            layout = None
+            if layout_path is not None:
+                with open(layout_path, "rb") as fh:
+                    layout = fh.read()
+                layout_mode = "reutilizado"
+            else:
+                layout_mode = "incremental" if self.positioned else "dot"
+            produced = emit_formats(source, missing, layout=layout, positioned=self.positioned)
+            # El dot persistente de render_daemon.py solo devuelve la imagen
+            if layout is None and LAYOUT_FORMAT in produced:
+                self.cache.put(layout_key, LAYOUT_FORMAT, produced[LAYOUT_FORMAT])
+                self.cache.put(self.positions_key, POSITIONS_FORMAT, produced[POSITIONS_FORMAT])
+            for fmt in missing:
+                cached[fmt] = self.cache.put(keys[fmt], fmt, produced[fmt])
+        seconds = time.perf_counter() - started
+
+        for fmt, path in cached.items():
+            target = f"{self.filename}.{fmt}"
+            _atomic_copy(path, target)
+            render_log.append({
+                "filename": target,
+                "format": fmt,
+                "key": keys[fmt],
+                "hit": fmt not in missing,
+                "layout": layout_mode,
+                "seconds": seconds,
+            })
+            if self.show:
+                graphviz.view(target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de la caché de renderizado")
+    parser.add_argument("--stats", action="store_true", help="muestra entradas y tamaño total")
+    parser.add_argument("--evict", action="store_true", help="aplica la expulsión por edad y tamaño")
+    parser.add_argument("--clear", action="store_true", help="vacía la caché")
+    args = parser.parse_args()
+
+    cache = RenderCache()
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Caché vaciada: {cache.root}")
+    if args.evict:
+        removed, freed = cache.evict()
+        print(f"🧹 {removed} entradas expulsadas ({freed / 1024:.1f} KiB)")
+    if args.stats or not (args.clear or args.evict):
+        entries = cache.entries()
+        total = sum(size for _, size, _ in entries)
+        print(f"📦 {cache.root}: {len(entries)} entradas, {total / 1024 / 1024:.2f} MiB "
+              f"(límite {cache.max_bytes / 1024 / 1024:.0f} MiB, "
+              f"{cache.max_age / 86400:.0f} días)")
+
+
+if __name__ == "__main__":
+    main()
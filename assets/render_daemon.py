@@ -0,0 +1,764 @@
+# render_daemon.py
+# Demonio de render en caliente con modo watch y vista previa en el navegador.
+#
+# Ejecutar `python uber_architecture_aws.py` en cada guardado paga un
+# intérprete nuevo, todos los imports de diagrams y un proceso `dot` nuevo.
+# Aquí un proceso de larga duración mantiene todo eso cargado:
+#   - vigila assets/*.py con inotify (ctypes, sin dependencias) o, si no hay
+#     inotify, comparando mtime/tamaño cada --poll segundos
+#   - agrupa las ráfagas de eventos de un guardado (--debounce)
+#   - un worker "zygote" importa una sola vez diagrams, graphviz, los módulos
+#     de proveedor de lazy_nodes, topology y render_cache; cada render es un
+#     fork del zygote, así el script se ejecuta con todo importado pero sin
+#     arrastrar estado de módulo de un render al siguiente
+#   - Graphviz también queda caliente: un `dot -Tsvg` / `dot -Tpng`
+#     persistente por formato (y un `neato -n2` para los layouts
+#     incrementales de topology_diff) recibe un grafo por stdin y devuelve la
+#     imagen delimitada por `</svg>` o por el chunk IEND. Si la versión de
+#     Graphviz no vacía la salida grafo a grafo (se comprueba al arrancar) se
+#     usa el render normal de render_cache
+#   - solo se re-ejecuta el script guardado; si cambia un módulo auxiliar
+#     (topology.py, lazy_nodes.py...) se reinicia el zygote y se renderizan
+#     de nuevo los diagramas ya mostrados
+#   - la página http://127.0.0.1:8765 recibe cada imagen nueva por SSE
+# El proceso persistente solo devuelve la imagen: con él no se guarda el
+# layout xdot/json en la caché y topology_diff reutiliza las posiciones del
+# último render completo (si se añaden nodos, hace un layout nuevo).
+#
+# Uso:
+#     python render_daemon.py                          # todos los diagramas de assets/
+#     python render_daemon.py uber_architecture_aws.py --port 9000
+#     python render_daemon.py --formats svg --debounce 0.2
+#     python render_daemon.py --poll 0.5               # sin inotify (NFS, Docker en macOS)
+#     python render_daemon.py uber_*.py --bench 5      # intérprete nuevo vs worker caliente
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import multiprocessing
+import os
+import pickle
+import queue
+import re
+import select
+import signal
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+import build_diagrams
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HOT_FORMATS = ("svg", "png")
+# dot para layouts completos, neato -n2 para los incrementales de topology_diff
+HOT_TOOLS = {"dot": ["dot"], "neato": ["neato", "-n2"]}
+PROBE_GRAPH = b'digraph sonda { a [pos="0,0"]; b [pos="0,100"]; a -> b }\n'
+PROBE_TIMEOUT = 5.0
+RENDER_TIMEOUT = 120.0
+PNG_IEND = b"IEND"
+CONTENT_TYPES = {".png": "image/png", ".svg": "image/svg+xml", ".jpg": "image/jpeg",
+                 ".pdf": "application/pdf", ".json": "application/json"}
+
+
+# ============================================
+# VIGILANCIA DE ARCHIVOS
+# ============================================
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _wanted(name, patterns):
+    # temporales de editores: .#x.py, x.py~, .x.py.swp
+    if name.startswith((".", "#")) or name.endswith("~"):
+        return False
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+class InotifyWatcher:
+    """Eventos de cierre tras escritura y renombrado en un directorio.
+
+    Se vigila el directorio y no cada archivo: los editores que guardan
+    escribiendo un temporal y renombrándolo siguen generando IN_MOVED_TO.
+    """
+
+    def __init__(self, directory, patterns):
+        self.directory = directory
+        self.patterns = patterns
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify no disponible")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory}")
+
+    def poll(self, timeout=None):
+        """Rutas modificadas; espera hasta `timeout` segundos (None = sin límite)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        changed, offset = set(), 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if _wanted(name, self.patterns):
+                changed.add(os.path.join(self.directory, name))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Alternativa sin inotify: compara mtime y tamaño cada `interval` segundos."""
+
+    def __init__(self, directory, patterns, interval=0.5):
+        self.directory = directory
+        self.patterns = patterns
+        self.interval = interval
+        self.seen = self.snapshot()
+
+    def snapshot(self):
+        found = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and _wanted(entry.name, self.patterns):
+                stat = entry.stat()
+                found[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def poll(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self.snapshot()
+            changed = {path for path, stamp in current.items() if self.seen.get(path) != stamp}
+            self.seen = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+
+    def close(self):
+        pass
+
+
+def make_watcher(directory, patterns, interval=None):
+    if interval is None:
+        try:
+            return InotifyWatcher(directory, patterns)
+        except (OSError, AttributeError) as exc:
+            print(f"⚠️  Sin inotify ({exc}): se usa sondeo cada 0.5s")
+            interval = 0.5
+    return PollingWatcher(directory, patterns, interval)
+
+
+def debounced(watcher, quiet):
+    """Espera un cambio y agrupa los siguientes hasta `quiet` segundos de calma.
+
+    Devuelve (rutas, instante del primer evento).
+    """
+    changed = watcher.poll(None)
+    first = time.perf_counter()
+    while True:
+        more = watcher.poll(quiet)
+        if not more:
+            return changed, first
+        changed |= more
+
+
+# ============================================
+# GRAPHVIZ PERSISTENTE
+# ============================================
+
+class HotGraphvizError(RuntimeError):
+    pass
+
+
+def _svg_end(buffer):
+    end = buffer.find(b"</svg>")
+    if end < 0:
+        return None
+    newline = buffer.find(b"\n", end)
+    return end + len(b"</svg>") if newline < 0 else newline + 1
+
+
+def _png_end(buffer):
+    offset = 8
+    while offset + 8 <= len(buffer):
+        length, kind = struct.unpack_from(">I4s", buffer, offset)
+        offset += 12 + length
+        if kind == PNG_IEND:
+            return offset if offset <= len(buffer) else None
+    return None
+
+
+class HotGraphviz:
+    """Proceso `dot -T<formato>` (o `neato -n2`) persistente: un grafo por petición.
+
+    dot lee grafos de stdin uno tras otro y escribe cada imagen al terminar
+    su layout; la respuesta se delimita por el final del documento (SVG) o
+    por el chunk IEND (PNG). Se lee con os.read sobre el descriptor para que
+    un fork del proceso dueño pueda usarlo sin buffers heredados.
+    """
+
+    END = {"svg": _svg_end, "png": _png_end}
+
+    def __init__(self, fmt, tool="dot", cwd=BASE_DIR):
+        self.fmt = fmt
+        self.tool = tool
+        self.cwd = cwd
+        self.proc = None
+
+    def start(self):
+        self.proc = subprocess.Popen(HOT_TOOLS[self.tool] + [f"-T{self.fmt}"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, cwd=self.cwd, bufsize=0)
+        return self
+
+    def stop(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def restart(self):
+        self.stop()
+        return self.start()
+
+    def render(self, source, timeout=RENDER_TIMEOUT):
+        # sin poll(): en el fork del zygote dot no es hijo directo (ECHILD)
+        if self.proc is None:
+            raise HotGraphvizError(f"dot -T{self.fmt} no está en marcha")
+        data = source if isinstance(source, bytes) else source.encode("utf-8")
+        try:
+            self.proc.stdin.write(data if data.endswith(b"\n") else data + b"\n")
+        except BrokenPipeError as exc:
+            raise HotGraphvizError(f"dot -T{self.fmt} cerró la entrada") from exc
+        fd, end = self.proc.stdout.fileno(), self.END[self.fmt]
+        deadline = time.monotonic() + timeout
+        buffer = bytearray()
+        while True:
+            remaining = deadline - time.monotonic()
+            ready, _, _ = select.select([fd], [], [], max(0.0, remaining))
+            if not ready:
+                raise HotGraphvizError(f"dot -T{self.fmt} no respondió en {timeout:.0f}s")
+            chunk = os.read(fd, 256 * 1024)
+            if not chunk:
+                raise HotGraphvizError(f"dot -T{self.fmt} terminó")
+            buffer += chunk
+            size = end(buffer)
+            if size is not None:
+                if size != len(buffer):
+                    raise HotGraphvizError(f"dot -T{self.fmt} devolvió más de una imagen")
+                return bytes(buffer)
+
+
+def start_hot(formats, cwd):
+    """Arranca y prueba un proceso persistente por herramienta y formato.
+
+    Devuelve {"dot:svg": HotGraphviz, ...} sin los que no responden grafo a
+    grafo (dos sondas seguidas: la segunda falla si dot acumula la salida).
+    """
+    hot = {}
+    for tool in HOT_TOOLS:
+        for fmt in formats:
+            engine = HotGraphviz(fmt, tool, cwd)
+            try:
+                engine.start()
+                engine.render(PROBE_GRAPH, timeout=PROBE_TIMEOUT)
+                engine.render(PROBE_GRAPH, timeout=PROBE_TIMEOUT)
+            except (OSError, HotGraphvizError):
+                engine.stop()
+                continue
+            hot[f"{tool}:{fmt}"] = engine
+    return hot
+
+
+# ============================================
+# WORKER CALIENTE (ZYGOTE + FORK POR RENDER)
+# ============================================
+
+def preload():
+    """Importa la pila de render completa; devuelve los segundos invertidos."""
+    started = time.perf_counter()
+    import importlib
+
+    import graphviz  # noqa: F401
+    import diagrams  # noqa: F401
+    import lazy_nodes
+    import render_cache  # noqa: F401
+    import topology  # noqa: F401
+    import topology_diff  # noqa: F401
+
+    for target in sorted(set(lazy_nodes.REGISTRY.values())):
+        importlib.import_module(target.split(":")[0])
+    return time.perf_counter() - started
+
+
+def render_job(job, hot):
+    """Se ejecuta en el fork: renderiza un script con el dot persistente."""
+    import render_cache
+
+    original = render_cache.emit_formats
+    used, broken = [], []
+
+    def emit(source, formats, layout=None, positioned=False):
+        wanted = list(dict.fromkeys(formats))
+        key = f"{'neato' if positioned else 'dot'}:{wanted[0]}"
+        engine = hot.get(key) if len(wanted) == 1 and layout is None else None
+        if engine is not None:
+            try:
+                produced = {wanted[0]: engine.render(source, job["timeout"])}
+                used.append(key)
+                return produced
+            except HotGraphvizError:
+                # el zygote lo reinicia; este render sigue por la vía normal
+                broken.append(key)
+                hot.pop(key)
+        return original(source, formats, layout=layout, positioned=positioned)
+
+    render_cache.emit_formats = emit
+    if job.get("no_cache"):
+        render_cache.RenderCache.get = lambda self, key, outformat: None
+    result = build_diagrams.render_script(job["path"])
+    result["hot"], result["hot_broken"] = used, broken
+    return result
+
+
+def run_forked(job, hot):
+    """Ejecuta render_job en un fork del zygote con límite de tiempo."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            payload = pickle.dumps(render_job(job, hot))
+        except BaseException as exc:
+            payload = pickle.dumps({"error": f"{type(exc).__name__}: {exc}"})
+        with os.fdopen(write_fd, "wb") as fh:
+            fh.write(payload)
+        os._exit(0)
+
+    os.close(write_fd)
+    chunks, deadline, timed_out = [], time.monotonic() + job["timeout"], False
+    with os.fdopen(read_fd, "rb", buffering=0) as fh:
+        while True:
+            ready, _, _ = select.select([fh], [], [], max(0.0, deadline - time.monotonic()))
+            if not ready:
+                timed_out = True
+                os.kill(pid, signal.SIGKILL)
+                break
+            chunk = fh.read(1024 * 1024)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    _, status = os.waitpid(pid, 0)
+    script = os.path.basename(job["path"])
+    base = {"script": script, "ok": False, "renders": [], "imports": [], "output": "",
+            "seconds": job["timeout"], "hot": [], "hot_broken": list(hot)}
+    if timed_out:
+        return dict(base, error=f"sin respuesta en {job['timeout']:.0f}s: proceso terminado")
+    try:
+        result = pickle.loads(b"".join(chunks))
+    except (pickle.UnpicklingError, EOFError):
+        return dict(base, error=f"el proceso de render terminó de forma anómala (estado {status})")
+    if "script" not in result:
+        return dict(base, error=result["error"], seconds=0.0, hot_broken=[])
+    return result
+
+
+def worker_main(conn, directory):
+    """Bucle del zygote: carga la pila una vez y hace un fork por trabajo."""
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    os.chdir(directory)
+    seconds = preload()
+    hot = start_hot(HOT_FORMATS, directory)
+    conn.send({"pid": os.getpid(), "preload": seconds, "hot": sorted(hot)})
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        result = run_forked(job, hot)
+        for key in result.get("hot_broken", []):
+            if key in hot:
+                hot[key].restart()
+        conn.send(result)
+    for engine in hot.values():
+        engine.stop()
+
+
+class WarmWorker:
+    """Lado del demonio: arranca, usa y reinicia el zygote."""
+
+    def __init__(self, directory, timeout=RENDER_TIMEOUT, no_cache=False):
+        self.directory = directory
+        self.timeout = timeout
+        self.no_cache = no_cache
+        self.process = None
+        self.conn = None
+        self.info = {}
+
+    def start(self):
+        # spawn: el demonio tiene hilos (servidor HTTP) y no debe hacer fork
+        context = multiprocessing.get_context("spawn")
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child, self.directory), daemon=True)
+        started = time.perf_counter()
+        self.process.start()
+        child.close()
+        self.info = self.conn.recv()
+        self.info["startup"] = time.perf_counter() - started
+        return self.info
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.process = None
+
+    def restart(self):
+        self.stop()
+        return self.start()
+
+    def render(self, path):
+        job = {"path": path, "timeout": self.timeout, "no_cache": self.no_cache}
+        try:
+            self.conn.send(job)
+            return self.conn.recv()
+        except (EOFError, BrokenPipeError, OSError) as exc:
+            self.restart()
+            return {"script": os.path.basename(path), "ok": False, "renders": [], "imports": [],
+                    "output": "", "seconds": 0.0, "hot": [], "hot_broken": [],
+                    "error": f"el worker se reinició ({type(exc).__name__})"}
+
+
+# ============================================
+# VISTA PREVIA (HTTP + SSE)
+# ============================================
+
+PAGE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Vista previa de diagramas</title>
+<style>
+  html, body { margin: 0; height: 100%; font-family: sans-serif; background: #fafafa; }
+  body { display: flex; }
+  nav { width: 260px; overflow: auto; border-right: 1px solid #ddd; background: #fff; font-size: 13px; }
+  nav div { padding: 8px 10px; cursor: pointer; border-bottom: 1px solid #eee; }
+  nav div.activo { background: #E3F2FD; }
+  nav small { display: block; color: #777; }
+  main { flex: 1; overflow: auto; padding: 12px; }
+  main img, main svg { max-width: 100%; height: auto; }
+  pre.error { color: #B71C1C; background: #FFEBEE; padding: 10px; white-space: pre-wrap; }
+  #estado { position: fixed; right: 8px; bottom: 8px; font-size: 12px; color: #555; background: #fffc; padding: 4px 8px; }
+</style>
+</head>
+<body>
+<nav id="lista"></nav>
+<main id="vista"><p>Esperando el primer render…</p></main>
+<div id="estado">conectando…</div>
+<script>
+const renders = new Map();
+let selected = null;
+
+function show(name) {
+  selected = name;
+  const ev = renders.get(name), view = document.getElementById("vista");
+  document.querySelectorAll("nav div").forEach(d => d.classList.toggle("activo", d.dataset.name === name));
+  if (!ev.ok) { view.innerHTML = ""; const pre = document.createElement("pre"); pre.className = "error"; pre.textContent = ev.error; view.appendChild(pre); return; }
+  const image = ev.images.find(i => i.endsWith(".svg")) || ev.images.find(i => i.endsWith(".png")) || ev.images[0];
+  if (!image) { view.innerHTML = "<p>El script no generó imágenes.</p>"; return; }
+  const url = image + "?v=" + ev.version;
+  // el SVG se inserta en la página para que carguen sus iconos
+  if (image.endsWith(".svg")) fetch(url).then(r => r.text()).then(t => { if (selected === name) view.innerHTML = t; });
+  else view.innerHTML = '<img src="' + url + '">';
+}
+function list() {
+  const nav = document.getElementById("lista");
+  nav.innerHTML = "";
+  for (const [name, ev] of renders) {
+    const item = document.createElement("div");
+    item.dataset.name = name;
+    item.innerHTML = (ev.ok ? "✅ " : "❌ ") + name + "<small>" + ev.seconds.toFixed(2) + " s · " + ev.when + "</small>";
+    item.onclick = () => show(name);
+    nav.appendChild(item);
+  }
+}
+const events = new EventSource("/eventos");
+events.onopen = () => document.getElementById("estado").textContent = "conectado";
+events.onerror = () => document.getElementById("estado").textContent = "reconectando…";
+events.onmessage = e => {
+  const ev = JSON.parse(e.data);
+  renders.set(ev.script, ev);
+  list();
+  show(ev.script);
+};
+</script>
+</body>
+</html>
+"""
+
+_HREF_RE = re.compile(rb'xlink:href="(/[^"]+)"')
+
+
+class Preview:
+    """Estado de la vista previa y difusión de eventos a los clientes SSE."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latest = {}
+        self.files = {}
+        self.icons = set()
+        self.clients = []
+        self.version = 0
+
+    def publish(self, result, directory):
+        images = []
+        for entry in result.get("renders", []):
+            path = os.path.join(directory, entry["filename"])
+            name = os.path.basename(path)
+            if path.endswith(".svg") and os.path.exists(path):
+                # el SVG de Graphviz enlaza los iconos por ruta absoluta
+                with open(path, "rb") as fh:
+                    icons = {href.decode() for href in _HREF_RE.findall(fh.read())}
+                with self.lock:
+                    self.icons.update(icons)
+            with self.lock:
+                self.files[name] = path
+            images.append(f"/salida/{name}")
+        with self.lock:
+            self.version += 1
+            event = {"script": result["script"], "ok": result["ok"], "error": result.get("error") or "",
+                     "seconds": result["seconds"], "images": images, "version": self.version,
+                     "when": time.strftime("%H:%M:%S")}
+            self.latest[result["script"]] = event
+            clients = list(self.clients)
+        for client in clients:
+            client.put(event)
+
+    def subscribe(self):
+        client = queue.Queue()
+        with self.lock:
+            self.clients.append(client)
+            for event in self.latest.values():
+                client.put(event)
+        return client
+
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.remove(client)
+
+
+def make_handler(preview):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = unquote(urlparse(self.path).path)
+            if path == "/":
+                self.send_bytes(PAGE.encode("utf-8"), "text/html; charset=utf-8")
+            elif path == "/eventos":
+                self.stream(preview.subscribe())
+            elif path.startswith("/salida/") and path[len("/salida/"):] in preview.files:
+                self.send_file(preview.files[path[len("/salida/"):]])
+            elif path in preview.icons:
+                self.send_file(path)
+            else:
+                self.send_error(404)
+
+        def send_bytes(self, data, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_file(self, path):
+            try:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+            except OSError:
+                self.send_error(404)
+                return
+            self.send_bytes(data, CONTENT_TYPES.get(os.path.splitext(path)[1], "application/octet-stream"))
+
+        def stream(self, client):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            try:
+                while True:
+                    try:
+                        event = client.get(timeout=15)
+                        message = f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+                    except queue.Empty:
+                        message = ": latido\n\n"
+                    self.wfile.write(message.encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                preview.unsubscribe(client)
+
+    return Handler
+
+
+def serve(preview, host, port):
+    server = ThreadingHTTPServer((host, port), make_handler(preview))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ============================================
+# BUCLE PRINCIPAL
+# ============================================
+
+def report(result, started=None):
+    status = "✅" if result["ok"] else "❌"
+    outputs = ", ".join(os.path.basename(r["filename"]) + (" (caché)" if r["hit"] else "")
+                        for r in result["renders"]) or "sin salida"
+    hot = f" · graphviz caliente: {', '.join(result['hot'])}" if result.get("hot") else ""
+    loop = f" · edición→imagen {time.perf_counter() - started:.2f}s" if started is not None else ""
+    print(f"{status} {result['script']} → {outputs} en {result['seconds']:.2f}s{hot}{loop}", flush=True)
+    if not result["ok"]:
+        print("    " + result["error"].strip().replace("\n", "\n    "), flush=True)
+
+
+def watch(args, directory, worker, preview):
+    patterns = args.patterns or ["*.py"]
+    scripts = build_diagrams.discover(directory, patterns)
+    # un diagrama con un error de sintaxis a medio editar sigue siendo diagrama
+    known = set(build_diagrams.discover(directory))
+    shown = []
+    for path in scripts:
+        result = worker.render(path)
+        report(result)
+        preview.publish(result, directory)
+        shown.append(path)
+
+    watcher = make_watcher(directory, ["*.py"], args.poll)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else f"sondeo cada {watcher.interval}s"
+    print(f"👀 Vigilando {directory}/*.py ({kind}, debounce {args.debounce}s) · Ctrl+C para salir", flush=True)
+    try:
+        while True:
+            changed, started = debounced(watcher, args.debounce)
+            changed = sorted(path for path in changed if os.path.exists(path))
+            known.update(p for p in changed if build_diagrams.is_diagram_script(p))
+            targets = [p for p in changed if p in known
+                       and any(fnmatch.fnmatch(os.path.basename(p), pattern) for pattern in patterns)]
+            helpers = [p for p in changed if p not in known]
+            if helpers:
+                names = ", ".join(os.path.basename(p) for p in helpers)
+                info = worker.restart()
+                print(f"🔁 {names} cambió: worker reiniciado en {info['startup']:.2f}s", flush=True)
+                targets = list(dict.fromkeys(targets + shown))
+            for path in targets:
+                result = worker.render(path)
+                preview.publish(result, directory)
+                report(result, started)
+                if path not in shown:
+                    shown.append(path)
+    finally:
+        watcher.close()
+
+
+def bench(args, directory, worker):
+    """Intérprete nuevo (como ejecutar el script a mano) frente al worker caliente."""
+    paths = build_diagrams.discover(directory, args.patterns or ["*.py"])
+    print(f"\n{'Diagrama':<32} {'en frío':>9} {'caliente':>9} {'p50':>7} {'máx':>7}")
+    print("-" * 70)
+    for path in paths:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = dict(os.environ, DIAGRAMS_CACHE_DIR=cache_dir)
+            started = time.perf_counter()
+            subprocess.run([sys.executable, path], cwd=os.path.dirname(path), env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            cold = time.perf_counter() - started
+        times, failed = [], None
+        for _ in range(args.bench):
+            started = time.perf_counter()
+            result = worker.render(path)
+            times.append(time.perf_counter() - started)
+            if not result["ok"]:
+                failed = result["error"]
+                break
+        name = os.path.basename(path)
+        if failed:
+            print(f"{name:<32} {cold:>8.2f}s  ❌ {failed.strip().splitlines()[-1]}")
+            continue
+        print(f"{name:<32} {cold:>8.2f}s {times[0]:>8.2f}s {statistics.median(times):>6.2f}s {max(times):>6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Demonio de render en caliente con vista previa")
+    parser.add_argument("patterns", nargs="*", help="scripts a renderizar (glob relativo a --dir; por defecto *.py)")
+    parser.add_argument("--dir", default=BASE_DIR, help="directorio vigilado (por defecto assets/)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--debounce", type=float, default=0.1, help="segundos de calma antes de renderizar")
+    parser.add_argument("--poll", type=float, default=None, help="sondeo cada N segundos en lugar de inotify")
+    parser.add_argument("--formats", help="formatos de salida (p. ej. svg); por defecto los de cada script")
+    parser.add_argument("--timeout", type=float, default=RENDER_TIMEOUT, help="segundos máximos por render")
+    parser.add_argument("--bench", type=int, metavar="N",
+                        help="mide N renders en caliente (sin caché) frente a un intérprete nuevo y sale")
+    args = parser.parse_args()
+
+    if args.formats:
+        # El zygote hereda el entorno; CachedDiagram lo consulta al renderizar
+        os.environ["DIAGRAMS_FORMATS"] = args.formats
+    directory = os.path.abspath(args.dir)
+    worker = WarmWorker(directory, timeout=args.timeout, no_cache=bool(args.bench))
+    info = worker.start()
+    hot = ", ".join(info["hot"]) or "no disponible (render normal)"
+    print(f"🔥 Worker caliente (pid {info['pid']}) listo en {info['startup']:.2f}s: "
+          f"imports {info['preload']:.2f}s · graphviz persistente: {hot}", flush=True)
+
+    try:
+        if args.bench:
+            bench(args, directory, worker)
+            return 0
+        preview = Preview()
+        server = serve(preview, args.host, args.port)
+        print(f"🌐 Vista previa en http://{args.host}:{server.server_address[1]}/", flush=True)
+        watch(args, directory, worker, preview)
+    except KeyboardInterrupt:
+        print("\n👋 Demonio detenido")
+    finally:
+        worker.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
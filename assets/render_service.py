@@ -0,0 +1,524 @@
+# render_service.py
+# Servicio HTTP local de render de topologías.
+#
+# Otros equipos (p. ej. el dashboard del frontend) envían la especificación
+# de topology.py (la misma que construyen los scripts de assets/, ver
+# `python topology.py export`) y reciben la imagen sin instalar Graphviz:
+#   - POST /render?format=png|svg con la especificación JSON en el cuerpo
+#   - GET  /render/<digest>.<formato> para volver a pedir un render ya hecho
+#     (la respuesta del POST lo indica en la cabecera Location)
+#   - GET  /metrics: profundidad de la cola, renders en curso, aciertos,
+#     peticiones fusionadas y percentiles del tiempo de render y de respuesta
+# La clave es topology.spec_digest de la especificación sin los campos que no
+# cambian la imagen (filename, outformat, show). Las imágenes se guardan en
+# un RenderCache propio (LRU por mtime y limitado en tamaño, ver
+# render_cache.py), así el mismo diagrama de DeliMasa o de Uber sale de
+# disco sin tocar el pool. Peticiones idénticas simultáneas se fusionan en un
+# único render. Los renders corren en un pool de procesos acotado (cada
+# worker importa la pila de diagrams una vez) y la cola de espera también
+# está acotada: si se llena se responde 503 con Retry-After. Un render que
+# supera --timeout sigue ocupando su worker hasta que termina y, mientras,
+# cuenta como un hueco más de la cola.
+# La especificación llega de fuera: los atributos de grafo, nodo y arista se
+# limitan a claves de presentación (sin image, shapefile, fontpath...) y no
+# se aceptan etiquetas HTML de Graphviz (<IMG SRC=...> lee ficheros locales).
+# Sin --cors no se envía Access-Control-Allow-Origin.
+#
+# Uso:
+#     python render_service.py serve --port 8770 --workers 2
+#     python render_service.py serve --prewarm delimasa_aws_diagram.py,uber_architecture_aws.py
+#     python render_service.py serve --cors http://localhost:8080   # frontend en `npm run dev`
+#     python render_service.py request delimasa_aws_diagram.py -o delimasa.svg --format svg
+#     python render_service.py request uber_architecture_aws.py --concurrency 8   # fusión y caché
+#     curl -s -X POST --data-binary @delimasa.json "http://127.0.0.1:8770/render?format=png" -o d.png
+#     curl -s http://127.0.0.1:8770/metrics
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import lazy_nodes
+import topology
+from load_test import HdrHistogram
+from render_cache import RenderCache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_CACHE_DIR = os.path.join(BASE_DIR, ".render_service")
+
+FORMATS = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf", "jpg": "image/jpeg"}
+# No cambian la imagen: fuera de la clave
+VOLATILE_FIELDS = ("filename", "outformat", "show")
+MAX_SPEC_BYTES = 2 * 1024 * 1024
+# Únicas claves de graph_attr/node_attr/edge_attr y "attrs" que se pasan a
+# Graphviz: las que solo cambian el aspecto
+PRESENTATION_ATTRS = frozenset({
+    "label", "xlabel", "headlabel", "taillabel", "tooltip", "labelloc", "labeljust",
+    "color", "fillcolor", "bgcolor", "fontcolor", "pencolor", "labelfontcolor",
+    "fontsize", "fontname", "labelfontsize", "labelfontname",
+    "style", "penwidth", "peripheries", "shape", "width", "height", "fixedsize", "margin",
+    "pad", "splines", "nodesep", "ranksep", "rankdir", "ratio", "concentrate", "compound",
+    "dir", "arrowhead", "arrowtail", "arrowsize", "constraint", "minlen", "weight",
+    "group", "rank", "center", "newrank",
+})
+
+
+class SpecError(ValueError):
+    """Especificación que no se puede renderizar (respuesta 400)."""
+
+
+def check_value(where, value):
+    if not isinstance(value, (str, int, float, bool)):
+        raise SpecError(f"{where}: se esperaba texto o número, no {type(value).__name__}")
+    # graphviz pasa "<...>" sin comillas: sería una etiqueta HTML
+    if isinstance(value, str) and value.strip().startswith("<") and value.strip().endswith(">"):
+        raise SpecError(f"{where}: no se admiten etiquetas HTML de Graphviz")
+
+
+def check_attrs(where, attrs):
+    if attrs is None:
+        return
+    if not isinstance(attrs, dict):
+        raise SpecError(f"{where}: se esperaba un objeto")
+    rejected = sorted(key for key in attrs if key not in PRESENTATION_ATTRS)
+    if rejected:
+        raise SpecError(f"{where}: atributos no permitidos: {', '.join(map(str, rejected))}")
+    for key, value in attrs.items():
+        check_value(f"{where}.{key}", value)
+
+
+def check_presentation(spec):
+    """Solo atributos de aspecto: la especificación llega de otros equipos."""
+    attr_fields = ("graph_attr", "node_attr", "edge_attr")
+    for field in attr_fields:
+        check_attrs(field, spec.get(field))
+    # name es la etiqueta del grafo: también puede ser una etiqueta HTML
+    for field, value in spec.items():
+        if field not in attr_fields and field not in ("nodes", "edges", "clusters"):
+            check_value(field, value)
+    for group, attr_fields in (("clusters", ("graph_attr",)), ("nodes", ("attrs",)),
+                               ("edges", ("attrs",))):
+        items = spec.get(group) or []
+        if not isinstance(items, list):
+            raise SpecError(f'"{group}" debe ser una lista')
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise SpecError(f"{group}[{i}]: se esperaba un objeto")
+            for field in attr_fields:
+                check_attrs(f"{group}[{i}].{field}", item.get(field))
+            for field in ("label", "style", "color"):
+                if field in item:
+                    check_value(f"{group}[{i}].{field}", item[field])
+
+
+def normalize(spec):
+    """Especificación sin campos volátiles, validada contra el modelo compilado."""
+    if not isinstance(spec, dict) or not isinstance(spec.get("nodes"), list):
+        raise SpecError('se esperaba un objeto JSON con "nodes", "edges" y "clusters"')
+    clean = {key: value for key, value in spec.items() if key not in VOLATILE_FIELDS}
+    check_presentation(clean)
+    unknown = sorted({node.get("kind") for node in clean["nodes"]} - set(lazy_nodes.REGISTRY))
+    if unknown:
+        raise SpecError(f"tipos de nodo desconocidos: {', '.join(map(str, unknown))}")
+    try:
+        topology.compile_spec(clean)
+    except (KeyError, ValueError, TypeError) as exc:
+        raise SpecError(f"especificación inválida: {type(exc).__name__}: {exc}") from exc
+    return clean
+
+
+def spec_key(spec):
+    return topology.spec_digest(spec)
+
+
+# ============================================
+# WORKERS
+# ============================================
+
+def warm_worker():
+    # Sin posiciones de renders anteriores: la misma clave da la misma imagen
+    os.environ["DIAGRAMS_FULL_LAYOUT"] = "1"
+    import render_daemon
+
+    render_daemon.preload()
+
+
+def render_spec(spec, fmt, key, cache_root, max_bytes):
+    """Se ejecuta en el worker: renderiza y guarda en la caché del servicio."""
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        target = os.path.join(tmp, "render_service")
+        job = dict(spec, filename=target, outformat=fmt, show=False)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            topology.render(job)
+        with open(f"{target}.{fmt}", "rb") as fh:
+            data = fh.read()
+    path = RenderCache(root=cache_root, max_bytes=max_bytes, max_age=None).put(key, fmt, data)
+    return path, time.perf_counter() - started
+
+
+class Job:
+    def __init__(self, key, fmt, spec):
+        self.key = key
+        self.fmt = fmt
+        self.spec = spec
+        self.done = threading.Event()
+        self.path = None
+        self.error = None
+
+
+# ============================================
+# SERVICIO
+# ============================================
+
+class RenderService:
+    """Caché, fusión de peticiones idénticas, cola acotada y pool de procesos.
+
+    Un hilo despachador por worker saca trabajos de la cola y espera su
+    render; así la profundidad de la cola es exactamente lo que aún no tiene
+    worker asignado. Si el render vence, el cliente recibe el error pero el
+    despachador no toma otro trabajo hasta que el proceso acaba: el render
+    vencido sigue en `overdue` y ocupa un hueco de la cola.
+    """
+
+    def __init__(self, workers=2, max_queue=32, cache_root=SERVICE_CACHE_DIR,
+                 max_bytes=256 * 1024 * 1024, timeout=120.0):
+        self.workers = workers
+        self.timeout = timeout
+        self.cache = RenderCache(root=cache_root, max_bytes=max_bytes, max_age=None)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.running = 0
+        self.overdue = 0
+        self.counters = {"total": 0, "hit": 0, "miss": 0, "coalesced": 0, "rejected": 0,
+                         "invalid": 0, "errors": 0}
+        self.render_time = HdrHistogram()
+        self.response_time = {"hit": HdrHistogram(), "miss": HdrHistogram(), "coalesced": HdrHistogram()}
+        self.started = time.time()
+        for _ in range(workers):
+            threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def _dispatch(self):
+        while True:
+            job = self.queue.get()
+            with self.lock:
+                self.running += 1
+            future = None
+            try:
+                future = self.pool.submit(render_spec, job.spec, job.fmt, job.key,
+                                          self.cache.root, self.cache.max_bytes)
+                job.path, seconds = future.result(timeout=self.timeout)
+                with self.lock:
+                    self.render_time.record(seconds)
+            except FutureTimeout:
+                job.error = f"el render superó {self.timeout:g}s"
+            except Exception as exc:
+                job.error = f"{type(exc).__name__}: {exc}"
+            finally:
+                with self.lock:
+                    # la imagen ya está en disco: quien llegue ahora acierta
+                    self.inflight.pop((job.key, job.fmt), None)
+                    if job.error:
+                        self.counters["errors"] += 1
+                    overdue = future is not None and not future.done()
+                    if overdue:
+                        self.overdue += 1
+                job.done.set()
+            if overdue:
+                # el proceso sigue renderizando: el worker no queda libre
+                with contextlib.suppress(Exception):
+                    future.exception()
+                with self.lock:
+                    self.overdue -= 1
+            with self.lock:
+                self.running -= 1
+
+    def render(self, spec, fmt):
+        """Devuelve (resultado, clave, ruta o error).
+
+        resultado: "hit", "miss", "coalesced", "rejected", "invalid" o "error".
+        """
+        started = time.perf_counter()
+        with self.lock:
+            self.counters["total"] += 1
+        try:
+            clean = normalize(spec)
+        except SpecError as exc:
+            with self.lock:
+                self.counters["invalid"] += 1
+            return "invalid", None, str(exc)
+        key = spec_key(clean)
+
+        with self.lock:
+            job = self.inflight.get((key, fmt))
+            if job is not None:
+                outcome = "coalesced"
+            else:
+                path = self.cache.get(key, fmt)
+                if path is not None:
+                    outcome = "hit"
+                else:
+                    outcome = "miss"
+                    job = Job(key, fmt, clean)
+                    # solo aquí se encola (con el lock): put_nowait no falla
+                    if self.queue.qsize() + self.overdue >= self.queue.maxsize:
+                        self.counters["rejected"] += 1
+                        return "rejected", key, (f"cola llena ({self.queue.qsize()} en espera, "
+                                                 f"{self.overdue} renders vencidos)")
+                    self.queue.put_nowait(job)
+                    self.inflight[(key, fmt)] = job
+            self.counters[outcome] += 1
+
+        if outcome != "hit":
+            if not job.done.wait(self.timeout):
+                return "error", key, f"sin respuesta en {self.timeout:g}s"
+            if job.error:
+                return "error", key, job.error
+            path = job.path
+        with self.lock:
+            self.response_time[outcome].record(time.perf_counter() - started)
+        return outcome, key, path
+
+    def cached(self, key, fmt):
+        with self.lock:
+            return self.cache.get(key, fmt)
+
+    def metrics(self):
+        entries = self.cache.entries()
+
+        def summary(histogram):
+            return {"count": histogram.total,
+                    **{f"p{q}": round(histogram.percentile(q), 2) if histogram.total else None
+                       for q in (50, 90, 99)},
+                    "max": round(histogram.max / 1000, 2) if histogram.total else None}
+
+        with self.lock:
+            lookups = self.counters["hit"] + self.counters["miss"] + self.counters["coalesced"]
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "queue_depth": self.queue.qsize(),
+                "queue_max": self.queue.maxsize,
+                "running": self.running,
+                "overdue": self.overdue,
+                "workers": self.workers,
+                "inflight": len(self.inflight),
+                "requests": dict(self.counters),
+                "hit_ratio": round(self.counters["hit"] / lookups, 4) if lookups else None,
+                "render_ms": summary(self.render_time),
+                "response_ms": {outcome: summary(h) for outcome, h in self.response_time.items()},
+                "cache": {"entries": len(entries), "bytes": sum(size for _, size, _ in entries),
+                          "max_bytes": self.cache.max_bytes, "root": self.cache.root},
+            }
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def make_handler(service, cors):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, status, payload, headers=()):
+            data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.cors()
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_image(self, path, fmt, key, outcome=None):
+            try:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+            except FileNotFoundError:
+                # la LRU respeta lo recién servido (RenderCache.grace): solo
+                # pasa si alguien vacía la caché a mano (render_cache.py --clear)
+                self.send_json(503, {"error": "imagen expulsada de la caché, reintenta"},
+                               headers=[("Retry-After", "1")])
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", FORMATS[fmt])
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("ETag", f'"{key}"')
+            # la URL lleva el digest: el contenido no cambia nunca
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+            self.send_header("Location", f"/render/{key}.{fmt}")
+            if outcome:
+                self.send_header("X-Render-Cache", outcome)
+            self.cors()
+            self.end_headers()
+            self.wfile.write(data)
+
+        def cors(self):
+            if cors:
+                self.send_header("Access-Control-Allow-Origin", cors)
+                self.send_header("Access-Control-Expose-Headers", "Location, ETag, X-Render-Cache")
+
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self.cors()
+            self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+            self.end_headers()
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/metrics":
+                self.send_json(200, service.metrics())
+            elif url.path == "/health":
+                self.send_json(200, {"ok": True})
+            elif url.path.startswith("/render/"):
+                key, _, fmt = url.path[len("/render/"):].partition(".")
+                path = service.cached(key, fmt) if fmt in FORMATS and len(key) == 64 else None
+                if path is None:
+                    self.send_json(404, {"error": "no está en caché: usa POST /render"})
+                elif self.headers.get("If-None-Match") == f'"{key}"':
+                    self.send_response(304)
+                    self.cors()
+                    self.end_headers()
+                else:
+                    self.send_image(path, fmt, key)
+            else:
+                self.send_json(404, {"error": "rutas: POST /render, GET /render/<digest>.<formato>, GET /metrics"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/render":
+                self.send_json(404, {"error": "usa POST /render?format=png"})
+                return
+            fmt = parse_qs(url.query).get("format", ["png"])[0]
+            if fmt not in FORMATS:
+                self.send_json(400, {"error": f"formato no soportado: {fmt} ({', '.join(FORMATS)})"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_SPEC_BYTES:
+                self.send_json(413, {"error": f"especificación mayor de {MAX_SPEC_BYTES // 1024} KB"})
+                return
+            try:
+                spec = json.loads(self.rfile.read(length) or b"null")
+            except ValueError as exc:
+                self.send_json(400, {"error": f"JSON inválido: {exc}"})
+                return
+            outcome, key, result = service.render(spec, fmt)
+            if outcome == "invalid":
+                self.send_json(400, {"error": result})
+            elif outcome == "rejected":
+                self.send_json(503, {"error": result}, headers=[("Retry-After", "2")])
+            elif outcome == "error":
+                self.send_json(500, {"error": result, "digest": key})
+            else:
+                self.send_image(result, fmt, key, outcome)
+
+    return Handler
+
+
+# ============================================
+# CLIENTE
+# ============================================
+
+def post_spec(url, spec, fmt):
+    body = json.dumps(spec, ensure_ascii=False).encode("utf-8")
+    request = urllib.request.Request(f"{url}/render?format={fmt}", data=body, method="POST",
+                                     headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            data = response.read()
+            return response.status, response.headers.get("X-Render-Cache"), data, time.perf_counter() - started
+    except urllib.error.HTTPError as exc:
+        return exc.code, None, exc.read(), time.perf_counter() - started
+
+
+def request_command(args):
+    spec = topology.load_spec(args.source, static=args.source.endswith(".py"))
+    url = args.url.rstrip("/")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: post_spec(url, spec, args.format), range(args.concurrency)))
+    for status, outcome, data, seconds in results:
+        detail = outcome if status == 200 else data.decode("utf-8", "replace").strip()
+        print(f"{'✅' if status == 200 else '❌'} {status} {seconds * 1000:8.1f} ms  {detail}")
+    ok = [data for status, _, data, _ in results if status == 200]
+    if ok and args.output:
+        with open(args.output, "wb") as fh:
+            fh.write(ok[0])
+        print(f"💾 {args.output} ({len(ok[0]) / 1024:,.0f} KB)")
+    return 0 if len(ok) == len(results) else 1
+
+
+def serve_command(args):
+    service = RenderService(workers=args.workers, max_queue=args.max_queue, cache_root=args.cache_dir,
+                            max_bytes=int(args.cache_mb * 1024 * 1024), timeout=args.timeout)
+    for source in filter(None, (args.prewarm or "").split(",")):
+        path = source if os.path.isabs(source) or os.path.exists(source) else os.path.join(BASE_DIR, source)
+        spec = topology.load_spec(path, static=path.endswith(".py"))
+        for fmt in args.formats.split(","):
+            outcome, _, result = service.render(spec, fmt)
+            print(f"🔥 {os.path.basename(path)} ({fmt}): {outcome}"
+                  + (f" · {result}" if outcome in ("invalid", "error") else ""), flush=True)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.cors))
+    server.daemon_threads = True
+    print(f"🌐 Servicio de render en http://{args.host}:{server.server_address[1]}/ · "
+          f"{args.workers} workers · cola máx. {args.max_queue} · caché {args.cache_mb:.0f} MB en {args.cache_dir}",
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servicio detenido")
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de render de topologías")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="arranca el servicio")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8770)
+    serve.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="procesos de render")
+    serve.add_argument("--max-queue", type=int, default=32, help="renders en espera antes de responder 503")
+    serve.add_argument("--cache-dir", default=SERVICE_CACHE_DIR)
+    serve.add_argument("--cache-mb", type=float, default=256, help="tamaño máximo de la caché (LRU)")
+    serve.add_argument("--timeout", type=float, default=120.0, help="segundos máximos por render")
+    serve.add_argument("--cors", default="",
+                       help="origen permitido en Access-Control-Allow-Origin, p. ej. http://localhost:8080 "
+                            "(por defecto ninguno)")
+    serve.add_argument("--prewarm", help="scripts o .json a renderizar al arrancar, separados por comas")
+    serve.add_argument("--formats", default="png,svg", help="formatos del precalentamiento")
+
+    request = sub.add_parser("request", help="envía la especificación de un script o .json al servicio")
+    request.add_argument("source", help="script .py, .json o .topo")
+    request.add_argument("--url", default="http://127.0.0.1:8770")
+    request.add_argument("--format", default="png", choices=sorted(FORMATS))
+    request.add_argument("--concurrency", type=int, default=1, help="peticiones idénticas simultáneas")
+    request.add_argument("-o", "--output", help="guarda la imagen recibida")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        return serve_command(args)
+    return request_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+# sharded_render.py
+# Render por shards: un sub-diagrama por cluster de primer nivel, en
+# paralelo, más un diagrama resumen que enlaza con ellos.
+#
+# Un único layout de Graphviz de toda la arquitectura crece de forma
+# superlineal con el número de nodos y produce imágenes ilegibles. Aquí la
+# especificación (topology.load_spec) se parte por cluster de primer nivel:
+#   - cada shard lleva el cluster completo (subclusters incluidos) y sus
+#     aristas internas
+#   - una arista que sale o entra del cluster se dibuja contra un nodo
+#     "puerto" (el nodo externo, con el nombre de su cluster) que en SVG
+#     enlaza con el shard donde vive ese nodo
+#   - el resumen tiene un nodo por cluster (con el icono más frecuente del
+#     cluster y el número de nodos), los nodos sueltos del nivel raíz y una
+#     arista por par de clusters conectados con el número de conexiones;
+#     en SVG cada cluster enlaza con su shard
+# Los shards se renderizan en un pool de procesos con la caché de render
+# habitual, así el tiempo total lo marca el cluster más grande y no el total.
+#
+# Uso:
+#     python sharded_render.py
+#     python sharded_render.py uber_architecture_aws.py -j 4 --formats png,svg
+#     python sharded_render.py delimasa_aws_diagram.py --out-dir docs/arquitectura --dry-run
+
+import argparse
+import collections
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import topology
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = os.path.join(BASE_DIR, "delimasa_aws_diagram.py")
+
+OVERVIEW = "resumen"
+PORT_ATTRS = {"shape": "cds", "style": "filled", "fillcolor": "#E3F2FD", "color": "#1565C0",
+              "fontcolor": "#0D47A1", "fontsize": "11", "height": "0.6", "width": "2.2",
+              "labelloc": "c", "imagescale": "false"}
+
+
+def slug(text):
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_") or "cluster"
+
+
+# ============================================
+# PARTICIÓN
+# ============================================
+
+def _owners(spec):
+    """Cluster de primer nivel de cada nodo (None = raíz) y etiquetas de cluster."""
+    clusters = {c["id"]: c for c in spec.get("clusters", [])}
+
+    def top(cluster_id):
+        while cluster_id is not None and clusters[cluster_id].get("parent") is not None:
+            cluster_id = clusters[cluster_id]["parent"]
+        return cluster_id
+
+    owner = {node["id"]: top(node.get("cluster")) for node in spec["nodes"]}
+    return owner, clusters, top
+
+
+def shard_names(spec):
+    """Nombre de archivo (slug) de cada cluster de primer nivel, sin colisiones."""
+    names, used = {}, {OVERVIEW}
+    for cluster in spec.get("clusters", []):
+        if cluster.get("parent") is None:
+            base = name = slug(cluster.get("label") or cluster["id"])
+            n = 2
+            while name in used:
+                name, n = f"{base}_{n}", n + 1
+            used.add(name)
+            names[cluster["id"]] = name
+    return names
+
+
+def _base(spec, filename, formats):
+    keep = ("name", "direction", "curvestyle", "autolabel", "strict", "graph_attr", "node_attr", "edge_attr")
+    base = {key: spec[key] for key in keep if key in spec}
+    base.update(filename=filename, outformat=formats, show=False)
+    return base
+
+
+def _one_line(label):
+    return " ".join(label.split())
+
+
+def split(spec, out_dir, formats):
+    """Especificaciones de los shards y del resumen."""
+    owner, clusters, top = _owners(spec)
+    names = shard_names(spec)
+    nodes = {node["id"]: node for node in spec["nodes"]}
+    link_format = "svg"
+
+    def link(cluster_id):
+        return f"{names[cluster_id] if cluster_id is not None else OVERVIEW}.{link_format}"
+
+    shards = {}
+    for cluster_id, name in names.items():
+        shard = _base(spec, os.path.join(out_dir, name), formats)
+        label = clusters[cluster_id].get("label") or cluster_id
+        shard["name"] = f"{spec.get('name', '')} · {_one_line(label)}".strip(" ·")
+        shard["clusters"] = [c for c in spec.get("clusters", []) if top(c["id"]) == cluster_id]
+        shard["nodes"] = [n for n in spec["nodes"] if owner[n["id"]] == cluster_id]
+        shard["edges"] = []
+        shard["ports"] = {}
+        shards[cluster_id] = shard
+
+    for edge in spec["edges"]:
+        src, dst = owner[edge["src"]], owner[edge["dst"]]
+        if src == dst:
+            if src is not None:
+                shards[src]["edges"].append(edge)
+            continue
+        # arista entre clusters: cada extremo agrupado ve un puerto hacia el otro
+        for here, remote, remote_owner in ((src, "dst", dst), (dst, "src", src)):
+            if here is None:
+                continue
+            shard = shards[here]
+            remote_id = edge[remote]
+            port_id = f"puerto__{remote_id}"
+            if port_id not in shard["ports"]:
+                where = _one_line(clusters[remote_owner].get("label") or remote_owner) \
+                    if remote_owner is not None else "raíz"
+                attrs = dict(PORT_ATTRS, URL=link(remote_owner),
+                             tooltip=f"Ir a {where}")
+                shard["ports"][port_id] = {
+                    "id": port_id, "kind": "Blank",
+                    "label": f"{_one_line(nodes[remote_id].get('label') or remote_id)}\n[{where}]",
+                    "cluster": None, "order": len(shard["nodes"]) + len(shard["ports"]), "attrs": attrs}
+            record = dict(edge, **{remote: port_id})
+            record["style"] = edge.get("style") or "dashed"
+            record["color"] = edge.get("color") or PORT_ATTRS["color"]
+            shard["edges"].append(record)
+
+    for shard in shards.values():
+        shard["nodes"] = shard["nodes"] + list(shard.pop("ports").values())
+    return shards, overview(spec, owner, clusters, names, out_dir, formats)
+
+
+def overview(spec, owner, clusters, names, out_dir, formats):
+    """Diagrama resumen: un nodo por cluster de primer nivel y los nodos raíz."""
+    result = _base(spec, os.path.join(out_dir, OVERVIEW), formats)
+    result["name"] = f"{spec.get('name', '')} · resumen".strip(" ·")
+    result["clusters"] = []
+    kinds = collections.defaultdict(collections.Counter)
+    sizes = collections.Counter()
+    for node in spec["nodes"]:
+        if owner[node["id"]] is not None and node["kind"] != "Blank":
+            kinds[owner[node["id"]]][node["kind"]] += 1
+        sizes[owner[node["id"]]] += 1
+    items = []
+    for cluster_id, name in names.items():
+        label = _one_line(clusters[cluster_id].get("label") or cluster_id)
+        kind = kinds[cluster_id].most_common(1)[0][0] if kinds[cluster_id] else "Blank"
+        items.append({"id": f"cluster__{name}", "kind": kind, "label": f"{label}\n({sizes[cluster_id]} nodos)",
+                      "cluster": None, "order": clusters[cluster_id].get("order", 0),
+                      "attrs": {"URL": f"{name}.svg", "tooltip": f"Abrir {label}"}})
+    for node in spec["nodes"]:
+        if owner[node["id"]] is None:
+            items.append(dict(node, cluster=None))
+    result["nodes"] = items
+
+    def endpoint(node_id):
+        cluster_id = owner[node_id]
+        return node_id if cluster_id is None else f"cluster__{names[cluster_id]}"
+
+    grouped = collections.OrderedDict()
+    for edge in spec["edges"]:
+        src, dst = endpoint(edge["src"]), endpoint(edge["dst"])
+        if src == dst:
+            continue
+        grouped.setdefault((src, dst), []).append(edge)
+    edges = []
+    for (src, dst), members in grouped.items():
+        labels = sorted({e["label"] for e in members if e.get("label")})
+        text = f"{len(members)} conexiones" if len(members) > 1 else ""
+        if labels and len(labels) <= 2:
+            text = f"{text}\n{', '.join(labels)}".strip()
+        dirs = {e.get("dir", "forward") for e in members}
+        edges.append({"src": src, "dst": dst, "dir": dirs.pop() if len(dirs) == 1 else "both",
+                      "label": text, "attrs": {"penwidth": f"{min(1 + len(members) / 2, 6):.1f}"}})
+    result["edges"] = edges
+    return result
+
+
+# ============================================
+# RENDER EN PARALELO
+# ============================================
+
+def render_part(spec):
+    """Renderiza una especificación en el worker; devuelve tiempos y archivos."""
+    import render_cache
+
+    del render_cache.render_log[:]
+    output = io.StringIO()
+    started = time.perf_counter()
+    error = None
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            topology.render(spec)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    return {"filename": spec["filename"], "nodes": len(spec["nodes"]), "edges": len(spec["edges"]),
+            "seconds": time.perf_counter() - started, "error": error,
+            "hits": sum(entry["hit"] for entry in render_cache.render_log),
+            "files": [entry["filename"] for entry in render_cache.render_log]}
+
+
+def render_all(specs, jobs=None):
+    results = []
+    if jobs == 1:
+        return [render_part(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(render_part, spec) for spec in specs]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
+
+
+def print_summary(results, wall):
+    print(f"\n{'Parte':<40} {'nodos':>6} {'aristas':>8} {'tiempo':>8}")
+    print("-" * 66)
+    for row in sorted(results, key=lambda r: -r["seconds"]):
+        name = os.path.basename(row["filename"])
+        status = "❌ " + row["error"] if row["error"] else ("♻️  caché" if row["files"] and row["hits"] == len(row["files"]) else "✅")
+        print(f"{name:<40} {row['nodes']:>6} {row['edges']:>8} {row['seconds']:>7.2f}s  {status}")
+    largest = max(results, key=lambda r: r["nodes"])
+    print(f"\n⏱️  {len(results)} partes en {wall:.2f}s · shard más grande: "
+          f"{os.path.basename(largest['filename'])} ({largest['nodes']} nodos)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render por cluster de primer nivel con diagrama resumen")
+    parser.add_argument("source", nargs="?", default=DEFAULT_SCRIPT, help="script .py, .json o .topo")
+    parser.add_argument("--out-dir", help="carpeta de salida (por defecto <filename>_shards)")
+    parser.add_argument("--formats", default="png,svg", help="formatos; los enlaces solo funcionan en svg")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="procesos (por defecto uno por núcleo)")
+    parser.add_argument("--dry-run", action="store_true", help="escribe las especificaciones JSON sin renderizar")
+    args = parser.parse_args()
+
+    spec = topology.load_spec(args.source, static=args.source.endswith(".py"))
+    out_dir = args.out_dir or f"{spec.get('filename') or 'diagrama'}_shards"
+    os.makedirs(out_dir, exist_ok=True)
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    shards, summary = split(spec, out_dir, formats)
+    if not shards:
+        print("⚠️  El diagrama no tiene clusters de primer nivel: nada que partir")
+        return 1
+    parts = list(shards.values()) + [summary]
+    total = len(spec["nodes"])
+    print(f"🧩 {total} nodos en {len(shards)} shards (el mayor con "
+          f"{max(len(s['nodes']) for s in shards.values())} nodos, puertos incluidos) + resumen")
+
+    if args.dry_run:
+        for part in parts:
+            with open(f"{part['filename']}.json", "w", encoding="utf-8") as f:
+                json.dump(part, f, ensure_ascii=False, indent=2)
+        print(f"💾 Especificaciones en {out_dir}/")
+        return 0
+
+    started = time.perf_counter()
+    results = render_all(parts, args.jobs)
+    print_summary(results, time.perf_counter() - started)
+    print(f"📂 Abre {os.path.join(out_dir, OVERVIEW)}.svg para navegar por los shards")
+    return 1 if any(row["error"] for row in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+# size_optimizer.py
+# Etapa posterior al render que reduce el tamaño de los PNG y SVG de assets/.
+#
+# SVG: Graphviz escribe un <image> por nodo que apunta al PNG del icono en la
+# instalación de diagrams, así que el SVG no es portable, y al incrustar los
+# iconos cada Lambda o S3 repetiría el mismo PNG en base64. Aquí cada icono
+# distinto se define una sola vez en <defs> como <symbol> (con el PNG del
+# icono recomprimido) y cada nodo lo referencia con <use>.
+#
+# PNG (decodificado con el lector por filas de tile_pyramid.py):
+#   - canal alfa eliminado si es opaco en toda la imagen
+#   - paleta exacta si hay <= 256 colores (sin pérdida)
+#   - si hay más, cuantización a 256 colores: los colores que ocupan más del
+#     0,1 % de la imagen se conservan exactos y el resto se agrupa (k-medias
+#     ponderado); se descarta si el PSNR queda por debajo de --min-psnr
+#   - filtro por fila elegido como libpng (mínima suma de valores absolutos)
+#     y deflate al máximo con varias estrategias; sin fragmentos auxiliares
+# Un archivo solo se reemplaza si el resultado es más pequeño que el
+# original, también en los SVG: si enlazan iconos locales, la versión
+# autocontenida pesa más y no se escribe (el informe la muestra en la
+# columna "incrustado", lo que ocuparía incrustando cada icono en cada nodo).
+# Con --out-dir los archivos que no mejoran se copian tal cual.
+#
+# Uso:
+#     python size_optimizer.py --check                    # solo informe
+#     python size_optimizer.py --in-place                 # optimiza assets/*.png y *.svg
+#     python size_optimizer.py diagrama.svg --out-dir publicar/ --lossless
+
+import argparse
+import base64
+import glob
+import html
+import io
+import json
+import os
+import re
+import shutil
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from tile_pyramid import PNG_SIGNATURE, PngRows
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ANCHOR_SHARE = 0.001            # colores que se conservan exactos al cuantizar
+STRIP_ROWS = 256
+ZLIB_STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+
+
+# ============================================
+# PNG
+# ============================================
+
+def read_png(source):
+    reader = PngRows(source)
+    pixels = np.empty((reader.height, reader.width, reader.channels), dtype=np.uint8)
+    for y, row in enumerate(reader.rows()):
+        pixels[y] = row
+    return pixels
+
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def _deflate(data):
+    best = None
+    for strategy in ZLIB_STRATEGIES:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+        out = compressor.compress(data) + compressor.flush()
+        if best is None or len(out) < len(best):
+            best = out
+    return best
+
+
+def filter_rows(rows, bpp):
+    """Filtro adaptativo por fila (heurística de libpng), por franjas de filas."""
+    height, stride = rows.shape
+    out = np.empty((height, stride + 1), dtype=np.uint8)
+    for y0 in range(0, height, STRIP_ROWS):
+        y1 = min(height, y0 + STRIP_ROWS)
+        x = rows[y0:y1].astype(np.int16)
+        up = np.zeros_like(x)
+        up[1:] = x[:-1]
+        if y0:
+            up[0] = rows[y0 - 1]
+        left = np.zeros_like(x)
+        left[:, bpp:] = x[:, :-bpp]
+        upleft = np.zeros_like(x)
+        upleft[:, bpp:] = up[:, :-bpp]
+        p = left + up - upleft
+        pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - upleft)
+        paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+        candidates = np.stack([x, x - left, x - up, x - ((left + up) >> 1), x - paeth]) & 255
+        signed = np.where(candidates > 127, 256 - candidates, candidates)
+        choice = signed.sum(axis=2).argmin(axis=0)
+        out[y0:y1, 0] = choice
+        out[y0:y1, 1:] = candidates[choice, np.arange(y1 - y0)]
+    return out
+
+
+def encode(pixels=None, indices=None, palette=None):
+    """PNG truecolor (pixels alto×ancho×3|4) o con paleta (indices + palette N×3|4)."""
+    if indices is not None:
+        height, width = indices.shape
+        color, raw = 3, np.concatenate([np.zeros((height, 1), dtype=np.uint8), indices], axis=1)
+    else:
+        height, width, channels = pixels.shape
+        color = 6 if channels == 4 else 2
+        raw = filter_rows(pixels.reshape(height, -1), channels)
+    chunks = [_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color, 0, 0, 0))]
+    if indices is not None:
+        chunks.append(_chunk(b"PLTE", palette[:, :3].astype(np.uint8).tobytes()))
+        if palette.shape[1] == 4 and (palette[:, 3] < 255).any():
+            alpha = palette[:, 3].astype(np.uint8)
+            last = int(np.flatnonzero(alpha < 255)[-1]) + 1
+            chunks.append(_chunk(b"tRNS", alpha[:last].tobytes()))
+    chunks.append(_chunk(b"IDAT", _deflate(raw.tobytes())))
+    chunks.append(_chunk(b"IEND", b""))
+    return PNG_SIGNATURE + b"".join(chunks)
+
+
+def _pack(pixels):
+    channels = pixels.shape[2]
+    flat = pixels.reshape(-1, channels).astype(np.uint32)
+    packed = np.zeros(len(flat), dtype=np.uint32)
+    for c in range(channels):
+        packed |= flat[:, c] << np.uint32(8 * c)
+    return packed
+
+
+def _unpack(packed, channels):
+    return np.stack([(packed >> np.uint32(8 * c)) & 255 for c in range(channels)], axis=1).astype(np.float64)
+
+
+def quantize(colors, counts, size=256, iterations=4):
+    """Paleta de `size` colores para los colores únicos dados (N×canales).
+
+    Devuelve (paleta, índice de paleta de cada color, error cuadrático medio).
+    """
+    total = counts.sum()
+    order = np.argsort(-counts, kind="stable")
+    palette = colors[order[:size]].copy()
+    anchored = counts[order[:size]] >= ANCHOR_SHARE * total
+    for _ in range(iterations + 1):
+        nearest = np.empty(len(colors), dtype=np.int64)
+        for start in range(0, len(colors), 8192):
+            block = colors[start:start + 8192]
+            dist = ((block[:, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+            nearest[start:start + 8192] = dist.argmin(axis=1)
+        weights = np.bincount(nearest, weights=counts, minlength=size)
+        moved = False
+        for c in range(colors.shape[1]):
+            sums = np.bincount(nearest, weights=counts * colors[:, c], minlength=size)
+            centroid = np.where(weights > 0, sums / np.maximum(weights, 1), palette[:, c])
+            new = np.where(anchored, palette[:, c], np.round(centroid))
+            moved |= bool((new != palette[:, c]).any())
+            palette[:, c] = new
+        if not moved:
+            break
+    error = ((colors - palette[nearest]) ** 2).mean(axis=1)
+    return palette, nearest, float((error * counts).sum() / total)
+
+
+def optimize_png(data, lossless=False, min_psnr=40.0):
+    """(bytes optimizados, método) de un PNG; el método describe lo aplicado."""
+    pixels = read_png(io.BytesIO(data))
+    prefix = []
+    if pixels.shape[2] == 4 and (pixels[:, :, 3] == 255).all():
+        pixels = np.ascontiguousarray(pixels[:, :, :3])
+        prefix.append("sin alfa")
+    channels = pixels.shape[2]
+    unique, inverse, counts = np.unique(_pack(pixels), return_inverse=True, return_counts=True)
+    note = []
+    candidates = [(encode(pixels=pixels), ["filtros adaptativos"])]
+    if len(unique) <= 256:
+        indices = inverse.astype(np.uint8).reshape(pixels.shape[:2])
+        candidates.append((encode(indices=indices, palette=_unpack(unique, channels)),
+                           [f"paleta exacta ({len(unique)} colores)"]))
+    elif not lossless:
+        palette, nearest, mse = quantize(_unpack(unique, channels), counts)
+        psnr = 10 * np.log10(255 ** 2 / mse) if mse else float("inf")
+        if psnr >= min_psnr:
+            indices = nearest[inverse].astype(np.uint8).reshape(pixels.shape[:2])
+            candidates.append((encode(indices=indices, palette=palette),
+                               [f"cuantizado {len(unique):,}→256 colores (PSNR {psnr:.1f} dB)"]))
+        else:
+            note.append(f"cuantización descartada (PSNR {psnr:.1f} dB)")
+    best, how = min(candidates, key=lambda item: len(item[0]))
+    return best, ", ".join(prefix + how + note)
+
+
+def optimize_png_bytes(data, lossless=True):
+    """Versión sin informe para los iconos incrustados en SVG; nunca agranda."""
+    try:
+        out, _ = optimize_png(data, lossless=lossless)
+    except ValueError:
+        return data
+    return out if len(out) < len(data) else data
+
+
+# ============================================
+# SVG
+# ============================================
+
+IMAGE_RE = re.compile(r"<image\b([^>]*?)(?:/>|>\s*</image>)", re.S)
+ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*"([^"]*)"')
+SVG_OPEN_RE = re.compile(r"<svg\b[^>]*>", re.S)
+
+
+def _png_size(data):
+    if data[:8] != PNG_SIGNATURE:
+        return None
+    return struct.unpack(">II", data[16:24])
+
+
+def _icon_bytes(href, svg_dir):
+    if href.startswith("data:"):
+        header, _, payload = href.partition(",")
+        return base64.b64decode(payload) if ";base64" in header else None
+    path = href if os.path.isabs(href) else os.path.join(svg_dir, href)
+    try:
+        with open(path, "rb") as fh:
+            return fh.read()
+    except OSError:
+        return None
+
+
+def optimize_svg(text, svg_dir, lossless=True):
+    """(svg, iconos distintos, referencias, tamaño con cada icono incrustado por nodo)."""
+    symbols = {}
+    naive_extra = 0
+    uses = 0
+    missing = set()
+
+    def replace(match):
+        nonlocal naive_extra, uses
+        attrs = dict(ATTR_RE.findall(match.group(1)))
+        href = html.unescape(attrs.get("xlink:href") or attrs.get("href") or "")
+        if href not in symbols:
+            data = _icon_bytes(href, svg_dir)
+            size = _png_size(data) if data else None
+            if size is None:
+                missing.add(href)
+                return match.group(0)
+            optimized = optimize_png_bytes(data, lossless)
+            symbols[href] = {"id": f"icono{len(symbols)}", "size": size, "raw": len(data),
+                             "data": base64.b64encode(optimized).decode("ascii"),
+                             "aspect": attrs.get("preserveAspectRatio", "xMinYMin meet")}
+        symbol = symbols[href]
+        naive_extra += len(base64.b64encode(b"\0" * symbol["raw"]))
+        uses += 1
+        placed = " ".join(f'{key}="{attrs[key]}"' for key in ("x", "y", "width", "height", "transform") if key in attrs)
+        return f'<use xlink:href="#{symbol["id"]}" {placed}/>'
+
+    body = IMAGE_RE.sub(replace, text)
+    if not symbols:
+        return text, 0, 0, len(text.encode("utf-8")), sorted(missing)
+    defs = ["<defs>"]
+    for symbol in symbols.values():
+        width, height = symbol["size"]
+        defs.append(f'<symbol id="{symbol["id"]}" viewBox="0 0 {width} {height}" '
+                    f'preserveAspectRatio="{symbol["aspect"]}"><image width="{width}" height="{height}" '
+                    f'xlink:href="data:image/png;base64,{symbol["data"]}"/></symbol>')
+    defs.append("</defs>")
+    opening = SVG_OPEN_RE.search(body)
+    if opening is None:
+        return text, 0, 0, len(text.encode("utf-8")), sorted(missing)
+    tag = opening.group(0)
+    if "xmlns:xlink" not in tag:
+        tag = tag[:-1] + ' xmlns:xlink="http://www.w3.org/1999/xlink">'
+    body = body[:opening.start()] + tag + "\n" + "\n".join(defs) + body[opening.end():]
+    naive = len(text.encode("utf-8")) + naive_extra
+    return body, len(symbols), uses, naive, sorted(missing)
+
+
+# ============================================
+# CLI
+# ============================================
+
+def process(path, out_path, lossless, min_psnr, write):
+    before = os.path.getsize(path)
+    started = time.perf_counter()
+    row = {"file": os.path.basename(path), "before": before, "inline": None}
+    if path.endswith(".svg"):
+        with open(path, encoding="utf-8") as fh:
+            text = fh.read()
+        result, icons, uses, naive, missing = optimize_svg(text, os.path.dirname(path), lossless=True)
+        data = result.encode("utf-8")
+        row["method"] = f"{icons} iconos en <defs>, {uses} <use>" if icons else "sin iconos que compartir"
+        if icons:
+            # referencia aparte: cada icono incrustado en cada nodo
+            row["inline"] = naive
+        if missing:
+            row["method"] += f" ({len(missing)} iconos no encontrados)"
+    else:
+        with open(path, "rb") as fh:
+            original = fh.read()
+        data, row["method"] = optimize_png(original, lossless, min_psnr)
+    keep = len(data) < before
+    if not keep:
+        if len(data) > before:
+            row["method"] += f"; se deja el original (el resultado ocuparía {len(data) / 1024:,.0f}KB)"
+        data = None
+    row["after"] = len(data) if data is not None else before
+    row["seconds"] = time.perf_counter() - started
+    if write and data is not None:
+        tmp = out_path + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, out_path)
+    elif write and os.path.abspath(out_path) != os.path.abspath(path):
+        # --out-dir: la carpeta de salida queda completa
+        shutil.copyfile(path, out_path)
+    return row
+
+
+def print_report(rows):
+    print(f"\n{'Archivo':<34} {'antes':>10} {'después':>10} {'ahorro':>8} {'incrustado':>11}  método")
+    print("-" * 122)
+    for row in rows:
+        saved = 1 - row["after"] / row["before"] if row["before"] else 0.0
+        inline = f"{row['inline'] / 1024:>9,.0f}KB" if row["inline"] is not None else f"{'-':>11}"
+        print(f"{row['file']:<34} {row['before'] / 1024:>8,.0f}KB {row['after'] / 1024:>8,.0f}KB {saved:>8.1%} "
+              f"{inline}  {row['method']}")
+    before = sum(row["before"] for row in rows)
+    after = sum(row["after"] for row in rows)
+    print("-" * 122)
+    print(f"{'Total':<34} {before / 1024:>8,.0f}KB {after / 1024:>8,.0f}KB {1 - after / max(before, 1):>8.1%}")
+    if any(row["inline"] is not None for row in rows):
+        print("ℹ️  incrustado: el SVG con cada icono en base64 en cada nodo, como lo haría autocontenido "
+              "un render sin <symbol>")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimización de tamaño de los PNG y SVG renderizados")
+    parser.add_argument("files", nargs="*", help="PNG/SVG (por defecto los de assets/)")
+    parser.add_argument("--out-dir", default=os.path.join(BASE_DIR, "optimizado"))
+    parser.add_argument("--in-place", action="store_true", help="reemplaza los archivos originales")
+    parser.add_argument("--check", action="store_true", help="solo informa, no escribe nada")
+    parser.add_argument("--lossless", action="store_true", help="sin cuantización de paleta")
+    parser.add_argument("--min-psnr", type=float, default=40.0, help="calidad mínima de la cuantización (dB)")
+    parser.add_argument("--json", dest="json_out", help="escribe el informe")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(BASE_DIR, "*.png")) + glob.glob(os.path.join(BASE_DIR, "*.svg")))
+    if not args.in_place and not args.check:
+        os.makedirs(args.out_dir, exist_ok=True)
+    rows = []
+    for path in files:
+        out_path = path if args.in_place else os.path.join(args.out_dir, os.path.basename(path))
+        try:
+            rows.append(process(path, out_path, args.lossless, args.min_psnr, write=not args.check))
+        except (OSError, ValueError) as exc:
+            print(f"❌ {os.path.basename(path)}: {exc}")
+    if not rows:
+        return 1
+    print_report(rows)
+    if args.check:
+        print("\nℹ️  --check: no se escribió ningún archivo")
+    elif not args.in_place:
+        print(f"\n📂 Archivos optimizados en {args.out_dir}/")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(rows, fh, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,535 @@
+# stream_processor.py
+# Motor de streaming local para el camino de telemetría de
+# uber_arquitectura_aws.py:
+#   location_service >> kinesis >> location_processor >> dynamodb
+#
+# Productor: conductores que se mueven por la ciudad (City de
+# matching_bench.py) y envían pings. Cada ping va a un shard según el hash
+# de su conductor (clave de partición), como en Kinesis; cada shard acepta
+# hasta shard_write_rps registros/s y el resto se cuenta como throttling.
+#
+# Cada shard guarda los pings en un buffer columnar (conductor u32, instante
+# f64, x/y/velocidad f32: 24 bytes por registro frente a ~120 en JSON) con
+# números de secuencia globales. Un consumidor por shard, como el event
+# source mapping de Lambda, se invoca cuando hay batch_size registros o
+# cuando el más antiguo lleva batching_window_s esperando, y procesa el
+# micro-lote de forma vectorizada:
+#   - última posición conocida de cada conductor (escrituras a DynamoDB)
+#   - densidad de conductores por celda en ventanas fijas de tiempo de
+#     evento, cerradas por una marca de agua (mínimo entre shards - retraso
+#     permitido); los pings que llegan tarde se descartan y se cuentan
+# La duración de cada invocación es invoke_ms + el tiempo de cómputo medido
+# + los BatchWriteItem a DynamoDB. Con eso se obtiene la edad del iterador
+# (IteratorAge) de cada shard y la combinación shards × batch_size a partir
+# de la cual location_processor deja de dar abasto.
+#
+# Los offsets de cada shard, el estado de agregación (ventanas abiertas y
+# emitidas incluidas), la marca de agua y las estadísticas se guardan en
+# --checkpoint (escritura atómica); con --resume el flujo (determinista con
+# --seed) se vuelve a generar hasta el instante del checkpoint sin
+# reprocesarlo y la ejecución sigue como si no se hubiera interrumpido.
+#
+# Uso:
+#     python stream_processor.py
+#     python stream_processor.py --rate 40000 --shards 8,16,32,64 --batch 100,1000,10000
+#     python stream_processor.py --shards 16 --batch 500 --set invoke_ms=40 --set batch_write_ms=15
+#     python stream_processor.py --shards 16 --batch 500 --seed 7 --checkpoint ckpt/ --resume
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import topology
+from matching_bench import City
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIAGRAM = os.path.join(BASE_DIR, "uber_arquitectura_aws.py")
+MODELED_HOPS = (("location_service", "kinesis"), ("kinesis", "location_processor"),
+                ("location_processor", "dynamodb"))
+
+PROCESSOR = {
+    "shard_write_rps": 1000,        # límite de escritura de Kinesis por shard
+    "batching_window_s": 1.0,       # MaximumBatchingWindowInSeconds
+    "invoke_ms": 25.0,              # invocación + GetRecords
+    "batch_write_items": 25,        # BatchWriteItem
+    "batch_write_ms": 8.0,
+    "write_concurrency": 1,         # BatchWriteItem en paralelo por invocación
+    "window_s": 10.0,               # ventana de densidad
+    "lateness_s": 2.0,
+    "cell_m": 500.0,
+    "speed_mps": 8.0,
+}
+TICK_S = 0.05
+COLUMNS = (("driver", np.uint32), ("ts", np.float64), ("x", np.float32), ("y", np.float32), ("speed", np.float32))
+RECORD_BYTES = sum(np.dtype(dtype).itemsize for _, dtype in COLUMNS)
+
+
+# ============================================
+# BUFFER COLUMNAR
+# ============================================
+
+class PingBuffer:
+    """Columnas NumPy de un shard con números de secuencia globales."""
+
+    def __init__(self, capacity=4096):
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMNS}
+        self.base = 0               # secuencia del primer registro guardado
+        self.size = 0
+
+    @property
+    def end(self):
+        return self.base + self.size
+
+    def append(self, batch):
+        n = len(batch["driver"])
+        capacity = len(self.columns["driver"])
+        if self.size + n > capacity:
+            new_capacity = max(capacity * 2, self.size + n)
+            for name, column in self.columns.items():
+                grown = np.empty(new_capacity, dtype=column.dtype)
+                grown[:self.size] = column[:self.size]
+                self.columns[name] = grown
+        for name, column in self.columns.items():
+            column[self.size:self.size + n] = batch[name]
+        self.size += n
+
+    def read(self, start, stop):
+        """Vistas de los registros [start, stop) (secuencias)."""
+        lo, hi = start - self.base, stop - self.base
+        return {name: column[lo:hi] for name, column in self.columns.items()}
+
+    def trim(self, upto):
+        """Descarta lo ya confirmado (compacta cuando ocupa más de la mitad)."""
+        drop = upto - self.base
+        if drop <= 0 or drop < self.size // 2:
+            return
+        for column in self.columns.values():
+            column[:self.size - drop] = column[drop:self.size]
+        self.base, self.size = upto, self.size - drop
+
+
+def partition(drivers, shards):
+    """Shard de cada conductor (hash de la clave de partición)."""
+    h = drivers.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    h ^= h >> np.uint64(31)
+    return (h % np.uint64(shards)).astype(np.int64)
+
+
+# ============================================
+# PRODUCTOR
+# ============================================
+
+class Producer:
+    def __init__(self, drivers, rate, seed, config):
+        self.rng = np.random.default_rng(seed)
+        self.city = City(self.rng)
+        self.rate = rate
+        self.drivers = drivers
+        self.x, self.y = self.city.points(drivers)
+        heading = self.rng.uniform(0, 2 * np.pi, drivers)
+        self.speed = self.rng.normal(config["speed_mps"], 2.0, drivers).clip(0.5)
+        self.vx, self.vy = self.speed * np.cos(heading), self.speed * np.sin(heading)
+        self.last = np.zeros(drivers)
+
+    def tick(self, now, dt):
+        n = self.rng.poisson(self.rate * dt)
+        ids = self.rng.integers(0, self.drivers, n)
+        ts = np.sort(self.rng.uniform(now - dt, now, n))
+        elapsed = np.maximum(ts - self.last[ids], 0.0)
+        self.last[ids] = ts
+        x = np.clip(self.x[ids] + self.vx[ids] * elapsed, 0, self.city.width - 1)
+        y = np.clip(self.y[ids] + self.vy[ids] * elapsed, 0, self.city.height - 1)
+        self.x[ids], self.y[ids] = x, y
+        turn = ids[self.rng.random(n) < 0.05]
+        self.vx[turn], self.vy[turn] = -self.vy[turn], self.vx[turn]
+        return {"driver": ids, "ts": ts, "x": x, "y": y, "speed": self.speed[ids]}
+
+
+# ============================================
+# AGREGACIÓN
+# ============================================
+
+class Aggregator:
+    """Última posición por conductor y densidad por celda en ventanas fijas."""
+
+    def __init__(self, drivers, city, config):
+        self.window = config["window_s"]
+        self.lateness = config["lateness_s"]
+        self.cell = config["cell_m"]
+        self.nx = int(np.ceil(city.width / self.cell))
+        self.ny = int(np.ceil(city.height / self.cell))
+        self.last_ts = np.full(drivers, -np.inf)
+        self.last_x = np.zeros(drivers, dtype=np.float32)
+        self.last_y = np.zeros(drivers, dtype=np.float32)
+        self.open = {}              # ventana -> última celda de cada conductor (-1 = ausente)
+        self.emitted = []
+        self.closed_before = -np.inf
+        self.late = 0
+
+    def process(self, batch):
+        """Procesa un micro-lote; devuelve las escrituras de última posición."""
+        drivers = batch["driver"].astype(np.int64)
+        ts = batch["ts"]
+        # el último registro de cada conductor dentro del lote
+        last = len(drivers) - 1 - np.unique(drivers[::-1], return_index=True)[1]
+        newer = ts[last] > self.last_ts[drivers[last]]
+        update = last[newer]
+        ids = drivers[update]
+        self.last_ts[ids] = ts[update]
+        self.last_x[ids] = batch["x"][update]
+        self.last_y[ids] = batch["y"][update]
+
+        windows = np.floor(ts / self.window).astype(np.int64)
+        on_time = windows > self.closed_before
+        self.late += int((~on_time).sum())
+        cells = (np.minimum((batch["y"] // self.cell).astype(np.int64), self.ny - 1) * self.nx
+                 + np.minimum((batch["x"] // self.cell).astype(np.int64), self.nx - 1))
+        for window in np.unique(windows[on_time]).tolist():
+            rows = np.flatnonzero(windows == window)
+            keep = rows[len(rows) - 1 - np.unique(drivers[rows][::-1], return_index=True)[1]]
+            state = self.open.get(window)
+            if state is None:
+                state = self.open[window] = np.full(len(self.last_ts), -1, dtype=np.int32)
+            state[drivers[keep]] = cells[keep]
+        return len(ids)
+
+    def advance(self, watermark):
+        """Cierra las ventanas que terminan antes de la marca de agua."""
+        limit = np.floor((watermark - self.lateness) / self.window) - 1
+        for window in sorted(w for w in self.open if w <= limit):
+            state = self.open.pop(window)
+            cells = state[state >= 0]
+            density = np.bincount(cells, minlength=self.nx * self.ny)
+            top = int(density.argmax())
+            self.emitted.append({"start_s": window * self.window, "drivers": int(len(cells)),
+                                 "busy_cells": int((density > 0).sum()), "max_cell": top,
+                                 "max_density": int(density[top])})
+            self.closed_before = max(self.closed_before, window)
+
+    def state(self):
+        """(arrays, metadatos JSON) para el checkpoint."""
+        arrays = {"last_ts": self.last_ts, "last_x": self.last_x, "last_y": self.last_y}
+        arrays.update({f"open_{window}": state for window, state in self.open.items()})
+        meta = {"closed_before": self.closed_before, "emitted": self.emitted, "late": self.late}
+        return arrays, meta
+
+    def restore(self, arrays, meta):
+        self.last_ts[:] = arrays["last_ts"]
+        self.last_x[:] = arrays["last_x"]
+        self.last_y[:] = arrays["last_y"]
+        self.open = {int(name[len("open_"):]): arrays[name].copy()
+                     for name in arrays if name.startswith("open_")}
+        self.closed_before = meta["closed_before"]
+        self.emitted = list(meta["emitted"])
+        self.late = meta["late"]
+
+
+# ============================================
+# CONSUMIDORES
+# ============================================
+
+class Checkpoint:
+    """Offsets por shard + estado del motor, escritos de forma atómica.
+
+    state.npz lleva los arrays (última posición, ventanas abiertas) y
+    offsets.json el resto; offsets.json se escribe el último, así un
+    checkpoint a medias nunca se lee como completo.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.offsets_path = os.path.join(directory, "offsets.json")
+        self.state_path = os.path.join(directory, "state.npz")
+
+    def save(self, meta, arrays):
+        tmp = self.state_path + ".tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, self.state_path)
+        tmp = self.offsets_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.offsets_path)
+
+    def load(self):
+        try:
+            with open(self.offsets_path, encoding="utf-8") as f:
+                data = json.load(f)
+            with np.load(self.state_path) as arrays:
+                return data, {name: arrays[name] for name in arrays.files}
+        except OSError:
+            return None, None
+
+
+class StreamEngine:
+    def __init__(self, drivers, rate, shards, batch_size, config, seed=None):
+        self.config = config
+        self.shards, self.batch_size = shards, batch_size
+        self.producer = Producer(drivers, rate, seed, config)
+        self.aggregator = Aggregator(drivers, self.producer.city, config)
+        self.buffers = [PingBuffer() for _ in range(shards)]
+        self.offsets = [0] * shards             # siguiente secuencia por procesar
+        self.busy_until = [0.0] * shards
+        self.max_event = np.full(shards, -np.inf)
+        self.written = [0] * shards             # escrituras del segundo en curso
+        self.second = -1
+        self.stats = {"produced": 0, "throttled": 0, "processed": 0, "invocations": 0, "writes": 0,
+                      "compute_s": 0.0, "busy_s": 0.0, "max_age_s": 0.0,
+                      "max_backlog": 0, "skipped": 0}
+        self.ages = []                          # edad máxima del iterador por segundo simulado
+
+    def _ingest(self, batch, now, dt):
+        # ProvisionedThroughputExceeded: cada shard admite shard_write_rps por segundo
+        shard = partition(batch["driver"], self.shards)
+        order = np.argsort(shard, kind="stable")
+        bounds = np.searchsorted(shard[order], np.arange(self.shards + 1))
+        if int(now - dt) != self.second:
+            self.second = int(now - dt)
+            self.written = [0] * self.shards
+        for s in range(self.shards):
+            rows = order[bounds[s]:bounds[s + 1]]
+            limit = max(0, self.config["shard_write_rps"] - self.written[s])
+            if len(rows) > limit:
+                self.stats["throttled"] += len(rows) - limit
+                rows = rows[:limit]
+            self.written[s] += len(rows)
+            if len(rows):
+                self.buffers[s].append({name: column[rows] for name, column in batch.items()})
+        self.stats["produced"] += len(batch["driver"])
+
+    def _invoke(self, s, now):
+        buffer = self.buffers[s]
+        start = self.offsets[s]
+        stop = min(buffer.end, start + self.batch_size)
+        batch = buffer.read(start, stop)
+        started = time.perf_counter()
+        writes = self.aggregator.process(batch)
+        compute = time.perf_counter() - started
+        config = self.config
+        rounds = -(-writes // (config["batch_write_items"] * config["write_concurrency"]))
+        service = config["invoke_ms"] / 1000 + compute + rounds * config["batch_write_ms"] / 1000
+        self.busy_until[s] = now + service
+        self.offsets[s] = stop                  # checkpoint del event source mapping
+        self.max_event[s] = max(self.max_event[s], float(batch["ts"][-1]))
+        buffer.trim(stop)
+        stats = self.stats
+        stats["processed"] += stop - start
+        stats["invocations"] += 1
+        stats["writes"] += writes
+        stats["compute_s"] += compute
+        stats["busy_s"] += service
+
+    # del productor: se recalculan al regenerar el flujo
+    PRODUCER_STATS = ("produced", "throttled")
+
+    def snapshot(self, clock):
+        """(metadatos, arrays) del estado al final del tick `clock`."""
+        arrays, aggregation = self.aggregator.state()
+        meta = {"clock": clock, "config": {"shards": self.shards, "batch_size": self.batch_size},
+                "offsets": list(self.offsets), "busy_until": list(self.busy_until),
+                "max_event": self.max_event.tolist(), "aggregation": aggregation, "ages": self.ages,
+                "stats": {k: v for k, v in self.stats.items() if k not in self.PRODUCER_STATS}}
+        return meta, arrays
+
+    def restore(self, meta, arrays):
+        """Aplica un checkpoint sobre buffers regenerados hasta su instante."""
+        for s, offset in enumerate(meta["offsets"]):
+            self.stats["skipped"] += offset - self.offsets[s]
+            self.offsets[s] = offset
+            self.buffers[s].trim(offset)
+        self.busy_until = list(meta["busy_until"])
+        self.ages = list(meta["ages"])
+        # marca de agua: el máximo de tiempo de evento de lo ya confirmado
+        self.max_event = np.array(meta["max_event"], dtype=np.float64)
+        skipped = self.stats["skipped"]
+        self.stats.update(meta["stats"])
+        self.stats["skipped"] = skipped
+        self.aggregator.restore(arrays, meta["aggregation"])
+
+    def run(self, seconds, checkpoint=None, resume=False, checkpoint_every=10.0):
+        ticks = int(round(seconds / TICK_S))
+        replay = 0
+        meta = arrays = None
+        if checkpoint and resume:
+            meta, arrays = checkpoint.load()
+            if meta is not None:
+                if meta["config"] != {"shards": self.shards, "batch_size": self.batch_size}:
+                    raise ValueError(f"el checkpoint es de otro caso: {meta['config']}")
+                replay = int(round(meta["clock"] / TICK_S))
+                if replay > ticks:
+                    raise ValueError(f"el checkpoint (t={meta['clock']:g}s) va más allá de --seconds")
+                print(f"↩️  Reanudando desde el checkpoint (t={meta['clock']:.1f}s, "
+                      f"{sum(meta['offsets']):,} registros ya confirmados)")
+        next_save = checkpoint_every
+        for tick in range(ticks):
+            now = (tick + 1) * TICK_S
+            self._ingest(self.producer.tick(now, TICK_S), now, TICK_S)
+            if tick < replay:
+                # ya procesado antes del reinicio: solo se regenera el flujo
+                if tick == replay - 1:
+                    self.restore(meta, arrays)
+                if now >= next_save:
+                    next_save += checkpoint_every
+                continue
+            for s in range(self.shards):
+                buffer = self.buffers[s]
+                pending = buffer.end - self.offsets[s]
+                if not pending:
+                    continue
+                oldest = float(buffer.read(self.offsets[s], self.offsets[s] + 1)["ts"][0])
+                age = now - oldest
+                self.stats["max_age_s"] = max(self.stats["max_age_s"], age)
+                second = int(tick * TICK_S)
+                self.ages.extend([0.0] * (second + 1 - len(self.ages)))
+                self.ages[second] = max(self.ages[second], age)
+                self.stats["max_backlog"] = max(self.stats["max_backlog"], pending)
+                if self.busy_until[s] <= now and (pending >= self.batch_size
+                                                  or age >= self.config["batching_window_s"]):
+                    self._invoke(s, now)
+            self.aggregator.advance(float(self.max_event.min()) if np.isfinite(self.max_event).all() else -np.inf)
+            if checkpoint and now >= next_save:
+                checkpoint.save(*self.snapshot(now))
+                next_save += checkpoint_every
+        if checkpoint:
+            checkpoint.save(*self.snapshot(ticks * TICK_S))
+        return self.report(seconds)
+
+    def report(self, seconds):
+        stats = self.stats
+        backlog = sum(buffer.end - offset for buffer, offset in zip(self.buffers, self.offsets))
+        return {
+            "shards": self.shards, "batch_size": self.batch_size, "seconds": seconds,
+            "produced": stats["produced"], "throttled": stats["throttled"], "processed": stats["processed"],
+            "backlog": backlog, "invocations": stats["invocations"],
+            "mean_batch": stats["processed"] / max(stats["invocations"], 1),
+            "utilization": stats["busy_s"] / (seconds * self.shards),
+            "max_age_s": stats["max_age_s"], "tail_age_s": max(self.ages[int(seconds) // 2:], default=0.0),
+            "writes_per_s": stats["writes"] / seconds,
+            "compute_records_per_min": stats["processed"] / stats["compute_s"] * 60 if stats["compute_s"] else 0.0,
+            "windows": len(self.aggregator.emitted), "late": self.aggregator.late,
+            "skipped": stats["skipped"],
+        }
+
+
+# ============================================
+# CLI
+# ============================================
+
+def check_diagram(path):
+    graph = topology.load(path, static=True)
+    pairs = {(graph.ids[graph.flow_src[e]], graph.ids[graph.flow_dst[e]]) for e in range(graph.n_edges)}
+    return [hop for hop in MODELED_HOPS if hop not in pairs]
+
+
+def keeps_up(row, max_age):
+    return row["throttled"] == 0 and row["tail_age_s"] <= max_age
+
+
+def print_results(rows, max_age):
+    print(f"\n{'shards':>6} {'batch':>6} {'lote medio':>10} {'uso':>6} {'edad máx s':>10} {'edad final s':>12} "
+          f"{'pendientes':>10} {'throttled':>10} {'escrit./s':>10} {'cómputo reg/min':>16}")
+    print("-" * 110)
+    for row in rows:
+        flag = "✅" if keeps_up(row, max_age) else "❌"
+        print(f"{row['shards']:>6} {row['batch_size']:>6,} {row['mean_batch']:>10,.0f} {row['utilization']:>6.0%} "
+              f"{row['max_age_s']:>10.1f} {row['tail_age_s']:>12.1f} {row['backlog']:>10,} {row['throttled']:>10,} "
+              f"{row['writes_per_s']:>10,.0f} {row['compute_records_per_min']:>16,.0f} {flag}")
+
+
+def positive_ints(text):
+    """Tipo de argparse: lista de enteros positivos separada por comas."""
+    try:
+        values = [int(v) for v in text.split(",") if v.strip()]
+    except ValueError:
+        values = []
+    if not values or min(values) < 1:
+        raise argparse.ArgumentTypeError(f"se espera una lista de enteros positivos: {text!r}")
+    return values
+
+
+def apply_setting(config, setting):
+    """--set campo=valor con el tipo del valor por defecto (enteros donde lo son)."""
+    field, _, raw = setting.partition("=")
+    if field not in config:
+        raise ValueError(f"--set {setting!r}: campo desconocido {field!r} (usa {', '.join(config)})")
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = None
+    integer = isinstance(config[field], int)
+    valid = not isinstance(value, bool) and isinstance(value, int if integer else (int, float))
+    # solo el margen de llegadas tardías puede ser 0
+    if not valid or value < 0 or (value == 0 and field != "lateness_s"):
+        raise ValueError(f"--set {setting!r}: {field} debe ser un {'entero' if integer else 'número'} "
+                         f"{'>= 0' if field == 'lateness_s' else 'positivo'}")
+    config[field] = value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming Kinesis → location_processor → DynamoDB en local")
+    parser.add_argument("--drivers", type=int, default=200_000)
+    parser.add_argument("--rate", type=float, default=40_000, help="pings por segundo")
+    parser.add_argument("--seconds", type=float, default=60.0, help="segundos simulados por caso")
+    parser.add_argument("--shards", type=positive_ints, default=[32, 48, 64], help="lista separada por comas")
+    parser.add_argument("--batch", type=positive_ints, default=[10, 100, 1000], help="batch_size (lista)")
+    parser.add_argument("--max-age", type=float, default=5.0,
+                        help="edad de iterador aceptable en la segunda mitad (s)")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="CAMPO=VALOR",
+                        help="p. ej. invoke_ms=40")
+    parser.add_argument("--checkpoint", help="directorio de checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continúa desde --checkpoint")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--diagram", default=DIAGRAM)
+    parser.add_argument("--json", dest="json_out", help="escribe los resultados")
+    args = parser.parse_args()
+
+    config = copy.deepcopy(PROCESSOR)
+    for setting in args.settings:
+        try:
+            apply_setting(config, setting)
+        except ValueError as exc:
+            parser.error(str(exc))
+    cases = list(itertools.product(args.shards, args.batch))
+    if args.checkpoint and len(cases) > 1:
+        parser.error("--checkpoint necesita un único caso (--shards y --batch sin listas)")
+    if args.resume and args.seed is None:
+        parser.error("--resume necesita --seed para volver a generar el mismo flujo")
+
+    missing = check_diagram(args.diagram)
+    if missing:
+        print("⚠️  Saltos del modelo que no están en el diagrama: "
+              + ", ".join(f"{a} → {b}" for a, b in missing))
+    print(f"📡 {args.rate:,.0f} pings/s ({args.rate * 60 / 1e6:,.2f} M/min) de {args.drivers:,} conductores · "
+          f"{args.seconds:g} s simulados · {RECORD_BYTES} bytes por registro en el buffer")
+
+    rows = []
+    for shards, batch_size in cases:
+        print(f"   ⏳ {shards} shards, batch_size {batch_size:,}...")
+        engine = StreamEngine(args.drivers, args.rate, shards, batch_size, config, args.seed)
+        checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+        rows.append(engine.run(args.seconds, checkpoint, args.resume))
+    print_results(rows, args.max_age)
+    print(f"\n   ✅ sin throttling y con la edad del iterador <= {args.max_age:g} s en la segunda mitad")
+    min_shards = int(np.ceil(args.rate / config["shard_write_rps"]))
+    print(f"   Kinesis necesita al menos {min_shards} shards para {args.rate:,.0f} registros/s de escritura")
+    last = rows[-1]
+    if last["skipped"]:
+        print(f"   {last['skipped']:,} registros ya confirmados no se reprocesaron")
+    if last["windows"]:
+        print(f"   {last['windows']} ventanas de densidad de {config['window_s']:g} s cerradas, "
+              f"{last['late']:,} pings tardíos descartados")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"💾 Resultados en {args.json_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
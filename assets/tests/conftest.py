@@ -0,0 +1,8 @@
+# Los scripts de assets/ se importan entre sí como módulos sueltos
+# (import topology, from render_cache import ...): las pruebas igual.
+import os
+import sys
+
+ASSETS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ASSETS_DIR not in sys.path:
+    sys.path.insert(0, ASSETS_DIR)
@@ -0,0 +1,98 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+import build_diagrams
+
+# Un Diagram mínimo que deja en render_log lo mismo que CachedDiagram, sin Graphviz
+FAKE_DIAGRAM = '''
+import render_cache
+
+
+class FakeDiagram:
+    def __init__(self, name, hit=False):
+        self.name, self.hit = name, hit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            render_cache.render_log.append({"filename": f"salida/{self.name}.png", "format": "png",
+                                            "key": "0" * 64, "hit": self.hit, "layout": "dot",
+                                            "seconds": 0.0})
+'''
+
+SCRIPTS = {
+    "a_ok.py": "with FakeDiagram('a_ok'):\n    print('dibujando a_ok')\n",
+    "b_falla.py": "with FakeDiagram('b_falla'):\n    raise RuntimeError('icono roto')\n",
+    "c_cache.py": "with FakeDiagram('c_cache', hit=True):\n    pass\n",
+    "d_exit.py": "import sys\nwith FakeDiagram('d_exit'):\n    sys.exit(3)\n",
+    "e_ok.py": "with FakeDiagram('e_ok'):\n    pass\n",
+}
+
+
+@pytest.fixture
+def scripts(tmp_path):
+    for name, body in SCRIPTS.items():
+        (tmp_path / name).write_text(FAKE_DIAGRAM + textwrap.dedent(body), encoding="utf-8")
+    (tmp_path / "utilidades.py").write_text("def ayuda():\n    return 1\n", encoding="utf-8")
+    (tmp_path / "roto.py").write_text("with (\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_discover_only_diagram_scripts(scripts):
+    found = [os.path.basename(p) for p in build_diagrams.discover(str(scripts))]
+    assert found == sorted(SCRIPTS)
+    assert [os.path.basename(p) for p in build_diagrams.discover(str(scripts), ["[ab]_*.py"])] == \
+        ["a_ok.py", "b_falla.py"]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_failing_scripts_do_not_stop_the_others(scripts, jobs):
+    results = build_diagrams.build(build_diagrams.discover(str(scripts)), jobs=jobs)
+    by_script = {r["script"]: r for r in results}
+    assert set(by_script) == set(SCRIPTS)
+    assert {name for name, r in by_script.items() if r["ok"]} == {"a_ok.py", "c_cache.py", "e_ok.py"}
+    assert "RuntimeError: icono roto" in by_script["b_falla.py"]["error"]
+    assert "SystemExit: 3" in by_script["d_exit.py"]["error"]
+    # con jobs=1 el mismo worker ejecuta e_ok.py después de los dos fallos
+    assert [r["filename"] for r in by_script["e_ok.py"]["renders"]] == ["salida/e_ok.png"]
+    assert by_script["a_ok.py"]["output"] == "dibujando a_ok\n"
+    assert all(r["seconds"] >= 0 for r in results)
+
+
+def test_summary_report(scripts, capsys):
+    results = build_diagrams.build(build_diagrams.discover(str(scripts)), jobs=1)
+    capsys.readouterr()
+    build_diagrams.print_summary(results, 1.5, verbose=True)
+    report = capsys.readouterr().out
+    names = [line.split()[0] for line in report.splitlines() if line.split()[:1] and line.split()[0] in SCRIPTS]
+    assert names == sorted(SCRIPTS)
+
+    def row(script):
+        return next(line for line in report.splitlines() if line.startswith(script))
+
+    assert row("a_ok.py").split()[1] == "ok" and row("a_ok.py").endswith("a_ok.png (render dot)")
+    assert row("c_cache.py").endswith("c_cache.png (caché)")
+    assert row("b_falla.py").split()[1] == "ERROR"
+    assert "    RuntimeError: icono roto" in report
+    assert "    dibujando a_ok" in report
+    serial = sum(r["seconds"] for r in results)
+    assert report.rstrip().endswith(f"📊 5 diagramas, 2 con error | pared 1.50s | suma de tiempos {serial:.2f}s")
+
+
+def test_main_exit_status(scripts, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["build_diagrams.py", "--dir", str(scripts), "-j", "2"])
+    assert build_diagrams.main() == 1
+    out = capsys.readouterr().out
+    assert "Construyendo 5 diagramas con 2 workers" in out
+    assert out.count("✅") == 3 and out.count("❌") == 2
+
+    monkeypatch.setattr(sys, "argv", ["build_diagrams.py", "--dir", str(scripts), "a_ok.py", "e_ok.py"])
+    assert build_diagrams.main() == 0
+    monkeypatch.setattr(sys, "argv", ["build_diagrams.py", "--dir", str(scripts), "nada_*.py"])
+    assert build_diagrams.main() == 1
+    assert "No se encontraron scripts de diagramas." in capsys.readouterr().out
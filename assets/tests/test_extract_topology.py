@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+import extract_topology
+import topology
+
+ASSETS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["delimasa_aws_diagram.py", "uber_architecture_aws.py"]
+
+
+@pytest.fixture(autouse=True)
+def topology_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(topology, "TOPOLOGY_DIR", str(tmp_path / ".topology"))
+    return tmp_path / ".topology"
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_static_extraction_matches_execution(script):
+    path = os.path.join(ASSETS_DIR, script)
+    executed = topology.compile_spec(topology.spec_from_script(path))
+    extracted = topology.compile_spec(extract_topology.extract(path))
+    assert extracted.to_spec() == executed.to_spec()
+    assert extracted.digest == executed.digest
+
+
+def test_static_load_matches_execution(tmp_path, topology_dir):
+    script = tmp_path / "mini.py"
+    script.write_text(
+        "from topology import Diagram, Cluster, Edge\n"
+        "from lazy_nodes import Lambda, SQS, RDS\n"
+        "with Diagram('mini', show=False, direction='TB'):\n"
+        "    with Cluster('Datos'):\n"
+        "        db = RDS('db', capacity={'connections': 90})\n"
+        "    cola = SQS('cola')\n"
+        "    cola >> Edge(label='lote') >> Lambda('worker') >> db\n"
+        "    db << Edge(style='dashed') << cola\n",
+        encoding="utf-8",
+    )
+    static = topology.load(str(script), static=True)
+    assert (topology_dir / "mini.topo").exists()
+    assert static.digest == topology.compile_spec(topology.spec_from_script(str(script))).digest
+
+
+def test_rejects_script_without_diagram(tmp_path):
+    script = tmp_path / "vacio.py"
+    script.write_text("print('sin diagrama')\n", encoding="utf-8")
+    with pytest.raises(extract_topology.ExtractionError):
+        extract_topology.extract(str(script))
@@ -0,0 +1,145 @@
+import random
+
+import numpy as np
+import pytest
+
+import policy_backtest
+from mock_catalog import load_catalog
+from policy_backtest import DECISIONS, Policy
+
+
+def analyze_order(client, items):
+    """RulesAnalysisService.analyzeOrder (backend/src/services/rulesAnalysisService.ts), solo la decisión."""
+    total_pedido = sum(item["subtotal"] for item in items)
+    margenes = []
+    for item in items:
+        costo = item["precioUnitario"] * 0.6
+        precio_con_descuento = item["precioUnitario"] * (1 - item["descuento"] / 100)
+        margenes.append((precio_con_descuento - costo) / precio_con_descuento * 100)
+    margen_promedio = sum(margenes) / len(margenes)
+    descuento_promedio = sum(item["descuento"] for item in items) / len(items)
+
+    decision = "APROBAR"
+    descuento_exceso = max(0, descuento_promedio - client["descuentoMaximo"])
+    if descuento_exceso > 5:
+        decision = "RECHAZAR"
+    elif 0 < descuento_exceso <= 5:
+        if decision == "APROBAR":
+            decision = "AJUSTAR"
+    if margen_promedio < client["margenMinimo"] - 2:
+        decision = "RECHAZAR"
+    elif margen_promedio < client["margenMinimo"]:
+        if decision == "APROBAR":
+            decision = "AJUSTAR"
+    factor = total_pedido / client["limiteCredito"]
+    if factor > 1.1:
+        decision = "RECHAZAR"
+    elif factor > 1:
+        if decision == "APROBAR":
+            decision = "AJUSTAR"
+    return decision
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog()
+
+
+def _random_orders(clients, products, count, seed):
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(count):
+        client = rng.choice(list(clients.values()))
+        items = []
+        for product in rng.sample(products, rng.randint(1, 5)):
+            cantidad = rng.randint(1, 400)
+            descuento = rng.choice([0, client["descuentoMaximo"], client["descuentoMaximo"] + rng.randint(-8, 12),
+                                    rng.randint(0, 45)])
+            descuento = min(max(descuento, 0), 60)
+            subtotal = round(cantidad * product["precioBase"] * (1 - descuento / 100))
+            items.append({"cantidad": cantidad, "precioUnitario": product["precioBase"],
+                          "descuento": descuento, "subtotal": subtotal})
+        orders.append((client, items))
+    return orders
+
+
+def _boundary_orders(clients, products):
+    """Pedidos de una línea justo en los umbrales de descuento y de crédito."""
+    price = products[0]["precioBase"]
+    orders = []
+    for client in clients.values():
+        limit = client["limiteCredito"]
+        for excess in (-1, 0, 1, 5, 6):
+            for factor in (0.5, 1.0, 1.0 + 1e-9, 1.1, 1.1 + 1e-9):
+                descuento = client["descuentoMaximo"] + excess
+                orders.append((client, [{"cantidad": 1, "precioUnitario": price,
+                                         "descuento": descuento, "subtotal": limit * factor}]))
+    return orders
+
+
+def _write_csv(path, orders):
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("pedido_id,cliente_id,cantidad,precio_unitario,descuento,subtotal\n")
+        for number, (client, items) in enumerate(orders):
+            for item in items:
+                fh.write(f"P{number:06d},{client['id']},{item['cantidad']},{item['precioUnitario']},"
+                         f"{item['descuento']},{item['subtotal']!r}\n")
+
+
+def _decisions(path, policy, chunk_rows):
+    found = []
+    for orders in policy_backtest.order_chunks(str(path), policy, chunk_rows):
+        margins = policy.margins(orders["descuento_linea"])
+        orders["margen_promedio"] = np.add.reduceat(margins, orders["starts"]) / orders["count"]
+        decision, _ = policy.rules(orders)
+        found.extend(DECISIONS[d] for d in decision)
+    return found
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 1_000_000])
+def test_matches_backend_on_random_orders(catalog, tmp_path, chunk_rows):
+    clients, products = catalog
+    orders = _random_orders(clients, products, 1500, seed=3)
+    _write_csv(tmp_path / "pedidos.csv", orders)
+    expected = [analyze_order(client, items) for client, items in orders]
+    assert set(expected) == set(DECISIONS)
+    assert _decisions(tmp_path / "pedidos.csv", Policy(clients), chunk_rows) == expected
+
+
+def test_matches_backend_on_thresholds(catalog, tmp_path):
+    clients, products = catalog
+    orders = _boundary_orders(clients, products)
+    _write_csv(tmp_path / "limites.csv", orders)
+    expected = [analyze_order(client, items) for client, items in orders]
+    assert _decisions(tmp_path / "limites.csv", Policy(clients), 1000) == expected
+
+
+def test_reject_reasons(catalog):
+    clients, _ = catalog
+    policy = Policy(clients)
+    code = policy.client_ids.index("clienteC")
+    limit = clients["clienteC"]["limiteCredito"]
+    orders = {
+        "cliente": np.full(4, code),
+        "descuento_promedio": np.array([10.0, 16.0, 10.0, 10.0]),
+        "margen_promedio": np.array([30.0, 30.0, 15.9, 30.0]),
+        "total": np.array([1.0, 1.0, 1.0, 1.2 * limit]),
+    }
+    decision, reject = policy.rules(orders)
+    assert [DECISIONS[d] for d in decision] == ["APROBAR", "RECHAZAR", "RECHAZAR", "RECHAZAR"]
+    assert [list(mask) for mask in reject] == [[False, True, False, False], [False, False, True, False],
+                                               [False, False, False, True]]
+
+
+def test_settings_change_thresholds(catalog):
+    clients, _ = catalog
+    policy = Policy(clients).with_settings(["descuento_rechazo=8", "clienteC.margenMinimo=16"])
+    assert policy.thresholds["descuento_rechazo"] == 8.0
+    assert policy.margen_minimo[policy.client_ids.index("clienteC")] == 16
+    with pytest.raises(ValueError):
+        Policy(clients).with_settings(["clienteZ.margenMinimo=1"])
+    with pytest.raises(ValueError, match="descuento_rechazo espera un número"):
+        Policy(clients).with_settings(["descuento_rechazo=abc"])
+    with pytest.raises(ValueError, match="limiteCredito espera un número"):
+        Policy(clients).with_settings(["clienteC.limiteCredito=true"])
+    assert Policy(clients).with_settings(["clienteC.categoria=Premium"]).clients["clienteC"]["categoria"] == "Premium"
@@ -0,0 +1,108 @@
+import os
+import time
+
+import pytest
+
+import render_cache
+from render_cache import RenderCache, canonical_source, graph_digest
+
+A, B, C = "a" * 32, "b" * 32, "c" * 32
+
+
+def _source(ids, icon, layout="", bb=""):
+    first, second = ids
+    return (f'digraph "demo" {{\n'
+            f'\tgraph [rankdir=LR{bb}]\n'
+            f'\t{first} [label="API" image="{icon}" shape=none{layout}]\n'
+            f'\t"{second}" [label="Lambda" image={icon}{layout}]\n'
+            f'\t{first} -> "{second}" [label="invoca"]\n'
+            f'}}\n')
+
+
+@pytest.fixture
+def icon(tmp_path):
+    path = tmp_path / "iconos" / "lambda.png"
+    path.parent.mkdir()
+    path.write_bytes(b"icono-1")
+    return path
+
+
+def test_canonical_source_numbers_ids_in_order():
+    assert canonical_source(f"{A} -> {B}; {A}") == "n0 -> n1; n0"
+    assert canonical_source(f'"{A}" -> {B}', names={A: "api"}) == '"api" -> n1'
+
+
+def test_key_ignores_random_node_ids(icon):
+    one = canonical_source(_source((A, B), icon))
+    two = canonical_source(_source((C, A), icon))
+    assert one == two
+    assert graph_digest(one, "png") == graph_digest(two, "png")
+    named = canonical_source(_source((A, B), icon), names={A: "api", B: "worker"})
+    assert graph_digest(named, "png") != graph_digest(one, "png")
+
+
+def test_key_ignores_layout_attributes(icon):
+    plain = canonical_source(_source((A, B), icon))
+    placed = canonical_source(_source((A, B), icon, layout=' pos="12,30" lp="3,4"', bb=' bb="0,0,9,9"'))
+    assert placed != plain
+    assert graph_digest(placed, "svg") == graph_digest(plain, "svg")
+
+
+def test_key_depends_on_format_and_content(icon):
+    source = canonical_source(_source((A, B), icon))
+    keys = {graph_digest(source, fmt) for fmt in render_cache.OUTFORMATS}
+    assert len(keys) == len(render_cache.OUTFORMATS)
+    assert graph_digest(source.replace("invoca", "publica"), "png") != graph_digest(source, "png")
+
+
+def test_key_follows_icon_content_not_path(icon, tmp_path):
+    source = canonical_source(_source((A, B), icon))
+    moved = tmp_path / "otro" / "lambda.png"
+    moved.parent.mkdir()
+    moved.write_bytes(icon.read_bytes())
+    relocated = source.replace(str(icon), str(moved))
+    assert relocated != source
+    assert graph_digest(relocated, "png") == graph_digest(source, "png")
+
+    before = graph_digest(source, "png")
+    icon.write_bytes(b"icono-2, distinto")
+    assert graph_digest(source, "png") != before
+
+
+def _age(path, seconds):
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_evicts_least_recently_used_outside_grace(tmp_path):
+    cache = RenderCache(root=str(tmp_path), max_bytes=250, max_age=None, grace=60)
+    paths = [cache.put(f"{i:02d}" + "0" * 62, "png", b"x" * 100) for i in range(2)]
+    _age(paths[0], 600)
+    _age(paths[1], 300)
+    assert cache.get("00" + "0" * 62, "png") == paths[0]     # el acierto lo refresca
+
+    third = cache.put("02" + "0" * 62, "png", b"x" * 100)
+    assert os.path.exists(paths[0]) and os.path.exists(third)
+    assert not os.path.exists(paths[1])
+
+
+def test_grace_window_protects_recent_entries(tmp_path):
+    cache = RenderCache(root=str(tmp_path), max_bytes=150, max_age=None, grace=60)
+    first = cache.put("00" + "0" * 62, "png", b"x" * 100)
+    second = cache.put("01" + "0" * 62, "png", b"x" * 100)
+    # sobre el límite, pero las dos se tocaron hace menos de `grace` segundos
+    assert os.path.exists(first) and os.path.exists(second)
+
+    _age(first, 120)
+    assert cache.evict() == (1, 100)
+    assert not os.path.exists(first) and os.path.exists(second)
+
+
+def test_expires_by_age(tmp_path):
+    cache = RenderCache(root=str(tmp_path), max_bytes=None, max_age=3600, grace=0)
+    old = cache.put("00" + "0" * 62, "svg", b"<svg/>")
+    fresh = cache.put("01" + "0" * 62, "svg", b"<svg/>")
+    _age(old, 7200)
+    assert cache.evict() == (1, 6)
+    assert cache.get("00" + "0" * 62, "svg") is None
+    assert cache.get("01" + "0" * 62, "svg") == fresh
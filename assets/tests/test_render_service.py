@@ -0,0 +1,205 @@
+import copy
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import extract_topology
+import render_service
+from render_cache import RenderCache
+from render_service import RenderService, SpecError, normalize
+
+ASSETS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def spec():
+    return extract_topology.extract(os.path.join(ASSETS_DIR, "delimasa_aws_diagram.py"))
+
+
+def _variant(spec, number):
+    return dict(copy.deepcopy(spec), name=f"{spec['name']} #{number}")
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "la condición no se cumplió a tiempo"
+        time.sleep(0.005)
+
+
+# ============================================
+# VALIDACIÓN
+# ============================================
+
+def test_normalize_drops_volatile_fields(spec):
+    clean = normalize(spec)
+    assert not set(render_service.VOLATILE_FIELDS) & set(clean)
+    moved = dict(spec, filename="otro", outformat="svg", show=True)
+    assert render_service.spec_key(normalize(moved)) == render_service.spec_key(clean)
+
+
+@pytest.mark.parametrize("place, attrs", [
+    ("spec", {"name": '<<IMG SRC="/etc/passwd"/>>'}),
+    ("spec", {"direction": {"TB": 1}}),
+    ("graph_attr", {"image": "/etc/passwd"}),
+    ("node_attr", {"fontpath": "/tmp"}),
+    ("node", {"shapefile": "/etc/hosts"}),
+    ("edge", {"label": "<<IMG SRC=\"/etc/passwd\"/>>"}),
+    ("cluster", {"bgcolor": {"anidado": 1}}),
+])
+def test_normalize_rejects_non_presentation_attrs(spec, place, attrs):
+    bad = copy.deepcopy(spec)
+    if place == "spec":
+        bad.update(attrs)
+    elif place in ("graph_attr", "node_attr"):
+        bad[place] = dict(bad[place], **attrs)
+    elif place == "node":
+        bad["nodes"][0]["attrs"] = attrs
+    elif place == "edge":
+        bad["edges"][0]["attrs"] = attrs
+    else:
+        bad["clusters"][0]["graph_attr"] = attrs
+    with pytest.raises(SpecError):
+        normalize(bad)
+
+
+def test_normalize_rejects_html_labels_and_bad_models(spec):
+    bad = copy.deepcopy(spec)
+    bad["nodes"][0]["label"] = " <<b>Clientes</b>> "
+    with pytest.raises(SpecError, match="HTML"):
+        normalize(bad)
+    bad = copy.deepcopy(spec)
+    bad["nodes"][0]["kind"] = "NoExiste"
+    with pytest.raises(SpecError, match="desconocidos"):
+        normalize(bad)
+    bad = copy.deepcopy(spec)
+    bad["edges"][0]["dst"] = "fantasma"
+    with pytest.raises(SpecError, match="inválida"):
+        normalize(bad)
+    with pytest.raises(SpecError):
+        normalize({"edges": []})
+
+
+# ============================================
+# FUSIÓN, CACHÉ Y COLA
+# ============================================
+
+@pytest.fixture
+def gate(monkeypatch):
+    """render_spec falso: espera a que la prueba abra la puerta y escribe en la caché."""
+    opened = threading.Event()
+    calls = []
+
+    def fake_render_spec(spec, fmt, key, cache_root, max_bytes):
+        calls.append(key)
+        opened.wait(10)
+        path = RenderCache(root=cache_root, max_bytes=max_bytes, max_age=None).put(key, fmt, key.encode())
+        return path, 0.01
+
+    monkeypatch.setattr(render_service, "render_spec", fake_render_spec)
+    opened.calls = calls
+    return opened
+
+
+def _service(tmp_path, workers=1, max_queue=4, timeout=5.0):
+    service = RenderService(workers=workers, max_queue=max_queue, cache_root=str(tmp_path / "cache"),
+                            timeout=timeout)
+    # los procesos del pool se crean al primer submit: se cambia antes por hilos
+    service.pool.shutdown()
+    service.pool = ThreadPoolExecutor(max_workers=workers)
+    return service
+
+
+def _in_threads(service, specs, fmt="png"):
+    results = [None] * len(specs)
+
+    def call(i):
+        results[i] = service.render(specs[i], fmt)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(specs))]
+    for thread in threads:
+        thread.start()
+    return results, threads
+
+
+def test_identical_requests_coalesce(spec, gate, tmp_path):
+    service = _service(tmp_path)
+    try:
+        results, threads = _in_threads(service, [spec] * 6)
+        _wait_for(lambda: service.counters["miss"] + service.counters["coalesced"] == 6)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert sorted(outcome for outcome, _, _ in results) == ["coalesced"] * 5 + ["miss"]
+        assert len({key for _, key, _ in results}) == 1
+        assert len({path for _, _, path in results}) == 1
+        assert len(gate.calls) == 1
+
+        outcome, key, path = service.render(dict(spec, filename="otro"), "png")
+        assert (outcome, key, path) == ("hit", results[0][1], results[0][2])
+        assert service.render(spec, "svg")[0] == "miss"
+        assert len(gate.calls) == 2
+        metrics = service.metrics()
+        assert metrics["requests"]["hit"] == 1 and metrics["inflight"] == 0
+    finally:
+        gate.set()
+        service.close()
+
+
+def test_full_queue_rejects(spec, gate, tmp_path):
+    service = _service(tmp_path, workers=1, max_queue=1)
+    try:
+        results, threads = _in_threads(service, [_variant(spec, 1)])
+        _wait_for(lambda: service.running == 1 and service.queue.qsize() == 0)
+        queued, more = _in_threads(service, [_variant(spec, 2)])
+        _wait_for(lambda: service.queue.qsize() == 1)
+
+        outcome, _, message = service.render(_variant(spec, 3), "png")
+        assert outcome == "rejected" and "cola llena" in message
+        # una petición idéntica a la encolada se fusiona: no ocupa otro hueco
+        coalesced, waiting = _in_threads(service, [_variant(spec, 2)])
+        _wait_for(lambda: service.counters["coalesced"] == 1)
+
+        gate.set()
+        for thread in threads + more + waiting:
+            thread.join(5)
+        assert [r[0] for r in results + queued + coalesced] == ["miss", "miss", "coalesced"]
+        assert service.counters["rejected"] == 1
+        assert service.render(_variant(spec, 3), "png")[0] == "miss"
+    finally:
+        gate.set()
+        service.close()
+
+
+def test_overdue_render_holds_a_queue_slot(spec, gate, tmp_path):
+    service = _service(tmp_path, workers=1, max_queue=1, timeout=0.2)
+    try:
+        outcome, _, message = service.render(_variant(spec, 1), "png")
+        assert outcome == "error"
+        _wait_for(lambda: service.overdue == 1)
+        assert service.metrics()["overdue"] == 1
+
+        outcome, _, message = service.render(_variant(spec, 2), "png")
+        assert outcome == "rejected" and "1 renders vencidos" in message
+
+        gate.set()
+        _wait_for(lambda: service.overdue == 0 and service.running == 0)
+        # el render vencido terminó y dejó la imagen en la caché
+        assert service.render(_variant(spec, 1), "png")[0] == "hit"
+        assert service.render(_variant(spec, 2), "png")[0] == "miss"
+    finally:
+        gate.set()
+        service.close()
+
+
+def test_invalid_spec_is_counted(tmp_path):
+    service = _service(tmp_path)
+    try:
+        assert service.render({"nodes": "no"}, "png")[0] == "invalid"
+        assert service.counters["invalid"] == 1 and service.counters["total"] == 1
+    finally:
+        service.close()
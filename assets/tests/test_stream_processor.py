@@ -0,0 +1,49 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import stream_processor
+from stream_processor import Checkpoint, StreamEngine
+
+CASE = {"drivers": 5000, "rate": 1500, "shards": 3, "batch_size": 100, "seed": 11}
+
+
+@pytest.fixture(autouse=True)
+def fixed_compute(monkeypatch):
+    # el cómputo medido entra en el tiempo de servicio: sin reloj real las
+    # dos ejecuciones invocan en los mismos ticks
+    clock = itertools.count()
+    monkeypatch.setattr(stream_processor.time, "perf_counter", lambda: next(clock) * 1e-6)
+
+
+def engine():
+    return StreamEngine(CASE["drivers"], CASE["rate"], CASE["shards"], CASE["batch_size"],
+                        dict(stream_processor.PROCESSOR), CASE["seed"])
+
+
+def test_resume_matches_uninterrupted_run(tmp_path):
+    full = engine()
+    expected = full.run(30.0)
+
+    first = engine().run(15.0, Checkpoint(tmp_path))
+    assert first["windows"] == 1
+    resumed_engine = engine()
+    resumed = resumed_engine.run(30.0, Checkpoint(tmp_path), resume=True)
+
+    assert resumed["windows"] == expected["windows"] == 2
+    assert resumed_engine.aggregator.emitted == full.aggregator.emitted
+    assert resumed["skipped"] == first["processed"]
+    for field in ("produced", "throttled", "processed", "backlog", "invocations", "late",
+                  "utilization", "max_age_s", "tail_age_s", "writes_per_s"):
+        assert resumed[field] == pytest.approx(expected[field]), field
+    np.testing.assert_array_equal(resumed_engine.aggregator.last_ts, full.aggregator.last_ts)
+    assert set(resumed_engine.aggregator.open) == set(full.aggregator.open)
+
+
+def test_resume_rejects_other_case(tmp_path):
+    engine().run(5.0, Checkpoint(tmp_path))
+    other = StreamEngine(CASE["drivers"], CASE["rate"], CASE["shards"] + 1, CASE["batch_size"],
+                         dict(stream_processor.PROCESSOR), CASE["seed"])
+    with pytest.raises(ValueError):
+        other.run(10.0, Checkpoint(tmp_path), resume=True)
@@ -0,0 +1,150 @@
+import io
+import math
+import os
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+import size_optimizer
+import tile_pyramid
+from tile_pyramid import PNG_SIGNATURE, PngRows
+
+
+def _chunks(data):
+    pos, found = len(PNG_SIGNATURE), []
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        found.append((kind, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+    return found
+
+
+def _assemble(chunks):
+    return PNG_SIGNATURE + b"".join(size_optimizer._chunk(kind, body) for kind, body in chunks)
+
+
+def split_idat(data, pieces):
+    """El mismo PNG con el flujo zlib repartido en varios IDAT."""
+    chunks = _chunks(data)
+    stream = b"".join(body for kind, body in chunks if kind == b"IDAT")
+    step = -(-len(stream) // pieces)
+    idats = [(b"IDAT", stream[i:i + step]) for i in range(0, len(stream), step)]
+    head = [c for c in chunks if c[0] not in (b"IDAT", b"IEND")]
+    return _assemble(head + idats + [(b"IEND", b"")])
+
+
+def decode(data):
+    reader = PngRows(io.BytesIO(data))
+    return np.stack(list(reader.rows()))
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+def _image(rng, height, width, channels):
+    # degradados con ruido: las filas eligen filtros distintos (Sub, Up, Average, Paeth)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([(x * 3 + y * c) % 256 for c in range(1, channels + 1)], axis=2)
+    noise = rng.integers(0, 24, size=base.shape) * (rng.random((height, 1, 1)) < 0.5)
+    return ((base + noise) % 256).astype(np.uint8)
+
+
+@pytest.mark.parametrize("channels", [3, 4])
+def test_decodes_adaptive_filters(rng, channels):
+    pixels = _image(rng, 37, 53, channels)
+    data = size_optimizer.encode(pixels=pixels)
+    filters = set(zlib.decompress(b"".join(b for k, b in _chunks(data) if k == b"IDAT"))[::53 * channels + 1])
+    assert len(filters) > 1
+    assert np.array_equal(decode(data), pixels)
+
+
+@pytest.mark.parametrize("channels", [3, 4])
+def test_decodes_sub_filter_and_split_idat(rng, channels):
+    pixels = _image(rng, 64, 31, channels)
+    data = tile_pyramid.encode_png(pixels)
+    assert np.array_equal(decode(data), pixels)
+    split = split_idat(data, 5)
+    assert sum(kind == b"IDAT" for kind, _ in _chunks(split)) == 5
+    assert np.array_equal(decode(split), pixels)
+
+
+def test_decodes_palette_with_transparency(rng):
+    palette = np.array([[255, 0, 0, 0], [0, 255, 0, 128], [0, 0, 255, 255], [9, 9, 9, 255]], dtype=np.uint8)
+    indices = rng.integers(0, len(palette), size=(20, 17)).astype(np.uint8)
+    data = size_optimizer.encode(indices=indices, palette=palette)
+    assert len(dict(_chunks(data))[b"tRNS"]) == 2
+    reader = PngRows(io.BytesIO(data))
+    assert reader.has_alpha and reader.channels == 4
+    assert np.array_equal(decode(data), palette[indices])
+
+    opaque = palette.copy()
+    opaque[:, 3] = 255
+    data = size_optimizer.encode(indices=indices, palette=opaque)
+    assert b"tRNS" not in dict(_chunks(data))
+    assert np.array_equal(decode(split_idat(data, 3)), opaque[indices][:, :, :3])
+
+
+@pytest.mark.parametrize("color, bpp", [(0, 1), (4, 2)])
+def test_decodes_grayscale(rng, color, bpp):
+    gray = rng.integers(0, 256, size=(9, 11, bpp)).astype(np.uint8)
+    raw = np.concatenate([np.zeros((9, 1), dtype=np.uint8), gray.reshape(9, -1)], axis=1)
+    data = _assemble([(b"IHDR", struct.pack(">IIBBBBB", 11, 9, 8, color, 0, 0, 0)),
+                      (b"IDAT", zlib.compress(raw.tobytes())), (b"IEND", b"")])
+    expected = np.repeat(gray[:, :, :1], 3, axis=2)
+    if color == 4:
+        expected = np.concatenate([expected, gray[:, :, 1:]], axis=2)
+    assert np.array_equal(decode(data), expected)
+
+
+def test_rejects_truncated_data(rng):
+    data = tile_pyramid.encode_png(_image(rng, 12, 12, 3))
+    chunks = _chunks(data)
+    short = zlib.compress(zlib.decompress(dict(chunks)[b"IDAT"])[:-40])
+    truncated = _assemble([c if c[0] != b"IDAT" else (b"IDAT", short) for c in chunks])
+    with pytest.raises(ValueError, match="truncados"):
+        decode(truncated)
+
+
+def _reduce(pixels):
+    height, width = pixels.shape[:2]
+    padded = np.pad(pixels.astype(np.uint16), ((0, height % 2), (0, width % 2), (0, 0)), mode="edge")
+    total = padded[0::2, 0::2] + padded[1::2, 0::2] + padded[0::2, 1::2] + padded[1::2, 1::2]
+    return ((total + 2) // 4).astype(np.uint8)
+
+
+def test_export_tile_geometry(rng, tmp_path):
+    height, width, tile, overlap = 150, 301, 64, 2
+    pixels = _image(rng, height, width, 4)
+    png = tmp_path / "grande.png"
+    png.write_bytes(size_optimizer.encode(pixels=pixels))
+    out_dir = tmp_path / "teselas"
+    out_dir.mkdir()
+
+    summary = tile_pyramid.export(str(png), str(out_dir), str(tmp_path / "work"),
+                                  tile_size=tile, overlap=overlap, jobs=1)
+    max_level = math.ceil(math.log2(max(width, height)))
+    assert (summary["width"], summary["height"], summary["levels"]) == (width, height, max_level + 1)
+
+    level_pixels, tiles = pixels, 0
+    for level in range(max_level, -1, -1):
+        h, w = level_pixels.shape[:2]
+        level_dir = out_dir / "grande_files" / str(level)
+        cols, rows = -(-w // tile), -(-h // tile)
+        assert len(os.listdir(level_dir)) == cols * rows
+        for row in range(rows):
+            for col in range(cols):
+                x0, x1 = max(0, col * tile - overlap), min(w, (col + 1) * tile + overlap)
+                y0, y1 = max(0, row * tile - overlap), min(h, (row + 1) * tile + overlap)
+                got = decode((level_dir / f"{col}_{row}.png").read_bytes())
+                assert np.array_equal(got, level_pixels[y0:y1, x0:x1]), (level, col, row)
+        tiles += cols * rows
+        level_pixels = _reduce(level_pixels)
+    assert summary["tiles"] == tiles
+    assert h == w == 1
+
+    assert tile_pyramid.export(str(png), str(out_dir), str(tmp_path / "work"),
+                               tile_size=tile, overlap=overlap, jobs=1) is None
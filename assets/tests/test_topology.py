@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import topology
+
+ASSETS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["delimasa_aws_diagram.py", "uber_architecture_aws.py"]
+
+
+@pytest.fixture(autouse=True)
+def topology_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(topology, "TOPOLOGY_DIR", str(tmp_path / ".topology"))
+    return tmp_path / ".topology"
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_artifact_round_trip(script, tmp_path):
+    spec = topology.spec_from_script(os.path.join(ASSETS_DIR, script))
+    graph = topology.compile_spec(spec)
+    path = str(tmp_path / "grafo.topo")
+    topology.save(graph, path, script_sha="abc")
+
+    header, loaded = topology._read_artifact(path)
+    assert header == {"version": topology.ARTIFACT_VERSION, "digest": graph.digest,
+                      "script_sha": "abc"}
+    assert loaded.to_spec() == graph.to_spec()
+    assert topology.spec_digest(loaded.to_spec()) == graph.digest
+    assert list(loaded.out_ptr) == list(graph.out_ptr)
+    assert list(loaded.in_edge) == list(graph.in_edge)
+    assert topology.load(path).digest == graph.digest
+
+
+def test_compile_is_idempotent_on_to_spec():
+    spec = topology.spec_from_script(os.path.join(ASSETS_DIR, SCRIPTS[0]))
+    graph = topology.compile_spec(spec)
+    again = topology.compile_spec(graph.to_spec())
+    assert again.to_spec() == graph.to_spec()
+    assert again.digest == graph.digest
+
+
+def test_load_reuses_artifact_until_script_changes(tmp_path, topology_dir):
+    script = tmp_path / "mini.py"
+    script.write_text(
+        "from topology import Diagram, Edge\n"
+        "from lazy_nodes import Lambda, SQS\n"
+        "with Diagram('mini', show=False):\n"
+        "    cola = SQS('cola')\n"
+        "    cola >> Edge(label='lote') >> Lambda('worker')\n",
+        encoding="utf-8",
+    )
+    first = topology.load(str(script))
+    artifact = topology_dir / "mini.topo"
+    assert artifact.exists()
+    assert topology._read_artifact(str(artifact))[0]["script_sha"] == topology.file_sha(str(script))
+
+    with open(script, "a", encoding="utf-8") as fh:
+        fh.write("    cola >> Lambda('auditor')\n")
+    second = topology.load(str(script))
+    assert second.n_nodes == first.n_nodes + 1
+    assert second.n_edges == first.n_edges + 1
+    assert topology._read_artifact(str(artifact))[1].digest == second.digest
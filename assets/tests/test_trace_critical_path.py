@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+import topology
+import trace_critical_path
+
+ASSETS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return topology.compile_spec(topology.load_spec(os.path.join(ASSETS_DIR, "delimasa_aws_diagram.py"),
+                                                    static=True))
+
+
+@pytest.fixture(scope="module", params=["xray", "otel"])
+def dump(graph, tmp_path_factory, request):
+    path = str(tmp_path_factory.mktemp("trazas") / f"trazas_{request.param}.jsonl")
+    trace_critical_path.generate(path, graph, 1500, seed=5, fmt=request.param)
+    return path
+
+
+def _summary(graph, table):
+    data = trace_critical_path.rank(graph, table, 99.0)
+    rows = {row["node"]: (row["mean_ms"], row["tail_mean_ms"]) for row in data["nodes"]}
+    return data["traces"], data["spans"], data["skipped"], sorted(table.durations), rows
+
+
+@pytest.mark.parametrize("jobs", [2, 5, 16])
+def test_byte_ranges_match_a_single_pass(graph, dump, jobs):
+    flow = graph.index["lambda_registro"]
+    serial = _summary(graph, trace_critical_path.analyze([dump], graph, flow=flow, jobs=1))
+    sharded = _summary(graph, trace_critical_path.analyze([dump], graph, flow=flow, jobs=jobs))
+    assert serial[:4] == sharded[:4]
+    assert serial[0] == 1500
+    assert sharded[4].keys() == serial[4].keys()
+    for node, values in serial[4].items():
+        assert sharded[4][node] == pytest.approx(values)
+
+
+def test_two_files_are_not_joined(graph, dump):
+    table = trace_critical_path.analyze([dump, dump], graph, flow=-1, jobs=3)
+    assert len(table.durations) == 2 * len(trace_critical_path.analyze([dump], graph, flow=-1, jobs=1).durations)
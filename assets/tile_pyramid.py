@@ -0,0 +1,480 @@
+# tile_pyramid.py
+# Pirámide de teselas (Deep Zoom) de los PNG renderizados, con visor estático.
+#
+# delimasa_aws_arquitectura.png mide 7357×3433 px: un navegador o una wiki la
+# descarga y decodifica entera aunque solo se vea una parte. Esta etapa la
+# convierte en una pirámide multirresolución:
+#   <nombre>.dzi                    descriptor Deep Zoom (también lo lee OpenSeadragon)
+#   <nombre>_files/<nivel>/<col>_<fila>.png
+#   <nombre>.html                   visor mínimo: solo pide las teselas visibles
+#
+# Nunca se tiene el mapa de bits completo en memoria: el PNG se decodifica
+# fila a fila (zlib incremental + defiltrado con NumPy) hacia un raster
+# mapeado en disco (np.memmap); cada nivel se reduce del anterior por franjas
+# de filas (promedio 2×2) en otro memmap y las teselas se leen de ahí, de
+# modo que solo se paginan las filas de la franja en curso. Los raster
+# intermedios se guardan en --work-dir con el sha256 del PNG: si la imagen
+# no cambió no se vuelve a generar nada.
+#
+# Solo usa NumPy y la biblioteca estándar (sin Pillow).
+#
+# Uso:
+#     python tile_pyramid.py delimasa_aws_arquitectura.png
+#     python tile_pyramid.py *.png --out-dir teselas --tile-size 510 -j 4
+#     python tile_pyramid.py delimasa_componentes.png --force
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+READ_BLOCK = 1 << 20
+STRIP_ROWS = 512                # filas de salida por franja al reducir
+
+
+# ============================================
+# PNG POR FILAS
+# ============================================
+
+def _paeth_row(raw, prior, bpp):
+    """Defiltrado Paeth de una fila.
+
+    Donde el píxel de arriba y el de arriba a la izquierda coinciden el
+    predictor es siempre el de la izquierda y la fila es una suma acumulada
+    (NumPy); solo los píxeles restantes se calculan uno a uno.
+    """
+    width = len(raw) // bpp
+    R = raw.reshape(width, bpp)
+    B = prior.reshape(width, bpp)
+    C = np.zeros_like(B)
+    C[1:] = B[:-1]
+    X = np.empty_like(R)
+    hard = (B != C).any(axis=1)
+    hard[0] = True
+    edges = np.flatnonzero(np.diff(hard.astype(np.int8))) + 1
+    bounds = np.concatenate(([0], edges, [width])).tolist()
+    prev = [0] * bpp
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        if hard[start]:
+            r = R[start:stop].tolist()
+            b = B[start:stop].tolist()
+            c = C[start:stop].tolist()
+            out = []
+            for rp, bp, cp in zip(r, b, c):
+                pixel = []
+                for k in range(bpp):
+                    a, bv, cv = prev[k], bp[k], cp[k]
+                    pa, pb, pc = abs(bv - cv), abs(a - cv), abs(a + bv - 2 * cv)
+                    pred = a if pa <= pb and pa <= pc else (bv if pb <= pc else cv)
+                    pixel.append((rp[k] + pred) & 255)
+                out.append(pixel)
+                prev = pixel
+            X[start:stop] = out
+        else:
+            X[start:stop] = np.cumsum(R[start:stop], axis=0, dtype=np.uint8) + np.array(prev, dtype=np.uint8)
+            prev = X[stop - 1].tolist()
+    return X.reshape(-1)
+
+
+def _average_row(raw, prior, bpp):
+    out = bytearray(len(raw))
+    r, b = raw.tolist(), prior.tolist()
+    for i in range(len(r)):
+        left = out[i - bpp] if i >= bpp else 0
+        out[i] = (r[i] + ((left + b[i]) >> 1)) & 255
+    return np.frombuffer(bytes(out), dtype=np.uint8)
+
+
+def unfilter(kind, raw, prior, bpp):
+    if kind == 0:
+        return raw
+    if kind == 1:
+        return np.cumsum(raw.reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+    if kind == 2:
+        return raw + prior
+    if kind == 3:
+        return _average_row(raw, prior, bpp)
+    if kind == 4:
+        return _paeth_row(raw, prior, bpp)
+    raise ValueError(f"filtro PNG desconocido: {kind}")
+
+
+class PngRows:
+    """Lector de PNG de 8 bits sin entrelazar que entrega filas RGB/RGBA.
+
+    `source` es una ruta o un archivo binario ya abierto.
+    """
+
+    CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+    def __init__(self, source):
+        path = source if isinstance(source, str) else getattr(source, "name", "<png>")
+        self.path = path
+        self.file = open(source, "rb") if isinstance(source, str) else source
+        if self.file.read(8) != PNG_SIGNATURE:
+            raise ValueError(f"{path}: no es un PNG")
+        self.palette = None
+        self.transparency = None
+        self._pending = None
+        while True:
+            kind, data = self._chunk()
+            if kind == b"IHDR":
+                (self.width, self.height, depth, self.color, _, _,
+                 interlace) = struct.unpack(">IIBBBBB", data)
+                if depth != 8 or interlace:
+                    raise ValueError(f"{path}: solo PNG de 8 bits sin entrelazar (bits={depth})")
+            elif kind == b"PLTE":
+                self.palette = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+            elif kind == b"tRNS":
+                self.transparency = data
+            elif kind == b"IDAT":
+                self._pending = data
+                break
+            elif kind == b"IEND":
+                raise ValueError(f"{path}: PNG sin datos")
+        self.bpp = self.CHANNELS[self.color]
+        self.has_alpha = self.color in (4, 6) or (self.color == 3 and self.transparency is not None)
+        self.channels = 4 if self.has_alpha else 3
+
+    def _chunk(self):
+        header = self.file.read(8)
+        if len(header) < 8:
+            return b"IEND", b""
+        length, kind = struct.unpack(">I4s", header)
+        data = self.file.read(length)
+        self.file.read(4)               # CRC
+        return kind, data
+
+    def _idat(self):
+        data = self._pending
+        while True:
+            yield data
+            kind, data = self._chunk()
+            if kind != b"IDAT":
+                return
+
+    def _expand(self, row):
+        if self.color == 2 or self.color == 6:
+            return row.reshape(self.width, self.bpp)
+        if self.color == 3:
+            rgb = self.palette[row]
+            if not self.has_alpha:
+                return rgb
+            alpha = np.full(len(self.palette), 255, dtype=np.uint8)
+            alpha[:len(self.transparency)] = np.frombuffer(self.transparency, dtype=np.uint8)
+            return np.concatenate([rgb, alpha[row][:, None]], axis=1)
+        gray = row.reshape(self.width, self.bpp)
+        out = np.repeat(gray[:, :1], 3, axis=1)
+        return np.concatenate([out, gray[:, 1:]], axis=1) if self.color == 4 else out
+
+    def rows(self):
+        stride = self.width * self.bpp
+        decompressor = zlib.decompressobj()
+        buffer = bytearray()
+        prior = np.zeros(stride, dtype=np.uint8)
+        produced = 0
+        for data in self._idat():
+            buffer += decompressor.decompress(data)
+            while len(buffer) > stride and produced < self.height:
+                kind = buffer[0]
+                raw = np.frombuffer(bytes(buffer[1:stride + 1]), dtype=np.uint8)
+                del buffer[:stride + 1]
+                prior = unfilter(kind, raw, prior, self.bpp)
+                produced += 1
+                yield self._expand(prior)
+        buffer += decompressor.flush()
+        while len(buffer) >= stride + 1 and produced < self.height:
+            raw = np.frombuffer(bytes(buffer[1:stride + 1]), dtype=np.uint8)
+            prior = unfilter(buffer[0], raw, prior, self.bpp)
+            del buffer[:stride + 1]
+            produced += 1
+            yield self._expand(prior)
+        self.file.close()
+        if produced != self.height:
+            raise ValueError(f"{self.path}: datos truncados ({produced}/{self.height} filas)")
+
+
+def encode_png(pixels):
+    """PNG (filtro Sub en todas las filas) de un array alto×ancho×canales."""
+    height, width, channels = pixels.shape
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 1
+    body = filtered[:, 1:].reshape(height, width, channels)
+    body[:] = pixels
+    body[:, 1:] -= pixels[:, :-1]
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    color = 6 if channels == 4 else 2
+    header = struct.pack(">IIBBBBB", width, height, 8, color, 0, 0, 0)
+    return (PNG_SIGNATURE + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(filtered.tobytes(), 6)) + chunk(b"IEND", b""))
+
+
+# ============================================
+# RASTER MAPEADO Y NIVELES
+# ============================================
+
+def file_sha(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def decode_to_raster(png, path):
+    """Decodifica el PNG fila a fila en un memmap; devuelve (alto, ancho, canales)."""
+    reader = PngRows(png)
+    shape = (reader.height, reader.width, reader.channels)
+    raster = np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=np.uint8, shape=shape)
+    for y, row in enumerate(reader.rows()):
+        raster[y] = row
+    raster.flush()
+    del raster
+    os.replace(path + ".tmp", path)
+    return shape
+
+
+def reduce_level(source, path):
+    """Nivel siguiente (mitad de tamaño, promedio 2×2) por franjas de filas."""
+    src = np.load(source, mmap_mode="r")
+    height, width, channels = src.shape
+    out_h, out_w = (height + 1) // 2, (width + 1) // 2
+    dst = np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=np.uint8, shape=(out_h, out_w, channels))
+    for y0 in range(0, out_h, STRIP_ROWS):
+        y1 = min(out_h, y0 + STRIP_ROWS)
+        strip = np.asarray(src[2 * y0:min(height, 2 * y1)], dtype=np.uint16)
+        if strip.shape[0] % 2:
+            strip = np.concatenate([strip, strip[-1:]], axis=0)
+        if width % 2:
+            strip = np.concatenate([strip, strip[:, -1:]], axis=1)
+        total = strip[0::2, 0::2] + strip[1::2, 0::2] + strip[0::2, 1::2] + strip[1::2, 1::2]
+        dst[y0:y1] = ((total + 2) // 4).astype(np.uint8)
+    dst.flush()
+    del dst, src
+    os.replace(path + ".tmp", path)
+    return out_h, out_w
+
+
+def build_levels(png, work_dir, sha):
+    """Rutas de los raster de cada nivel (el último es la resolución completa)."""
+    os.makedirs(work_dir, exist_ok=True)
+    full = os.path.join(work_dir, f"{sha[:16]}_full.npy")
+    if not os.path.exists(full):
+        decode_to_raster(png, full)
+    height, width = np.load(full, mmap_mode="r").shape[:2]
+    max_level = int(np.ceil(np.log2(max(width, height, 1))))
+    paths = {max_level: full}
+    for level in range(max_level - 1, -1, -1):
+        path = os.path.join(work_dir, f"{sha[:16]}_{level}.npy")
+        if not os.path.exists(path):
+            reduce_level(paths[level + 1], path)
+        paths[level] = path
+    return [paths[level] for level in range(max_level + 1)]
+
+
+# ============================================
+# TESELAS
+# ============================================
+
+def write_tile_row(task):
+    """Teselas de una fila de un nivel (el worker abre el memmap por su cuenta)."""
+    raster_path, level_dir, row, tile_size, overlap = task
+    raster = np.load(raster_path, mmap_mode="r")
+    height, width = raster.shape[:2]
+    y0 = max(0, row * tile_size - overlap)
+    y1 = min(height, (row + 1) * tile_size + overlap)
+    strip = np.ascontiguousarray(raster[y0:y1])
+    written = 0
+    for col in range(-(-width // tile_size)):
+        x0 = max(0, col * tile_size - overlap)
+        x1 = min(width, (col + 1) * tile_size + overlap)
+        data = encode_png(np.ascontiguousarray(strip[:, x0:x1]))
+        with open(os.path.join(level_dir, f"{col}_{row}.png"), "wb") as fh:
+            fh.write(data)
+        written += len(data)
+    return written
+
+
+def write_pyramid(levels, out_base, tile_size, overlap, jobs):
+    files_dir = f"{out_base}_files"
+    if os.path.isdir(files_dir):
+        shutil.rmtree(files_dir)
+    tasks = []
+    for level, path in enumerate(levels):
+        level_dir = os.path.join(files_dir, str(level))
+        os.makedirs(level_dir)
+        height = np.load(path, mmap_mode="r").shape[0]
+        tasks.extend((path, level_dir, row, tile_size, overlap) for row in range(-(-height // tile_size)))
+    if jobs == 1:
+        sizes = [write_tile_row(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            sizes = list(pool.map(write_tile_row, tasks, chunksize=4))
+    tiles = sum(len(os.listdir(os.path.join(files_dir, str(level)))) for level in range(len(levels)))
+    return tiles, sum(sizes)
+
+
+DZI_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" TileSize="{tile}" Overlap="{overlap}" Format="png">
+  <Size Width="{width}" Height="{height}"/>
+</Image>
+"""
+
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+  html, body {{ margin: 0; height: 100%; background: #fafafa; font-family: sans-serif; }}
+  canvas {{ display: block; width: 100%; height: 100%; cursor: grab; }}
+  #ayuda {{ position: fixed; left: 8px; bottom: 8px; font-size: 12px; color: #555; background: #fffc; padding: 4px 8px; }}
+</style>
+</head>
+<body>
+<canvas id="lienzo"></canvas>
+<div id="ayuda">{title} · rueda: zoom · arrastrar: mover · doble clic: encajar</div>
+<script>
+const DZI = {{ base: "{files}", width: {width}, height: {height}, tile: {tile}, overlap: {overlap}, maxLevel: {max_level} }};
+const canvas = document.getElementById("lienzo"), ctx = canvas.getContext("2d");
+const cache = new Map();
+let scale = 1, ox = 0, oy = 0;
+
+function fit() {{
+  scale = Math.min(canvas.width / DZI.width, canvas.height / DZI.height);
+  ox = (canvas.width - DZI.width * scale) / 2; oy = (canvas.height - DZI.height * scale) / 2;
+}}
+function resize() {{
+  canvas.width = innerWidth * devicePixelRatio; canvas.height = innerHeight * devicePixelRatio;
+}}
+function tile(level, col, row) {{
+  const key = level + "/" + col + "_" + row;
+  let img = cache.get(key);
+  if (!img) {{
+    img = new Image(); img.onload = draw; img.src = DZI.base + "/" + key + ".png"; cache.set(key, img);
+  }}
+  return img.complete && img.naturalWidth ? img : null;
+}}
+function drawLevel(level) {{
+  const factor = Math.pow(2, DZI.maxLevel - level);      // píxeles originales por píxel del nivel
+  const w = Math.ceil(DZI.width / factor), h = Math.ceil(DZI.height / factor);
+  const s = scale * factor, t = DZI.tile, ov = DZI.overlap;
+  const c0 = Math.max(0, Math.floor(-ox / s / t)), c1 = Math.min(Math.ceil(w / t), Math.ceil((canvas.width - ox) / s / t));
+  const r0 = Math.max(0, Math.floor(-oy / s / t)), r1 = Math.min(Math.ceil(h / t), Math.ceil((canvas.height - oy) / s / t));
+  let complete = true;
+  for (let r = r0; r < r1; r++) for (let c = c0; c < c1; c++) {{
+    const img = tile(level, c, r);
+    if (!img) {{ complete = false; continue; }}
+    const x = c * t - (c ? ov : 0), y = r * t - (r ? ov : 0);
+    ctx.drawImage(img, ox + x * s, oy + y * s, img.naturalWidth * s, img.naturalHeight * s);
+  }}
+  return complete;
+}}
+function draw() {{
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+  const wanted = Math.max(0, Math.min(DZI.maxLevel, DZI.maxLevel + Math.ceil(Math.log2(scale))));
+  // un nivel más grueso de fondo mientras llegan las teselas del nivel pedido
+  if (wanted > 0) drawLevel(Math.max(0, wanted - 2));
+  drawLevel(wanted);
+}}
+let drag = null;
+canvas.addEventListener("mousedown", e => {{ drag = [e.clientX, e.clientY]; canvas.style.cursor = "grabbing"; }});
+addEventListener("mouseup", () => {{ drag = null; canvas.style.cursor = "grab"; }});
+addEventListener("mousemove", e => {{
+  if (!drag) return;
+  ox += (e.clientX - drag[0]) * devicePixelRatio; oy += (e.clientY - drag[1]) * devicePixelRatio;
+  drag = [e.clientX, e.clientY]; draw();
+}});
+canvas.addEventListener("wheel", e => {{
+  e.preventDefault();
+  const f = Math.exp(-e.deltaY * 0.0015), mx = e.clientX * devicePixelRatio, my = e.clientY * devicePixelRatio;
+  ox = mx - (mx - ox) * f; oy = my - (my - oy) * f; scale *= f; draw();
+}}, {{ passive: false }});
+canvas.addEventListener("dblclick", () => {{ fit(); draw(); }});
+addEventListener("resize", () => {{ resize(); draw(); }});
+resize(); fit(); draw();
+</script>
+</body>
+</html>
+"""
+
+
+def export(png, out_dir, work_dir, tile_size=254, overlap=1, jobs=None, force=False):
+    """Genera .dzi, teselas y visor de un PNG; devuelve un resumen o None si estaba al día."""
+    name = os.path.splitext(os.path.basename(png))[0]
+    out_base = os.path.join(out_dir, name)
+    manifest_path = f"{out_base}.json"
+    sha = file_sha(png)
+    settings = {"sha256": sha, "tile_size": tile_size, "overlap": overlap}
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        if all(manifest.get(key) == value for key, value in settings.items()):
+            return None
+
+    started = time.perf_counter()
+    levels = build_levels(png, work_dir, sha)
+    height, width = np.load(levels[-1], mmap_mode="r").shape[:2]
+    decoded = time.perf_counter() - started
+    tiles, size = write_pyramid(levels, out_base, tile_size, overlap, jobs)
+    max_level = len(levels) - 1
+    with open(f"{out_base}.dzi", "w", encoding="utf-8") as fh:
+        fh.write(DZI_TEMPLATE.format(tile=tile_size, overlap=overlap, width=width, height=height))
+    with open(f"{out_base}.html", "w", encoding="utf-8") as fh:
+        fh.write(VIEWER_TEMPLATE.format(title=name, files=f"{name}_files", width=width, height=height,
+                                        tile=tile_size, overlap=overlap, max_level=max_level))
+    summary = dict(settings, width=width, height=height, levels=len(levels), tiles=tiles, bytes=size,
+                   source_bytes=os.path.getsize(png), decode_s=decoded,
+                   seconds=time.perf_counter() - started)
+    with open(manifest_path, "w", encoding="utf-8") as fh:
+        json.dump(summary, fh, indent=2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pirámide de teselas Deep Zoom con visor estático")
+    parser.add_argument("images", nargs="*", help="PNG renderizados (por defecto los de assets/)")
+    parser.add_argument("--out-dir", default=os.path.join(BASE_DIR, "teselas"))
+    parser.add_argument("--work-dir", default=os.path.join(BASE_DIR, ".tiles"),
+                        help="raster intermedios mapeados en disco")
+    parser.add_argument("--tile-size", type=int, default=254)
+    parser.add_argument("--overlap", type=int, default=1)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="procesos para escribir teselas")
+    parser.add_argument("--force", action="store_true", help="regenera aunque el PNG no haya cambiado")
+    args = parser.parse_args()
+
+    images = args.images or sorted(glob.glob(os.path.join(BASE_DIR, "*.png")))
+    os.makedirs(args.out_dir, exist_ok=True)
+    for png in images:
+        name = os.path.basename(png)
+        try:
+            summary = export(png, args.out_dir, args.work_dir, args.tile_size, args.overlap, args.jobs, args.force)
+        except ValueError as exc:
+            print(f"❌ {exc}")
+            continue
+        if summary is None:
+            print(f"♻️  {name}: sin cambios")
+            continue
+        print(f"✅ {name}: {summary['width']}×{summary['height']} px → {summary['levels']} niveles, "
+              f"{summary['tiles']:,} teselas ({summary['bytes'] / 1e6:,.1f} MB) en {summary['seconds']:.1f}s "
+              f"(decodificación {summary['decode_s']:.1f}s)")
+    print(f"📂 Visores en {args.out_dir}/<nombre>.html")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
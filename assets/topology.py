@@ -0,0 +1,764 @@
+# topology.py
+# Especificación declarativa de topologías y modelo de grafo compilado.
+#
+# Los scripts de assets/ describen la arquitectura con la misma sintaxis de
+# "diagrams" (with Diagram/Cluster, nodo >> Edge(...) >> nodo), pero importando
+# Diagram, Cluster y Edge de este módulo. En lugar de construir el grafo de
+# Graphviz, ese código emite una especificación (dict serializable a JSON):
+#
+#     {"name": ..., "filename": ..., "direction": "TB", "graph_attr": {...},
+#      "clusters": [{"id", "label", "parent", "direction", "graph_attr", "order"}],
+#      "nodes": [{"id", "kind", "label", "cluster", "attrs", "capacity", "order"}],
+#      "edges": [{"src", "dst", "dir", "label", "style", "color", "attrs"}]}
+#
+# `capacity` es metadata de capacidad del nodo (Lambda("...", capacity={
+# "reserved_concurrency": 100, "duration_ms": 250})): no se dibuja y la usan
+# las herramientas de análisis (ver capacity_analysis.py).
+#
+# La especificación se compila a CompiledTopology (ids enteros, adyacencia
+# CSR en arrays) y se guarda como artefacto pickle en .topology/, de modo que
+# las herramientas de render, análisis y diff la cargan sin ejecutar el script:
+#
+#     import topology
+#     graph = topology.load("delimasa_aws_diagram.py")   # artefacto si está al día
+#     graph.successors(graph.index["lambda_registro"])
+#
+# CLI:
+#     python topology.py export delimasa_aws_diagram.py -o delimasa.json
+#     python topology.py compile delimasa.json -o delimasa.topo
+#     python topology.py render delimasa.json
+#     python topology.py info delimasa_aws_diagram.py
+
+import argparse
+import array
+import contextlib
+import hashlib
+import io
+import json
+import os
+import pickle
+import runpy
+import sys
+
+import lazy_nodes
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TOPOLOGY_DIR = os.environ.get("DIAGRAMS_TOPOLOGY_DIR", os.path.join(BASE_DIR, ".topology"))
+
+ARTIFACT_VERSION = 2
+
+DIRECTIONS = ("TB", "BT", "LR", "RL")
+CURVESTYLES = ("ortho", "curved")
+
+# Dirección de las aristas en el artefacto compilado
+EDGE_DIRS = ("none", "forward", "back", "both")
+
+# Modo "solo emitir": los Diagram registran la especificación sin renderizar
+_emit_only = False
+_emitted = []
+
+
+# ============================================
+# DSL COMPATIBLE CON DIAGRAMS
+# ============================================
+
+class Diagram:
+    """Contexto raíz: acepta los argumentos de diagrams.Diagram."""
+
+    def __init__(self, name="", filename="", direction="LR", curvestyle="ortho",
+                 outformat="png", autolabel=False, show=True, strict=False,
+                 graph_attr=None, node_attr=None, edge_attr=None):
+        if direction.upper() not in DIRECTIONS:
+            raise ValueError(f'"{direction}" is not a valid direction')
+        if curvestyle.lower() not in CURVESTYLES:
+            raise ValueError(f'"{curvestyle}" is not a valid curvestyle')
+        if not name and not filename:
+            filename = "diagrams_image"
+        elif not filename:
+            filename = "_".join(name.split()).lower()
+        self.graph = {
+            "name": name,
+            "filename": filename,
+            "direction": direction,
+            "curvestyle": curvestyle,
+            "outformat": outformat,
+            "autolabel": autolabel,
+            "show": show,
+            "strict": strict,
+            "graph_attr": dict(graph_attr or {}),
+            "node_attr": dict(node_attr or {}),
+            "edge_attr": dict(edge_attr or {}),
+        }
+        self.nodes = []
+        self.clusters = []
+        self.edges = []
+        self.spec = None
+        self._stack = []
+        self._order = 0
+        self._token = None
+
+    def __enter__(self):
+        self._token = lazy_nodes.bind_builder(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        lazy_nodes.unbind_builder(self._token)
+        if exc_type is not None:
+            return
+        # Los ids de nodo son los nombres de variable del script
+        frame = sys._getframe(1)
+        self.spec = self.to_spec(frame.f_locals)
+        script = frame.f_globals.get("__file__")
+        if _emit_only:
+            _emitted.append(self.spec)
+            return
+        if script and script.endswith(".py"):
+            save(compile_spec(self.spec), artifact_path(script), script_sha=file_sha(script))
+        render(self.spec)
+
+    def _next_order(self):
+        self._order += 1
+        return self._order
+
+    # Llamado por lazy_nodes cuando hay un Diagram activo
+    def add_node(self, kind, label="", *, nodeid=None, capacity=None, **attrs):
+        node = SpecNode(self, len(self.nodes))
+        self.nodes.append({
+            "kind": kind,
+            "label": label,
+            "cluster": self._stack[-1]["id"] if self._stack else None,
+            "attrs": attrs,
+            "capacity": dict(capacity) if capacity else None,
+            "order": self._next_order(),
+            "nodeid": nodeid,
+        })
+        return node
+
+    def add_edge(self, node, node2, edge):
+        record = {"src": node.index, "dst": node2.index, "dir": edge.direction}
+        record.update(edge.fields())
+        self.edges.append(record)
+
+    def to_spec(self, names=None):
+        """Especificación declarativa; `names` mapea variables -> SpecNode."""
+        ids = assign_ids(
+            [n["kind"] for n in self.nodes],
+            _variable_names(names or {}, len(self.nodes)),
+            [n["nodeid"] for n in self.nodes],
+        )
+        nodes = []
+        for node_id, node in zip(ids, self.nodes):
+            record = {"id": node_id, "kind": node["kind"], "label": node["label"],
+                      "cluster": node["cluster"], "order": node["order"]}
+            if node["attrs"]:
+                record["attrs"] = node["attrs"]
+            if node["capacity"]:
+                record["capacity"] = node["capacity"]
+            nodes.append(record)
+        edges = []
+        for edge in self.edges:
+            record = dict(edge)
+            record["src"], record["dst"] = ids[edge["src"]], ids[edge["dst"]]
+            edges.append(record)
+        return dict(self.graph, clusters=[dict(c) for c in self.clusters], nodes=nodes, edges=edges)
+
+
+class Cluster:
+    """Agrupación visual; se anida con `with` igual que diagrams.Cluster."""
+
+    def __init__(self, label="cluster", direction="LR", graph_attr=None):
+        if direction.upper() not in DIRECTIONS:
+            raise ValueError(f'"{direction}" is not a valid direction')
+        self.label = label
+        self.direction = direction
+        self.graph_attr = dict(graph_attr or {})
+        self._diagram = lazy_nodes.current_builder()
+        if self._diagram is None:
+            raise EnvironmentError("Global diagrams context not set up")
+        self.record = None
+
+    def __enter__(self):
+        stack = self._diagram._stack
+        parent = stack[-1]["id"] if stack else None
+        cluster_id = f"{parent}/{self.label}" if parent else self.label
+        taken = {c["id"] for c in self._diagram.clusters} | {c["id"] for c in stack}
+        base, n = cluster_id, 2
+        while cluster_id in taken:
+            cluster_id, n = f"{base}#{n}", n + 1
+        self.record = {"id": cluster_id, "label": self.label, "parent": parent,
+                       "direction": self.direction}
+        if self.graph_attr:
+            self.record["graph_attr"] = self.graph_attr
+        stack.append(self.record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Como en diagrams, el cluster se adjunta a su padre al cerrarse
+        self._diagram._stack.pop()
+        self.record["order"] = self._diagram._next_order()
+        self._diagram.clusters.append(self.record)
+
+
+class SpecNode:
+    """Nodo de la especificación con los operadores >>, << y - de diagrams."""
+
+    __slots__ = ("diagram", "index")
+
+    def __init__(self, diagram, index):
+        self.diagram = diagram
+        self.index = index
+
+    def __repr__(self):
+        node = self.diagram.nodes[self.index]
+        return f"<SpecNode {node['kind']} {node['label']!r}>"
+
+    def connect(self, node, edge):
+        self.diagram.add_edge(self, node, edge)
+        return node
+
+    def _link(self, other, **flags):
+        if isinstance(other, list):
+            for node in other:
+                self.connect(node, Edge(self, **flags))
+            return other
+        if isinstance(other, SpecNode):
+            return self.connect(other, Edge(self, **flags))
+        return None
+
+    def __sub__(self, other):
+        result = self._link(other)
+        if result is not None:
+            return result
+        other.node = self
+        return other
+
+    def __rsub__(self, other):
+        for o in other:
+            if isinstance(o, Edge):
+                o.connect(self)
+            else:
+                o.connect(self, Edge(self))
+        return self
+
+    def __rshift__(self, other):
+        result = self._link(other, forward=True)
+        if result is not None:
+            return result
+        other.forward = True
+        other.node = self
+        return other
+
+    def __lshift__(self, other):
+        result = self._link(other, reverse=True)
+        if result is not None:
+            return result
+        other.reverse = True
+        return other.connect(self)
+
+    def __rrshift__(self, other):
+        for o in other:
+            if isinstance(o, Edge):
+                o.forward = True
+                o.connect(self)
+            else:
+                o.connect(self, Edge(o, forward=True))
+        return self
+
+    def __rlshift__(self, other):
+        for o in other:
+            if isinstance(o, Edge):
+                o.reverse = True
+                o.connect(self)
+            else:
+                o.connect(self, Edge(o, reverse=True))
+        return self
+
+
+class Edge:
+    """Arista con etiqueta y estilo; misma semántica que diagrams.Edge."""
+
+    def __init__(self, node=None, forward=False, reverse=False, label="", color="",
+                 style="", **attrs):
+        self.node = node
+        self.forward = forward
+        self.reverse = reverse
+        self._attrs = {}
+        if label:
+            self._attrs["label"] = label
+        if color:
+            self._attrs["color"] = color
+        if style:
+            self._attrs["style"] = style
+        self._attrs.update(attrs)
+
+    @property
+    def direction(self):
+        if self.forward and self.reverse:
+            return "both"
+        if self.forward:
+            return "forward"
+        if self.reverse:
+            return "back"
+        return "none"
+
+    def fields(self):
+        """label/color/style como campos propios; el resto en "attrs"."""
+        fields = {k: self._attrs[k] for k in ("label", "color", "style") if k in self._attrs}
+        extra = {k: v for k, v in self._attrs.items() if k not in fields}
+        if extra:
+            fields["attrs"] = extra
+        return fields
+
+    def __sub__(self, other):
+        return self.connect(other)
+
+    def __rsub__(self, other):
+        return self.append(other)
+
+    def __rshift__(self, other):
+        self.forward = True
+        return self.connect(other)
+
+    def __lshift__(self, other):
+        self.reverse = True
+        return self.connect(other)
+
+    def __rrshift__(self, other):
+        return self.append(other, forward=True)
+
+    def __rlshift__(self, other):
+        return self.append(other, reverse=True)
+
+    def append(self, other, forward=None, reverse=None):
+        result = []
+        for o in other:
+            if isinstance(o, Edge):
+                o.forward = forward if forward else o.forward
+                o.reverse = reverse if reverse else o.reverse
+                self._attrs = dict(o._attrs)
+                result.append(o)
+            else:
+                result.append(Edge(o, forward=forward, reverse=reverse, **self._attrs))
+        return result
+
+    def connect(self, other):
+        if isinstance(other, list):
+            for node in other:
+                self.node.connect(node, self)
+            return other
+        if isinstance(other, Edge):
+            self._attrs = dict(other._attrs)
+            return self
+        if self.node is not None:
+            return self.node.connect(other, self)
+        self.node = other
+        return self
+
+
+def _variable_names(namespace, count):
+    """Primer nombre de variable ligado a cada SpecNode (índice -> nombre)."""
+    names = [None] * count
+    for name, value in namespace.items():
+        if isinstance(value, SpecNode) and not name.startswith("_") and names[value.index] is None:
+            names[value.index] = name
+    return names
+
+
+def assign_ids(kinds, names, explicit=None):
+    """Ids estables de nodo.
+
+    Prioridad: nodeid explícito, nombre de variable y, para nodos sin nombre
+    (p. ej. `>> SNS("SNS")`), el tipo en minúsculas con sufijo _2, _3, ...
+    El extractor estático usa la misma regla.
+    """
+    explicit = explicit or [None] * len(kinds)
+    ids = [explicit[i] or names[i] for i in range(len(kinds))]
+    taken = {i for i in ids if i}
+    for i, kind in enumerate(kinds):
+        if ids[i]:
+            continue
+        base = kind.lower()
+        candidate, n = base, 2
+        while candidate in taken:
+            candidate, n = f"{base}_{n}", n + 1
+        ids[i] = candidate
+        taken.add(candidate)
+    return ids
+
+
+# ============================================
+# GRAFO COMPILADO
+# ============================================
+
+def _csr(count, keys, values):
+    """Adyacencia CSR: ptr[i]:ptr[i+1] delimita los valores de la clave i."""
+    ptr = array.array("i", [0]) * (count + 1)
+    for key in keys:
+        ptr[key + 1] += 1
+    for i in range(count):
+        ptr[i + 1] += ptr[i]
+    fill = array.array("i", ptr[:-1])
+    out = array.array("i", [0]) * len(keys)
+    for key, value in zip(keys, values):
+        out[fill[key]] = value
+        fill[key] += 1
+    return ptr, out
+
+
+class CompiledTopology:
+    """Topología en memoria con ids enteros y adyacencia en arrays.
+
+    Las aristas se orientan según el flujo: una arista `a << b` (dir=back)
+    cuenta como b -> a en successors()/predecessors(). out_ptr/out_edge e
+    in_ptr/in_edge son índices CSR sobre los ids de arista.
+    """
+
+    def __init__(self, spec):
+        self.graph = {k: v for k, v in spec.items() if k not in ("nodes", "edges", "clusters")}
+
+        self.cluster_ids = [c["id"] for c in spec.get("clusters", [])]
+        cluster_index = {cid: i for i, cid in enumerate(self.cluster_ids)}
+        self.cluster_labels = [c.get("label", c["id"]) for c in spec.get("clusters", [])]
+        self.cluster_parent = array.array("i", [
+            cluster_index[c["parent"]] if c.get("parent") else -1 for c in spec.get("clusters", [])
+        ])
+        self.cluster_direction = [c.get("direction", "LR") for c in spec.get("clusters", [])]
+        self.cluster_attrs = [c.get("graph_attr") or None for c in spec.get("clusters", [])]
+        self.cluster_order = array.array("i", [c.get("order", 0) for c in spec.get("clusters", [])])
+
+        nodes = spec.get("nodes", [])
+        self.ids = [n["id"] for n in nodes]
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+        if len(self.index) != len(self.ids):
+            raise ValueError("ids de nodo duplicados en la especificación")
+        self.kinds = sorted({n["kind"] for n in nodes})
+        kind_index = {kind: i for i, kind in enumerate(self.kinds)}
+        self.node_kind = array.array("H", [kind_index[n["kind"]] for n in nodes])
+        self.labels = [n.get("label", "") for n in nodes]
+        self.node_cluster = array.array("i", [
+            cluster_index[n["cluster"]] if n.get("cluster") else -1 for n in nodes
+        ])
+        self.node_order = array.array("i", [n.get("order", 0) for n in nodes])
+        self.node_attrs = {i: n["attrs"] for i, n in enumerate(nodes) if n.get("attrs")}
+        self.node_capacity = {i: n["capacity"] for i, n in enumerate(nodes) if n.get("capacity")}
+
+        edges = spec.get("edges", [])
+        self.edge_src = array.array("i", [self.index[e["src"]] for e in edges])
+        self.edge_dst = array.array("i", [self.index[e["dst"]] for e in edges])
+        self.edge_dir = array.array("b", [EDGE_DIRS.index(e.get("dir", "forward")) for e in edges])
+        self.edge_label = [e.get("label") or None for e in edges]
+        self.edge_extra = {
+            i: {k: e[k] for k in ("style", "color", "attrs") if k in e}
+            for i, e in enumerate(edges) if any(k in e for k in ("style", "color", "attrs"))
+        }
+
+        flow_src = array.array("i", [
+            d if direction == 2 else s
+            for s, d, direction in zip(self.edge_src, self.edge_dst, self.edge_dir)
+        ])
+        flow_dst = array.array("i", [
+            s if direction == 2 else d
+            for s, d, direction in zip(self.edge_src, self.edge_dst, self.edge_dir)
+        ])
+        self.flow_src, self.flow_dst = flow_src, flow_dst
+        edge_ids = range(len(edges))
+        self.out_ptr, self.out_edge = _csr(len(nodes), flow_src, edge_ids)
+        self.in_ptr, self.in_edge = _csr(len(nodes), flow_dst, edge_ids)
+        self.digest = spec_digest(spec)
+
+    @property
+    def n_nodes(self):
+        return len(self.ids)
+
+    @property
+    def n_edges(self):
+        return len(self.edge_src)
+
+    def kind(self, node):
+        return self.kinds[self.node_kind[node]]
+
+    def out_edges(self, node):
+        return self.out_edge[self.out_ptr[node]:self.out_ptr[node + 1]]
+
+    def in_edges(self, node):
+        return self.in_edge[self.in_ptr[node]:self.in_ptr[node + 1]]
+
+    def successors(self, node):
+        return [self.flow_dst[e] for e in self.out_edges(node)]
+
+    def predecessors(self, node):
+        return [self.flow_src[e] for e in self.in_edges(node)]
+
+    def cluster_path(self, node):
+        """Clusters que contienen al nodo, del más externo al más interno."""
+        path = []
+        cluster = self.node_cluster[node]
+        while cluster != -1:
+            path.append(cluster)
+            cluster = self.cluster_parent[cluster]
+        return path[::-1]
+
+    def top_cluster(self, node):
+        path = self.cluster_path(node)
+        return path[0] if path else -1
+
+    def to_spec(self):
+        clusters = []
+        for i, cluster_id in enumerate(self.cluster_ids):
+            parent = self.cluster_parent[i]
+            record = {"id": cluster_id, "label": self.cluster_labels[i],
+                      "parent": self.cluster_ids[parent] if parent != -1 else None,
+                      "direction": self.cluster_direction[i]}
+            if self.cluster_attrs[i]:
+                record["graph_attr"] = self.cluster_attrs[i]
+            record["order"] = self.cluster_order[i]
+            clusters.append(record)
+        nodes = []
+        for i, node_id in enumerate(self.ids):
+            cluster = self.node_cluster[i]
+            record = {"id": node_id, "kind": self.kind(i), "label": self.labels[i],
+                      "cluster": self.cluster_ids[cluster] if cluster != -1 else None,
+                      "order": self.node_order[i]}
+            if i in self.node_attrs:
+                record["attrs"] = self.node_attrs[i]
+            if i in self.node_capacity:
+                record["capacity"] = self.node_capacity[i]
+            nodes.append(record)
+        edges = []
+        for i in range(self.n_edges):
+            record = {"src": self.ids[self.edge_src[i]], "dst": self.ids[self.edge_dst[i]],
+                      "dir": EDGE_DIRS[self.edge_dir[i]]}
+            if self.edge_label[i]:
+                record["label"] = self.edge_label[i]
+            record.update(self.edge_extra.get(i, {}))
+            edges.append(record)
+        return dict(self.graph, clusters=clusters, nodes=nodes, edges=edges)
+
+
+def spec_digest(spec):
+    data = json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def compile_spec(spec):
+    return CompiledTopology(spec)
+
+
+# ============================================
+# ARTEFACTOS Y CARGA
+# ============================================
+
+def file_sha(path):
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+def artifact_path(script):
+    stem = os.path.splitext(os.path.basename(script))[0]
+    return os.path.join(TOPOLOGY_DIR, f"{stem}.topo")
+
+
+def save(graph, path, script_sha=None):
+    """Escribe el artefacto pickle de forma atómica."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    header = {"version": ARTIFACT_VERSION, "digest": graph.digest, "script_sha": script_sha}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump((header, graph), fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _read_artifact(path):
+    with open(path, "rb") as fh:
+        header, graph = pickle.load(fh)
+    if header.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"{path}: versión de artefacto {header.get('version')} no soportada")
+    return header, graph
+
+
+def spec_from_script(path):
+    """Ejecuta un script en modo "solo emitir" y devuelve su especificación."""
+    global _emit_only
+    path = os.path.abspath(path)
+    script_dir = os.path.dirname(path)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    previous, _emit_only = _emit_only, True
+    start = len(_emitted)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(path, run_name="__main__")
+    finally:
+        _emit_only = previous
+    specs = _emitted[start:]
+    del _emitted[start:]
+    if not specs:
+        raise ValueError(f"{path} no construyó ningún Diagram de topology")
+    return specs[0]
+
+
+def load(path, static=False):
+    """CompiledTopology de un script (.py), especificación (.json) o artefacto (.topo).
+
+    Para un script se usa el artefacto de .topology/ si corresponde al
+    contenido actual del script; si no, se ejecuta en modo "solo emitir"
+    (sin diagrams ni Graphviz) y se guarda el artefacto. Con static=True el
+    script no se ejecuta: se analiza con extract_topology.
+    """
+    if path.endswith(".topo"):
+        return _read_artifact(path)[1]
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as fh:
+            return compile_spec(json.load(fh))
+    sha = file_sha(path)
+    artifact = artifact_path(path)
+    try:
+        header, graph = _read_artifact(artifact)
+        if header.get("script_sha") == sha:
+            return graph
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+        pass
+    if static:
+        import extract_topology
+        spec = extract_topology.extract(path)
+    else:
+        spec = spec_from_script(path)
+    graph = compile_spec(spec)
+    save(graph, artifact, script_sha=sha)
+    return graph
+
+
+def load_spec(path, static=False):
+    """Especificación declarativa de cualquier fuente admitida por load()."""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    return load(path, static=static).to_spec()
+
+
+# ============================================
+# RENDER
+# ============================================
+
+def _children(spec):
+    """Contenido de cada cluster (None = raíz) ordenado como en el script."""
+    items = {None: []}
+    for cluster in spec.get("clusters", []):
+        items.setdefault(cluster["id"], [])
+    for cluster in spec.get("clusters", []):
+        items[cluster.get("parent")].append((cluster.get("order", 0), "cluster", cluster))
+    for node in spec.get("nodes", []):
+        items[node.get("cluster")].append((node.get("order", 0), "node", node))
+    for content in items.values():
+        content.sort(key=lambda item: (item[0], item[1] == "cluster"))
+    return items
+
+
+def render(spec, cache=None):
+    """Renderiza la especificación con diagrams a través de la caché de render.
+
+    Si el render anterior del mismo diagrama tiene la misma geometría de
+    clusters se reutilizan sus posiciones (ver topology_diff.py).
+    """
+    if _emit_only:
+        _emitted.append(spec)
+        return None
+    from diagrams import Cluster as DiagramsCluster
+    from diagrams import Edge as DiagramsEdge
+    from render_cache import CachedDiagram, RenderCache
+
+    import topology_diff
+
+    cache = cache if cache is not None else RenderCache()
+    source_spec = spec
+    placed = topology_diff.positioned_spec(spec, cache)
+    if placed is not None:
+        spec = placed
+    items = _children(spec)
+    created = {}
+    diagram = CachedDiagram(
+        spec.get("name", ""), filename=spec.get("filename", ""),
+        direction=spec.get("direction", "LR"), curvestyle=spec.get("curvestyle", "ortho"),
+        outformat=spec.get("outformat", "png"), autolabel=spec.get("autolabel", False),
+        show=spec.get("show", False), strict=spec.get("strict", False),
+        graph_attr=spec.get("graph_attr"), node_attr=spec.get("node_attr"),
+        edge_attr=spec.get("edge_attr"), cache=cache,
+    )
+    diagram.positioned = placed is not None
+
+    def emit(parent):
+        for _, kind, item in items[parent]:
+            if kind == "node":
+                cls = lazy_nodes.node(item["kind"]).resolve()
+                node = cls(item.get("label", ""), **item.get("attrs", {}))
+                diagram.node_names[node.nodeid] = item["id"]
+                created[item["id"]] = node
+            else:
+                cluster = DiagramsCluster(item.get("label", ""), direction=item.get("direction", "LR"),
+                                          graph_attr=item.get("graph_attr"))
+                # subgrafo nombrado por el id estable, no por la etiqueta: dos
+                # clusters con la misma etiqueta no se confunden en el layout
+                cluster.name = cluster.dot.name = f"cluster_{item['id']}"
+                with cluster:
+                    emit(item["id"])
+
+    with diagram:
+        emit(None)
+        for edge in spec.get("edges", []):
+            direction = edge.get("dir", "forward")
+            diagram.connect(created[edge["src"]], created[edge["dst"]], DiagramsEdge(
+                forward=direction in ("forward", "both"),
+                reverse=direction in ("back", "both"),
+                label=edge.get("label", ""), color=edge.get("color", ""),
+                style=edge.get("style", ""), **edge.get("attrs", {}),
+            ))
+    topology_diff.record_layout(source_spec, diagram)
+    return diagram
+
+
+# ============================================
+# CLI
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Especificación y modelo compilado de topologías")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("export", "escribe la especificación JSON"),
+                            ("compile", "escribe el artefacto compilado (.topo)"),
+                            ("render", "renderiza la topología"),
+                            ("info", "resumen de nodos, aristas y clusters")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("source", help="script .py, especificación .json o artefacto .topo")
+        if name in ("export", "compile"):
+            cmd.add_argument("-o", "--output", help="archivo de salida")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        data = json.dumps(load_spec(args.source), ensure_ascii=False, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as fh:
+                fh.write(data + "\n")
+        else:
+            print(data)
+    elif args.command == "compile":
+        graph = load(args.source)
+        output = args.output or os.path.splitext(args.source)[0] + ".topo"
+        save(graph, output)
+        print(f"✅ {output}: {graph.n_nodes} nodos, {graph.n_edges} aristas")
+    elif args.command == "render":
+        render(load_spec(args.source))
+        print("✅ Diagrama generado")
+    else:
+        graph = load(args.source)
+        print(f"📊 {graph.graph.get('name') or args.source}")
+        print(f"   {graph.n_nodes} nodos, {graph.n_edges} aristas, {len(graph.cluster_ids)} clusters")
+        print(f"   tipos: {', '.join(graph.kinds)}")
+        print(f"   digest: {graph.digest[:16]}")
+
+
+if __name__ == "__main__":
+    # Los scripts hacen `import topology`: el CLI debe usar ese mismo módulo
+    # (modo "solo emitir", clases de los artefactos pickle), no __main__
+    import topology
+
+    topology.main()
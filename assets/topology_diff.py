@@ -0,0 +1,369 @@
+# topology_diff.py
+# Diff estructural entre dos versiones de una topología y render incremental.
+#
+# Cada cluster recibe dos hashes canónicos (árbol de Merkle, de las hojas a
+# la raíz):
+#   - layout:    nodos (id, tipo, etiqueta, atributos) y subclusters en el
+#                orden del script, más label/direction/graph_attr del cluster
+#   - contenido: el hash de layout más la capacidad de sus nodos, las aristas
+#                cuyo ancestro común más bajo es ese cluster y los hashes de
+#                contenido de los hijos
+# Si dos versiones tienen el mismo hash de contenido en la raíz son iguales y
+# el diff termina ahí; si no, solo se recorren los clusters marcados.
+#
+# Render incremental: tras cada render se guarda en la caché (history/) la
+# especificación y las posiciones (json de Graphviz). Si la siguiente versión
+# conserva el hash de layout de todos los clusters (p. ej. solo se añadió
+# `lambda_registro >> api_pagos`), topology.render() reinyecta pos/bb de los
+# nodos, clusters y aristas sin cambios y Graphviz solo enruta las aristas
+# nuevas (neato -n2) en lugar de rehacer el layout completo.
+# DIAGRAMS_FULL_LAYOUT=1 fuerza el layout completo.
+#
+# Uso:
+#     python topology_diff.py viejo.json delimasa_aws_diagram.py
+#     python topology_diff.py delimasa_aws_diagram.py --against HEAD
+#     python topology_diff.py delimasa_aws_diagram.py --against HEAD~3 --json
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+import topology
+
+HISTORY_VERSION = 2
+ROOT = None
+
+# Atributos de posición: no cuentan para los hashes ni para el diff
+_POSITION_ATTRS = ("pos", "bb", "lp")
+_EDGE_FIELDS = ("dir", "label", "style", "color", "attrs")
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def _sha(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _strip_positions(attrs):
+    return {k: v for k, v in (attrs or {}).items() if k not in _POSITION_ATTRS}
+
+
+def _node_signature(node):
+    return _canonical([node["id"], node["kind"], node.get("label", ""),
+                       _strip_positions(node.get("attrs"))])
+
+
+def _edge_signature(edge):
+    return _canonical([edge["src"], edge["dst"]] + [
+        _strip_positions(edge.get(f)) if f == "attrs" else edge.get(f) for f in _EDGE_FIELDS
+    ])
+
+
+def _cluster_paths(spec):
+    parents = {c["id"]: c.get("parent") for c in spec.get("clusters", [])}
+    paths = {}
+
+    def path(cluster):
+        if cluster not in paths:
+            paths[cluster] = [] if cluster is None else path(parents.get(cluster)) + [cluster]
+        return paths[cluster]
+
+    return {n["id"]: path(n.get("cluster")) for n in spec.get("nodes", [])}
+
+
+def edge_owner(paths, edge):
+    """Cluster más profundo que contiene ambos extremos (None = raíz)."""
+    owner = ROOT
+    for a, b in zip(paths[edge["src"]], paths[edge["dst"]]):
+        if a != b:
+            break
+        owner = a
+    return owner
+
+
+def cluster_hashes(spec):
+    """{cluster_id | None: (hash_layout, hash_contenido)} de toda la especificación."""
+    items = topology._children(spec)
+    paths = _cluster_paths(spec)
+    owned = {cluster: [] for cluster in items}
+    for edge in spec.get("edges", []):
+        owned[edge_owner(paths, edge)].append(_edge_signature(edge))
+    clusters = {c["id"]: c for c in spec.get("clusters", [])}
+    hashes = {}
+
+    def visit(cluster):
+        if cluster is None:
+            header = _canonical([spec.get(k) for k in ("direction", "curvestyle")]
+                                + [_strip_positions(spec.get(k))
+                                   for k in ("graph_attr", "node_attr", "edge_attr")])
+        else:
+            record = clusters[cluster]
+            header = _canonical([record.get("label", ""), record.get("direction", "LR"),
+                                 _strip_positions(record.get("graph_attr"))])
+        layout_parts, content_parts = [header], []
+        for _, kind, item in items[cluster]:
+            if kind == "node":
+                layout_parts.append(_node_signature(item))
+                if item.get("capacity"):
+                    content_parts.append(_canonical([item["id"], item["capacity"]]))
+            else:
+                child_layout, child_content = visit(item["id"])
+                layout_parts.append(child_layout)
+                content_parts.append(child_content)
+        layout = _sha(*layout_parts)
+        content = _sha(layout, *content_parts, *sorted(owned[cluster]))
+        hashes[cluster] = (layout, content)
+        return hashes[cluster]
+
+    visit(ROOT)
+    return hashes
+
+
+# ============================================
+# DIFF ESTRUCTURAL
+# ============================================
+
+def _edge_keys(edges):
+    """(src, dst, n-ésima aparición) -> arista: identidad estable entre versiones."""
+    seen, keyed = {}, {}
+    for edge in edges:
+        pair = (edge["src"], edge["dst"])
+        seen[pair] = seen.get(pair, 0) + 1
+        keyed[pair + (seen[pair],)] = edge
+    return keyed
+
+
+def _field_changes(old, new, fields):
+    return {f: (old.get(f), new.get(f)) for f in fields if old.get(f) != new.get(f)}
+
+
+def diff(old, new):
+    """Diferencias entre dos especificaciones.
+
+    Devuelve un dict con "identical", "dirty" (clusters cuyo hash de contenido
+    cambió o que desaparecieron, None = raíz) y, para "nodes", "edges" y "clusters", las listas
+    "added", "removed" y "changed" (cambios como {campo: (antes, después)}).
+    """
+    old_hashes, new_hashes = cluster_hashes(old), cluster_hashes(new)
+    result = {"identical": old_hashes[ROOT] == new_hashes[ROOT],
+              "layout_reusable": layout_reusable(old_hashes, new_hashes),
+              "dirty": [c for c in new_hashes if old_hashes.get(c) != new_hashes[c]]
+                       + [c for c in old_hashes if c not in new_hashes]}
+    for section in ("nodes", "edges", "clusters"):
+        result[section] = {"added": [], "removed": [], "changed": []}
+    if result["identical"]:
+        return result
+
+    def compare(section, old_items, new_items, fields):
+        out = result[section]
+        for key, item in new_items.items():
+            if key not in old_items:
+                out["added"].append(item)
+            else:
+                changes = _field_changes(old_items[key], item, fields)
+                if changes:
+                    out["changed"].append((key, changes))
+        out["removed"].extend(item for key, item in old_items.items() if key not in new_items)
+
+    compare("nodes", {n["id"]: n for n in old.get("nodes", [])},
+            {n["id"]: n for n in new.get("nodes", [])}, ("kind", "label", "cluster", "attrs", "capacity"))
+    compare("clusters", {c["id"]: c for c in old.get("clusters", [])},
+            {c["id"]: c for c in new.get("clusters", [])}, ("label", "parent", "direction", "graph_attr"))
+    compare("edges", _edge_keys(old.get("edges", [])), _edge_keys(new.get("edges", [])), _EDGE_FIELDS)
+    return result
+
+
+def layout_reusable(old_hashes, new_hashes):
+    """True si todos los clusters conservan su hash de layout."""
+    return old_hashes.keys() == new_hashes.keys() and all(
+        old_hashes[c][0] == new_hashes[c][0] for c in new_hashes
+    )
+
+
+# ============================================
+# RENDER INCREMENTAL
+# ============================================
+
+def history_path(cache, spec):
+    return os.path.join(cache.root, "history", f"{os.path.basename(spec.get('filename') or 'diagram')}.json")
+
+
+def layout_positions(data, spec):
+    """Posiciones del json de Graphviz indexadas por ids de la especificación.
+
+    topology.render nombra cada subgrafo "cluster_<id>": el id es único aunque
+    dos clusters compartan etiqueta.
+    """
+    layout = json.loads(data)
+    by_name = {"cluster_" + c["id"]: c["id"] for c in spec.get("clusters", [])}
+    nodes, clusters, gvid = {}, {}, {}
+    for obj in layout.get("objects", []):
+        name = obj.get("name", "")
+        if "nodes" in obj or "subgraphs" in obj or name in by_name:
+            if name in by_name:
+                clusters[by_name[name]] = {k: obj[k] for k in ("bb", "lp") if k in obj}
+        elif "pos" in obj:
+            nodes[name] = obj["pos"]
+            gvid[obj["_gvid"]] = name
+    seen, edges = {}, []
+    for edge in layout.get("edges", []):
+        if "pos" not in edge or edge.get("tail") not in gvid or edge.get("head") not in gvid:
+            continue
+        pair = (gvid[edge["tail"]], gvid[edge["head"]])
+        seen[pair] = seen.get(pair, 0) + 1
+        edges.append([pair[0], pair[1], seen[pair], edge["pos"], edge.get("lp")])
+    return {"bb": layout.get("bb"), "nodes": nodes, "clusters": clusters, "edges": edges}
+
+
+def record_layout(spec, diagram):
+    """Guarda especificación y posiciones del render para la próxima versión."""
+    path = diagram.cache.get(diagram.positions_key, "json") if diagram.positions_key else None
+    if path is None:
+        return
+    with open(path, "rb") as fh:
+        positions = layout_positions(fh.read(), spec)
+    target = history_path(diagram.cache, spec)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"version": HISTORY_VERSION, "spec": spec, "layout": positions}, fh, ensure_ascii=False)
+    os.replace(tmp, target)
+
+
+def positioned_spec(spec, cache):
+    """Copia de `spec` con las posiciones del render anterior, o None.
+
+    Solo aplica si todos los clusters conservan su hash de layout; las
+    aristas nuevas o modificadas quedan sin `pos` y Graphviz las enruta.
+    """
+    if os.environ.get("DIAGRAMS_FULL_LAYOUT") == "1":
+        return None
+    try:
+        with open(history_path(cache, spec), encoding="utf-8") as fh:
+            history = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if history.get("version") != HISTORY_VERSION:
+        return None
+    previous, layout = history["spec"], history["layout"]
+    if not layout_reusable(cluster_hashes(previous), cluster_hashes(spec)):
+        return None
+    if any(n["id"] not in layout["nodes"] for n in spec["nodes"]):
+        return None
+
+    placed = json.loads(json.dumps(spec))
+    if layout.get("bb"):
+        placed["graph_attr"] = dict(placed.get("graph_attr") or {}, bb=layout["bb"])
+    for cluster in placed.get("clusters", []):
+        geometry = layout["clusters"].get(cluster["id"])
+        if geometry:
+            cluster["graph_attr"] = dict(cluster.get("graph_attr") or {}, **geometry)
+    for node in placed["nodes"]:
+        node["attrs"] = dict(node.get("attrs") or {}, pos=layout["nodes"][node["id"]])
+    old_edges = _edge_keys(previous.get("edges", []))
+    routes = {(src, dst, n): (pos, lp) for src, dst, n, pos, lp in layout["edges"]}
+    for key, edge in _edge_keys(placed.get("edges", [])).items():
+        old = old_edges.get(key)
+        if key not in routes or old is None or _edge_signature(old) != _edge_signature(edge):
+            continue
+        pos, lp = routes[key]
+        edge["attrs"] = dict(edge.get("attrs") or {}, pos=pos)
+        if lp:
+            edge["attrs"]["lp"] = lp
+    return placed
+
+
+# ============================================
+# CLI
+# ============================================
+
+def _spec_at_revision(path, revision):
+    """Especificación del script en una revisión de git (sin ejecutarlo)."""
+    import extract_topology
+    directory = os.path.dirname(os.path.abspath(path))
+    top = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=directory,
+                         capture_output=True, text=True, check=True).stdout.strip()
+    relative = os.path.relpath(os.path.abspath(path), top).replace(os.sep, "/")
+    source = subprocess.run(["git", "show", f"{revision}:{relative}"], cwd=top,
+                            capture_output=True, text=True, check=True).stdout
+    specs, _ = extract_topology.extract_source(source, filename=f"{revision}:{relative}")
+    if not specs:
+        raise ValueError(f"{revision}:{relative} no contiene un bloque with Diagram(...)")
+    return specs[0]
+
+
+def _load(path, static):
+    return topology.load_spec(path, static=static) if path.endswith(".py") else topology.load_spec(path)
+
+
+def _describe_edge(edge):
+    arrow = {"forward": "->", "back": "<-", "both": "<->"}.get(edge.get("dir"), "--")
+    label = f" [{edge['label']}]" if edge.get("label") else ""
+    return f"{edge['src']} {arrow} {edge['dst']}{label}"
+
+
+def print_diff(result):
+    if result["identical"]:
+        print("✅ Sin cambios estructurales")
+        return
+    for section, title in (("clusters", "Clusters"), ("nodes", "Nodos"), ("edges", "Aristas")):
+        changes = result[section]
+        if not any(changes.values()):
+            continue
+        print(f"\n{title}:")
+        describe = _describe_edge if section == "edges" else (lambda item: f"{item['id']} ({item.get('label', '')!r})")
+        for item in changes["added"]:
+            print(f"  + {describe(item)}")
+        for item in changes["removed"]:
+            print(f"  - {describe(item)}")
+        for key, fields in changes["changed"]:
+            name = f"{key[0]} -> {key[1]} #{key[2]}" if section == "edges" else key
+            for field, (before, after) in fields.items():
+                print(f"  ~ {name}: {field} {before!r} → {after!r}")
+    dirty = ", ".join("(raíz)" if c is None else c for c in result["dirty"])
+    print(f"\n🔎 Clusters afectados: {dirty}")
+    print("♻️  Layout reutilizable: solo se enrutan las aristas nuevas" if result["layout_reusable"]
+          else "🔁 Cambió la geometría de algún cluster: se requiere layout completo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff estructural entre dos versiones de una topología")
+    parser.add_argument("old", help="versión anterior (.py, .json o .topo) o la actual con --against")
+    parser.add_argument("new", nargs="?", help="versión nueva")
+    parser.add_argument("--against", metavar="REV", help="compara el script con su versión en una revisión de git")
+    parser.add_argument("--static", action="store_true", help="analiza los scripts sin ejecutarlos")
+    parser.add_argument("--json", action="store_true", help="imprime el diff como JSON")
+    args = parser.parse_args()
+
+    if args.against:
+        if args.new:
+            parser.error("--against recibe un solo script")
+        old, new = _spec_at_revision(args.old, args.against), _load(args.old, args.static)
+    elif args.new:
+        old, new = _load(args.old, args.static), _load(args.new, args.static)
+    else:
+        parser.error("indica dos versiones o --against REV")
+
+    started = time.perf_counter()
+    result = diff(old, new)
+    elapsed = (time.perf_counter() - started) * 1000
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=list))
+    else:
+        print_diff(result)
+        print(f"⏱️  Diff en {elapsed:.1f} ms")
+    return 0 if result["identical"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,582 @@
+# trace_critical_path.py
+# Camino crítico de trazas distribuidas agregado por nodo del diagrama.
+#
+# El diagrama envía api_gateway y step_functions a X-Ray. Este analizador lee
+# volcados locales de trazas (JSON-lines, también .gz):
+#   - X-Ray: documentos de segmento ({"trace_id", "id", "parent_id",
+#     "subsegments": [...]}) o la salida de batch-get-traces
+#     ({"Id", "Segments": [{"Document": "..."}]})
+#   - OpenTelemetry: exportación OTLP/JSON ({"resourceSpans": [...]})
+# reconstruye el árbol de spans de cada traza, calcula su camino crítico
+# (lo que realmente marcó la duración: hijos en paralelo que terminan antes
+# no cuentan) y reparte esa duración entre los nodos de la topología.
+#
+# Con millones de trazas solo se guarda, por traza, su duración, el id de su
+# camino crítico y unos pocos pares (nodo, segundos). El ranking final dice
+# qué nodo pesa más en la cola (p99) del flujo elegido, por defecto el
+# registro de pedidos (trazas que pasan por lambda_registro):
+#   media en la cola   segundos críticos medios en las trazas >= p99
+#   exceso             media en la cola - media en todas las trazas
+#   % de la cola       parte de la duración de las trazas de cola
+#
+# Los spans se asocian a nodos como en traffic_overlay.py (id, etiqueta o
+# --aliases); un span sin nodo cuenta para el nodo de su padre. Los archivos
+# se procesan en paralelo (--jobs) y los grandes sin comprimir se reparten en
+# rangos de bytes: los segmentos de una traza deben estar cerca en el volcado
+# (--window trazas abiertas como máximo por proceso). Las trazas que cruzan
+# el borde de un rango se unen al combinar los rangos, así que el resultado
+# es el mismo con cualquier --jobs.
+#
+# Uso:
+#     python trace_critical_path.py generate trazas.jsonl --traces 200000
+#     python trace_critical_path.py run trazas.jsonl --jobs 8
+#     python trace_critical_path.py run xray/*.jsonl.gz --flow lambda_registro --quantile 99.9
+#     python trace_critical_path.py run otel.jsonl --flow all --json critico.json
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+import topology
+from latency_mc import LatencyModel, load_model
+from traffic_overlay import Resolver, _open
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = os.path.join(BASE_DIR, "delimasa_aws_diagram.py")
+
+# Campos que identifican el recurso llamado, por orden de preferencia
+XRAY_AWS_FIELDS = ("function_name", "table_name", "state_machine_name", "queue_url", "topic_arn")
+OTEL_PEER_FIELDS = ("peer.service", "db.name", "messaging.destination.name", "rpc.service", "server.address")
+
+# Flujo sintético de registro: grupos que se ejecutan en orden; dentro de un
+# grupo las llamadas van en paralelo. Cada par tiene que ser una arista del diagrama.
+SYNTHETIC_FLOW = {
+    "api_gateway": [["cognito_clientes"], ["lambda_registro"]],
+    "lambda_registro": [["lambda_validacion_inv", "lambda_validacion_cred"], ["api_pagos"], ["rds"],
+                        ["sqs_pedidos", "step_functions"]],
+    "lambda_validacion_inv": [["rds"], ["vpn"]],
+    "lambda_validacion_cred": [["rds"], ["sagemaker"]],
+    "sagemaker": [["rds_replica"]],
+    "vpn": [["legacy_erp"]],
+}
+SYNTHETIC_LATENCY = {
+    "cognito_clientes": {"dist": "lognormal", "median": 0.012, "sigma": 0.4},
+    "legacy_erp": {"dist": "lognormal", "median": 0.09, "sigma": 0.5},
+    "api_pagos": {"dist": "lognormal", "median": 0.18, "sigma": 0.35},
+}
+# nodo: (probabilidad, multiplicador) de un episodio lento
+SYNTHETIC_TAIL = {"legacy_erp": (0.02, 12.0), "sagemaker": (0.01, 6.0), "rds": (0.004, 15.0)}
+SEGMENT_KINDS = {"APIGateway", "Lambda", "Fargate", "StepFunctions"}
+
+
+# ============================================
+# LECTURA DE SPANS
+# ============================================
+
+def _resolve(resolver, names):
+    for name in names:
+        if name:
+            node = resolver.node(name)
+            if node >= 0:
+                return node, None
+    return -1, next((name for name in names if name), None)
+
+
+def xray_spans(document, resolver, parent=None, trace=None):
+    """Spans (traza, id, padre, nodo, inicio, fin, nombre sin nodo) de un segmento."""
+    trace = document.get("trace_id", trace)
+    start, end = document.get("start_time"), document.get("end_time")
+    if trace is None or start is None or end is None:
+        return
+    aws = document.get("aws") or {}
+    names = [document.get("name")]
+    for field in XRAY_AWS_FIELDS:
+        value = aws.get(field)
+        if isinstance(value, str):
+            names.append(value.rsplit("/", 1)[-1].rsplit(":", 1)[-1])
+    node, unknown = _resolve(resolver, names)
+    span_id = document.get("id")
+    yield trace, span_id, document.get("parent_id", parent), node, float(start), float(end), unknown
+    for child in document.get("subsegments") or ():
+        yield from xray_spans(child, resolver, parent=span_id, trace=trace)
+
+
+def _otel_attrs(items):
+    attrs = {}
+    for item in items or ():
+        value = item.get("value") or {}
+        attrs[item.get("key")] = next(iter(value.values()), None) if value else None
+    return attrs
+
+
+def otel_spans(record, resolver):
+    for resource_spans in record.get("resourceSpans") or ():
+        service = _otel_attrs((resource_spans.get("resource") or {}).get("attributes")).get("service.name")
+        for scope in resource_spans.get("scopeSpans") or ():
+            for span in scope.get("spans") or ():
+                attrs = _otel_attrs(span.get("attributes"))
+                names = [attrs.get(field) for field in OTEL_PEER_FIELDS]
+                names += [span.get("name"), service]
+                node, unknown = _resolve(resolver, [n for n in names if isinstance(n, str)])
+                yield (span.get("traceId"), span.get("spanId"), span.get("parentSpanId") or None, node,
+                       int(span["startTimeUnixNano"]) / 1e9, int(span["endTimeUnixNano"]) / 1e9, unknown)
+
+
+def record_spans(record, resolver):
+    if "resourceSpans" in record:
+        yield from otel_spans(record, resolver)
+    elif "Segments" in record:
+        for segment in record["Segments"]:
+            document = segment.get("Document")
+            if isinstance(document, str):
+                document = json.loads(document)
+            if document:
+                yield from xray_spans(document, resolver, trace=record.get("Id"))
+    else:
+        yield from xray_spans(record, resolver)
+
+
+# ============================================
+# CAMINO CRÍTICO
+# ============================================
+
+def critical_path(spans):
+    """(duración, {nodo: segundos críticos}, nodos del camino en orden) de una traza.
+
+    spans: lista de (id, padre, nodo, inicio, fin). Se recorre desde el final
+    de la raíz hacia atrás: en cada span se toma el hijo que termina más
+    tarde antes del cursor, se desciende en él y el cursor salta a su inicio;
+    los huecos sin hijos son tiempo propio del span.
+    """
+    index = {span[0]: i for i, span in enumerate(spans)}
+    children = {}
+    roots = []
+    for i, span in enumerate(spans):
+        parent = index.get(span[1])
+        if parent is None or parent == i:
+            roots.append(i)
+        else:
+            children.setdefault(parent, []).append(i)
+    if not roots:
+        return None
+    root = max(roots, key=lambda i: spans[i][4] - spans[i][3])
+
+    # nodo efectivo: un span sin nodo hereda el de su padre
+    nodes = {root: spans[root][2]}
+    order = [root]
+    for i in order:
+        for child in children.get(i, ()):
+            nodes[child] = spans[child][2] if spans[child][2] >= 0 else nodes[i]
+            order.append(child)
+
+    contrib = {}
+    visited = [(spans[root][3], nodes[root])]
+    stack = [(root, spans[root][4])]
+    while stack:
+        i, until = stack.pop()
+        start = spans[i][3]
+        node = nodes[i]
+        cursor = min(spans[i][4], until)
+        own = 0.0
+        for child in sorted(children.get(i, ()), key=lambda c: spans[c][4], reverse=True):
+            if cursor <= start:
+                break
+            child_start, child_end = spans[child][3], min(spans[child][4], cursor)
+            if child_start >= cursor or child_end <= start:
+                continue
+            own += cursor - child_end
+            stack.append((child, child_end))
+            visited.append((child_start, nodes[child]))
+            cursor = max(child_start, start)
+        own += max(0.0, cursor - start)
+        if node >= 0 and own > 0:
+            contrib[node] = contrib.get(node, 0.0) + own
+
+    path = []
+    for _, node in sorted(visited):
+        if node >= 0 and node in contrib and (not path or path[-1] != node):
+            path.append(node)
+    return spans[root][4] - spans[root][3], contrib, tuple(path)
+
+
+class TraceTable:
+    """Resultados compactos por traza (arrays planos, baratos de combinar)."""
+
+    def __init__(self):
+        self.durations = array("d")
+        self.path_ids = array("q")
+        self.contrib_trace = array("q")
+        self.contrib_node = array("q")
+        self.contrib_seconds = array("d")
+        self.paths = {}
+        self.unknown = {}
+        self.spans = 0
+        self.skipped = 0
+
+    def add(self, duration, contrib, path):
+        trace = len(self.durations)
+        self.durations.append(duration)
+        self.path_ids.append(self.paths.setdefault(path, len(self.paths)))
+        for node, seconds in contrib.items():
+            self.contrib_trace.append(trace)
+            self.contrib_node.append(node)
+            self.contrib_seconds.append(seconds)
+
+    def merge(self, other):
+        offset = len(self.durations)
+        remap = {pid: self.paths.setdefault(path, len(self.paths)) for path, pid in other.paths.items()}
+        self.durations.extend(other.durations)
+        self.path_ids.extend(remap[pid] for pid in other.path_ids)
+        self.contrib_trace.extend(trace + offset for trace in other.contrib_trace)
+        self.contrib_node.extend(other.contrib_node)
+        self.contrib_seconds.extend(other.contrib_seconds)
+        for name, count in other.unknown.items():
+            self.unknown[name] = self.unknown.get(name, 0) + count
+        self.spans += other.spans
+        self.skipped += other.skipped
+
+
+def close_trace(table, spans, flow):
+    if flow >= 0 and not any(span[2] == flow for span in spans):
+        return
+    result = critical_path(spans)
+    if result is None:
+        table.skipped += 1
+    else:
+        table.add(*result)
+
+
+def analyze_range(task):
+    """Trazas cuyos segmentos empiezan en [start, end) de un archivo.
+
+    Devuelve (tabla, cabeza, cola, ids de cabeza). Las trazas en los bordes
+    del rango no se cierran aquí: `cabeza` son las primeras `window` trazas
+    abiertas (pueden venir del rango anterior) que ya se cerraron o
+    expulsaron, y `cola` las que siguen abiertas al final del rango. analyze()
+    las une con las del rango vecino.
+    """
+    path, start, end, graph, aliases, flow, window = task
+    resolver = Resolver(graph, aliases)
+    table = TraceTable()
+    pending = OrderedDict()
+    head, head_ids = {}, set()
+    opened = 0
+
+    with _open(path) as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        for line in f:
+            if end is not None and position >= end:
+                break
+            position += len(line)
+            line = line.strip()
+            if not line or line[:1] != b"{":
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            for trace, span_id, parent, node, t0, t1, unknown in record_spans(record, resolver):
+                table.spans += 1
+                if unknown is not None:
+                    table.unknown[unknown] = table.unknown.get(unknown, 0) + 1
+                spans = pending.get(trace)
+                if spans is None:
+                    spans = pending[trace] = []
+                    opened += 1
+                    if start and opened <= window:
+                        head_ids.add(trace)
+                    if len(pending) > window:
+                        evicted, evicted_spans = pending.popitem(last=False)
+                        if evicted in head_ids:
+                            head[evicted] = evicted_spans
+                        else:
+                            close_trace(table, evicted_spans, flow)
+                else:
+                    pending.move_to_end(trace)
+                spans.append((span_id, parent, node, t0, t1))
+    if end is None:
+        for spans in pending.values():
+            close_trace(table, spans, flow)
+        pending = {}
+    return table, head, dict(pending), head_ids
+
+
+def analyze(paths, graph, aliases=None, flow=-1, jobs=1, window=10_000):
+    """Tabla de todas las trazas; el resultado no depende de --jobs."""
+    tasks = []
+    for path in paths:
+        if jobs > 1 and not path.endswith(".gz"):
+            size = os.path.getsize(path)
+            step = max(1, -(-size // jobs))
+            tasks.extend((path, offset, min(offset + step, size), graph, aliases, flow, window)
+                         for offset in range(0, size, step))
+        else:
+            tasks.append((path, 0, None, graph, aliases, flow, window))
+    total = TraceTable()
+    carry = {}
+
+    def join(task, part):
+        # una traza abierta al final del rango anterior sigue en la cabeza de este
+        nonlocal carry
+        table, head, tail, head_ids = part
+        total.merge(table)
+        if task[1] == 0:
+            for spans in carry.values():
+                close_trace(total, spans, flow)
+            carry = {}
+        for trace, spans in head.items():
+            close_trace(total, carry.pop(trace, []) + spans, flow)
+        for trace in tail:
+            if trace in head_ids and trace in carry:
+                tail[trace] = carry.pop(trace) + tail[trace]
+        for spans in carry.values():
+            close_trace(total, spans, flow)
+        carry = tail
+
+    if jobs > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(jobs, len(tasks))) as pool:
+            for task, part in zip(tasks, pool.imap(analyze_range, tasks)):
+                join(task, part)
+    else:
+        for task in tasks:
+            join(task, analyze_range(task))
+    for spans in carry.values():
+        close_trace(total, spans, flow)
+    return total
+
+
+# ============================================
+# RANKING
+# ============================================
+
+def rank(graph, table, quantile=99.0):
+    durations = np.frombuffer(table.durations, dtype=np.float64)
+    if not durations.size:
+        return None
+    threshold = float(np.percentile(durations, quantile))
+    tail = durations >= threshold
+    traces = np.frombuffer(table.contrib_trace, dtype=np.int64)
+    nodes = np.frombuffer(table.contrib_node, dtype=np.int64)
+    seconds = np.frombuffer(table.contrib_seconds, dtype=np.float64)
+    in_tail = tail[traces]
+    n = graph.n_nodes
+    total_all = np.bincount(nodes, weights=seconds, minlength=n)
+    total_tail = np.bincount(nodes[in_tail], weights=seconds[in_tail], minlength=n)
+    presence = np.bincount(nodes[in_tail], minlength=n)
+    n_tail = int(tail.sum())
+    tail_time = float(durations[tail].sum())
+
+    rows = []
+    for node in np.flatnonzero(total_all):
+        mean_all = total_all[node] / durations.size
+        mean_tail = total_tail[node] / n_tail
+        rows.append({"node": graph.ids[node], "mean_ms": mean_all * 1000, "tail_mean_ms": mean_tail * 1000,
+                     "excess_ms": (mean_tail - mean_all) * 1000,
+                     "tail_share": total_tail[node] / tail_time if tail_time else 0.0,
+                     "tail_presence": presence[node] / n_tail})
+    rows.sort(key=lambda row: -row["tail_mean_ms"])
+
+    path_ids = np.frombuffer(table.path_ids, dtype=np.int64)
+    names = {pid: " → ".join(graph.ids[node] for node in path) for path, pid in table.paths.items()}
+    counts = np.bincount(path_ids[tail], minlength=len(names))
+    paths = [{"path": names[pid], "share": counts[pid] / n_tail} for pid in np.argsort(-counts)[:5] if counts[pid]]
+    return {"traces": int(durations.size), "spans": table.spans, "quantile": quantile,
+            "threshold_ms": threshold * 1000, "p50_ms": float(np.percentile(durations, 50)) * 1000,
+            "tail_traces": n_tail, "nodes": rows, "tail_paths": paths,
+            "unknown": dict(sorted(table.unknown.items(), key=lambda kv: -kv[1])[:50]),
+            "skipped": table.skipped}
+
+
+# ============================================
+# TRAZAS SINTÉTICAS
+# ============================================
+
+class TraceGenerator:
+    """Trazas X-Ray u OTel del flujo SYNTHETIC_FLOW con latencias de latency_mc."""
+
+    def __init__(self, graph, seed=None, fmt="xray"):
+        self.graph = graph
+        self.rng = random.Random(seed)
+        self.format = fmt
+        config = load_model()
+        config["nodes"].update(SYNTHETIC_LATENCY)
+        self.model = LatencyModel(graph, config)
+        edges = {(graph.flow_src[e], graph.flow_dst[e]) for e in range(graph.n_edges)}
+        for parent, groups in SYNTHETIC_FLOW.items():
+            for child in (c for group in groups for c in group):
+                if (graph.index[parent], graph.index[child]) not in edges:
+                    raise ValueError(f"{parent} → {child} no es una arista del diagrama")
+        self.sequence = 0
+
+    def _latency(self, node_id):
+        spec = self.model.node(self.graph.index[node_id]) or {"dist": "const", "value": 0.0}
+        dist = spec.get("dist")
+        if dist == "lognormal":
+            value = self.rng.lognormvariate(math.log(spec["median"]), spec["sigma"])
+        elif dist == "const":
+            value = float(spec["value"])
+        else:
+            value = 0.005
+        chance, factor = SYNTHETIC_TAIL.get(node_id, (0.0, 1.0))
+        return value * factor if self.rng.random() < chance else value
+
+    def _id(self):
+        self.sequence += 1
+        return f"{self.sequence:016x}"
+
+    def _span(self, node_id, start, parent, spans):
+        """Span del nodo y de sus llamadas; devuelve el instante en que termina."""
+        own = self._latency(node_id)
+        span_id = self._id()
+        cursor = start + own * 0.4
+        for group in SYNTHETIC_FLOW.get(node_id, ()):
+            ends = [self._span(child, cursor + 0.0005, span_id, spans) for child in group]
+            cursor = max(ends) + 0.0005
+        end = cursor + own * 0.6
+        spans.append((span_id, parent, node_id, start, end))
+        return end
+
+    def trace(self, start):
+        spans = []
+        self._span("api_gateway", start, None, spans)
+        trace_id = f"1-{int(start):08x}-{self._id()}{self._id()[:8]}"
+        if self.format == "otel":
+            return [self._otel(trace_id, spans)]
+        return self._xray(trace_id, spans)
+
+    def _otel(self, trace_id, spans):
+        out = [{"traceId": trace_id, "spanId": span_id, "parentSpanId": parent or "", "name": node_id,
+                "startTimeUnixNano": str(int(t0 * 1e9)), "endTimeUnixNano": str(int(t1 * 1e9))}
+               for span_id, parent, node_id, t0, t1 in spans]
+        return {"resourceSpans": [{"resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": "delimasa"}}]},
+            "scopeSpans": [{"spans": out}]}]}
+
+    def _xray(self, trace_id, spans):
+        # Un documento por servicio (API Gateway, Lambda...) con sus llamadas
+        # como subsegmentos; el segmento del servicio llamado apunta al
+        # subsegmento de la llamada con parent_id.
+        documents, subsegments = {}, {}
+        for span_id, parent, node_id, t0, t1 in reversed(spans):
+            kind = self.graph.kind(self.graph.index[node_id])
+            doc = {"id": span_id, "name": f"delimasa-{node_id.replace('_', '-')}",
+                   "start_time": round(t0, 6), "end_time": round(t1, 6)}
+            subsegments[span_id] = doc
+            if parent is None or kind in SEGMENT_KINDS:
+                call_id = self._id()
+                if parent is not None:
+                    subsegments[parent].setdefault("subsegments", []).append(
+                        {"id": call_id, "name": doc["name"], "start_time": doc["start_time"],
+                         "end_time": doc["end_time"]})
+                    doc["parent_id"] = call_id
+                doc["trace_id"] = trace_id
+                documents[span_id] = doc
+            else:
+                subsegments[parent].setdefault("subsegments", []).append(doc)
+        return list(documents.values())
+
+
+def generate(path, graph, traces, seed=None, fmt="xray", rate=50.0):
+    generator = TraceGenerator(graph, seed, fmt)
+    start = 1_735_689_600.0
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(traces):
+            documents = generator.trace(start + i / rate)
+            f.write("".join(json.dumps(doc, separators=(",", ":")) + "\n" for doc in documents))
+
+
+# ============================================
+# CLI
+# ============================================
+
+def print_ranking(data, flow, top):
+    print(f"\n🔎 {data['traces']:,} trazas ({data['spans']:,} spans) del flujo {flow}")
+    print(f"   p50 {data['p50_ms']:,.0f} ms · p{data['quantile']:g} {data['threshold_ms']:,.0f} ms "
+          f"· {data['tail_traces']:,} trazas en la cola")
+    print(f"\n{'Nodo':<26} {'media ms':>9} {'cola ms':>9} {'exceso ms':>10} {'% cola':>7} {'presencia':>10}")
+    print("-" * 76)
+    for row in data["nodes"][:top]:
+        print(f"{row['node']:<26} {row['mean_ms']:>9,.1f} {row['tail_mean_ms']:>9,.1f} {row['excess_ms']:>10,.1f} "
+              f"{row['tail_share']:>7.1%} {row['tail_presence']:>10.1%}")
+    if data["nodes"]:
+        worst = max(data["nodes"], key=lambda row: row["excess_ms"])
+        print(f"\n🎯 Mayor aporte a la cola: {worst['node']} (+{worst['excess_ms']:,.0f} ms sobre su media)")
+    print("\n🛤️  Caminos críticos más frecuentes en la cola:")
+    for row in data["tail_paths"]:
+        print(f"   {row['share']:6.1%}  {row['path']}")
+    if data["unknown"]:
+        names = ", ".join(f"{name} ({count:,})" for name, count in list(data["unknown"].items())[:10])
+        print(f"\n⚠️  Spans sin nodo (cuentan para su padre; usa --aliases): {names}")
+    if data["skipped"]:
+        print(f"⚠️  {data['skipped']:,} trazas sin raíz descartadas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Camino crítico de trazas X-Ray / OpenTelemetry por nodo")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="analiza volcados de trazas")
+    run_parser.add_argument("traces", nargs="+", help="archivos .jsonl o .jsonl.gz")
+    run_parser.add_argument("--source", default=DEFAULT_SCRIPT, help="script, .json o .topo del diagrama")
+    run_parser.add_argument("--aliases", help="JSON {nombre del span: id de nodo}")
+    run_parser.add_argument("--flow", default="lambda_registro",
+                            help="nodo que define el flujo ('all' = todas las trazas)")
+    run_parser.add_argument("--quantile", type=float, default=99.0)
+    run_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    run_parser.add_argument("--window", type=int, default=10_000, help="trazas abiertas por proceso")
+    run_parser.add_argument("--top", type=int, default=15)
+    run_parser.add_argument("--json", dest="json_out", help="escribe el ranking")
+
+    gen_parser = commands.add_parser("generate", help="genera trazas sintéticas del registro de pedidos")
+    gen_parser.add_argument("output")
+    gen_parser.add_argument("--source", default=DEFAULT_SCRIPT)
+    gen_parser.add_argument("--traces", type=int, default=100_000)
+    gen_parser.add_argument("--format", choices=["xray", "otel"], default="xray")
+    gen_parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    graph = topology.load(args.source, static=args.source.endswith(".py"))
+    if args.command == "generate":
+        generate(args.output, graph, args.traces, args.seed, args.format)
+        print(f"✅ {args.traces:,} trazas en {args.output}")
+        return 0
+
+    flow = -1
+    if args.flow != "all":
+        if args.flow not in graph.index:
+            parser.error(f"nodo desconocido: {args.flow}")
+        flow = graph.index[args.flow]
+    aliases = None
+    if args.aliases:
+        with open(args.aliases, encoding="utf-8") as f:
+            aliases = json.load(f)
+    started = time.perf_counter()
+    table = analyze(args.traces, graph, aliases, flow, args.jobs, args.window)
+    elapsed = time.perf_counter() - started
+    data = rank(graph, table, args.quantile)
+    if data is None:
+        print(f"⚠️  Ninguna traza del flujo {args.flow}")
+        return 1
+    print_ranking(data, args.flow, args.top)
+    print(f"\n⏱️  {data['traces']:,} trazas en {elapsed:.1f}s ({data['traces'] / max(elapsed, 1e-9):,.0f}/s)")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"💾 Ranking en {args.json_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
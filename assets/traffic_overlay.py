@@ -0,0 +1,466 @@
+# traffic_overlay.py
+# Tráfico medido pintado sobre el diagrama de arquitectura.
+#
+# Lee exportaciones JSON-lines de logs (CloudWatch estructurado o segmentos
+# de X-Ray, .jsonl o .jsonl.gz, de varios GB) línea a línea con memoria
+# constante, asocia cada registro a un nodo o a una arista de la topología
+# extraída y agrega por arista y por nodo:
+#   peticiones/s   registros / intervalo observado
+#   tasa de error  status >= 500, 429, error/fault/throttle
+#   p99            histograma HDR por arista (load_test.HdrHistogram)
+# Después renderiza una copia del diagrama (<filename>_trafico) donde cada
+# arista lleva penwidth según su tráfico, color según su tasa de error (o su
+# p99) y su etiqueta original más las métricas, y cada nodo una insignia
+# (xlabel) con su tráfico.
+#
+# Registros admitidos (un objeto por línea):
+#   {"timestamp": ..., "source": "delimasa-registro", "target": "rds",
+#    "status": 200, "duration_ms": 18.2}
+#   {"name": "lambda_registro", "start_time": ..., "end_time": ...,
+#    "subsegments": [{"name": "sqs_pedidos", ...}, ...]}        (X-Ray)
+# Los nombres se resuelven contra el id del nodo, su etiqueta o --aliases
+# (JSON nombre -> id), ignorando mayúsculas, guiones y el prefijo "delimasa".
+#
+# Con --jobs N cada archivo sin comprimir se reparte en N rangos de bytes
+# que se procesan en paralelo y se combinan al final.
+#
+# Uso:
+#     python traffic_overlay.py generate logs.jsonl --records 2000000
+#     python traffic_overlay.py run logs.jsonl --jobs 4
+#     python traffic_overlay.py run logs/*.jsonl.gz --color-by p99 --aliases alias.json
+#     python traffic_overlay.py run logs.jsonl --no-render --json trafico.json
+
+import argparse
+import gzip
+import json
+import math
+import multiprocessing
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+import topology
+from load_test import HdrHistogram
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = os.path.join(BASE_DIR, "delimasa_aws_diagram.py")
+
+SOURCE_FIELDS = ("source", "service", "caller", "functionName", "function", "name")
+TARGET_FIELDS = ("target", "downstream", "callee", "resource", "dependency")
+
+ERROR_COLORS = ((0.01, "#2E7D32"), (0.05, "#F9A825"), (math.inf, "#C62828"))
+P99_COLORS = ((0.2, "#2E7D32"), (1.0, "#F9A825"), (math.inf, "#C62828"))
+IDLE_COLOR = "#BDBDBD"
+MAX_PENWIDTH = 8.0
+
+_NORMALIZE_RE = re.compile(r"[^a-z0-9]")
+
+
+# ============================================
+# AGREGACIÓN
+# ============================================
+
+class Stats:
+    __slots__ = ("count", "errors", "latency")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency = HdrHistogram()
+
+    def add(self, error, seconds):
+        self.count += 1
+        self.errors += error
+        if seconds is not None:
+            self.latency.record(seconds)
+
+    def merge(self, other):
+        self.count += other.count
+        self.errors += other.errors
+        self.latency.merge(other.latency)
+
+
+class Aggregate:
+    """Métricas por arista (índice) y por nodo; también saltos no dibujados."""
+
+    def __init__(self):
+        self.edges = {}
+        self.nodes = {}
+        self.undrawn = {}
+        self.unknown = {}
+        self.records = 0
+        self.first = math.inf
+        self.last = -math.inf
+
+    def merge(self, other):
+        for mine, theirs in ((self.edges, other.edges), (self.nodes, other.nodes),
+                             (self.undrawn, other.undrawn)):
+            for key, stats in theirs.items():
+                if key in mine:
+                    mine[key].merge(stats)
+                else:
+                    mine[key] = stats
+        for name, count in other.unknown.items():
+            self.unknown[name] = self.unknown.get(name, 0) + count
+        self.records += other.records
+        self.first = min(self.first, other.first)
+        self.last = max(self.last, other.last)
+
+    @property
+    def duration(self):
+        return max(self.last - self.first, 1.0) if self.records else 1.0
+
+
+class Resolver:
+    """Nombres de los logs -> nodos y pares de nodos -> aristas."""
+
+    def __init__(self, graph, aliases=None):
+        self.graph = graph
+        self.names = {}
+        for node, node_id in enumerate(graph.ids):
+            for name in (node_id, graph.labels[node].replace("\n", " ")):
+                self.names.setdefault(self._key(name), node)
+        for name, node_id in (aliases or {}).items():
+            if node_id not in graph.index:
+                raise ValueError(f"alias {name!r}: nodo desconocido {node_id!r}")
+            self.names[self._key(name)] = graph.index[node_id]
+        self.cache = {}
+        self.edge_of = {}
+        for edge in range(graph.n_edges):
+            pair = (graph.flow_src[edge], graph.flow_dst[edge])
+            self.edge_of.setdefault(pair, edge)
+            if graph.edge_dir[edge] in (0, 3):           # none / both: cualquier sentido
+                self.edge_of.setdefault(pair[::-1], edge)
+
+    @staticmethod
+    def _key(name):
+        key = _NORMALIZE_RE.sub("", name.lower())
+        return key[8:] if key.startswith("delimasa") and len(key) > 8 else key
+
+    def node(self, name):
+        node = self.cache.get(name)
+        if node is None:
+            node = self.names.get(self._key(name), -1)
+            if len(self.cache) < 100_000:
+                self.cache[name] = node
+        return node
+
+
+def _timestamp(value):
+    if isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _is_error(record):
+    status = record.get("status", record.get("statusCode"))
+    if isinstance(status, dict):                          # X-Ray http.response.status
+        status = status.get("status")
+    if isinstance(status, str) and status.isdigit():
+        status = int(status)
+    if isinstance(status, int) and (status >= 500 or status == 429):
+        return 1
+    return int(bool(record.get("error") or record.get("fault") or record.get("throttle")))
+
+
+def _latency(record):
+    for field, scale in (("duration_ms", 1e-3), ("durationMs", 1e-3), ("latency_ms", 1e-3), ("duration", 1.0)):
+        value = record.get(field)
+        if isinstance(value, (int, float)):
+            return value * scale
+    start, end = record.get("start_time"), record.get("end_time")
+    if isinstance(start, (int, float)) and isinstance(end, (int, float)):
+        return max(0.0, end - start)
+    return None
+
+
+def _first(record, fields):
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, str) and value:
+            return value
+    return None
+
+
+def ingest_record(record, resolver, aggregate, parent=None):
+    """Suma un registro (y sus subsegmentos de X-Ray) al agregado."""
+    ts = _timestamp(record.get("timestamp", record.get("start_time")))
+    if ts is not None:
+        aggregate.first = min(aggregate.first, ts)
+        aggregate.last = max(aggregate.last, ts)
+    source_name = _first(record, SOURCE_FIELDS)
+    target_name = _first(record, TARGET_FIELDS)
+    error, seconds = _is_error(record), _latency(record)
+
+    if parent is not None and source_name:
+        # subsegmento: parent -> este nombre
+        source, target = parent, resolver.node(source_name)
+        if target < 0:
+            aggregate.unknown[source_name] = aggregate.unknown.get(source_name, 0) + 1
+    else:
+        source = resolver.node(source_name) if source_name else -1
+        target = resolver.node(target_name) if target_name else -1
+        for name, node in ((source_name, source), (target_name, target)):
+            if name and node < 0:
+                aggregate.unknown[name] = aggregate.unknown.get(name, 0) + 1
+
+    if source >= 0 and target >= 0:
+        edge = resolver.edge_of.get((source, target))
+        table, key = (aggregate.edges, edge) if edge is not None else (aggregate.undrawn, (source, target))
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = Stats()
+        stats.add(error, seconds)
+    node = target if target >= 0 else source
+    if node >= 0:
+        stats = aggregate.nodes.get(node)
+        if stats is None:
+            stats = aggregate.nodes[node] = Stats()
+        stats.add(error, seconds)
+
+    children = record.get("subsegments")
+    if children:
+        owner = target if target >= 0 else source
+        for child in children:
+            if isinstance(child, dict):
+                ingest_record(child, resolver, aggregate, parent=owner if owner >= 0 else None)
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def ingest_range(task):
+    """Procesa [start, end) de un archivo (líneas que empiezan en el rango)."""
+    path, start, end, graph, aliases = task
+    resolver = Resolver(graph, aliases)
+    aggregate = Aggregate()
+    with _open(path) as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()              # termina la línea que empezó en el rango anterior
+        position = f.tell()
+        for line in f:
+            if end is not None and position >= end:
+                break
+            position += len(line)
+            line = line.strip()
+            if not line or line[:1] != b"{":
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            aggregate.records += 1
+            ingest_record(record, resolver, aggregate)
+    return aggregate
+
+
+def ingest(paths, graph, aliases=None, jobs=1):
+    tasks = []
+    for path in paths:
+        if jobs > 1 and not path.endswith(".gz"):
+            size = os.path.getsize(path)
+            step = max(1, -(-size // jobs))
+            tasks.extend((path, offset, min(offset + step, size), graph, aliases)
+                         for offset in range(0, size, step))
+        else:
+            tasks.append((path, 0, None, graph, aliases))
+    total = Aggregate()
+    if jobs > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(jobs, len(tasks))) as pool:
+            for part in pool.imap_unordered(ingest_range, tasks):
+                total.merge(part)
+    else:
+        for task in tasks:
+            total.merge(ingest_range(task))
+    return total
+
+
+# ============================================
+# OVERLAY
+# ============================================
+
+def _rate(stats, duration):
+    return stats.count / duration
+
+
+def _color(value, scale):
+    return next(color for limit, color in scale if value < limit)
+
+
+def _metrics(stats, duration):
+    p99 = stats.latency.percentile(99) if stats.latency.total else math.nan
+    text = f"{_rate(stats, duration):,.1f} rps · {stats.errors / stats.count:.1%} err"
+    return text + (f" · p99 {p99:,.0f} ms" if not math.isnan(p99) else "")
+
+
+def overlay_spec(spec, graph, aggregate, color_by="errors"):
+    """Copia de la especificación con grosor, color y etiquetas de tráfico."""
+    duration = aggregate.duration
+    spec = json.loads(json.dumps(spec))
+    spec["filename"] = f"{spec.get('filename') or 'diagrama'}_trafico"
+    spec["name"] = f"{spec.get('name', '')} · tráfico medido".strip(" ·")
+    peak = max((_rate(s, duration) for s in aggregate.edges.values()), default=0.0)
+    for edge, record in enumerate(spec["edges"]):
+        attrs = dict(record.get("attrs") or {})
+        stats = aggregate.edges.get(edge)
+        if stats is None or not stats.count:
+            record["color"] = IDLE_COLOR
+            record["attrs"] = attrs
+            continue
+        rps = _rate(stats, duration)
+        attrs["penwidth"] = f"{1 + (MAX_PENWIDTH - 1) * math.log1p(rps) / math.log1p(peak):.2f}"
+        if color_by == "p99":
+            record["color"] = _color(stats.latency.percentile(99) / 1000, P99_COLORS)
+        else:
+            record["color"] = _color(stats.errors / stats.count, ERROR_COLORS)
+        original = record.get("label")
+        record["label"] = f"{original}\n{_metrics(stats, duration)}" if original else _metrics(stats, duration)
+        record["attrs"] = attrs
+    by_id = {node["id"]: node for node in spec["nodes"]}
+    for node, stats in aggregate.nodes.items():
+        if stats.count:
+            attrs = dict(by_id[graph.ids[node]].get("attrs") or {})
+            attrs["xlabel"] = _metrics(stats, duration)
+            by_id[graph.ids[node]]["attrs"] = attrs
+    return spec
+
+
+def summary(graph, aggregate):
+    duration = aggregate.duration
+    rows = []
+    for edge, stats in aggregate.edges.items():
+        rows.append({"src": graph.ids[graph.flow_src[edge]], "dst": graph.ids[graph.flow_dst[edge]],
+                     "label": graph.edge_label[edge], **_summary_fields(stats, duration)})
+    undrawn = [{"src": graph.ids[s], "dst": graph.ids[d], **_summary_fields(stats, duration)}
+               for (s, d), stats in aggregate.undrawn.items()]
+    nodes = {graph.ids[n]: _summary_fields(stats, duration) for n, stats in aggregate.nodes.items()}
+    return {"records": aggregate.records, "seconds": duration,
+            "edges": sorted(rows, key=lambda r: -r["rps"]),
+            "undrawn": sorted(undrawn, key=lambda r: -r["rps"]),
+            "nodes": nodes, "unknown": dict(sorted(aggregate.unknown.items(), key=lambda kv: -kv[1])[:50])}
+
+
+def _summary_fields(stats, duration):
+    hist = stats.latency
+    return {"requests": stats.count, "rps": _rate(stats, duration),
+            "error_rate": stats.errors / stats.count if stats.count else 0.0,
+            "p50_ms": hist.percentile(50) if hist.total else None,
+            "p99_ms": hist.percentile(99) if hist.total else None}
+
+
+# ============================================
+# LOGS SINTÉTICOS
+# ============================================
+
+def generate(path, graph, records, seed=None, start=1_735_689_600.0, seconds=3600.0):
+    """Registros estructurados sobre las aristas del diagrama, con tráfico sesgado."""
+    rng = random.Random(seed)
+    edges = list(range(graph.n_edges))
+    weights = [rng.paretovariate(1.2) for _ in edges]
+    errors = {e: (0.08 if rng.random() < 0.1 else 0.004) for e in edges}
+    slow = {e: rng.choice([0.01, 0.03, 0.12, 0.4]) for e in edges}
+    alias = {n: f"delimasa-{graph.ids[n].replace('_', '-')}" for n in range(graph.n_nodes)}
+    block = 100_000
+    with open(path, "w", encoding="utf-8") as f:
+        for first in range(0, records, block):
+            n = min(block, records - first)
+            chosen = rng.choices(edges, weights, k=n)
+            lines = []
+            for i, edge in enumerate(chosen):
+                ts = start + seconds * (first + i) / records
+                failed = rng.random() < errors[edge]
+                lines.append(json.dumps({
+                    "timestamp": round(ts * 1000),
+                    "source": alias[graph.flow_src[edge]],
+                    "target": alias[graph.flow_dst[edge]],
+                    "status": 502 if failed else 200,
+                    "duration_ms": round(rng.lognormvariate(math.log(slow[edge] * 1000), 0.6), 2),
+                }))
+            f.write("\n".join(lines) + "\n")
+
+
+# ============================================
+# CLI
+# ============================================
+
+def print_summary(data, top):
+    print(f"\n📥 {data['records']:,} registros en {data['seconds'] / 60:,.1f} min")
+    print(f"\n{'Arista':<52} {'rps':>9} {'error':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    print("-" * 88)
+    for row in data["edges"][:top]:
+        name = f"{row['src']} → {row['dst']}" + (f" ({row['label']})" if row["label"] else "")
+        p50 = f"{row['p50_ms']:,.0f}" if row["p50_ms"] is not None else "-"
+        p99 = f"{row['p99_ms']:,.0f}" if row["p99_ms"] is not None else "-"
+        print(f"{name[:52]:<52} {row['rps']:>9,.1f} {row['error_rate']:>7.2%} {p50:>8} {p99:>8}")
+    if data["undrawn"]:
+        print("\nℹ️  Saltos con tráfico que no están dibujados en el diagrama:")
+        for row in data["undrawn"][:top]:
+            print(f"   {row['src']} → {row['dst']}: {row['rps']:,.1f} rps")
+    if data["unknown"]:
+        names = ", ".join(f"{name} ({count:,})" for name, count in list(data["unknown"].items())[:10])
+        print(f"\n⚠️  Nombres sin nodo (usa --aliases): {names}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tráfico de los logs sobre el diagrama de arquitectura")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="agrega los logs y renderiza el overlay")
+    run_parser.add_argument("logs", nargs="+", help="archivos .jsonl o .jsonl.gz")
+    run_parser.add_argument("--source", default=DEFAULT_SCRIPT, help="script, .json o .topo del diagrama")
+    run_parser.add_argument("--aliases", help="JSON {nombre en los logs: id de nodo}")
+    run_parser.add_argument("--jobs", type=int, default=1, help="procesos para leer los logs")
+    run_parser.add_argument("--color-by", choices=["errors", "p99"], default="errors")
+    run_parser.add_argument("--top", type=int, default=20, help="aristas a listar")
+    run_parser.add_argument("--json", dest="json_out", help="escribe las métricas agregadas")
+    run_parser.add_argument("--no-render", action="store_true")
+
+    gen_parser = commands.add_parser("generate", help="genera logs sintéticos del diagrama")
+    gen_parser.add_argument("output")
+    gen_parser.add_argument("--source", default=DEFAULT_SCRIPT)
+    gen_parser.add_argument("--records", type=int, default=1_000_000)
+    gen_parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    static = args.source.endswith(".py")
+    graph = topology.load(args.source, static=static)
+    if args.command == "generate":
+        generate(args.output, graph, args.records, args.seed)
+        print(f"✅ {args.records:,} registros en {args.output}")
+        return 0
+
+    aliases = None
+    if args.aliases:
+        with open(args.aliases, encoding="utf-8") as f:
+            aliases = json.load(f)
+    started = time.perf_counter()
+    aggregate = ingest(args.logs, graph, aliases, args.jobs)
+    elapsed = time.perf_counter() - started
+    data = summary(graph, aggregate)
+    print_summary(data, args.top)
+    print(f"\n⏱️  {aggregate.records:,} registros en {elapsed:.1f}s ({aggregate.records / max(elapsed, 1e-9):,.0f}/s)")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"💾 Métricas en {args.json_out}")
+    if not args.no_render:
+        spec = overlay_spec(topology.load_spec(args.source, static=static), graph, aggregate, args.color_by)
+        topology.render(spec)
+        print(f"🎨 Diagrama con tráfico: {spec['filename']}.{spec.get('outformat', 'png')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
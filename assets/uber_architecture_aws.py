@@ -2,27 +2,18 @@
 # Diagrama de arquitectura estilo Uber en AWS usando "diagrams"
 # Genera: uber_architecture_aws.png
 
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.network import Route53, CloudFront, APIGateway, VPCRouter, ELB
-from diagrams.aws.security import WAF, Cognito, SecretsManager, Shield
-from diagrams.aws.compute import ECS, Lambda, EKS
-from diagrams.aws.integration import SQS, SNS, Eventbridge, StepFunctions
-from diagrams.aws.database import RDS, Dynamodb, Elasticache
-from diagrams.aws.analytics import KinesisDataStreams, Glue, Athena, Quicksight
-from diagrams.aws.management import Cloudwatch
-from diagrams.aws.storage import S3
-from diagrams.aws.mobile import APIGateway as APIGWMobile # (alias visual)
-from diagrams.aws.network import NATGateway, InternetGateway
-from diagrams.aws.devtools import Codepipeline, XRay
-from diagrams.aws.ml import Personalize
-from diagrams.aws.iot import IotCore
-from diagrams.aws.general import InternetAlt1
-from diagrams.aws.security import CertificateManager
-from diagrams.aws.migration import Dms
-from diagrams.aws.blockchain import ManagedBlockchain
-from diagrams.aws.location import LocationService
+from topology import Diagram, Cluster, Edge
+from lazy_nodes import (
+    Route53, CloudFront, APIGateway, VPCRouter, ELB, WAF, Cognito,
+    SecretsManager, Shield, ECS, Lambda, EKS, SQS, SNS, Eventbridge,
+    StepFunctions, RDS, Dynamodb, Elasticache, KinesisDataStreams, Glue,
+    Athena, Quicksight, Cloudwatch, S3, APIGWMobile, NATGateway,
+    InternetGateway, Codepipeline, XRay, Personalize, IotCore, InternetAlt1,
+    CertificateManager, Dms, ManagedBlockchain, LocationService,
+)
 
 # Nota: algunos imports son decorativos para variedad visual; ajusta a tu stack real.
+# lazy_nodes solo carga el módulo de proveedor de las clases que se renderizan.
 
 with Diagram("uber_architecture_aws", show=False, filename="uber_architecture_aws", direction="LR"):
     # Usuarios/Clientes
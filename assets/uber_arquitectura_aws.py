@@ -1,14 +1,9 @@
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.compute import Lambda, ECS
-from diagrams.aws.database import RDS, Dynamodb, ElastiCache
-from diagrams.aws.network import ELB, CloudFront, Route53, APIGateway
-from diagrams.aws.storage import S3
-from diagrams.aws.integration import SQS, SNS, Eventbridge
-from diagrams.aws.analytics import Kinesis
-from diagrams.aws.security import Cognito
-from diagrams.aws.ml import SagemakerModel
-from diagrams.onprem.client import Users
-from diagrams.onprem.queue import Celery
+from topology import Diagram, Cluster, Edge
+from lazy_nodes import (
+    Lambda, ECS, RDS, Dynamodb, ElastiCache, ELB, CloudFront, Route53,
+    APIGateway, S3, SQS, SNS, Eventbridge, Kinesis, Cognito, SagemakerModel,
+    Users, Celery,
+)
 
 # Configuración del diagrama
 graph_attr = {
@@ -18,7 +13,7 @@ graph_attr = {
 }
 
 with Diagram("Arquitectura App de Transporte - AWS", 
-             filename="/home/claude/arquitectura_uber_aws", 
+             filename="arquitectura_uber_aws", 
              show=False,
              direction="TB",
              graph_attr=graph_attr):